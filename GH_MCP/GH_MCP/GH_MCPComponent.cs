@@ -176,28 +176,37 @@ namespace GrasshopperMCP
             {
                 try
                 {
-                    // 讀取命令
-                    string commandJson = await reader.ReadLineAsync();
-                    if (string.IsNullOrEmpty(commandJson))
+                    // 持久連接：逐行讀取命令，直到客戶端關閉連接
+                    // （舊客戶端只送一行就關閉，行為不變）
+                    while (isRunning)
                     {
-                        return;
+                        // 讀取命令
+                        string commandJson = await reader.ReadLineAsync();
+                        if (commandJson == null)
+                        {
+                            return;
+                        }
+                        if (commandJson.Trim().Length == 0)
+                        {
+                            continue;
+                        }
+                        
+                        // 更新最後接收的命令
+                        LastCommand = commandJson;
+                        
+                        // 解析命令
+                        Command command = JsonConvert.DeserializeObject<Command>(commandJson);
+                        RhinoApp.WriteLine($"GrasshopperMCPBridge: Received command: {command.Type}");
+                        
+                        // 執行命令
+                        Response response = GrasshopperCommandRegistry.ExecuteCommand(command);
+                        
+                        // 發送響應
+                        string responseJson = JsonConvert.SerializeObject(response);
+                        await writer.WriteLineAsync(responseJson);
+                        
+                        RhinoApp.WriteLine($"GrasshopperMCPBridge: Command {command.Type} executed with result: {(response.Success ? "Success" : "Error")}");
                     }
-                    
-                    // 更新最後接收的命令
-                    LastCommand = commandJson;
-                    
-                    // 解析命令
-                    Command command = JsonConvert.DeserializeObject<Command>(commandJson);
-                    RhinoApp.WriteLine($"GrasshopperMCPBridge: Received command: {command.Type}");
-                    
-                    // 執行命令
-                    Response response = GrasshopperCommandRegistry.ExecuteCommand(command);
-                    
-                    // 發送響應
-                    string responseJson = JsonConvert.SerializeObject(response);
-                    await writer.WriteLineAsync(responseJson);
-                    
-                    RhinoApp.WriteLine($"GrasshopperMCPBridge: Command {command.Type} executed with result: {(response.Success ? "Success" : "Error")}");
                 }
                 catch (Exception ex)
                 {
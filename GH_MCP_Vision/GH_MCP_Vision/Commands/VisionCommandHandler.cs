@@ -65,11 +65,43 @@ namespace GH_MCP_Vision.Commands
             return result;
         }
 
+        /// <summary>
+        /// 依 transfer 參數打包 PNG：
+        /// - "base64"（默認）：image 欄位為 Base64 字串
+        /// - "binary"：image 為 null，PNG 作為附件緊接在回應行之後送出
+        /// - "file"：PNG 寫入暫存檔，path 欄位為檔案路徑（僅適用於本機客戶端）
+        /// </summary>
+        private static object PackImage(VisionCommand command, byte[] png, Dictionary<string, object> data)
+        {
+            string transfer = command.GetParameter<string>("transfer") ?? "base64";
+            data["format"] = "png";
+
+            switch (transfer)
+            {
+                case "binary":
+                    data["image"] = null;
+                    data["attachment"] = new { length = png.Length, encoding = "png" };
+                    return new VisionBinaryResult { Header = data, Bytes = png };
+
+                case "file":
+                    string path = Path.Combine(Path.GetTempPath(), $"gh_mcp_vision_{Guid.NewGuid():N}.png");
+                    File.WriteAllBytes(path, png);
+                    data["image"] = null;
+                    data["path"] = path;
+                    data["length"] = png.Length;
+                    return data;
+
+                default:
+                    data["image"] = Convert.ToBase64String(png);
+                    return data;
+            }
+        }
+
         /// <summary>
         /// 截取 Grasshopper 畫布
         /// </summary>
         /// <param name="command">包含可選 bounds 參數的命令</param>
-        /// <returns>Base64 編碼的 PNG 圖片</returns>
+        /// <returns>PNG 圖片（Base64、二進位附件或暫存檔，見 PackImage）</returns>
         public static object CaptureCanvas(VisionCommand command)
         {
             var boundsDict = command.GetParameter<Dictionary<string, object>>("bounds");
@@ -157,20 +189,16 @@ namespace GH_MCP_Vision.Commands
                         throw new Exception("Failed to generate canvas image");
                     }
 
-                    // 轉換為 Base64
                     using (MemoryStream ms = new MemoryStream())
                     {
                         bitmap.Save(ms, ImageFormat.Png);
-                        string base64String = Convert.ToBase64String(ms.ToArray());
 
-                        return new
+                        return PackImage(command, ms.ToArray(), new Dictionary<string, object>
                         {
-                            image = base64String,
-                            width = bitmap.Width,
-                            height = bitmap.Height,
-                            format = "png",
-                            bounds = new { x = sourceRect.X, y = sourceRect.Y, width = sourceRect.Width, height = sourceRect.Height }
-                        };
+                            ["width"] = bitmap.Width,
+                            ["height"] = bitmap.Height,
+                            ["bounds"] = new { x = sourceRect.X, y = sourceRect.Y, width = sourceRect.Width, height = sourceRect.Height }
+                        });
                     }
                 }
                 finally
@@ -211,14 +239,11 @@ namespace GH_MCP_Vision.Commands
                     using (MemoryStream ms = new MemoryStream())
                     {
                         bitmap.Save(ms, ImageFormat.Png);
-                        string base64 = Convert.ToBase64String(ms.ToArray());
-                        return new
+                        return PackImage(command, ms.ToArray(), new Dictionary<string, object>
                         {
-                            image = base64,
-                            width = bitmap.Width,
-                            height = bitmap.Height,
-                            format = "png"
-                        };
+                            ["width"] = bitmap.Width,
+                            ["height"] = bitmap.Height
+                        });
                     }
                 }
             });
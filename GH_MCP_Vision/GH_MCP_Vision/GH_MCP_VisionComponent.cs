@@ -183,9 +183,15 @@ namespace GH_MCP_Vision
 
                             if (!string.IsNullOrEmpty(line))
                             {
-                                string response = ProcessCommand(line);
+                                string response = ProcessCommand(line, out byte[] attachment);
                                 byte[] responseBytes = Encoding.UTF8.GetBytes(response + "\n");
                                 await stream.WriteAsync(responseBytes, 0, responseBytes.Length, token);
+
+                                // 二進位附件緊接在回應行之後，長度由回應的 data.attachment.length 指定
+                                if (attachment != null)
+                                {
+                                    await stream.WriteAsync(attachment, 0, attachment.Length, token);
+                                }
                             }
                         }
                     }
@@ -200,13 +206,19 @@ namespace GH_MCP_Vision
             }
         }
 
-        private string ProcessCommand(string json)
+        private string ProcessCommand(string json, out byte[] attachment)
         {
+            attachment = null;
             try
             {
                 AddLog($"Received: {json.Substring(0, Math.Min(50, json.Length))}...");
                 var command = JsonConvert.DeserializeObject<VisionCommand>(json);
                 var response = VisionCommandRegistry.ExecuteCommand(command);
+                if (response.Data is VisionBinaryResult binary)
+                {
+                    response.Data = binary.Header;
+                    attachment = binary.Bytes;
+                }
                 return JsonConvert.SerializeObject(response);
             }
             catch (Exception ex)
@@ -152,4 +152,15 @@ namespace GH_MCP_Vision.Models
             return new VisionResponse { Success = false, Error = error };
         }
     }
+
+    /// <summary>
+    /// 帶二進位附件的命令結果：Header 作為回應的 data 送出，
+    /// Bytes 緊接在回應那一行之後以原始位元組送出（長度見 data.attachment.length）
+    /// </summary>
+    public class VisionBinaryResult
+    {
+        public object Header { get; set; }
+
+        public byte[] Bytes { get; set; }
+    }
 }
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Level 1 統計嵌入訓練基準測試
+
+生成帶大量組件類型（Wasp、LunchBox、Kangaroo 等插件的規模）的 GHX 語料，
+量測 AdaptiveLearner._train_statistical：
+
+- sparse: 稀疏共現矩陣（從連線列整列累加）+ 截斷分解（類型數超過
+  EXACT_SVD_MAX_TYPES 時為隨機化分解）
+- dense:  舊實作，n×n 稠密矩陣 + 逐邊 Python 迴圈 + 完整 np.linalg.svd
+  （O(n²) 記憶體、O(n³) 時間，只在類型數不超過 --dense-max 時執行）
+
+每種實作報告訓練耗時與峰值記憶體（tracemalloc）；兩者都執行時比較全部 --dim 個奇異值的
+相對誤差（最大值與中位數，尾部奇異值間距小，最大誤差通常出現在最後幾個）。
+
+用法:
+    python benchmarks/embedding_training.py                            # 10k 類型
+    python benchmarks/embedding_training.py --types 2000 --dense-max 2000
+    python benchmarks/embedding_training.py --types 50000 --documents 2000 --json result.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+# 添加專案路徑
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "gh_learning" / "src"))
+
+from ghx_corpus import GHXCorpus
+from ghx_parser import Component, Connection, GHXDocument, Parameter
+from graph_learner import AdaptiveLearner
+
+DEFAULT_TYPES = 10000
+DEFAULT_DOCUMENTS = 500
+DEFAULT_COMPONENTS = 200
+DEFAULT_DIM = 64
+DEFAULT_DENSE_MAX = 3000
+# 類型使用頻率的 Zipf 指數（少數常用組件 + 長尾插件組件）
+ZIPF_EXPONENT = 1.1
+
+
+# =============================================================================
+# 語料生成
+# =============================================================================
+
+def generate_corpus(types: int, documents: int, components: int, fan_in: int = 2, seed: int = 0) -> GHXCorpus:
+    """
+    每個文件 components 個組件，每個組件連接前面最多 fan_in 個組件的輸出；
+    組件類型按 Zipf 分佈抽樣，並保證每種類型至少出現一次
+    """
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, types + 1) ** ZIPF_EXPONENT
+    sampled = rng.choice(types, size=documents * components, p=weights / weights.sum())
+    sampled[:min(types, len(sampled))] = rng.permutation(types)[:len(sampled)]
+    names = [f"Plugin{i % 40:02d} Component {i:05d}" for i in range(types)]
+
+    docs = []
+    for d in range(documents):
+        comps: List[Component] = []
+        conns: List[Connection] = []
+        for c in range(components):
+            type_id = int(sampled[d * components + c])
+            instance = f"{d}-{c}"
+            comps.append(Component(
+                instance_guid=instance, component_guid=f"guid-{type_id:05d}", name=names[type_id],
+                nickname=f"C{type_id}", inputs=[Parameter("A", "Input")], outputs=[Parameter("R", "Result")]
+            ))
+            if c:
+                for source in rng.integers(max(0, c - 50), c, size=int(rng.integers(1, fan_in + 1))):
+                    conns.append(Connection(f"{d}-{source}", "R", instance, "A"))
+        docs.append(GHXDocument(file_path=f"synthetic_{d:05d}.ghx", components=comps, connections=conns))
+    return GHXCorpus.from_documents(docs)
+
+
+# =============================================================================
+# 訓練
+# =============================================================================
+
+def train_dense(learner: AdaptiveLearner):
+    """舊實作：稠密共現矩陣 + 完整 SVD"""
+    types = sorted(learner.component_types)
+    type_to_idx = {t: i for i, t in enumerate(types)}
+    n = len(types)
+    cooccurrence = np.zeros((n, n))
+
+    for graph in learner.iter_graphs():
+        id_to_type = {node.instance_id: node.component_type for node in graph.nodes}
+        for edge in graph.edges:
+            src_type = id_to_type.get(edge.source)
+            tgt_type = id_to_type.get(edge.target)
+            if src_type and tgt_type and src_type in type_to_idx and tgt_type in type_to_idx:
+                i, j = type_to_idx[src_type], type_to_idx[tgt_type]
+                cooccurrence[i, j] += 1
+                cooccurrence[j, i] += 1
+
+    U, S, _ = np.linalg.svd(cooccurrence, full_matrices=False)
+    dim = min(learner.embedding_dim, n, len(S))
+    embeddings_matrix = U[:, :dim] * np.sqrt(S[:dim])
+    learner.embeddings = {t: embeddings_matrix[idx] for t, idx in type_to_idx.items()}
+
+
+def train_sparse(learner: AdaptiveLearner):
+    learner._train_statistical()
+
+
+def measure(corpus: GHXCorpus, dim: int, train: Callable[[AdaptiveLearner], None]) -> Dict[str, Any]:
+    learner = AdaptiveLearner(embedding_dim=dim)
+    with contextlib.redirect_stdout(io.StringIO()):
+        learner.load_corpus(corpus)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        train(learner)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    types = sorted(learner.embeddings)
+    matrix = np.array([learner.embeddings[t] for t in types])
+    return {
+        "seconds": round(elapsed, 3),
+        "peak_mb": round(peak / 2**20, 1),
+        # 嵌入列的範數平方即奇異值
+        "singular_values": (np.linalg.norm(matrix, axis=0) ** 2).tolist(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="量測 Level 1 統計嵌入訓練")
+    parser.add_argument("--types", type=int, default=DEFAULT_TYPES, help=f"組件類型數（默認: {DEFAULT_TYPES}）")
+    parser.add_argument("--documents", type=int, default=DEFAULT_DOCUMENTS, help=f"文件數（默認: {DEFAULT_DOCUMENTS}）")
+    parser.add_argument("--components", type=int, default=DEFAULT_COMPONENTS,
+                        help=f"每個文件的組件數（默認: {DEFAULT_COMPONENTS}）")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM, help=f"嵌入維度（默認: {DEFAULT_DIM}）")
+    parser.add_argument("--dense-max", type=int, default=DEFAULT_DENSE_MAX,
+                        help=f"類型數不超過此值時也量測稠密實作（默認: {DEFAULT_DENSE_MAX}）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="結果輸出為 JSON")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    corpus = generate_corpus(args.types, args.documents, args.components, seed=args.seed)
+    print(f"語料: {len(corpus)} 個文件, {corpus.component_count} 個組件, {corpus.connection_count} 條連線, "
+          f"{args.types} 種類型（生成 {time.perf_counter() - start:.1f}s）")
+
+    results: Dict[str, Any] = {"types": args.types, "documents": args.documents,
+                               "components": corpus.component_count, "connections": corpus.connection_count,
+                               "dim": args.dim}
+    results["sparse"] = measure(corpus, args.dim, train_sparse)
+    if args.types <= args.dense_max:
+        results["dense"] = measure(corpus, args.dim, train_dense)
+
+    print(f"\n{'實作':<8} {'耗時 (s)':>10} {'峰值 (MB)':>10}")
+    for name in ("sparse", "dense"):
+        if name in results:
+            print(f"{name:<8} {results[name]['seconds']:>10.3f} {results[name]['peak_mb']:>10.1f}")
+    if "dense" in results:
+        exact = np.array(results["dense"]["singular_values"])
+        approx = np.array(results["sparse"]["singular_values"])
+        error = np.abs(approx - exact) / exact
+        results["max_relative_error"] = float(np.max(error))
+        results["median_relative_error"] = float(np.median(error))
+        print(f"\n加速: {results['dense']['seconds'] / results['sparse']['seconds']:.1f}x, "
+              f"{len(error)} 個奇異值相對誤差: 最大 {results['max_relative_error']:.2e}, "
+              f"中位數 {results['median_relative_error']:.2e}")
+    else:
+        print(f"\n（類型數超過 --dense-max {args.dense_max}，未量測稠密實作）")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
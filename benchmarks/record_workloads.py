@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+把 scripts/ 中的建模腳本錄製為基準測試工作負載
+
+在 8080 / 8081 埠啟動模擬 GH_MCP，以 runpy 執行腳本（time.sleep 與 input 被替換為
+立即返回 / 回答 "y"），記錄每個成功的 add_component、set_slider_properties 與
+connect_components，轉為 placement_info 格式保存到 benchmarks/workloads/<名稱>.json。
+腳本寫入 GH_WIP 的 ID 映射在錄製後還原。
+
+腳本把埠寫死為 8080，錄製期間該埠必須空閒。錄製結果已提交，只有腳本改動後才需重錄。
+
+用法：
+    python benchmarks/record_workloads.py              # 錄製全部
+    python benchmarks/record_workloads.py tower cup    # 只錄製指定名稱
+"""
+
+import argparse
+import builtins
+import contextlib
+import os
+import runpy
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 添加專案路徑
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "tests"))
+
+from mock_gh_mcp import MockGHMCP
+from workloads import WORKLOAD_DIR, Workload, WorkloadComponent, WorkloadConnection, resolve_guid
+
+# 工作負載名稱 → 腳本
+SCRIPTS = {
+    "table": "create_table_v3.py",
+    "chair": "create_chair.py",
+    "chair_v2": "build_chair_v2.py",
+    "cup": "build_cup_v2.py",
+    "sofa": "build_sofa_v2.py",
+    "seesaw": "build_seesaw.py",
+    "tower": "create_tower.py",
+}
+
+
+@contextlib.contextmanager
+def preserve_files(directory: Path):
+    """區塊結束後把目錄中的 JSON 文件還原為進入時的內容，並刪除新建的 JSON 文件"""
+    saved = {path: path.read_bytes() for path in directory.glob("*.json")}
+    try:
+        yield
+    finally:
+        for path in directory.glob("*.json"):
+            if path not in saved:
+                path.unlink()
+        for path, content in saved.items():
+            if not path.exists() or path.read_bytes() != content:
+                path.write_bytes(content)
+
+
+class CommandRecorder:
+    """包裝 MockGHMCP.dispatch，按順序記錄成功的建模命令"""
+
+    def __init__(self, mock: MockGHMCP):
+        self.mock = mock
+        self.components: Dict[str, WorkloadComponent] = {}
+        self.connections: List[WorkloadConnection] = []
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._dispatch = mock.dispatch
+        mock.dispatch = self.dispatch  # type: ignore[method-assign]
+
+    def dispatch(self, handlers, command: Dict[str, Any]):
+        response, attachment = self._dispatch(handlers, command)
+        if response.get("success"):
+            with self._lock:
+                self._record(str(command.get("type", "")), command.get("parameters") or {}, response["data"])
+        return response, attachment
+
+    def _key(self, params: Dict[str, Any], name: str) -> str:
+        nickname = params.get("nickname")
+        if nickname and not any(c.key == nickname for c in self.components.values()):
+            return str(nickname)
+        base = (nickname or name or "COMPONENT").upper().replace(" ", "_")
+        self._counts[base] = self._counts.get(base, 0) + 1
+        return f"{base}_{self._counts[base]}"
+
+    def _record(self, command_type: str, params: Dict[str, Any], data: Any):
+        if command_type == "clear_document":
+            self.components.clear()
+            self.connections.clear()
+        elif command_type == "add_component":
+            name = data.get("name") or params.get("type") or ""
+            self.components[data["id"]] = WorkloadComponent(
+                key=self._key(params, name),
+                type=name,
+                guid=params.get("guid") if params.get("guid") not in (None, "", "dummy") else resolve_guid(name),
+                x=float(params.get("x", 0.0)),
+                y=float(params.get("y", 0.0)),
+            )
+        elif command_type in ("set_slider_properties", "set_component_value", "set_slider_value"):
+            component = self.components.get(str(params.get("id") or params.get("componentId")))
+            if component is not None and isinstance(data, dict):
+                component.value = data.get("value", component.value)
+                component.min_val = data.get("min", component.min_val)
+                component.max_val = data.get("max", component.max_val)
+        elif command_type == "connect_components":
+            source = self.components.get(str(params.get("sourceId")))
+            target = self.components.get(str(params.get("targetId")))
+            if source is not None and target is not None:
+                self.connections.append(WorkloadConnection(
+                    source.key, params.get("sourceParam"), target.key, params.get("targetParam")
+                ))
+
+    def workload(self, name: str, source: str) -> Workload:
+        return Workload(name, list(self.components.values()), list(self.connections), source)
+
+
+def record(name: str, script: str) -> Optional[Workload]:
+    """執行一個腳本並返回錄製的工作負載；腳本沒有創建任何組件時返回 None"""
+    path = PROJECT_ROOT / "scripts" / script
+    sleep, ask = time.sleep, builtins.input
+    time.sleep = lambda seconds: None
+    builtins.input = lambda prompt="": "y"
+    try:
+        with preserve_files(PROJECT_ROOT / "GH_WIP"), MockGHMCP(port=8080, vision_port=8081) as mock:
+            recorder = CommandRecorder(mock)
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                try:
+                    runpy.run_path(str(path), run_name="__main__")
+                except SystemExit:
+                    pass
+    finally:
+        time.sleep, builtins.input = sleep, ask
+    workload = recorder.workload(name, f"scripts/{script}")
+    return workload if workload.components else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把建模腳本錄製為基準測試工作負載")
+    parser.add_argument("names", nargs="*", help=f"要錄製的名稱（默認全部: {', '.join(SCRIPTS)}）")
+    args = parser.parse_args()
+
+    for name in args.names or SCRIPTS:
+        if name not in SCRIPTS:
+            parser.error(f"未知的工作負載: {name}")
+        workload = record(name, SCRIPTS[name])
+        if workload is None:
+            print(f"✗ {name}: {SCRIPTS[name]} 沒有創建任何組件")
+            continue
+        workload.save(WORKLOAD_DIR / f"{name}.json")
+        print(f"✓ {name}: {len(workload.components)} 個組件, {len(workload.connections)} 條連接, "
+              f"{len(workload.sliders)} 個 slider ← {workload.source}")
+
+
+if __name__ == "__main__":
+    main()
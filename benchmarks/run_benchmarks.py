@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+端到端建模工作負載基準測試
+
+在模擬 GH_MCP（tests/mock_gh_mcp.py）上重放工作負載（見 workloads.py），比較三種執行器：
+
+- placement-dag / placement-phased / placement-batch：PlacementExecutor 的三種模式
+- client-optimized：GH_MCP_ClientOptimized（逐一 add_slider / add_component / connect）
+- layout：MCPLayoutExecutor（定義 → 佈局計算 → 創建 → slider → 連接 → 縮放）
+
+每個案例（工作負載 × 規模 × 執行器）報告：命令數與 commands/sec、總耗時、
+客戶端峰值 RSS、各階段耗時，以及每種命令的 p50 / p95 / p99。
+每個案例在獨立的子進程中執行（模擬伺服器留在主進程），峰值 RSS 只計客戶端。
+
+結果追加到 benchmarks/results/history.jsonl（每次執行一行，帶 git commit），
+每個案例與相同設定（延遲、並行數）下該案例最近一次的結果比較：commands/sec 下降、
+耗時或峰值 RSS 上升超過閾值即標記為回歸。
+
+用法：
+    python benchmarks/run_benchmarks.py                          # 全部工作負載，原始規模 + 1k
+    python benchmarks/run_benchmarks.py --scales 10000 --workloads tower --executors placement-dag
+    python benchmarks/run_benchmarks.py --latency 0.002 --fail-on-regression
+    python benchmarks/run_benchmarks.py --workloads synthetic synthetic-deep --scales 1000 50000
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 添加專案路徑
+BENCHMARK_DIR = Path(__file__).parent
+PROJECT_ROOT = BENCHMARK_DIR.parent
+for path in (PROJECT_ROOT, PROJECT_ROOT / "tests", BENCHMARK_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from mock_gh_mcp import FaultConfig, MockGHMCP
+from workloads import Workload, builtin_workloads
+import synthetic
+
+DEFAULT_RESULTS = BENCHMARK_DIR / "results" / "history.jsonl"
+DEFAULT_SCALES = ["native", "1000"]
+DEFAULT_THRESHOLD = 0.10
+# 合成工作負載在 native 規模下的組件數
+SYNTHETIC_NATIVE = 1000
+# 耗時低於此值（秒）的案例受計時雜訊主導，只顯示變化、不判定吞吐量與耗時的回歸
+MIN_COMPARABLE_TIME = 0.25
+HOST = "127.0.0.1"
+
+# 執行器返回 (各階段耗時, 成功計數, 使用的傳輸)
+Phases = Dict[str, float]
+Runner = Callable[[Workload, int, Path, int], Tuple[Phases, Dict[str, int], Any]]
+
+
+# =============================================================================
+# 執行器
+# =============================================================================
+
+def _placement(mode: str) -> Runner:
+    def run(workload: Workload, port: int, workdir: Path, workers: int):
+        from grasshopper_mcp.transport import Transport
+        from grasshopper_tools.client import GrasshopperClient
+        from grasshopper_tools.placement_executor import PlacementExecutor
+
+        json_path = workdir / f"{workload.name.replace('@', '_')}.json"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(workload.to_placement_info(), f)
+
+        transport = Transport(HOST, port, pool_size=max(workers, 1))
+        executor = PlacementExecutor(client=GrasshopperClient(transport=transport))
+        result = executor.execute_placement_info(
+            str(json_path), max_workers=workers, use_batch=mode == "batch", use_dag=mode == "dag",
+            id_map_path=str(workdir / "component_id_map.json"), resume=False
+        )
+        phases = {"add": result.get("add_time", 0.0), "connect": result.get("connect_time", 0.0)}
+        ok = {"add": result.get("add_success", 0), "connect": result.get("connect_success", 0)}
+        return phases, ok, transport
+
+    return run
+
+
+def _client_optimized(workload: Workload, port: int, workdir: Path, workers: int):
+    from grasshopper_mcp.client_optimized import GH_MCP_ClientOptimized
+
+    client = GH_MCP_ClientOptimized(host=HOST, port=port, vision_port=port, debug=False)
+
+    def cell(x: float, y: float) -> Tuple[int, int]:
+        return (round((x - client.START_X) / client.COL_WIDTH), round((y - client.START_Y) / client.ROW_HEIGHT))
+
+    phases: Phases = {}
+    ok = {"sliders": 0, "components": 0, "connections": 0}
+
+    start = time.perf_counter()
+    for component in workload.sliders:
+        min_val = component.min_val if component.min_val is not None else 0
+        max_val = component.max_val if component.max_val is not None else 100
+        value = component.value if component.value is not None else min_val
+        ok["sliders"] += bool(client.add_slider(component.key, *cell(component.x, component.y),
+                                                value, min_val, max_val))
+    phases["sliders"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for component in workload.components:
+        if not component.is_slider:
+            ok["components"] += bool(client.add_component(component.type, component.key,
+                                                          *cell(component.x, component.y), guid=component.guid))
+    phases["components"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for c in workload.connections:
+        ok["connections"] += client.connect(c.source, c.source_param, c.target, c.target_param)
+    phases["connections"] = time.perf_counter() - start
+    return phases, ok, client._transport
+
+
+def _layout(workload: Workload, port: int, workdir: Path, workers: int):
+    from grasshopper_mcp.layout.mcp_layout_executor import MCPLayoutExecutor
+
+    executor = MCPLayoutExecutor(host=HOST, port=port)
+    phases: Phases = {}
+    ok = {"components": 0, "sliders": 0, "connections": 0}
+
+    def phase(name: str):
+        phases[name] = time.perf_counter()
+
+    def done(name: str):
+        phases[name] = time.perf_counter() - phases[name]
+
+    phase("define")
+    for component in workload.components:
+        executor.define_component(component.key, component.type)
+    for c in workload.connections:
+        executor.define_connection(c.source, c.source_param or "", c.target, c.target_param or "")
+    done("define")
+
+    phase("layout")
+    executor.calculate_layout()
+    done("layout")
+
+    phase("components")
+    for component in workload.components:
+        ok["components"] += bool(executor.create_component(component.key, component.type))
+    done("components")
+
+    phase("sliders")
+    for component in workload.sliders:
+        if component.min_val is not None and component.value is not None:
+            ok["sliders"] += executor.set_slider(component.key, component.min_val, component.max_val, component.value)
+    done("sliders")
+
+    phase("connections")
+    for c in workload.connections:
+        ok["connections"] += executor.create_connection(c.source, c.source_param, c.target, c.target_param)
+    done("connections")
+
+    phase("zoom")
+    executor.zoom_to_all()
+    done("zoom")
+    return phases, ok, executor.transport
+
+
+EXECUTORS: Dict[str, Runner] = {
+    "placement-dag": _placement("dag"),
+    "placement-phased": _placement("phased"),
+    "placement-batch": _placement("batch"),
+    "client-optimized": _client_optimized,
+    "layout": _layout,
+}
+
+
+# =============================================================================
+# 量測
+# =============================================================================
+
+def peak_rss_mb() -> Optional[float]:
+    """
+    本進程的峰值 RSS（MB）；無法取得時（Windows）返回 None
+
+    Linux 讀 /proc 的 VmHWM：它屬於 exec 後的新位址空間，而 ru_maxrss 會繼承
+    spawn 前父進程的峰值
+    """
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 為單位，macOS 以位元組為單位
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def load_workload(name: str, scale: Optional[int]) -> Workload:
+    # 合成工作負載直接生成到指定規模，而不是複製
+    if name in synthetic.SHAPES:
+        components = scale or SYNTHETIC_NATIVE
+        return synthetic.generate(components, **synthetic.SHAPES[name], name=f"{name}@{components}")
+    workloads = builtin_workloads()
+    if name not in workloads:
+        available = list(workloads) + list(synthetic.SHAPES)
+        raise KeyError(f"未知的工作負載: {name}（可用: {', '.join(available)}）")
+    workload = workloads[name]
+    return workload.scaled(scale) if scale else workload
+
+
+def measure(workload_name: str, scale: Optional[int], executor: str, port: int, workers: int) -> Dict[str, Any]:
+    """在目前進程中執行一個案例（輸出導向 devnull），返回客戶端量測"""
+    workload = load_workload(workload_name, scale)
+    runner = EXECUTORS[executor]
+    with tempfile.TemporaryDirectory(prefix="gh_bench_") as workdir, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        phases, ok, transport = runner(workload, port, Path(workdir), workers)
+        wall_time = time.perf_counter() - start
+        commands = transport.stats()["commands"]
+        transport.close()
+
+    phases = {name: round(seconds, 4) for name, seconds in phases.items()}
+    return {
+        "components": len(workload.components),
+        "connections": len(workload.connections),
+        "wall_time": round(wall_time, 4),
+        "peak_rss_mb": peak_rss_mb(),
+        "phases": phases,
+        "ok": ok,
+        "latency": {
+            command_type: {key: stats[key] for key in ("count", "errors", "p50", "p95", "p99")}
+            for command_type, stats in sorted(commands.items())
+        },
+    }
+
+
+def _child(queue, *args):
+    try:
+        queue.put(("ok", measure(*args)))
+    except BaseException as e:  # 子進程中的任何失敗都回報給主進程
+        queue.put(("error", f"{type(e).__name__}: {e}"))
+
+
+def run_case(
+    workload: str,
+    scale: Optional[int],
+    executor: str,
+    latency: float = 0.0,
+    workers: int = 8,
+    isolate: bool = True,
+    timeout: float = 1800.0
+) -> Dict[str, Any]:
+    """
+    執行一個案例
+
+    Args:
+        workload: 工作負載名稱
+        scale: 組件數；None 為原始規模
+        executor: EXECUTORS 中的名稱
+        latency: 模擬伺服器每個命令的延遲（秒）
+        workers: 並行數（PlacementExecutor 的 max_workers 與連接池大小）
+        isolate: 在子進程中執行客戶端（峰值 RSS 只計客戶端）；False 時在目前進程執行
+        timeout: 子進程的最長執行時間（秒）
+    """
+    case: Dict[str, Any] = {"workload": workload, "scale": scale, "executor": executor}
+    with MockGHMCP(vision_port=None, faults=FaultConfig(default_latency=latency)) as mock:
+        if isolate:
+            context = multiprocessing.get_context("spawn")
+            queue = context.Queue()
+            process = context.Process(target=_child, args=(queue, workload, scale, executor, mock.port, workers))
+            process.start()
+            try:
+                status, payload = queue.get(timeout=timeout)
+            finally:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+            if status != "ok":
+                raise RuntimeError(f"{workload}/{executor}: {payload}")
+        else:
+            payload = measure(workload, scale, executor, mock.port, workers)
+        counts = mock.counts()
+
+    case.update(payload)
+    # batch 信封本身不算：其中的命令已分別計入
+    case["commands"] = sum(counts.values()) - counts.get("batch", 0)
+    case["commands_by_type"] = dict(sorted(counts.items()))
+    case["commands_per_sec"] = round(case["commands"] / case["wall_time"], 1) if case["wall_time"] else None
+    return case
+
+
+# =============================================================================
+# 結果歷史
+# =============================================================================
+
+def git_revision() -> Tuple[Optional[str], bool]:
+    """目前的 (commit, 工作區是否有未提交的修改)；不在 git 倉庫中時為 (None, False)"""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+        return commit, bool(dirty)
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def case_key(case: Dict[str, Any]) -> Tuple[str, Optional[int], str]:
+    return (case["workload"], case["scale"], case["executor"])
+
+
+def load_history(path: Path) -> List[Dict[str, Any]]:
+    """讀取結果歷史；損壞的行被跳過"""
+    if not path.exists():
+        return []
+    runs = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                runs.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return runs
+
+
+def append_history(path: Path, run: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False, sort_keys=True) + "\n")
+
+
+def baseline_cases(history: List[Dict[str, Any]], settings: Dict[str, Any]) -> Dict[Tuple, Dict[str, Any]]:
+    """每個案例在相同設定下最近一次的結果，附上該次執行的 commit"""
+    cases: Dict[Tuple, Dict[str, Any]] = {}
+    for run in history:
+        if run.get("settings") != settings:
+            continue
+        for case in run.get("cases", []):
+            cases[case_key(case)] = dict(case, commit=run.get("commit"))
+    return cases
+
+
+def compare(
+    baseline: Dict[Tuple, Dict[str, Any]],
+    run: Dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_time: float = MIN_COMPARABLE_TIME
+) -> List[Dict[str, Any]]:
+    """
+    逐案例與基線比較
+
+    兩次耗時都低於 min_time 秒的案例不判定 commands/sec 與耗時的回歸
+
+    Returns:
+        每個有基線的案例一項：{"key", "baseline_commit", "commands_per_sec", "wall_time",
+        "peak_rss_mb", "regressions"}，各指標為相對變化（+0.12 表示增加 12%）；
+        regressions 列出變差超過閾值的指標
+    """
+    rows = []
+    for case in run.get("cases", []):
+        before = baseline.get(case_key(case))
+        if before is None:
+            continue
+        row: Dict[str, Any] = {"key": case_key(case), "baseline_commit": before.get("commit"), "regressions": []}
+        timed = max(before.get("wall_time") or 0.0, case.get("wall_time") or 0.0) >= min_time
+        # commands/sec 越高越好，耗時與記憶體越低越好
+        for metric, higher_is_better in (("commands_per_sec", True), ("wall_time", False), ("peak_rss_mb", False)):
+            old, new = before.get(metric), case.get(metric)
+            if not old or new is None:
+                row[metric] = None
+                continue
+            change = (new - old) / old
+            row[metric] = round(change, 4)
+            if (timed or metric == "peak_rss_mb") and (-change if higher_is_better else change) > threshold:
+                row["regressions"].append(metric)
+        rows.append(row)
+    return rows
+
+
+# =============================================================================
+# 命令行
+# =============================================================================
+
+def _scale(value: str) -> Optional[int]:
+    return None if value == "native" else int(value)
+
+
+def _format_scale(scale: Optional[int]) -> str:
+    return "native" if scale is None else f"{scale // 1000}k" if scale % 1000 == 0 else str(scale)
+
+
+def print_cases(cases: List[Dict[str, Any]]):
+    print(f"{'工作負載':<20}{'規模':>7}{'執行器':>18}{'組件':>7}{'命令':>8}{'耗時 (s)':>10}"
+          f"{'命令/秒':>10}{'RSS (MB)':>10}  階段")
+    for case in cases:
+        phases = " ".join(f"{name}={seconds:.2f}" for name, seconds in case["phases"].items())
+        rss = case["peak_rss_mb"]
+        print(f"{case['workload']:<20}{_format_scale(case['scale']):>7}{case['executor']:>18}"
+              f"{case['components']:>7}{case['commands']:>8}{case['wall_time']:>10.2f}"
+              f"{case['commands_per_sec'] or 0:>10.0f}{rss if rss is not None else '-':>10}  {phases}")
+
+
+def print_comparison(rows: List[Dict[str, Any]], threshold: float):
+    print(f"\n與相同設定下最近一次的結果比較，閾值 {threshold:.0%}：")
+
+    def pct(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value:+.1%}"
+
+    for row in rows:
+        workload, scale, executor = row["key"]
+        flag = "  ✗ 回歸: " + ", ".join(row["regressions"]) if row["regressions"] else ""
+        print(f"  {workload:<20}{_format_scale(scale):>7}{executor:>18}  vs {row['baseline_commit'] or '?':<9}"
+              f"  命令/秒 {pct(row['commands_per_sec']):>8}  耗時 {pct(row['wall_time']):>8}"
+              f"  RSS {pct(row['peak_rss_mb']):>8}{flag}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="在模擬 GH_MCP 上重放建模工作負載並記錄效能")
+    parser.add_argument("--workloads", nargs="+", help=f"工作負載名稱（默認全部內建；合成: {', '.join(synthetic.SHAPES)}）")
+    parser.add_argument("--scales", nargs="+", default=DEFAULT_SCALES,
+                        help="規模：native 或組件數，例如 native 1000 10000（默認: native 1000）")
+    parser.add_argument("--executors", nargs="+", choices=list(EXECUTORS), default=list(EXECUTORS),
+                        help="要比較的執行器（默認全部）")
+    parser.add_argument("--latency", type=float, default=0.0, help="模擬伺服器每個命令的延遲（秒）")
+    parser.add_argument("--workers", type=int, default=8, help="並行數（默認: 8）")
+    parser.add_argument("--results", default=str(DEFAULT_RESULTS), help="結果歷史文件（JSON Lines）")
+    parser.add_argument("--no-save", action="store_true", help="不寫入結果歷史")
+    parser.add_argument("--label", help="標記此次執行")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="回歸閾值（相對變化，默認: 0.10）")
+    parser.add_argument("--fail-on-regression", action="store_true", help="有回歸時以狀態碼 1 結束")
+    parser.add_argument("--no-isolate", action="store_true", help="在目前進程執行客戶端（峰值 RSS 不準確）")
+    args = parser.parse_args(argv)
+
+    names = args.workloads or list(builtin_workloads())
+    scales = [_scale(value) for value in args.scales]
+    settings = {"latency": args.latency, "workers": args.workers}
+
+    cases = []
+    for name in names:
+        for scale in scales:
+            for executor in args.executors:
+                print(f"▶ {name} / {_format_scale(scale)} / {executor}", file=sys.stderr)
+                cases.append(run_case(name, scale, executor, args.latency, args.workers, not args.no_isolate))
+
+    commit, dirty = git_revision()
+    run = {
+        "commit": commit,
+        "dirty": dirty,
+        "label": args.label,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        "cases": cases,
+    }
+    print_cases(cases)
+
+    results = Path(args.results)
+    rows = compare(baseline_cases(load_history(results), settings), run, args.threshold)
+    if rows:
+        print_comparison(rows, args.threshold)
+    regressions = sum(bool(row["regressions"]) for row in rows)
+
+    if not args.no_save:
+        append_history(results, run)
+        print(f"\n結果已追加到: {results}")
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
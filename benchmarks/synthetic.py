@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+合成大型 Grasshopper 定義
+
+生產中的定義有數千到數萬個組件，範例設計都不到 100 個。這裡按層生成可控規模的
+有向無環圖，組件類型、GUID 與參數名都取自 GH_WIP/component_knowledge.json，
+可輸出為 placement_info、component_info.mmd 或 Joseki JSON，用於壓測執行器與解析器。
+
+圖的形狀：
+
+- 第 0 層是 Number Slider（輸入），其餘組件平均分佈在 depth - 1 層
+- fan_in：每個組件連接的輸入數（不超過該組件實際的輸入數）
+- fan_out：每個組件最多被連接的次數；所有候選都用完時才超出，並計入 overflow
+- skip_ratio：連接跨層（來自更早的層）的比例；每個組件至少有一條連接來自上一層，
+  因此最長路徑恰好是 depth - 1 條連接
+- 相同參數與 seed 產生相同的圖
+
+用法：
+    python benchmarks/synthetic.py --components 10000 --depth 20 --output big.json
+    python benchmarks/synthetic.py --components 50000 --format mmd --output big.mmd
+    python benchmarks/synthetic.py --components 1000 --format joseki --output big_joseki.json
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# 添加專案路徑
+BENCHMARK_DIR = Path(__file__).parent
+PROJECT_ROOT = BENCHMARK_DIR.parent
+for path in (PROJECT_ROOT, BENCHMARK_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from workloads import KNOWLEDGE_PATH, Workload, WorkloadComponent, WorkloadConnection
+
+SLIDER = "Number Slider"
+# Number Slider 在 component_knowledge.json 中沒有列出輸出參數
+SLIDER_OUTPUT = "Number"
+
+# 佈局：每層一列
+COLUMN_WIDTH = 250
+ROW_HEIGHT = 80
+
+# run_benchmarks 中可直接使用的形狀
+SHAPES: Dict[str, Dict[str, Any]] = {
+    "synthetic": {"depth": 12, "fan_in": 3, "fan_out": 4},
+    "synthetic-deep": {"depth": 200, "fan_in": 2, "fan_out": 2},
+    "synthetic-wide": {"depth": 4, "fan_in": 6, "fan_out": 32},
+}
+
+
+@dataclass
+class GraphStats:
+    """生成的圖的實際形狀"""
+    components: int
+    connections: int
+    layers: int
+    longest_path: int
+    max_fan_in: int
+    max_fan_out: int
+    mean_fan_in: float
+    overflow: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+def load_component_types(path: Path = KNOWLEDGE_PATH) -> Dict[str, Dict[str, Any]]:
+    """component_knowledge.json：名稱 → {guid, typeName, inputs, outputs, ...}"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"\W+", "_", name).strip("_").upper() or "COMPONENT"
+
+
+# =============================================================================
+# 生成
+# =============================================================================
+
+def generate(
+    components: int,
+    depth: int = 12,
+    fan_in: int = 3,
+    fan_out: int = 4,
+    input_ratio: float = 0.15,
+    skip_ratio: float = 0.2,
+    seed: int = 0,
+    knowledge: Optional[Dict[str, Dict[str, Any]]] = None,
+    name: Optional[str] = None
+) -> Workload:
+    """
+    生成一個分層的合成定義
+
+    Args:
+        components: 組件總數
+        depth: 層數（含輸入層），不超過組件數
+        fan_in: 每個組件連接的輸入數上限
+        fan_out: 每個組件被連接的次數上限
+        input_ratio: 輸入層（Number Slider）佔組件總數的比例
+        skip_ratio: 跨層連接的比例
+        seed: 隨機種子
+        knowledge: load_component_types() 的結果；None 時自動讀取
+        name: 工作負載名稱，默認 "synthetic-<components>"
+
+    Returns:
+        Workload；最後一次生成的 GraphStats 可用 graph_stats() 計算
+    """
+    if components <= 0:
+        raise ValueError("components 必須大於 0")
+    if fan_in < 1 or fan_out < 1:
+        raise ValueError("fan_in 與 fan_out 必須至少為 1")
+    knowledge = load_component_types() if knowledge is None else knowledge
+    slider = knowledge.get(SLIDER, {})
+    # 中間層只用有輸入也有輸出的組件
+    types = sorted(
+        (type_name, info) for type_name, info in knowledge.items()
+        if info.get("guid") and info.get("inputs") and info.get("outputs")
+    )
+    if not types:
+        raise ValueError("component_knowledge.json 中沒有可用的組件類型")
+
+    rng = random.Random(seed)
+    depth = max(1, min(depth, components))
+    inputs = max(1, min(components - (depth - 1), round(components * input_ratio)))
+    rest = components - inputs
+    layer_sizes = [inputs] + [rest // (depth - 1) + (1 if i < rest % (depth - 1) else 0) for i in range(depth - 1)]
+
+    workload = Workload(name or f"synthetic-{components}", source=f"synthetic(seed={seed})")
+    # 每層中仍可被連接的組件索引，以及每個組件的輸出參數與剩餘容量
+    open_sources: List[List[int]] = []
+    outputs: List[List[str]] = []
+    capacity: List[int] = []
+    overflow = 0
+
+    def take_source(layer: int) -> Optional[int]:
+        candidates = open_sources[layer]
+        if not candidates:
+            return None
+        position = rng.randrange(len(candidates))
+        index = candidates[position]
+        capacity[index] -= 1
+        if capacity[index] <= 0:
+            candidates[position] = candidates[-1]
+            candidates.pop()
+        return index
+
+    for layer, size in enumerate(layer_sizes):
+        layer_open: List[int] = []
+        for row in range(size):
+            index = len(workload.components)
+            if layer == 0:
+                type_name, info = SLIDER, slider
+                minimum, maximum = 0.0, float(rng.choice((1, 10, 100, 1000)))
+                value = round(rng.uniform(minimum, maximum), 2)
+            else:
+                type_name, info = types[rng.randrange(len(types))]
+                minimum = maximum = value = None
+            workload.components.append(WorkloadComponent(
+                key=f"{_slug(type_name)}_{index}",
+                type=type_name,
+                guid=info.get("guid") or str(uuid.uuid5(uuid.NAMESPACE_URL, f"grasshopper:{type_name}")),
+                x=float(layer * COLUMN_WIDTH),
+                y=float(row * ROW_HEIGHT),
+                value=value,
+                min_val=minimum,
+                max_val=maximum,
+            ))
+            outputs.append([p["name"] for p in info.get("outputs", [])] or [SLIDER_OUTPUT])
+            capacity.append(fan_out)
+            layer_open.append(index)
+
+            if layer == 0:
+                continue
+            target_params = [p["name"] for p in info["inputs"]]
+            rng.shuffle(target_params)
+            for wire, target_param in enumerate(target_params[:fan_in]):
+                # 第一條連接來自上一層，保證深度；其餘按 skip_ratio 跨層
+                preferred = layer - 1
+                if wire and layer > 1 and rng.random() < skip_ratio:
+                    preferred = rng.randrange(layer - 1)
+                source = take_source(preferred)
+                if source is None:
+                    for fallback in range(layer - 1, -1, -1):
+                        source = take_source(fallback)
+                        if source is not None:
+                            break
+                if source is None:
+                    # 所有候選的容量都已用完：超出 fan_out
+                    overflow += 1
+                    previous = layer_sizes[layer - 1]
+                    source = sum(layer_sizes[:layer - 1]) + rng.randrange(previous)
+                workload.connections.append(WorkloadConnection(
+                    workload.components[source].key,
+                    rng.choice(outputs[source]),
+                    workload.components[index].key,
+                    target_param,
+                ))
+        open_sources.append(layer_open)
+
+    workload.source += f" overflow={overflow}"
+    return workload
+
+
+def graph_stats(workload: Workload) -> GraphStats:
+    """計算工作負載的實際層數、最長路徑與扇入 / 扇出"""
+    order = {component.key: i for i, component in enumerate(workload.components)}
+    fan_in = [0] * len(order)
+    fan_out = [0] * len(order)
+    incoming: List[List[int]] = [[] for _ in order]
+    for connection in workload.connections:
+        source, target = order[connection.source], order[connection.target]
+        fan_out[source] += 1
+        fan_in[target] += 1
+        incoming[target].append(source)
+
+    # 生成的組件按層排列，來源總在目標之前：一次遍歷即可求最長路徑
+    longest = [0] * len(order)
+    for index in range(len(order)):
+        for source in incoming[index]:
+            longest[index] = max(longest[index], longest[source] + 1)
+
+    wired = [count for count in fan_in if count]
+    match = re.search(r"overflow=(\d+)", workload.source)
+    return GraphStats(
+        components=len(workload.components),
+        connections=len(workload.connections),
+        layers=len({component.x for component in workload.components}),
+        longest_path=max(longest, default=0),
+        max_fan_in=max(fan_in, default=0),
+        max_fan_out=max(fan_out, default=0),
+        mean_fan_in=round(sum(wired) / len(wired), 3) if wired else 0.0,
+        overflow=int(match.group(1)) if match else 0,
+    )
+
+
+# =============================================================================
+# 輸出格式
+# =============================================================================
+
+def to_mmd(workload: Workload, knowledge: Optional[Dict[str, Dict[str, Any]]] = None, module_size: int = 100) -> str:
+    """
+    輸出與 GH_WIP/component_info.mmd 相同格式的 Mermaid flowchart
+
+    每層的組件按 module_size 分為一個 subgraph；連接的標籤是目標參數名
+    """
+    knowledge = load_component_types() if knowledge is None else knowledge
+    lines = ["flowchart LR"]
+    layers: Dict[float, List[WorkloadComponent]] = {}
+    for component in workload.components:
+        layers.setdefault(component.x, []).append(component)
+
+    for layer, (_, members) in enumerate(sorted(layers.items())):
+        for start in range(0, len(members), module_size):
+            module = f"L{layer}_M{start // module_size}"
+            lines.append(f'    subgraph {module}["第 {layer} 層 模組 {start // module_size}"]')
+            lines.append("        direction LR")
+            for component in members[start:start + module_size]:
+                info = knowledge.get(component.type, {})
+                parts = [component.type.replace('"', "'")]
+                if info.get("inputs"):
+                    parts.append("输入: " + ", ".join(p["name"] for p in info["inputs"]))
+                if component.is_slider:
+                    parts.append(f"输出: {component.value}")
+                elif info.get("outputs"):
+                    parts.append("输出: " + ", ".join(p["name"] for p in info["outputs"]))
+                parts.append(f"GUID: {component.guid}")
+                parts.append(f"位置: X={int(component.x)}, Y={int(component.y)}")
+                lines.append(f'        {component.key}["{"<br/>".join(parts)}"]')
+            lines.append("    end")
+            lines.append("")
+
+    for connection in workload.connections:
+        label = (connection.target_param or connection.source_param or "").replace('"', "'")
+        lines.append(f'    {connection.source} -->|"{label}"| {connection.target}')
+    return "\n".join(lines) + "\n"
+
+
+def to_joseki(workload: Workload, knowledge: Optional[Dict[str, Dict[str, Any]]] = None):
+    """輸出 GrasshopperJoseki；端口使用參數的 nickname，slider 範圍寫入 constraints"""
+    from grasshopper_mcp.joseki import GrasshopperJoseki, JosekiConnection, JosekiNode, PortConstraint
+
+    knowledge = load_component_types() if knowledge is None else knowledge
+
+    def nickname(type_name: str, kind: str, param: Optional[str]) -> str:
+        for entry in knowledge.get(type_name, {}).get(kind, []):
+            if entry.get("name") == param:
+                return entry.get("nickname") or param
+        return param or ""
+
+    types = {component.key: component.type for component in workload.components}
+    stats = graph_stats(workload)
+    return GrasshopperJoseki(
+        id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"grasshopper:{workload.name}:{workload.source}")),
+        name=workload.name,
+        description=f"合成定義：{stats.components} 個組件、{stats.connections} 條連接、{stats.layers} 層",
+        category="Synthetic",
+        tags=["synthetic", "benchmark"],
+        pseudo_code=f"1. {stats.layers} 層分層有向無環圖，最長路徑 {stats.longest_path} 條連接",
+        nodes=[
+            JosekiNode(
+                id=component.key,
+                name=component.type,
+                component_guid=component.guid,
+                input_values={"value": component.value} if component.is_slider else {},
+                position={"x": component.x, "y": component.y},
+            )
+            for component in workload.components
+        ],
+        connections=[
+            JosekiConnection(
+                c.source, nickname(types[c.source], "outputs", c.source_param),
+                c.target, nickname(types[c.target], "inputs", c.target_param),
+            )
+            for c in workload.connections
+        ],
+        constraints=[
+            PortConstraint(component.key, SLIDER_OUTPUT, "Float", component.min_val, component.max_val)
+            for component in workload.sliders
+        ],
+    )
+
+
+FORMATS = ("placement", "mmd", "joseki")
+
+
+def write(workload: Workload, path: Path, fmt: str = "placement"):
+    """按格式把工作負載寫入文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "placement":
+        workload.save(path)
+    elif fmt == "mmd":
+        path.write_text(to_mmd(workload), encoding="utf-8")
+    elif fmt == "joseki":
+        path.write_text(to_joseki(workload).to_json(), encoding="utf-8")
+    else:
+        raise ValueError(f"未知的格式: {fmt}（可用: {', '.join(FORMATS)}）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成的大型 Grasshopper 定義")
+    parser.add_argument("--components", type=int, default=1000, help="組件總數（默認: 1000）")
+    parser.add_argument("--depth", type=int, default=12, help="層數（默認: 12）")
+    parser.add_argument("--fan-in", type=int, default=3, help="每個組件連接的輸入數上限（默認: 3）")
+    parser.add_argument("--fan-out", type=int, default=4, help="每個組件被連接的次數上限（默認: 4）")
+    parser.add_argument("--input-ratio", type=float, default=0.15, help="輸入層比例（默認: 0.15）")
+    parser.add_argument("--skip-ratio", type=float, default=0.2, help="跨層連接比例（默認: 0.2）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=FORMATS, default="placement", help="輸出格式（默認: placement）")
+    parser.add_argument("--output", required=True, help="輸出文件路徑")
+    args = parser.parse_args()
+
+    workload = generate(
+        args.components, depth=args.depth, fan_in=args.fan_in, fan_out=args.fan_out,
+        input_ratio=args.input_ratio, skip_ratio=args.skip_ratio, seed=args.seed
+    )
+    write(workload, Path(args.output), args.format)
+    stats = graph_stats(workload)
+    print(f"✓ {args.output}: {stats.components} 個組件, {stats.connections} 條連接, {stats.layers} 層, "
+          f"最長路徑 {stats.longest_path}, 最大扇入 {stats.max_fan_in}, 最大扇出 {stats.max_fan_out}"
+          + (f", 超出扇出上限 {stats.overflow} 次" if stats.overflow else ""))
+
+
+if __name__ == "__main__":
+    main()
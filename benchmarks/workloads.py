@@ -0,0 +1,227 @@
+"""
+基準測試的工作負載
+
+一個工作負載是一張與執行器無關的組件圖：組件（鍵、類型、GUID、位置、slider 範圍）與連接。
+來源：
+
+- GH_WIP/placement_info*.json：直接讀取 placement_info 格式
+- benchmarks/workloads/*.json：由 record_workloads.py 在模擬伺服器上錄製的建模腳本
+  （桌子、椅子、杯子、沙發、蹺蹺板、高樓），同樣是 placement_info 格式，
+  slider 另帶 min / max
+
+scaled() 把工作負載複製成 N 個組件（例如 1k / 10k）：每份副本的鍵加上後綴、
+位置向下平移，連接只保留兩端都在範圍內的部分。
+"""
+
+import json
+import math
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+PROJECT_ROOT = Path(__file__).parent.parent
+WORKLOAD_DIR = Path(__file__).parent / "workloads"
+KNOWLEDGE_PATH = PROJECT_ROOT / "GH_WIP" / "component_knowledge.json"
+
+SLIDER_TYPES = {"Number Slider", "Slider"}
+
+# 副本之間的垂直間距
+_COPY_MARGIN = 200.0
+
+
+@dataclass
+class WorkloadComponent:
+    """工作負載中的一個組件"""
+    key: str
+    type: str
+    guid: str
+    x: float
+    y: float
+    value: Optional[float] = None
+    min_val: Optional[float] = None
+    max_val: Optional[float] = None
+
+    @property
+    def is_slider(self) -> bool:
+        return self.type in SLIDER_TYPES
+
+
+@dataclass
+class WorkloadConnection:
+    """工作負載中的一條連接（以組件鍵表示）"""
+    source: str
+    source_param: Optional[str]
+    target: str
+    target_param: Optional[str]
+
+
+@dataclass
+class Workload:
+    """一張組件圖"""
+    name: str
+    components: List[WorkloadComponent] = field(default_factory=list)
+    connections: List[WorkloadConnection] = field(default_factory=list)
+    source: str = ""
+
+    @property
+    def sliders(self) -> List[WorkloadComponent]:
+        return [component for component in self.components if component.is_slider]
+
+    # -------------------------------------------------------------------------
+    # 縮放
+    # -------------------------------------------------------------------------
+
+    def scaled(self, target: int) -> "Workload":
+        """
+        複製成恰好 target 個組件的工作負載
+
+        第 i 份副本的鍵加上 "#i" 後綴並向下平移一個副本高度；
+        最後一份副本可能只取前面部分組件，連接只保留兩端都存在的
+        """
+        if target <= 0 or not self.components:
+            return Workload(f"{self.name}@{target}", source=self.source)
+        if target == len(self.components):
+            return self
+
+        height = max(c.y for c in self.components) - min(c.y for c in self.components) + _COPY_MARGIN
+        copies = math.ceil(target / len(self.components))
+        components: List[WorkloadComponent] = []
+        connections: List[WorkloadConnection] = []
+        for copy in range(copies):
+            suffix = f"#{copy}" if copy else ""
+            kept = set()
+            for component in self.components:
+                if len(components) >= target:
+                    break
+                kept.add(component.key)
+                components.append(WorkloadComponent(
+                    key=component.key + suffix,
+                    type=component.type,
+                    guid=component.guid,
+                    x=component.x,
+                    y=component.y + copy * height,
+                    value=component.value,
+                    min_val=component.min_val,
+                    max_val=component.max_val,
+                ))
+            connections.extend(
+                WorkloadConnection(c.source + suffix, c.source_param, c.target + suffix, c.target_param)
+                for c in self.connections
+                if c.source in kept and c.target in kept
+            )
+        return Workload(f"{self.name}@{target}", components, connections, self.source)
+
+    # -------------------------------------------------------------------------
+    # placement_info 格式
+    # -------------------------------------------------------------------------
+
+    def to_placement_info(self) -> Dict[str, Any]:
+        """轉為 PlacementExecutor 讀取的 placement_info 字典"""
+        commands: List[Dict[str, Any]] = []
+        for component in self.components:
+            command: Dict[str, Any] = {
+                "type": "add_component",
+                "componentId": component.key,
+                "componentType": component.type,
+                "x": component.x,
+                "y": component.y,
+                "value": component.value,
+                "parameters": {"guid": component.guid},
+            }
+            if component.is_slider and component.min_val is not None:
+                command["min"] = component.min_val
+                command["max"] = component.max_val
+            commands.append(command)
+        for connection in self.connections:
+            commands.append({
+                "type": "connect_components",
+                "parameters": {
+                    "sourceId": connection.source,
+                    "sourceParam": connection.source_param,
+                    "targetId": connection.target,
+                    "targetParam": connection.target_param,
+                },
+            })
+        return {"description": self.name, "generated_from": self.source, "commands": commands}
+
+    @classmethod
+    def from_placement_info(cls, name: str, data: Dict[str, Any], source: str = "") -> "Workload":
+        """
+        讀取 placement_info 字典
+
+        沒有 GUID 的 add_component 以 resolve_guid() 按類型名補上
+        """
+        components: List[WorkloadComponent] = []
+        connections: List[WorkloadConnection] = []
+        for command in data.get("commands", []):
+            params = command.get("parameters") or {}
+            if command.get("type") == "add_component":
+                component_type = command.get("componentType") or params.get("type") or ""
+                components.append(WorkloadComponent(
+                    key=command["componentId"],
+                    type=component_type,
+                    guid=params.get("guid") or command.get("guid") or resolve_guid(component_type),
+                    x=float(params.get("x", command.get("x", 0.0))),
+                    y=float(params.get("y", command.get("y", 0.0))),
+                    value=command.get("value"),
+                    min_val=command.get("min"),
+                    max_val=command.get("max"),
+                ))
+            elif command.get("type") == "connect_components":
+                connections.append(WorkloadConnection(
+                    params["sourceId"], params.get("sourceParam"),
+                    params["targetId"], params.get("targetParam"),
+                ))
+        return cls(name, components, connections, source or data.get("generated_from", ""))
+
+    @classmethod
+    def load(cls, path: Path, name: Optional[str] = None) -> "Workload":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls.from_placement_info(name or Path(path).stem, data, str(path))
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_placement_info(), f, indent=2, ensure_ascii=False)
+
+
+# =============================================================================
+# GUID
+# =============================================================================
+
+_guid_index: Optional[Dict[str, str]] = None
+
+
+def resolve_guid(type_name: str) -> str:
+    """
+    組件類型名 → GUID
+
+    依序查 component_knowledge.json 與 MCPLayoutExecutor.COMPONENT_GUIDS；
+    都沒有時返回以類型名產生的固定 UUID（模擬伺服器接受任意 GUID）
+    """
+    global _guid_index
+    if _guid_index is None:
+        from grasshopper_mcp.layout.mcp_layout_executor import MCPLayoutExecutor
+
+        index = dict(MCPLayoutExecutor.COMPONENT_GUIDS)
+        if KNOWLEDGE_PATH.exists():
+            with open(KNOWLEDGE_PATH, "r", encoding="utf-8") as f:
+                index.update({name: info["guid"] for name, info in json.load(f).items() if info.get("guid")})
+        _guid_index = index
+    return _guid_index.get(type_name) or str(uuid.uuid5(uuid.NAMESPACE_URL, f"grasshopper:{type_name}"))
+
+
+# =============================================================================
+# 內建工作負載
+# =============================================================================
+
+def builtin_workloads() -> Dict[str, Workload]:
+    """GH_WIP 中的 placement_info 與已錄製的建模腳本，按名稱排序"""
+    workloads: Dict[str, Workload] = {}
+    for path in sorted((PROJECT_ROOT / "GH_WIP").glob("placement_info*.json")):
+        workloads[path.stem] = Workload.load(path)
+    for path in sorted(WORKLOAD_DIR.glob("*.json")):
+        workloads[path.stem] = Workload.load(path)
+    return workloads
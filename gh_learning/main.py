@@ -9,10 +9,13 @@ GH-MCP 智能學習系統
 - Interactive Session: 蘇格拉底對話
 
 使用方式:
-    python main.py parse <folder>              # 解析 .ghx 文件
+    python main.py parse <folder> [out.json]   # 解析 .ghx 文件（out.npz 輸出列式語料）
     python main.py analyze <folder>            # 萃取知識並分析
     python main.py learn <topic>               # 開始學習會話
     python main.py explain <component>         # 解釋組件
+
+parse / analyze 可加 --workers N 指定進程數、--no-cache 停用解析結果快取
+analyze 的原始計數保存在 knowledge/knowledge_state.json，再次執行時只處理改動的文件
 """
 
 import sys
@@ -24,6 +27,7 @@ src_path = Path(__file__).parent / "src"
 sys.path.insert(0, str(src_path))
 
 from ghx_parser import GHXParser
+from ghx_corpus import GHXCorpus
 from knowledge_extractor import KnowledgeExtractor, generate_report
 from gemini_analyzer import GeminiAnalyzer
 
@@ -33,6 +37,8 @@ BASE_DIR = Path(__file__).parent
 KNOWLEDGE_DIR = BASE_DIR / "knowledge"
 GHX_SAMPLES_DIR = BASE_DIR / "ghx_samples"
 KNOWLEDGE_FILE = KNOWLEDGE_DIR / "component_registry.json"
+GHX_CACHE_DIR = KNOWLEDGE_DIR / "ghx_cache"
+KNOWLEDGE_STATE_FILE = KNOWLEDGE_DIR / "knowledge_state.json"
 
 
 def ensure_dirs():
@@ -41,28 +47,38 @@ def ensure_dirs():
     GHX_SAMPLES_DIR.mkdir(exist_ok=True)
 
 
-def cmd_parse(folder: str, output: str = None):
+def parse_folder(folder: str, workers: int = None, use_cache: bool = True):
+    """並行解析資料夾，未改動的文件直接讀取快取"""
+    parser = GHXParser()
+    cache_dir = str(GHX_CACHE_DIR) if use_cache else None
+    return parser.batch_parse(folder, workers=workers, cache_dir=cache_dir)
+
+
+def cmd_parse(folder: str, output: str = None, workers: int = None, use_cache: bool = True):
     """解析 .ghx 文件"""
     parser = GHXParser()
-    docs = parser.batch_parse(folder)
+    docs = parse_folder(folder, workers, use_cache)
 
     if not docs:
         print("No documents parsed successfully.")
         return
 
     output_path = output or str(KNOWLEDGE_DIR / "parsed_data.json")
-    parser.to_json(docs, output_path)
+    if GHXCorpus.is_corpus(output_path):
+        # 列式語料：AdaptiveLearner / knowledge_extractor 可直接延遲載入
+        GHXCorpus.from_documents(docs).save(output_path)
+    else:
+        parser.to_json(docs, output_path)
 
     print(f"\n✓ Parsed {len(docs)} files")
     print(f"✓ Saved to: {output_path}")
 
 
-def cmd_analyze(folder: str, use_gemini: bool = True):
+def cmd_analyze(folder: str, use_gemini: bool = True, workers: int = None, use_cache: bool = True):
     """萃取知識並可選地用 Gemini 分析"""
     # 1. 解析
     print("=== Step 1: Parsing GHX files ===")
-    parser = GHXParser()
-    docs = parser.batch_parse(folder)
+    docs = parse_folder(folder, workers, use_cache)
 
     if not docs:
         print("No documents parsed successfully.")
@@ -70,8 +86,12 @@ def cmd_analyze(folder: str, use_gemini: bool = True):
 
     # 2. 萃取知識
     print("\n=== Step 2: Extracting knowledge ===")
-    extractor = KnowledgeExtractor()
-    knowledge = extractor.extract(docs)
+    # 只套用新增 / 改動 / 刪除文件的增量，未改動的文件沿用上次的計數
+    extractor = KnowledgeExtractor.load_state(str(KNOWLEDGE_STATE_FILE))
+    changes = extractor.update(docs)
+    extractor.save_state(str(KNOWLEDGE_STATE_FILE))
+    knowledge = extractor.export()
+    print("✓ Documents: {added} added, {updated} updated, {removed} removed, {unchanged} unchanged".format(**changes))
 
     # 保存知識
     knowledge_path = KNOWLEDGE_DIR / "extracted_knowledge.json"
@@ -246,6 +266,22 @@ def cmd_explain(component_name: str):
     print(explanation)
 
 
+def _parse_options(argv):
+    """分離位置參數與 --workers N / --no-cache / --no-gemini"""
+    args, workers, use_cache = [], None, True
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--workers" and i + 1 < len(argv):
+            workers = int(argv[i + 1])
+            i += 1
+        elif argv[i] == "--no-cache":
+            use_cache = False
+        elif not argv[i].startswith("--"):
+            args.append(argv[i])
+        i += 1
+    return args, workers, use_cache
+
+
 def main():
     ensure_dirs()
 
@@ -270,16 +306,17 @@ def main():
         sys.exit(0)
 
     command = sys.argv[1]
+    args, workers, use_cache = _parse_options(sys.argv[2:])
 
     if command == "parse":
-        folder = sys.argv[2] if len(sys.argv) > 2 else str(GHX_SAMPLES_DIR)
-        output = sys.argv[3] if len(sys.argv) > 3 else None
-        cmd_parse(folder, output)
+        folder = args[0] if args else str(GHX_SAMPLES_DIR)
+        output = args[1] if len(args) > 1 else None
+        cmd_parse(folder, output, workers, use_cache)
 
     elif command == "analyze":
-        folder = sys.argv[2] if len(sys.argv) > 2 else str(GHX_SAMPLES_DIR)
+        folder = args[0] if args else str(GHX_SAMPLES_DIR)
         use_gemini = "--no-gemini" not in sys.argv
-        cmd_analyze(folder, use_gemini)
+        cmd_analyze(folder, use_gemini, workers, use_cache)
 
     elif command == "learn":
         topic = sys.argv[2] if len(sys.argv) > 2 else "Grasshopper 組件參數"
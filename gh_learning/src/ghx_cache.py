@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+GHX 解析結果快取 - 每個文件一個條目
+
+鍵為 (路徑, mtime, 大小, 內容雜湊)：
+- 路徑、mtime 與大小都相同 → 直接命中，不讀取文件
+- mtime 改變但大小相同 → 重新計算 SHA-256，內容相同仍命中（並更新 mtime）
+- 其他情況 → 未命中，由呼叫端重新解析後寫入
+
+解析失敗也會快取，未改動的壞文件不會在每次執行時重新解析。
+條目以 JSON 寫入臨時文件後原子替換，並發寫入同一條目不會產生損壞的文件。
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# 解析器輸出格式改變時遞增，使舊條目失效
+CACHE_FORMAT = 1
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+@dataclass
+class FileKey:
+    """文件的快取鍵"""
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: str = ''
+
+    @classmethod
+    def stat(cls, path: str) -> 'FileKey':
+        """只讀取 stat（不計算雜湊）"""
+        resolved = str(Path(path).resolve())
+        info = os.stat(resolved)
+        return cls(resolved, info.st_mtime_ns, info.st_size)
+
+    @classmethod
+    def compute(cls, path: str) -> 'FileKey':
+        """stat 加內容雜湊"""
+        key = cls.stat(path)
+        key.sha256 = file_sha256(key.path)
+        return key
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class CachedResult:
+    """快取的解析結果：document 為 GHXDocument.to_dict() 的結果，失敗時為 None"""
+    key: FileKey
+    document: Optional[Dict[str, Any]]
+    errors: list
+
+
+class GHXCache:
+    """磁碟上的 GHX 解析結果快取"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, resolved_path: str) -> Path:
+        name = hashlib.sha1(resolved_path.encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{name}.json"
+
+    def _read(self, entry_path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get('format') != CACHE_FORMAT:
+            return None
+        return entry
+
+    def get(self, path: str) -> Optional[CachedResult]:
+        """查詢文件的快取結果；文件已改動或沒有條目時返回 None"""
+        try:
+            current = FileKey.stat(path)
+        except OSError:
+            self.misses += 1
+            return None
+
+        entry_path = self._entry_path(current.path)
+        entry = self._read(entry_path)
+        if entry is None or entry['key'].get('path') != current.path:
+            self.misses += 1
+            return None
+
+        cached = FileKey(**entry['key'])
+        if cached.size != current.size:
+            self.misses += 1
+            return None
+        if cached.mtime_ns != current.mtime_ns:
+            # 只是被觸碰過（例如重新簽出）：內容相同仍可使用
+            current.sha256 = file_sha256(current.path)
+            if current.sha256 != cached.sha256:
+                self.misses += 1
+                return None
+            entry['key'] = asdict(current)
+            self._write(entry_path, entry)
+            cached = current
+
+        self.hits += 1
+        return CachedResult(cached, entry['document'], entry.get('errors', []))
+
+    def put(self, key: FileKey, document: Optional[Dict[str, Any]], errors: Optional[list] = None):
+        """寫入解析結果（key 需帶內容雜湊，見 FileKey.compute）"""
+        entry = {'format': CACHE_FORMAT, 'key': asdict(key), 'document': document, 'errors': errors or []}
+        self._write(self._entry_path(key.path), entry)
+
+    def _write(self, entry_path: Path, entry: Dict[str, Any]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def clear(self):
+        """刪除所有條目"""
+        for entry_path in self.cache_dir.glob('*.json'):
+            entry_path.unlink()
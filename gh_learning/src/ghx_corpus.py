@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+GHX Corpus - 解析結果的列式存儲
+
+to_json 把每個文件寫成巢狀字典，語料一大 JSON 就有數百 MB，載入時必須完整解析。
+GHXCorpus 把同一批解析結果存為一個 NumPy .npz：
+
+- 字串去重後放進字串表（UTF-8 位元組 + 偏移量），各列只存整數索引
+  - strings: 組件名稱、GUID、暱稱、參數名、文件路徑
+  - instances: 組件 InstanceGuid（連線端點同樣引用此表）
+- 組件、參數、連線各為一組等長的整數 / 浮點數列；文件與組件以 CSR 偏移量劃分
+- 連線端點另存為全域組件列號（edge_source / edge_target，找不到時為 -1），
+  統計共現時不必再按 InstanceGuid 查找
+
+載入時只讀取 zip 目錄，各列在第一次使用時才讀入；不需要的列（例如座標、參數）不會被讀取。
+
+用法:
+    corpus = GHXCorpus.from_documents(docs)
+    corpus.save("knowledge/parsed_data.npz")
+
+    corpus = GHXCorpus.load("knowledge/parsed_data.npz")
+    for doc in corpus:                 # 逐一還原為 GHXDocument
+        ...
+    src, dst = corpus.edge_type_indices()   # 每條已解析連線兩端的組件名稱索引
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ghx_parser import Component, Connection, GHXDocument, Parameter
+
+# 格式版本，寫入文件並在載入時檢查
+CORPUS_FORMAT = 1
+
+# 空值（例如 Parameter.type_hint 為 None）的字串索引
+NO_STRING = -1
+
+# 組件的字串列（對應 strings 表）
+COMPONENT_STRING_COLUMNS = ('component_guid', 'name', 'nickname', 'category', 'subcategory')
+PARAM_KINDS = ('inputs', 'outputs')
+
+
+class StringTable:
+    """UTF-8 位元組 + 偏移量的字串表，按需解碼"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+        self._cache: Optional[List[str]] = None
+
+    @classmethod
+    def build(cls, values: Sequence[str]) -> 'StringTable':
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        return cls(blob, offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if index == NO_STRING:
+            return None
+        if self._cache is not None:
+            return self._cache[index]
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._blob[start:end].tobytes().decode('utf-8')
+
+    def to_list(self) -> List[str]:
+        """一次解碼全部字串（之後的查詢直接命中）"""
+        if self._cache is None:
+            data = self._blob.tobytes()
+            offsets = self._offsets.tolist()
+            self._cache = [data[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(self))]
+        return self._cache
+
+    def index(self) -> Dict[str, int]:
+        return {value: i for i, value in enumerate(self.to_list())}
+
+    def empty(self) -> np.ndarray:
+        """空字串的索引（不解碼）"""
+        return np.flatnonzero(np.diff(self._offsets) == 0)
+
+
+class _Interner:
+    """建立字串表時的去重"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def __call__(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        index = self._ids.get(value)
+        if index is None:
+            index = self._ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+class GHXCorpus:
+    """多個 GHXDocument 的列式表示"""
+
+    def __init__(self, arrays: Any):
+        """
+        Args:
+            arrays: 列名 → ndarray 的映射（dict 或 np.load 返回的 NpzFile）
+        """
+        self._arrays = arrays
+        self._columns: Dict[str, np.ndarray] = {}
+        self._tables: Dict[str, StringTable] = {}
+        self._extras: Optional[List[Dict[str, Any]]] = None
+        version = int(self['format'][0])
+        if version != CORPUS_FORMAT:
+            raise ValueError(f"Unsupported corpus format {version} (expected {CORPUS_FORMAT})")
+
+    # -------------------------------------------------------------------------
+    # 建立與讀寫
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def from_documents(cls, documents: Iterator[GHXDocument]) -> 'GHXCorpus':
+        """從解析結果建立（逐一讀取文件，只保留整數列與字串表）"""
+        strings, instances = _Interner(), _Interner()
+        columns: Dict[str, List] = {name: [] for name in (
+            'doc_file', 'doc_component_offsets', 'doc_connection_offsets',
+            'component_instance', 'position_x', 'position_y',
+            *COMPONENT_STRING_COLUMNS,
+            'edge_source', 'edge_target', 'edge_source_instance', 'edge_target_instance',
+            'edge_source_param', 'edge_target_param',
+        )}
+        for kind in PARAM_KINDS:
+            columns[f'{kind}_offsets'] = []
+            for field_name in ('nickname', 'name', 'type_hint', 'source_count'):
+                columns[f'{kind}_{field_name}'] = []
+        extras = []
+
+        for doc in documents:
+            columns['doc_file'].append(strings(doc.file_path))
+            columns['doc_component_offsets'].append(len(columns['component_instance']))
+            columns['doc_connection_offsets'].append(len(columns['edge_source']))
+            extras.append({'metadata': doc.metadata, 'groups': doc.groups, 'sha256': doc.sha256})
+
+            # 同一文件中重複的 InstanceGuid 以最後一個為準（與 dict 映射的行為一致）
+            rows: Dict[str, int] = {}
+            for comp in doc.components:
+                rows[comp.instance_guid] = len(columns['component_instance'])
+                columns['component_instance'].append(instances(comp.instance_guid))
+                columns['position_x'].append(comp.position_x)
+                columns['position_y'].append(comp.position_y)
+                for name in COMPONENT_STRING_COLUMNS:
+                    columns[name].append(strings(getattr(comp, name)))
+                for kind in PARAM_KINDS:
+                    columns[f'{kind}_offsets'].append(len(columns[f'{kind}_name']))
+                    for param in getattr(comp, kind):
+                        columns[f'{kind}_nickname'].append(strings(param.nickname))
+                        columns[f'{kind}_name'].append(strings(param.name))
+                        columns[f'{kind}_type_hint'].append(strings(param.type_hint))
+                        columns[f'{kind}_source_count'].append(param.source_count)
+
+            for conn in doc.connections:
+                columns['edge_source'].append(rows.get(conn.from_component, -1))
+                columns['edge_target'].append(rows.get(conn.to_component, -1))
+                columns['edge_source_instance'].append(instances(conn.from_component))
+                columns['edge_target_instance'].append(instances(conn.to_component))
+                columns['edge_source_param'].append(strings(conn.from_param))
+                columns['edge_target_param'].append(strings(conn.to_param))
+
+        columns['doc_component_offsets'].append(len(columns['component_instance']))
+        columns['doc_connection_offsets'].append(len(columns['edge_source']))
+        for kind in PARAM_KINDS:
+            columns[f'{kind}_offsets'].append(len(columns[f'{kind}_name']))
+
+        arrays: Dict[str, np.ndarray] = {'format': np.array([CORPUS_FORMAT], dtype=np.int32)}
+        for name, values in columns.items():
+            if name.endswith('_offsets') or name in ('edge_source', 'edge_target'):
+                dtype = np.int64
+            elif name.startswith('position_'):
+                dtype = np.float64
+            else:
+                dtype = np.int32
+            arrays[name] = np.asarray(values, dtype=dtype)
+        for table_name, interner in (('strings', strings), ('instances', instances)):
+            table = StringTable.build(interner.values)
+            arrays[f'{table_name}_blob'] = table._blob
+            arrays[f'{table_name}_offsets'] = table._offsets
+        arrays['extras_json'] = np.frombuffer(json.dumps(extras, ensure_ascii=False).encode('utf-8'), dtype=np.uint8)
+        return cls(arrays)
+
+    def save(self, path: Union[str, Path]):
+        """寫入未壓縮的 .npz（保留逐列延遲讀取）"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, **{name: self[name] for name in self._arrays.keys()})
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'GHXCorpus':
+        """打開 .npz；各列在第一次使用時才讀入"""
+        return cls(np.load(str(path), allow_pickle=False))
+
+    @staticmethod
+    def is_corpus(path: Union[str, Path]) -> bool:
+        return Path(path).suffix.lower() == '.npz'
+
+    # -------------------------------------------------------------------------
+    # 列存取
+    # -------------------------------------------------------------------------
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = self._arrays[name]
+        return column
+
+    def table(self, name: str) -> StringTable:
+        """字串表：'strings' 或 'instances'"""
+        table = self._tables.get(name)
+        if table is None:
+            table = self._tables[name] = StringTable(self[f'{name}_blob'], self[f'{name}_offsets'])
+        return table
+
+    @property
+    def strings(self) -> StringTable:
+        return self.table('strings')
+
+    @property
+    def component_count(self) -> int:
+        return len(self['component_instance'])
+
+    @property
+    def connection_count(self) -> int:
+        return len(self['edge_source'])
+
+    def __len__(self) -> int:
+        return len(self['doc_file'])
+
+    def file_paths(self) -> List[str]:
+        strings = self.strings
+        return [strings[int(i)] for i in self['doc_file']]
+
+    def extras(self, doc_index: int) -> Dict[str, Any]:
+        """文件的 metadata、groups 與來源 SHA-256"""
+        if self._extras is None:
+            self._extras = json.loads(self['extras_json'].tobytes().decode('utf-8'))
+        return self._extras[doc_index]
+
+    def edge_type_indices(self, column: str = 'name') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        兩端都在文件中的連線，其來源 / 目標組件的字串索引（默認為組件名稱）
+
+        Returns:
+            (source, target)：等長的整數陣列，值為 strings 表的索引
+        """
+        source, target = self['edge_source'], self['edge_target']
+        resolved = (source >= 0) & (target >= 0)
+        values = self[column]
+        return values[source[resolved]], values[target[resolved]]
+
+    def used_strings(self, column: str = 'name') -> List[str]:
+        """某個組件字串列中出現過的值（按字串表順序）"""
+        strings = self.strings
+        return [strings[int(i)] for i in np.unique(self[column]) if i != NO_STRING]
+
+    # -------------------------------------------------------------------------
+    # 還原為 GHXDocument
+    # -------------------------------------------------------------------------
+
+    def document(self, doc_index: int) -> GHXDocument:
+        strings, instances = self.strings, self.table('instances')
+        comp_start, comp_end = self['doc_component_offsets'][doc_index:doc_index + 2]
+        conn_start, conn_end = self['doc_connection_offsets'][doc_index:doc_index + 2]
+
+        components = []
+        for row in range(int(comp_start), int(comp_end)):
+            params = {kind: self._params(kind, row) for kind in PARAM_KINDS}
+            components.append(Component(
+                instance_guid=instances[int(self['component_instance'][row])],
+                **{name: strings[int(self[name][row])] for name in COMPONENT_STRING_COLUMNS},
+                inputs=params['inputs'],
+                outputs=params['outputs'],
+                position_x=float(self['position_x'][row]),
+                position_y=float(self['position_y'][row])
+            ))
+
+        connections = [
+            Connection(
+                from_component=instances[int(self['edge_source_instance'][row])],
+                from_param=strings[int(self['edge_source_param'][row])],
+                to_component=instances[int(self['edge_target_instance'][row])],
+                to_param=strings[int(self['edge_target_param'][row])]
+            )
+            for row in range(int(conn_start), int(conn_end))
+        ]
+
+        extras = self.extras(doc_index)
+        return GHXDocument(
+            file_path=strings[int(self['doc_file'][doc_index])],
+            components=components,
+            connections=connections,
+            groups=extras['groups'],
+            metadata=extras['metadata'],
+            sha256=extras.get('sha256', '')
+        )
+
+    def _params(self, kind: str, row: int) -> List[Parameter]:
+        strings = self.strings
+        start, end = self[f'{kind}_offsets'][row:row + 2]
+        return [
+            Parameter(
+                nickname=strings[int(self[f'{kind}_nickname'][i])],
+                name=strings[int(self[f'{kind}_name'][i])],
+                type_hint=strings[int(self[f'{kind}_type_hint'][i])],
+                source_count=int(self[f'{kind}_source_count'][i])
+            )
+            for i in range(int(start), int(end))
+        ]
+
+    def __iter__(self) -> Iterator[GHXDocument]:
+        for doc_index in range(len(self)):
+            yield self.document(doc_index)
+
+
+def load_documents(path: Union[str, Path]) -> Union[GHXCorpus, List[GHXDocument]]:
+    """載入 .npz 語料或 to_json 輸出的 JSON；兩者都可直接迭代出 GHXDocument"""
+    if GHXCorpus.is_corpus(path):
+        return GHXCorpus.load(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [GHXDocument.from_dict(doc) for doc in data]
@@ -3,14 +3,30 @@
 GHX Parser - 批量解析 Grasshopper .ghx 文件
 
 .ghx 文件結構: gzip 壓縮的 XML
+
+以 iterparse 串流解析，單遍建立組件、參數與連線，記憶體不隨文件大小增長。
+批量解析以進程池並行，並可按文件快取結果（見 ghx_cache.py），只重新解析改動過的文件。
 """
 
+import codecs
 import gzip
+import os
+import time
+import zlib
 import xml.etree.ElementTree as ET
 import json
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, BinaryIO, Callable
 from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ghx_cache import FileKey, GHXCache
+
+GZIP_MAGIC = b'\x1f\x8b'
+# 判斷純 XML 時讀取的文件開頭長度
+XML_SNIFF_BYTES = 512
+
+PARAM_CHUNKS = ('param_input', 'param_output')
 
 
 @dataclass
@@ -54,6 +70,295 @@ class GHXDocument:
     connections: List[Connection] = field(default_factory=list)
     groups: List[Dict] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # 來源文件內容的 SHA-256（batch_parse 從快取鍵填入），空字串表示未知
+    sha256: str = ''
+
+    def to_dict(self) -> Dict[str, Any]:
+        """轉為 to_json 輸出中的單個文件格式"""
+        data = {
+            'file': self.file_path,
+            'metadata': self.metadata,
+            'component_count': len(self.components),
+            'connection_count': len(self.connections),
+            'components': [asdict(c) for c in self.components],
+            'connections': [asdict(c) for c in self.connections],
+            'groups': self.groups
+        }
+        if self.sha256:
+            data['sha256'] = self.sha256
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'GHXDocument':
+        """從 to_dict() / to_json 的格式還原"""
+        components = []
+        for comp in data.get('components', []):
+            comp = dict(comp)
+            comp['inputs'] = [Parameter(**p) for p in comp.get('inputs', [])]
+            comp['outputs'] = [Parameter(**p) for p in comp.get('outputs', [])]
+            components.append(Component(**comp))
+        return cls(
+            file_path=data.get('file', ''),
+            components=components,
+            connections=[Connection(**c) for c in data.get('connections', [])],
+            groups=data.get('groups', []),
+            metadata=data.get('metadata', {}),
+            sha256=data.get('sha256', '')
+        )
+
+
+# =============================================================================
+# 串流解析狀態
+# =============================================================================
+
+@dataclass
+class _ObjectState:
+    """解析中的 Object chunk（結束後只保留結果，不再引用元素）"""
+    element: Optional[ET.Element]
+    slot: int
+    component_guid: str = ''
+    name: str = ''
+    container: Optional[ET.Element] = None
+    container_open: bool = False
+    instance_guid: str = ''
+    # 連線使用 Container 中第一個 InstanceGuid
+    first_instance_guid: str = ''
+    nickname: str = ''
+    inputs: List[Parameter] = field(default_factory=list)
+    outputs: List[Parameter] = field(default_factory=list)
+    # 待解析的輸入來源：(來源參數 InstanceGuid, 目標參數名)
+    sources: List[Tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class _ParamState:
+    """解析中的 param_input / param_output chunk"""
+    element: ET.Element
+    kind: str
+    owners: List[_ObjectState]
+    name: str = ''
+    nickname: str = ''
+    instance_guid: str = ''
+    source_count: int = 0
+    sources: List[str] = field(default_factory=list)
+
+    @property
+    def label(self) -> str:
+        return self.nickname or self.name
+
+
+class _GHXStreamBuilder:
+    """
+    接收 iterparse 的 start / end 事件，逐步建立組件與連線
+
+    chunk 格式：Object → Container → param_input / param_output，屬性都在 items/item 中；
+    輸入參數的 Source 指向來源輸出參數的 InstanceGuid，在文件結束後統一解析。
+    舊格式的組件（Object 標籤或 Guid 屬性）與 Wire 只在找不到 chunk 格式的組件 / 連線時使用。
+    """
+
+    def __init__(self, parse_legacy: Callable[[ET.Element], Optional[Component]]):
+        self.objects: List[_ObjectState] = []      # 目前打開的 Object chunk
+        self.params: List[_ParamState] = []        # 目前打開的參數 chunk
+        self.slots: List[Optional[_ObjectState]] = []
+        self.param_map: Dict[str, Tuple[str, str]] = {}  # 參數 InstanceGuid -> (組件 InstanceGuid, 參數名)
+        # 舊格式：組件與組群需要完整子樹，結束前不移除（keep_depth > 0）
+        self.parse_legacy = parse_legacy
+        self.keep_depth = 0
+        self.legacy: List[Optional[Component]] = []
+        self.legacy_open: List[int] = []
+        self.wires: List[Connection] = []
+        self.groups: List[Optional[Dict]] = []
+        self.groups_open: List[int] = []
+        self.root_attrib: Dict[str, str] = {}
+        self.definition: Optional[Dict[str, str]] = None
+        self.author: Optional[str] = None
+
+    # -------------------------------------------------------------------------
+    # 事件
+    # -------------------------------------------------------------------------
+
+    def start(self, elem: ET.Element, stack: List[ET.Element]):
+        tag = elem.tag
+        if len(stack) == 1:
+            self.root_attrib = dict(elem.attrib)
+
+        if tag == 'chunk':
+            chunk_name = elem.get('name')
+            if chunk_name == 'Object':
+                self.slots.append(None)
+                self.objects.append(_ObjectState(elem, len(self.slots) - 1))
+            elif chunk_name == 'Container':
+                # 每個 Object 以其下第一個 Container 為準
+                for state in self.objects:
+                    if state.container is None:
+                        state.container = elem
+                        state.container_open = True
+            elif chunk_name in PARAM_CHUNKS:
+                owners = [state for state in self.objects if state.container_open]
+                self.params.append(_ParamState(elem, chunk_name, owners))
+        elif tag == 'Wire':
+            wire = Connection(
+                from_component=elem.get('FromObject', ''),
+                from_param=elem.get('FromParam', ''),
+                to_component=elem.get('ToObject', ''),
+                to_param=elem.get('ToParam', '')
+            )
+            if wire.from_component and wire.to_component:
+                self.wires.append(wire)
+        elif tag == 'Definition' and self.definition is None and len(stack) > 1:
+            self.definition = dict(elem.attrib)
+        elif tag == 'Group':
+            self.groups_open.append(len(self.groups))
+            self.groups.append(None)
+            self.keep_depth += 1
+
+        if self._is_legacy_component(elem):
+            self.legacy_open.append(len(self.legacy))
+            self.legacy.append(None)
+            self.keep_depth += 1
+
+    def end(self, elem: ET.Element, stack: List[ET.Element]):
+        tag = elem.tag
+        if tag == 'item':
+            if len(stack) >= 3 and stack[-2].tag == 'items':
+                self._item(stack[-3], elem.get('name', ''), elem.text or '')
+        elif tag == 'chunk':
+            if self.params and self.params[-1].element is elem:
+                self._end_param(self.params.pop())
+            elif self.objects and self.objects[-1].element is elem:
+                state = self.objects.pop()
+                state.element = state.container = None
+                state.container_open = False
+                self.slots[state.slot] = state
+            else:
+                for state in self.objects:
+                    if state.container is elem:
+                        state.container_open = False
+        elif tag == 'Author':
+            if self.author is None:
+                self.author = elem.text or ''
+        elif tag == 'Group':
+            self.groups[self.groups_open.pop()] = {
+                'name': elem.get('Name', ''),
+                'nickname': elem.get('NickName', ''),
+                'colour': elem.get('Colour', ''),
+                'members': [m.text for m in elem.findall('.//Member') if m.text]
+            }
+            self.keep_depth -= 1
+
+        if self._is_legacy_component(elem):
+            self.legacy[self.legacy_open.pop()] = self.parse_legacy(elem)
+            self.keep_depth -= 1
+
+    @staticmethod
+    def _is_legacy_component(elem: ET.Element) -> bool:
+        return bool(elem.tag == 'Object' or elem.get('Guid') or elem.get('ComponentGuid'))
+
+    def _item(self, owner: ET.Element, item_name: str, text: str):
+        """items/item：按所屬的 chunk 分派"""
+        if self.params and self.params[-1].element is owner:
+            param = self.params[-1]
+            if item_name == 'Name':
+                param.name = text
+            elif item_name == 'NickName':
+                param.nickname = text
+            elif item_name == 'InstanceGuid':
+                param.instance_guid = text
+            elif item_name == 'SourceCount':
+                param.source_count = int(text or '0')
+            elif item_name == 'Source' and text:
+                param.sources.append(text)
+            return
+
+        if self.objects and self.objects[-1].element is owner:
+            state = self.objects[-1]
+            if item_name == 'GUID':
+                state.component_guid = text
+            elif item_name == 'Name':
+                state.name = text
+            return
+
+        for state in self.objects:
+            if state.container is owner:
+                if item_name == 'InstanceGuid':
+                    state.instance_guid = text
+                    state.first_instance_guid = state.first_instance_guid or text
+                elif item_name == 'NickName':
+                    state.nickname = text
+                elif item_name == 'Name' and not state.name:
+                    state.name = text
+
+    def _end_param(self, param: _ParamState):
+        parameter = None
+        if param.label:
+            parameter = Parameter(
+                nickname=param.label,
+                name=param.name or param.nickname,
+                source_count=param.source_count
+            )
+
+        for state in param.owners:
+            if param.kind == 'param_input':
+                if parameter:
+                    state.inputs.append(parameter)
+                if state.first_instance_guid:
+                    state.sources.extend((source, param.label) for source in param.sources)
+            else:
+                if parameter:
+                    state.outputs.append(parameter)
+                # 巢狀時內層組件較晚寫入，與逐一 Object 建立映射的結果相同
+                if state.first_instance_guid and param.instance_guid:
+                    self.param_map[param.instance_guid] = (state.first_instance_guid, param.label)
+
+    # -------------------------------------------------------------------------
+    # 結果
+    # -------------------------------------------------------------------------
+
+    def components(self) -> List[Component]:
+        components = []
+        for state in self.slots:
+            # 跳過 Group 等非組件物件
+            if state is None or state.name == 'Group' or not (state.instance_guid or state.component_guid):
+                continue
+            components.append(Component(
+                instance_guid=state.instance_guid,
+                component_guid=state.component_guid,
+                name=state.name,
+                nickname=state.nickname,
+                inputs=state.inputs,
+                outputs=state.outputs
+            ))
+
+        # 如果沒找到 chunk 格式，使用舊格式
+        return components or [component for component in self.legacy if component]
+
+    def connections(self) -> List[Connection]:
+        connections = []
+        for state in self.slots:
+            if state is None:
+                continue
+            for source, to_param in state.sources:
+                if source in self.param_map:
+                    from_component, from_param = self.param_map[source]
+                    connections.append(Connection(
+                        from_component=from_component,
+                        from_param=from_param,
+                        to_component=state.first_instance_guid,
+                        to_param=to_param
+                    ))
+
+        # 如果沒找到 chunk 格式的連線，使用 Wire 格式
+        return connections or self.wires
+
+    def metadata(self) -> Dict[str, Any]:
+        definition = self.definition if self.definition is not None else self.root_attrib
+        metadata = {
+            'version': definition.get('Version', ''),
+            'name': definition.get('Name', '')
+        }
+        if self.author is not None:
+            metadata['author'] = self.author
+        return metadata
 
 
 class GHXParser:
@@ -63,9 +368,15 @@ class GHXParser:
         self.parsed_count = 0
         self.error_count = 0
         self.errors = []
+        self.last_report: Optional[BatchReport] = None
 
     def parse_ghx(self, ghx_path: str) -> Optional[GHXDocument]:
-        """解析單個 .ghx 文件"""
+        """
+        解析單個 .ghx 文件
+
+        以 iterparse 串流解析：組件、參數與「參數 InstanceGuid → 組件」映射在同一遍中建立，
+        處理完的元素隨即從樹上移除，記憶體只與結果大小有關，與文件大小無關。
+        """
         path = Path(ghx_path)
 
         if not path.exists():
@@ -73,47 +384,20 @@ class GHXParser:
             self.error_count += 1
             return None
 
+        if path.suffix.lower() not in ['.ghx', '.gh']:
+            self.errors.append(f"Unsupported file type: {path.suffix}")
+            return None
+
         try:
-            # .ghx/.gh 可能是 gzip 壓縮或純 XML
-            # 先嘗試純 XML (處理 UTF-8 BOM)，失敗再嘗試 gzip
-            content = None
-
-            if path.suffix.lower() in ['.ghx', '.gh']:
-                # 嘗試 1: 純 XML (可能有 UTF-8 BOM)
-                try:
-                    with open(path, 'r', encoding='utf-8-sig') as f:
-                        content = f.read()
-                    # 驗證是否為有效 XML
-                    if not content.strip().startswith('<?xml') and not content.strip().startswith('<'):
-                        content = None  # 不是 XML，嘗試 gzip
-                except UnicodeDecodeError:
-                    content = None
-
-                # 嘗試 2: gzip 壓縮
-                if content is None:
-                    try:
-                        with gzip.open(path, 'rt', encoding='utf-8') as f:
-                            content = f.read()
-                    except (gzip.BadGzipFile, OSError):
-                        pass
-
-                if content is None:
-                    self.errors.append(f"Cannot read file (not XML or gzip): {ghx_path}")
-                    self.error_count += 1
-                    return None
-            else:
-                self.errors.append(f"Unsupported file type: {path.suffix}")
+            # .ghx/.gh 可能是 gzip 壓縮或純 XML（可能有 UTF-8 BOM）
+            stream = self._open_stream(path)
+            if stream is None:
+                self.errors.append(f"Cannot read file (not XML or gzip): {ghx_path}")
+                self.error_count += 1
                 return None
 
-            root = ET.fromstring(content)
-
-            doc = GHXDocument(
-                file_path=str(path),
-                components=self._extract_components(root),
-                connections=self._extract_connections(root),
-                groups=self._extract_groups(root),
-                metadata=self._extract_metadata(root)
-            )
+            with stream:
+                doc = self._parse_stream(stream, str(path))
 
             self.parsed_count += 1
             return doc
@@ -122,33 +406,59 @@ class GHXParser:
             self.errors.append(f"XML parse error in {ghx_path}: {e}")
             self.error_count += 1
             return None
+        except (gzip.BadGzipFile, EOFError, zlib.error):
+            self.errors.append(f"Cannot read file (not XML or gzip): {ghx_path}")
+            self.error_count += 1
+            return None
         except Exception as e:
             self.errors.append(f"Error parsing {ghx_path}: {e}")
             self.error_count += 1
             return None
 
-    def _extract_components(self, root: ET.Element) -> List[Component]:
-        """提取所有組件"""
-        components = []
+    def _open_stream(self, path: Path) -> Optional[BinaryIO]:
+        """以二進位串流打開文件（gzip 自動解壓）；既不是 XML 也不是 gzip 時返回 None"""
+        stream = open(path, 'rb')
+        head = stream.read(XML_SNIFF_BYTES)
+        stream.seek(0)
+
+        if head.startswith(GZIP_MAGIC):
+            stream.close()
+            return gzip.open(path, 'rb')
 
-        # 優先使用 chunk-based 格式 (較新的 GH 格式)
-        for chunk in root.findall(".//chunk[@name='Object']"):
-            component = self._parse_chunk_object(chunk)
-            if component:
-                components.append(component)
+        if head.startswith(codecs.BOM_UTF8):
+            head = head[len(codecs.BOM_UTF8):]
+        if head.lstrip().startswith(b'<'):
+            return stream
 
-        # 如果沒找到 chunk 格式，嘗試舊格式
-        if not components:
-            for obj in root.iter():
-                if obj.tag == 'Object' or obj.get('Guid') or obj.get('ComponentGuid'):
-                    component = self._parse_component_node(obj)
-                    if component:
-                        components.append(component)
+        stream.close()
+        return None
 
-        return components
+    def _parse_stream(self, stream: BinaryIO, file_path: str) -> GHXDocument:
+        """串流解析 XML，返回 GHXDocument"""
+        builder = _GHXStreamBuilder(self._parse_component_node)
+        stack: List[ET.Element] = []
+
+        for event, elem in ET.iterparse(stream, events=("start", "end")):
+            if event == "start":
+                stack.append(elem)
+                builder.start(elem, stack)
+            else:
+                builder.end(elem, stack)
+                stack.pop()
+                # 處理完即移除：舊格式的組件 / 組群需要完整子樹，在其結束前保留
+                if stack and not builder.keep_depth:
+                    stack[-1].remove(elem)
+
+        return GHXDocument(
+            file_path=file_path,
+            components=builder.components(),
+            connections=builder.connections(),
+            groups=[group for group in builder.groups if group],
+            metadata=builder.metadata()
+        )
 
     def _parse_component_node(self, obj: ET.Element) -> Optional[Component]:
-        """解析組件節點"""
+        """解析組件節點（舊格式）"""
         instance_guid = obj.get('Guid') or obj.get('InstanceGuid') or ''
         component_guid = obj.get('ComponentGuid') or ''
 
@@ -185,241 +495,107 @@ class GHXParser:
             outputs=outputs
         )
 
-    def _parse_chunk_object(self, chunk: ET.Element) -> Optional[Component]:
-        """解析 chunk 格式的組件（較新的 GH 格式）"""
-        # 提取基本屬性 - 從 Object chunk 的 items 中
-        component_guid = ''
-        name = ''
-
-        for item in chunk.findall("items/item"):
-            item_name = item.get('name', '')
-            if item_name == 'GUID':
-                component_guid = item.text or ''
-            elif item_name == 'Name':
-                name = item.text or ''
-
-        # 從 Container chunk 中提取更多資訊
-        container = chunk.find(".//chunk[@name='Container']")
-        instance_guid = ''
-        nickname = ''
-        inputs = []
-        outputs = []
-
-        if container is not None:
-            for item in container.findall("items/item"):
-                item_name = item.get('name', '')
-                if item_name == 'InstanceGuid':
-                    instance_guid = item.text or ''
-                elif item_name == 'NickName':
-                    nickname = item.text or ''
-                elif item_name == 'Name' and not name:
-                    name = item.text or ''
-
-            # 提取輸入參數
-            for param_chunk in container.findall(".//chunk[@name='param_input']"):
-                param = self._parse_param_chunk(param_chunk)
-                if param:
-                    inputs.append(param)
-
-            # 提取輸出參數
-            for param_chunk in container.findall(".//chunk[@name='param_output']"):
-                param = self._parse_param_chunk(param_chunk)
-                if param:
-                    outputs.append(param)
-
-        # 跳過 Group 等非組件物件
-        if name == 'Group' or not (instance_guid or component_guid):
-            return None
-
-        return Component(
-            instance_guid=instance_guid,
-            component_guid=component_guid,
-            name=name,
-            nickname=nickname,
-            inputs=inputs,
-            outputs=outputs
-        )
-
-    def _parse_param_chunk(self, param_chunk: ET.Element) -> Optional[Parameter]:
-        """解析參數 chunk"""
-        name = ''
-        nickname = ''
-        source_count = 0
-
-        for item in param_chunk.findall("items/item"):
-            item_name = item.get('name', '')
-            if item_name == 'Name':
-                name = item.text or ''
-            elif item_name == 'NickName':
-                nickname = item.text or ''
-            elif item_name == 'SourceCount':
-                source_count = int(item.text or '0')
-
-        if nickname or name:
-            return Parameter(
-                nickname=nickname or name,
-                name=name or nickname,
-                source_count=source_count
-            )
-        return None
-
-    def _extract_connections(self, root: ET.Element) -> List[Connection]:
-        """提取所有連接"""
-        connections = []
-
-        # 先嘗試 chunk-based 格式
-        # 在這個格式中，連線資訊嵌入在 param_input/param_output 的 Source 元素
-        # 需要建立 param InstanceGuid -> (component InstanceGuid, param name) 的映射
-
-        # 步驟 1: 建立參數 InstanceGuid 到 (組件 InstanceGuid, 參數名) 的映射
-        param_to_component = {}  # param_instance_guid -> (component_instance_guid, param_name)
-
-        for obj_chunk in root.findall(".//chunk[@name='Object']"):
-            container = obj_chunk.find(".//chunk[@name='Container']")
-            if container is None:
-                continue
-
-            # 獲取組件 InstanceGuid
-            comp_instance_guid = ''
-            for item in container.findall("items/item"):
-                if item.get('name') == 'InstanceGuid':
-                    comp_instance_guid = item.text or ''
-                    break
-
-            if not comp_instance_guid:
-                continue
-
-            # 記錄所有輸出參數
-            for param_chunk in container.findall(".//chunk[@name='param_output']"):
-                param_instance_guid = ''
-                param_name = ''
-                for item in param_chunk.findall("items/item"):
-                    if item.get('name') == 'InstanceGuid':
-                        param_instance_guid = item.text or ''
-                    elif item.get('name') == 'NickName':
-                        param_name = item.text or ''
-                    elif item.get('name') == 'Name' and not param_name:
-                        param_name = item.text or ''
-
-                if param_instance_guid:
-                    param_to_component[param_instance_guid] = (comp_instance_guid, param_name)
-
-        # 步驟 2: 從 param_input 的 Source 元素提取連線
-        for obj_chunk in root.findall(".//chunk[@name='Object']"):
-            container = obj_chunk.find(".//chunk[@name='Container']")
-            if container is None:
-                continue
-
-            # 獲取目標組件 InstanceGuid
-            to_comp_guid = ''
-            for item in container.findall("items/item"):
-                if item.get('name') == 'InstanceGuid':
-                    to_comp_guid = item.text or ''
-                    break
-
-            if not to_comp_guid:
-                continue
-
-            # 檢查每個輸入參數的 Source
-            for param_chunk in container.findall(".//chunk[@name='param_input']"):
-                to_param_name = ''
-                for item in param_chunk.findall("items/item"):
-                    if item.get('name') == 'NickName':
-                        to_param_name = item.text or ''
-                    elif item.get('name') == 'Name' and not to_param_name:
-                        to_param_name = item.text or ''
-
-                # 獲取所有 Source（一個輸入可能有多個來源）
-                for item in param_chunk.findall("items/item[@name='Source']"):
-                    source_guid = item.text or ''
-                    if source_guid and source_guid in param_to_component:
-                        from_comp_guid, from_param_name = param_to_component[source_guid]
-                        connections.append(Connection(
-                            from_component=from_comp_guid,
-                            from_param=from_param_name,
-                            to_component=to_comp_guid,
-                            to_param=to_param_name
-                        ))
-
-        # 如果沒找到 chunk 格式的連線，嘗試 Wire 格式
-        if not connections:
-            for wire in root.iter('Wire'):
-                conn = Connection(
-                    from_component=wire.get('FromObject', ''),
-                    from_param=wire.get('FromParam', ''),
-                    to_component=wire.get('ToObject', ''),
-                    to_param=wire.get('ToParam', '')
-                )
-                if conn.from_component and conn.to_component:
-                    connections.append(conn)
-
-        return connections
-
-    def _extract_groups(self, root: ET.Element) -> List[Dict]:
-        """提取組群資訊"""
-        groups = []
-
-        for group in root.iter('Group'):
-            groups.append({
-                'name': group.get('Name', ''),
-                'nickname': group.get('NickName', ''),
-                'colour': group.get('Colour', ''),
-                'members': [m.text for m in group.findall('.//Member') if m.text]
-            })
-
-        return groups
-
-    def _extract_metadata(self, root: ET.Element) -> Dict[str, Any]:
-        """提取文件元數據"""
-        metadata = {}
-
-        # 文件版本
-        definition = root.find('.//Definition') or root
-        metadata['version'] = definition.get('Version', '')
-        metadata['name'] = definition.get('Name', '')
-
-        # 作者資訊
-        author = root.find('.//Author')
-        if author is not None:
-            metadata['author'] = author.text or ''
-
-        return metadata
-
-    def batch_parse(self, folder: str, recursive: bool = True) -> List[GHXDocument]:
-        """批量解析資料夾內的 .ghx/.gh 文件"""
-        results = []
+    def batch_parse(
+        self,
+        folder: str,
+        recursive: bool = True,
+        workers: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+        progress: Optional[Callable[[int, int, str, str], None]] = None
+    ) -> List[GHXDocument]:
+        """
+        批量解析資料夾內的 .ghx/.gh 文件
+
+        未命中快取的文件分派到進程池並行解析；結果按文件順序返回，
+        統計與失敗清單保存在 self.last_report。
+        每個文件的 sha256 取自快取鍵（命中快取時不重新讀取文件內容）。
+
+        Args:
+            folder: 資料夾路徑
+            recursive: 是否包含子資料夾
+            workers: 進程數，默認為 CPU 數；1 表示在目前進程中逐一解析
+            cache_dir: 結果快取目錄（見 ghx_cache.GHXCache），None 表示不使用快取
+            progress: 每完成一個文件呼叫 progress(完成數, 總數, 路徑, 狀態)，
+                      狀態為 "parsed" / "cached" / "failed"；默認逐行輸出
+        """
         folder_path = Path(folder)
+        report = BatchReport()
+        self.last_report = report
 
         if not folder_path.exists():
             print(f"Folder not found: {folder}")
-            return results
+            return []
 
         pattern = "**/*.gh*" if recursive else "*.gh*"
+        files = [str(p) for p in folder_path.glob(pattern) if p.suffix.lower() in ['.ghx', '.gh']]
+        report.total = len(files)
+        progress = progress or _print_progress
+        start = time.perf_counter()
+
+        cache = GHXCache(cache_dir) if cache_dir else None
+        documents: List[Optional[GHXDocument]] = [None] * len(files)
+        pending: List[int] = []
+        done = 0
+
+        for index, path in enumerate(files):
+            cached = cache.get(path) if cache else None
+            if cached is None:
+                pending.append(index)
+                continue
+            if cached.document is not None:
+                documents[index] = GHXDocument.from_dict(cached.document)
+                documents[index].sha256 = cached.key.sha256
+                report.cached += 1
+                progress_status = BATCH_CACHED
+            else:
+                self.errors.extend(cached.errors)
+                self.error_count += 1
+                report.failures.extend((path, error) for error in cached.errors)
+                progress_status = BATCH_FAILED
+            done += 1
+            progress(done, report.total, path, progress_status)
+
+        def finish(index: int, result: Tuple[Optional[GHXDocument], List[str], Optional[FileKey]]):
+            nonlocal done
+            doc, errors, key = result
+            path = files[index]
+            if doc is not None and key is not None:
+                doc.sha256 = key.sha256
+            documents[index] = doc
+            self.errors.extend(errors)
+            if doc is not None:
+                self.parsed_count += 1
+                report.parsed += 1
+            else:
+                self.error_count += 1
+                report.failures.extend((path, error) for error in errors)
+            if cache and key is not None:
+                cache.put(key, doc.to_dict() if doc is not None else None, errors)
+            done += 1
+            progress(done, report.total, path, BATCH_PARSED if doc is not None else BATCH_FAILED)
+
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1 or len(pending) <= 1:
+            for index in pending:
+                finish(index, _parse_file(files[index]))
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+                futures = {pool.submit(_parse_file, files[index]): index for index in pending}
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # 工作進程崩潰（例如記憶體不足）：記為該文件的失敗，不寫入快取
+                        result = (None, [f"Error parsing {files[futures[future]]}: {e}"], None)
+                    finish(futures[future], result)
 
-        for file_path in folder_path.glob(pattern):
-            if file_path.suffix.lower() in ['.ghx', '.gh']:
-                print(f"Parsing: {file_path.name}")
-                doc = self.parse_ghx(str(file_path))
-                if doc:
-                    results.append(doc)
-
-        print(f"\nParsed: {self.parsed_count}, Errors: {self.error_count}")
-        return results
+        report.elapsed = time.perf_counter() - start
+        print(f"\n{report.summary()}")
+        return [doc for doc in documents if doc is not None]
 
     def to_json(self, documents: List[GHXDocument], output_path: str = None) -> str:
         """將解析結果轉為 JSON"""
-        data = []
-        for doc in documents:
-            doc_dict = {
-                'file': doc.file_path,
-                'metadata': doc.metadata,
-                'component_count': len(doc.components),
-                'connection_count': len(doc.connections),
-                'components': [asdict(c) for c in doc.components],
-                'connections': [asdict(c) for c in doc.connections],
-                'groups': doc.groups
-            }
-            data.append(doc_dict)
+        data = [doc.to_dict() for doc in documents]
 
         json_str = json.dumps(data, indent=2, ensure_ascii=False)
 
@@ -431,6 +607,52 @@ class GHXParser:
         return json_str
 
 
+# =============================================================================
+# 批量解析
+# =============================================================================
+
+BATCH_PARSED = "parsed"
+BATCH_CACHED = "cached"
+BATCH_FAILED = "failed"
+
+# 失敗摘要最多列出的條數
+MAX_LISTED_FAILURES = 20
+
+
+@dataclass
+class BatchReport:
+    """batch_parse 的統計"""
+    total: int = 0
+    parsed: int = 0
+    cached: int = 0
+    failures: List[Tuple[str, str]] = field(default_factory=list)  # (文件, 錯誤)
+    elapsed: float = 0.0
+
+    def summary(self) -> str:
+        lines = [f"Parsed: {self.parsed}, Cached: {self.cached}, Errors: {len(self.failures)} "
+                 f"({self.total} files, {self.elapsed:.2f}s)"]
+        for path, error in self.failures[:MAX_LISTED_FAILURES]:
+            lines.append(f"  ✗ {Path(path).name}: {error}")
+        if len(self.failures) > MAX_LISTED_FAILURES:
+            lines.append(f"  ... and {len(self.failures) - MAX_LISTED_FAILURES} more")
+        return "\n".join(lines)
+
+
+def _parse_file(path: str) -> Tuple[Optional[GHXDocument], List[str], Optional[FileKey]]:
+    """在工作進程中解析單個文件，返回 (文件, 錯誤, 快取鍵)"""
+    try:
+        key = FileKey.compute(path)
+    except OSError:
+        key = None
+    parser = GHXParser()
+    return parser.parse_ghx(path), parser.errors, key
+
+
+def _print_progress(done: int, total: int, path: str, status: str):
+    suffix = {BATCH_CACHED: " (cached)", BATCH_FAILED: " ✗"}.get(status, "")
+    print(f"[{done}/{total}] {Path(path).name}{suffix}")
+
+
 # CLI 介面
 if __name__ == "__main__":
     import sys
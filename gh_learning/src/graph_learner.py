@@ -4,7 +4,7 @@ Graph Learner - 自適應圖學習模組
 
 根據資料量自動選擇最佳學習方法：
 
-Level 1: 統計頻率 (< 30 樣本) - 共現矩陣 + SVD
+Level 1: 統計頻率 (< 30 樣本) - 稀疏共現矩陣 + 截斷 SVD
 Level 2: Node2Vec (30-500 樣本) - 隨機遊走 + Word2Vec
 Level 3: GraphSAGE (500-10K 樣本) - 圖神經網絡
 Level 4: Transformer (> 10K 樣本) - 預留
@@ -15,11 +15,13 @@ Level 4: Transformer (> 10K 樣本) - 預留
 import json
 import numpy as np
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Set
+from typing import List, Dict, Iterator, Optional, Tuple, Set
 from dataclasses import dataclass, field
 from collections import defaultdict
 import warnings
 
+from ghx_corpus import NO_STRING, GHXCorpus
+
 # 嘗試導入可選依賴
 try:
     import networkx as nx
@@ -46,6 +48,13 @@ THRESHOLD_NODE2VEC = 30
 THRESHOLD_GRAPHSAGE = 500
 THRESHOLD_TRANSFORMER = 10000
 
+# Level 1 共現矩陣的分解
+EXACT_SVD_MAX_TYPES = 1024      # 類型數不超過此值時對稠密矩陣做完整 SVD
+SVD_OVERSAMPLES = 10            # 隨機化分解的最少過採樣列數（實際取 max(此值, rank)）
+SVD_POWER_ITERATIONS = 6        # 冪迭代次數（奇異值衰減慢時提高精度）
+SVD_SEED = 0
+MATMUL_BLOCK_ELEMENTS = 1 << 21 # 稀疏乘法每段中間陣列的元素數上限（約 16 MB）
+
 
 @dataclass
 class GraphNode:
@@ -85,6 +94,79 @@ class Subgraph:
     source_files: List[str] = field(default_factory=list)
 
 
+@dataclass
+class SparseCooccurrence:
+    """對稱共現矩陣的 COO 表示：按 (row, col) 排序，重複項已合併"""
+    size: int
+    rows: np.ndarray
+    cols: np.ndarray
+    values: np.ndarray
+
+    @classmethod
+    def from_edges(cls, source: np.ndarray, target: np.ndarray, size: int) -> 'SparseCooccurrence':
+        """每條邊 (i, j) 在 [i, j] 與 [j, i] 各計一次"""
+        source = np.asarray(source, dtype=np.int64)
+        target = np.asarray(target, dtype=np.int64)
+        keys = np.concatenate([source * size + target, target * size + source])
+        keys, counts = np.unique(keys, return_counts=True)
+        return cls(size, keys // size, keys % size, counts.astype(np.float64))
+
+    @property
+    def nnz(self) -> int:
+        return len(self.values)
+
+    def to_dense(self) -> np.ndarray:
+        matrix = np.zeros((self.size, self.size))
+        matrix[self.rows, self.cols] = self.values
+        return matrix
+
+    def matmul(self, dense: np.ndarray) -> np.ndarray:
+        """self @ dense（按行分段 reduceat，等同 CSR 乘法）"""
+        out = np.zeros((self.size, dense.shape[1]))
+        if not self.nnz:
+            return out
+        starts = np.flatnonzero(np.r_[True, self.rows[1:] != self.rows[:-1]])
+        ends = np.r_[starts[1:], self.nnz]
+        # 按非零元素數分段：Zipf 分佈下常用類型的行非常密，按行數分段的中間陣列會隨之膨脹
+        budget = max(1, MATMUL_BLOCK_ELEMENTS // max(1, dense.shape[1]))
+        block = 0
+        while block < len(starts):
+            first = starts[block]
+            stop = max(block + 1, int(np.searchsorted(ends, first + budget, side='right')))
+            block_starts = starts[block:stop]
+            last = ends[stop - 1]
+            products = self.values[first:last, None] * dense[self.cols[first:last]]
+            out[self.rows[block_starts]] = np.add.reduceat(products, block_starts - first, axis=0)
+            block = stop
+        return out
+
+
+def randomized_eigh(matrix: SparseCooccurrence, rank: int,
+                    oversamples: int = SVD_OVERSAMPLES,
+                    power_iterations: int = SVD_POWER_ITERATIONS,
+                    seed: int = SVD_SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    對稱矩陣 |特徵值| 最大的 rank 個特徵對（隨機化範圍查找 + 冪迭代）
+
+    對稱矩陣的 SVD 中 U 即特徵向量、奇異值即 |特徵值|，
+    因此返回值可直接替代 np.linalg.svd 的 (U[:, :rank], S[:rank])。
+
+    共現矩陣尾部的奇異值間距很小（第 64 個與第 65 個常只差 1%），
+    過採樣列數隨 rank 增加，尾部的奇異值才與完整 SVD 一致。
+    """
+    n = matrix.size
+    width = min(n, rank + max(oversamples, rank))
+    rng = np.random.default_rng(seed)
+    basis, _ = np.linalg.qr(matrix.matmul(rng.standard_normal((n, width))))
+    for _ in range(power_iterations):
+        basis, _ = np.linalg.qr(matrix.matmul(basis))
+
+    projected = basis.T @ matrix.matmul(basis)
+    eigenvalues, vectors = np.linalg.eigh((projected + projected.T) / 2)
+    order = np.argsort(-np.abs(eigenvalues), kind='stable')[:rank]
+    return basis @ vectors[:, order], np.abs(eigenvalues[order])
+
+
 class AdaptiveLearner:
     """
     自適應圖學習器
@@ -94,11 +176,15 @@ class AdaptiveLearner:
         learner.load_parsed_data("knowledge/extracted_knowledge.json")
         learner.train()
         learner.save("knowledge/component_embeddings.json")
+
+    .npz 語料（見 ghx_corpus.py）不會轉成 ComponentGraph 列表：
+    連接模式直接從連線列統計，圖只在 iter_graphs() 時逐一建立。
     """
 
     def __init__(self, embedding_dim: int = 64):
         self.embedding_dim = embedding_dim
         self.graphs: List[ComponentGraph] = []
+        self.corpora: List[GHXCorpus] = []
         self.combined_graph = None
         self.embeddings: Dict[str, np.ndarray] = {}
         self.current_level: str = "NOT_TRAINED"
@@ -109,7 +195,14 @@ class AdaptiveLearner:
         self.num_walks = 80
 
     def get_sample_count(self) -> int:
-        return len(self.graphs)
+        return len(self.graphs) + sum(len(corpus) for corpus in self.corpora)
+
+    def iter_graphs(self) -> Iterator[ComponentGraph]:
+        """所有圖：已載入的 ComponentGraph，以及語料中按需建立的圖"""
+        yield from self.graphs
+        for corpus in self.corpora:
+            for doc in corpus:
+                yield self._document_graph(doc)
 
     def get_recommended_level(self) -> str:
         """根據資料量推薦學習等級"""
@@ -125,12 +218,16 @@ class AdaptiveLearner:
             return "STATISTICAL"
 
     def load_parsed_data(self, parsed_json_path: str) -> int:
-        """載入解析後的 JSON 資料（支援多種格式）"""
+        """載入解析後的 JSON 資料（支援多種格式）或 .npz 語料"""
         path = Path(parsed_json_path)
         if not path.exists():
             print(f"[AdaptiveLearner] 找不到: {parsed_json_path}")
             return 0
 
+        # 格式 0: 列式語料 (GHXCorpus)
+        if GHXCorpus.is_corpus(path):
+            return self.load_corpus(GHXCorpus.load(path))
+
         with open(path, 'r', encoding='utf-8') as f:
             data = json.load(f)
 
@@ -158,6 +255,49 @@ class AdaptiveLearner:
         print(f"[AdaptiveLearner] 推薦等級: {recommended}")
         return len(self.graphs)
 
+    def load_corpus(self, corpus: GHXCorpus) -> int:
+        """載入列式語料：組件類型與連接模式直接從列統計，不建立逐文件的圖"""
+        self.corpora.append(corpus)
+        self.component_types.update(corpus.used_strings('name'))
+
+        # 連接模式 "CompA.param -> CompB.param"：對四個整數列去重計數
+        resolved = (corpus['edge_source'] >= 0) & (corpus['edge_target'] >= 0)
+        if resolved.any():
+            source, target = corpus['edge_source'][resolved], corpus['edge_target'][resolved]
+            keys = np.stack([
+                corpus['name'][source], corpus['edge_source_param'][resolved],
+                corpus['name'][target], corpus['edge_target_param'][resolved],
+            ], axis=1)
+            patterns, counts = np.unique(keys, axis=0, return_counts=True)
+            strings = corpus.strings
+            for (src, src_param, tgt, tgt_param), count in zip(patterns.tolist(), counts.tolist()):
+                pattern = f"{strings[src]}.{strings[src_param]} -> {strings[tgt]}.{strings[tgt_param]}"
+                self.connection_patterns[pattern] += count
+
+        print(f"[AdaptiveLearner] 載入語料: {len(corpus)} 個文件, {corpus.component_count} 個組件, "
+              f"{corpus.connection_count} 條連線")
+        print(f"[AdaptiveLearner] 推薦等級: {self.get_recommended_level()}")
+        return len(corpus)
+
+    def _document_graph(self, doc) -> ComponentGraph:
+        """GHXDocument → ComponentGraph（不更新連接模式）"""
+        graph = ComponentGraph(file_name=doc.file_path, metadata=doc.metadata)
+        for comp in doc.components:
+            if comp.instance_guid:
+                graph.nodes.append(GraphNode(
+                    instance_id=comp.instance_guid,
+                    component_type=comp.name,
+                    nickname=comp.nickname,
+                    position=(comp.position_x, comp.position_y)
+                ))
+        for conn in doc.connections:
+            if conn.from_component and conn.to_component:
+                graph.edges.append(GraphEdge(
+                    source=conn.from_component, target=conn.to_component,
+                    source_param=conn.from_param, target_param=conn.to_param
+                ))
+        return graph
+
     def _load_aggregated_knowledge(self, data: Dict) -> int:
         """載入聚合知識庫格式（如 extracted_knowledge.json）"""
         # 提取組件類型
@@ -300,7 +440,7 @@ class AdaptiveLearner:
             return self._train_statistical()
 
     def _train_statistical(self) -> bool:
-        """Level 1: 統計頻率學習（共現矩陣 + SVD）"""
+        """Level 1: 統計頻率學習（稀疏共現矩陣 + 截斷分解）"""
         print("[Level 1] 統計頻率學習...")
 
         types = sorted(self.component_types)
@@ -309,32 +449,64 @@ class AdaptiveLearner:
 
         type_to_idx = {t: i for i, t in enumerate(types)}
         n = len(types)
-        cooccurrence = np.zeros((n, n))
-
-        for graph in self.graphs:
-            id_to_type = {node.instance_id: node.component_type for node in graph.nodes}
-            for edge in graph.edges:
-                src_type = id_to_type.get(edge.source)
-                tgt_type = id_to_type.get(edge.target)
-                if src_type and tgt_type and src_type in type_to_idx and tgt_type in type_to_idx:
-                    i, j = type_to_idx[src_type], type_to_idx[tgt_type]
-                    cooccurrence[i, j] += 1
-                    cooccurrence[j, i] += 1
+        cooccurrence = self._cooccurrence(type_to_idx)
 
         try:
-            U, S, _ = np.linalg.svd(cooccurrence, full_matrices=False)
-            dim = min(self.embedding_dim, n, len(S))
-            embeddings_matrix = U[:, :dim] * np.sqrt(S[:dim])
+            dim = min(self.embedding_dim, n)
+            if n <= EXACT_SVD_MAX_TYPES:
+                U, S, _ = np.linalg.svd(cooccurrence.to_dense(), full_matrices=False)
+                dim = min(dim, len(S))
+                U, S = U[:, :dim], S[:dim]
+            else:
+                U, S = randomized_eigh(cooccurrence, dim)
+            embeddings_matrix = U * np.sqrt(S)
 
             for t, idx in type_to_idx.items():
                 self.embeddings[t] = embeddings_matrix[idx]
 
-            print(f"[Level 1] 完成: {len(self.embeddings)} 嵌入 (維度: {dim})")
+            print(f"[Level 1] 完成: {len(self.embeddings)} 嵌入 (維度: {dim}, 非零項: {cooccurrence.nnz})")
             return True
         except Exception as e:
             print(f"[Level 1] 失敗: {e}")
             return False
 
+    def _cooccurrence(self, type_to_idx: Dict[str, int]) -> SparseCooccurrence:
+        """所有圖的連線兩端類型的共現計數（空類型與未知類型不計）"""
+        sources, targets = [], []
+
+        for graph in self.graphs:
+            id_to_idx = {node.instance_id: type_to_idx.get(node.component_type, -1) if node.component_type else -1
+                         for node in graph.nodes}
+            pairs = np.array([(id_to_idx.get(edge.source, -1), id_to_idx.get(edge.target, -1))
+                              for edge in graph.edges], dtype=np.int64).reshape(-1, 2)
+            sources.append(pairs[:, 0])
+            targets.append(pairs[:, 1])
+
+        # 語料：組件名稱的字串索引 → 類型索引，整列查表
+        for corpus in self.corpora:
+            names = corpus['name']
+            used = np.unique(names)
+            used = used[used != NO_STRING]
+            lookup = np.full(len(corpus.strings) + 1, -1, dtype=np.int64)   # 最後一格對應 NO_STRING
+            strings = corpus.strings
+            lookup[used] = [type_to_idx.get(strings[int(i)], -1) if strings[int(i)] else -1 for i in used]
+
+            source, target = corpus.edge_type_indices()
+            # 與 _document_graph 一致：端點 InstanceGuid 為空的連線不計
+            empty = corpus.table('instances').empty()
+            if len(empty):
+                resolved = (corpus['edge_source'] >= 0) & (corpus['edge_target'] >= 0)
+                keep = ~(np.isin(corpus['edge_source_instance'][resolved], empty)
+                         | np.isin(corpus['edge_target_instance'][resolved], empty))
+                source, target = source[keep], target[keep]
+            sources.append(lookup[source])
+            targets.append(lookup[target])
+
+        source = np.concatenate(sources) if sources else np.zeros(0, dtype=np.int64)
+        target = np.concatenate(targets) if targets else np.zeros(0, dtype=np.int64)
+        known = (source >= 0) & (target >= 0)
+        return SparseCooccurrence.from_edges(source[known], target[known], len(type_to_idx))
+
     def _train_node2vec(self) -> bool:
         """Level 2: Node2Vec（隨機遊走 + Word2Vec）"""
         print("[Level 2] Node2Vec 學習...")
@@ -378,7 +550,7 @@ class AdaptiveLearner:
 
         self.combined_graph = nx.DiGraph()
 
-        for graph in self.graphs:
+        for graph in self.iter_graphs():
             id_to_type = {node.instance_id: node.component_type for node in graph.nodes}
 
             for node in graph.nodes:
@@ -474,7 +646,7 @@ class AdaptiveLearner:
 
         pattern_counts = defaultdict(list)
 
-        for graph in self.graphs:
+        for graph in self.iter_graphs():
             G = nx.DiGraph()
             id_to_type = {}
 
@@ -7,139 +7,377 @@ Knowledge Extractor - 從解析的 GHX 文件中萃取知識
 2. 萃取參數映射 (nickname -> fullName)
 3. 發現連線模式
 4. 生成結構化知識庫
+
+增量更新:
+    每個文件的貢獻先算成一份 delta（原始計數），再加到 / 減出總計數；
+    update() 只處理新增、改動與刪除的文件，導出的視圖（每個組件的條目、
+    Top 100 連線模式、名稱映射）也只重新計算受影響的部分。
+    原始計數與每個文件的 delta 可用 save_state() / load_state() 保存，
+    而不是只保存截斷後的 extracted_knowledge.json。
+
+    extractor = KnowledgeExtractor.load_state("knowledge/knowledge_state.json")
+    extractor.update(docs)           # 未改動的文件直接跳過
+    extractor.save_state("knowledge/knowledge_state.json")
+    knowledge = extractor.export()
 """
 
+import copy
+import hashlib
+import heapq
 import json
-from collections import defaultdict
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Dict, List, Any, Set
-from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterable, List, Any, Optional, Set, Tuple
+from dataclasses import dataclass, field
 
 from ghx_parser import GHXParser, GHXDocument, Component, Connection
+from ghx_corpus import load_documents
+
+# 狀態文件格式版本
+STATE_FORMAT = 1
+
+# 導出視圖的截斷長度
+TOP_PATTERNS = 100
+TOP_CONNECTED = 10
 
 
 @dataclass
 class ComponentKnowledge:
-    """組件知識"""
+    """組件知識（原始計數；計數歸零的鍵被刪除）"""
     guid: str
-    names: Set[str] = field(default_factory=set)
-    nicknames: Set[str] = field(default_factory=set)
-    inputs: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
-    outputs: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
+    names: Counter = field(default_factory=Counter)
+    nicknames: Counter = field(default_factory=Counter)
+    inputs: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    outputs: Dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
     usage_count: int = 0
-    connected_to: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
-    connected_from: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    connected_to: Counter = field(default_factory=Counter)
+    connected_from: Counter = field(default_factory=Counter)
 
+    def is_empty(self) -> bool:
+        return self.usage_count <= 0 and not (self.connected_to or self.connected_from)
 
-class KnowledgeExtractor:
-    """知識萃取器"""
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            'usage_count': self.usage_count,
+            'names': dict(self.names),
+            'nicknames': dict(self.nicknames),
+            'inputs': {nick: dict(names) for nick, names in self.inputs.items()},
+            'outputs': {nick: dict(names) for nick, names in self.outputs.items()},
+            'connected_to': dict(self.connected_to),
+            'connected_from': dict(self.connected_from),
+        }
 
-    def __init__(self):
-        self.registry: Dict[str, ComponentKnowledge] = {}
-        self.connection_patterns: Dict[str, int] = defaultdict(int)
-        self.component_name_to_guid: Dict[str, str] = {}
 
-    def extract(self, documents: List[GHXDocument]) -> Dict[str, Any]:
-        """從多個解析結果中萃取知識"""
+def _ranked(counts: Dict[str, int], limit: Optional[int] = None) -> List[Tuple[str, int]]:
+    """按次數遞減、同次數按鍵排序"""
+    if limit is None:
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return heapq.nsmallest(limit, counts.items(), key=lambda item: (-item[1], item[0]))
 
-        for doc in documents:
-            # 建立 instance_guid -> component 映射
-            instance_map = {c.instance_guid: c for c in doc.components}
 
-            # 處理組件
-            for comp in doc.components:
-                self._register_component(comp)
+def _add_counts(target: Counter, counts: Dict[str, int], sign: int):
+    """把 counts 乘以 sign 加到 target，刪除歸零的鍵"""
+    for key, count in counts.items():
+        value = target[key] + sign * count
+        if value > 0:
+            target[key] = value
+        else:
+            del target[key]
 
-            # 處理連線
-            for conn in doc.connections:
-                self._record_connection(conn, instance_map)
 
-        return self._export()
+def document_delta(doc: GHXDocument) -> Dict[str, Any]:
+    """
+    單個文件對知識庫的貢獻（原始計數，可 JSON 序列化）
 
-    def _register_component(self, comp: Component):
-        """註冊組件知識"""
+    Returns:
+        {"components": {guid: {...}}, "patterns": {pattern: n}, "name_to_guid": {name: {guid: n}}}
+    """
+    components: Dict[str, ComponentKnowledge] = {}
+    patterns: Counter = Counter()
+    name_to_guid: Dict[str, Counter] = defaultdict(Counter)
+
+    for comp in doc.components:
         guid = comp.component_guid
         if not guid:
-            return
-
-        if guid not in self.registry:
-            self.registry[guid] = ComponentKnowledge(guid=guid)
-
-        entry = self.registry[guid]
+            continue
+        entry = components.setdefault(guid, ComponentKnowledge(guid=guid))
         entry.usage_count += 1
-
-        # 記錄名稱
         if comp.name:
-            entry.names.add(comp.name)
-            self.component_name_to_guid[comp.name.lower()] = guid
-
+            entry.names[comp.name] += 1
+            name_to_guid[comp.name.lower()][guid] += 1
         if comp.nickname:
-            entry.nicknames.add(comp.nickname)
-
-        # 記錄參數
+            entry.nicknames[comp.nickname] += 1
         for inp in comp.inputs:
             if inp.nickname:
-                entry.inputs[inp.nickname].add(inp.name or inp.nickname)
-
+                entry.inputs[inp.nickname][inp.name or inp.nickname] += 1
         for out in comp.outputs:
             if out.nickname:
-                entry.outputs[out.nickname].add(out.name or out.nickname)
+                entry.outputs[out.nickname][out.name or out.nickname] += 1
 
-    def _record_connection(self, conn: Connection, instance_map: Dict[str, Component]):
-        """記錄連線模式"""
+    # 建立 instance_guid -> component 映射
+    instance_map = {c.instance_guid: c for c in doc.components}
+    for conn in doc.connections:
         from_comp = instance_map.get(conn.from_component)
         to_comp = instance_map.get(conn.to_component)
+        if not (from_comp and to_comp):
+            continue
+        patterns[f"{from_comp.name}.{conn.from_param} -> {to_comp.name}.{conn.to_param}"] += 1
+        from_guid, to_guid = from_comp.component_guid, to_comp.component_guid
+        if from_guid in components:
+            components[from_guid].connected_to[to_guid] += 1
+        if to_guid in components:
+            components[to_guid].connected_from[from_guid] += 1
+
+    return {
+        'components': {guid: entry.to_state() for guid, entry in components.items()},
+        'patterns': dict(patterns),
+        'name_to_guid': {name: dict(guids) for name, guids in name_to_guid.items()},
+    }
+
+
+def document_fingerprint(doc: GHXDocument) -> str:
+    """
+    文件內容的指紋（判斷 update() 時文件是否改動）
+
+    batch_parse 的文件帶有來源文件的 SHA-256（快取已算好），直接使用；
+    其他來源（parse_ghx、手動建立的文件）才序列化整個文件計算雜湊。
+    """
+    if doc.sha256:
+        return doc.sha256
+    encoded = json.dumps(doc.to_dict(), sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
 
-        if from_comp and to_comp:
-            from_guid = from_comp.component_guid
-            to_guid = to_comp.component_guid
 
-            # 記錄連線模式
-            pattern = f"{from_comp.name}.{conn.from_param} -> {to_comp.name}.{conn.to_param}"
-            self.connection_patterns[pattern] += 1
+class KnowledgeExtractor:
+    """知識萃取器"""
 
-            # 更新組件連線統計
-            if from_guid in self.registry:
-                self.registry[from_guid].connected_to[to_guid] += 1
-            if to_guid in self.registry:
-                self.registry[to_guid].connected_from[from_guid] += 1
+    def __init__(self):
+        self.registry: Dict[str, ComponentKnowledge] = {}
+        self.connection_patterns: Counter = Counter()
+        self.name_guids: Dict[str, Counter] = {}      # name.lower() -> {guid: 次數}
+        # update() 追蹤的文件：鍵 -> {"fingerprint": ..., "delta": document_delta()}
+        self.documents: Dict[str, Dict[str, Any]] = {}
+
+        # 導出視圖的快取與待更新的鍵
+        self._component_views: Dict[str, Dict[str, Any]] = {}
+        self._name_view: Dict[str, str] = {}
+        self._dirty_components: Set[str] = set()
+        self._dirty_names: Set[str] = set()
+        self._top_patterns: Optional[Set[str]] = set()   # None 表示需要完整重算
+
+    @property
+    def component_name_to_guid(self) -> Dict[str, str]:
+        self._refresh_views()
+        return self._name_view
+
+    # -------------------------------------------------------------------------
+    # 萃取
+    # -------------------------------------------------------------------------
+
+    def extract(self, documents: Iterable[GHXDocument]) -> Dict[str, Any]:
+        """從多個解析結果中萃取知識（也可傳入 GHXCorpus，文件逐一還原）；結果累加，不追蹤文件"""
+        for doc in documents:
+            self.apply_delta(document_delta(doc))
+        return self._export()
+
+    def add_document(self, doc: GHXDocument, key: Optional[str] = None, fingerprint: Optional[str] = None):
+        """加入（或替換）一個追蹤的文件；key 默認為文件路徑"""
+        key = key or doc.file_path
+        if key in self.documents:
+            self.remove_document(key)
+        delta = document_delta(doc)
+        self.apply_delta(delta)
+        self.documents[key] = {'fingerprint': fingerprint or document_fingerprint(doc), 'delta': delta}
+
+    def remove_document(self, key: str) -> bool:
+        """移除一個追蹤的文件的全部貢獻"""
+        entry = self.documents.pop(key, None)
+        if entry is None:
+            return False
+        self.apply_delta(entry['delta'], sign=-1)
+        return True
+
+    def update(self, documents: Iterable[GHXDocument], prune: bool = True) -> Dict[str, int]:
+        """
+        以目前的文件集合增量更新
+
+        指紋（見 document_fingerprint）相同的文件跳過；改動的文件先減去舊 delta 再加上新 delta；
+        prune 時不在本次集合中的已追蹤文件被移除。
+
+        Returns:
+            {"added", "updated", "removed", "unchanged"} 的文件數
+        """
+        summary = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        seen = set()
+        for doc in documents:
+            key = doc.file_path
+            seen.add(key)
+            fingerprint = document_fingerprint(doc)
+            known = self.documents.get(key)
+            if known is not None and known['fingerprint'] == fingerprint:
+                summary['unchanged'] += 1
+                continue
+            self.add_document(doc, key, fingerprint)
+            summary['updated' if known is not None else 'added'] += 1
+
+        if prune:
+            for key in [key for key in self.documents if key not in seen]:
+                self.remove_document(key)
+                summary['removed'] += 1
+        return summary
+
+    def apply_delta(self, delta: Dict[str, Any], sign: int = 1):
+        """把 document_delta() 的結果加到（sign=-1 時減出）總計數"""
+        for guid, counts in delta['components'].items():
+            entry = self.registry.get(guid)
+            if entry is None:
+                entry = self.registry[guid] = ComponentKnowledge(guid=guid)
+            entry.usage_count += sign * counts['usage_count']
+            _add_counts(entry.names, counts['names'], sign)
+            _add_counts(entry.nicknames, counts['nicknames'], sign)
+            for kind in ('inputs', 'outputs'):
+                params = getattr(entry, kind)
+                for nick, names in counts[kind].items():
+                    _add_counts(params[nick], names, sign)
+                    if not params[nick]:
+                        del params[nick]
+            _add_counts(entry.connected_to, counts['connected_to'], sign)
+            _add_counts(entry.connected_from, counts['connected_from'], sign)
+            if entry.is_empty():
+                del self.registry[guid]
+            self._dirty_components.add(guid)
+
+        for pattern, count in delta['patterns'].items():
+            old = self.connection_patterns[pattern]
+            _add_counts(self.connection_patterns, {pattern: count}, sign)
+            self._pattern_changed(pattern, old, self.connection_patterns.get(pattern, 0))
+
+        for name, guids in delta['name_to_guid'].items():
+            counts = self.name_guids.setdefault(name, Counter())
+            _add_counts(counts, guids, sign)
+            if not counts:
+                del self.name_guids[name]
+            self._dirty_names.add(name)
+
+    # -------------------------------------------------------------------------
+    # 導出視圖（只重算改動的部分）
+    # -------------------------------------------------------------------------
+
+    def _pattern_changed(self, pattern: str, old: int, new: int):
+        """維護 Top N 連線模式的成員；Top 成員減少時改為完整重算"""
+        top = self._top_patterns
+        if top is None:
+            return
+        if pattern in top:
+            if new < old:
+                if new <= 0:
+                    top.discard(pattern)
+                # Top 之外還有模式時，可能有模式需要補上
+                if len(self.connection_patterns) > len(top):
+                    self._top_patterns = None
+            return
+        if new <= old:
+            return
+        if len(top) < TOP_PATTERNS:
+            top.add(pattern)
+            return
+        weakest = max(top, key=lambda key: (-self.connection_patterns[key], key))
+        if (-new, pattern) < (-self.connection_patterns[weakest], weakest):
+            top.discard(weakest)
+            top.add(pattern)
+
+    def _component_view(self, guid: str, entry: ComponentKnowledge) -> Dict[str, Any]:
+        return {
+            "guid": guid,
+            "names": [name for name, _ in _ranked(entry.names)],
+            "nicknames": [name for name, _ in _ranked(entry.nicknames)],
+            "inputs": {nick: [name for name, _ in _ranked(names)] for nick, names in sorted(entry.inputs.items())},
+            "outputs": {nick: [name for name, _ in _ranked(names)] for nick, names in sorted(entry.outputs.items())},
+            "usage_count": entry.usage_count,
+            "commonly_connected_to": dict(_ranked(entry.connected_to, TOP_CONNECTED)),
+            "commonly_connected_from": dict(_ranked(entry.connected_from, TOP_CONNECTED))
+        }
+
+    def _refresh_views(self):
+        for guid in self._dirty_components:
+            entry = self.registry.get(guid)
+            if entry is None or entry.usage_count <= 0:
+                self._component_views.pop(guid, None)
+            else:
+                self._component_views[guid] = self._component_view(guid, entry)
+        self._dirty_components.clear()
+
+        for name in self._dirty_names:
+            guids = self.name_guids.get(name)
+            if guids:
+                self._name_view[name] = _ranked(guids, 1)[0][0]
+            else:
+                self._name_view.pop(name, None)
+        self._dirty_names.clear()
+
+    def export(self) -> Dict[str, Any]:
+        """導出知識庫（extracted_knowledge.json 格式）"""
+        return self._export()
 
     def _export(self) -> Dict[str, Any]:
         """導出知識庫"""
-        components = {}
-
-        for guid, knowledge in self.registry.items():
-            components[guid] = {
-                "guid": guid,
-                "names": list(knowledge.names),
-                "nicknames": list(knowledge.nicknames),
-                "inputs": {k: list(v) for k, v in knowledge.inputs.items()},
-                "outputs": {k: list(v) for k, v in knowledge.outputs.items()},
-                "usage_count": knowledge.usage_count,
-                "commonly_connected_to": dict(
-                    sorted(knowledge.connected_to.items(), key=lambda x: -x[1])[:10]
-                ),
-                "commonly_connected_from": dict(
-                    sorted(knowledge.connected_from.items(), key=lambda x: -x[1])[:10]
-                )
-            }
+        self._refresh_views()
 
-        # 排序連線模式
-        sorted_patterns = sorted(
-            self.connection_patterns.items(),
-            key=lambda x: -x[1]
-        )[:100]  # 取 Top 100
+        if self._top_patterns is None:
+            self._top_patterns = {pattern for pattern, _ in _ranked(self.connection_patterns, TOP_PATTERNS)}
+        top = {pattern: self.connection_patterns[pattern] for pattern in self._top_patterns}
 
         return {
-            "components": components,
-            "connection_patterns": dict(sorted_patterns),
-            "name_to_guid": self.component_name_to_guid,
+            "components": dict(self._component_views),
+            "connection_patterns": dict(_ranked(top)),
+            "name_to_guid": dict(self._name_view),
             "statistics": {
-                "total_components": len(components),
+                "total_components": len(self._component_views),
                 "total_patterns": len(self.connection_patterns)
             }
         }
 
+    # -------------------------------------------------------------------------
+    # 狀態保存
+    # -------------------------------------------------------------------------
+
+    def save_state(self, path: str):
+        """保存原始計數與每個追蹤文件的 delta"""
+        state = {
+            'format': STATE_FORMAT,
+            'components': {guid: entry.to_state() for guid, entry in self.registry.items()},
+            'patterns': dict(self.connection_patterns),
+            'name_to_guid': {name: dict(guids) for name, guids in self.name_guids.items()},
+            'documents': self.documents,
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load_state(cls, path: str) -> 'KnowledgeExtractor':
+        """載入 save_state() 的結果；文件不存在或格式不符時返回空的萃取器"""
+        extractor = cls()
+        if not Path(path).exists():
+            return extractor
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('format') != STATE_FORMAT:
+            print(f"Ignoring knowledge state with format {state.get('format')}: {path}")
+            return extractor
+
+        extractor._top_patterns = None   # 全部載入後一次計算 Top N
+        extractor.apply_delta({
+            'components': state['components'],
+            'patterns': state['patterns'],
+            'name_to_guid': state['name_to_guid'],
+        })
+        extractor.documents = state.get('documents', {})
+        return extractor
+
     def merge_with_existing(self, existing_path: str) -> Dict[str, Any]:
         """與現有知識庫合併"""
         if not Path(existing_path).exists():
@@ -148,7 +386,7 @@ class KnowledgeExtractor:
         with open(existing_path, 'r', encoding='utf-8') as f:
             existing = json.load(f)
 
-        new_data = self._export()
+        new_data = copy.deepcopy(self._export())
 
         # 合併組件
         for guid, comp_data in new_data['components'].items():
@@ -197,20 +435,20 @@ class KnowledgeExtractor:
             if not knowledge.names:
                 continue
 
-            name = list(knowledge.names)[0]  # 取第一個名稱
+            name = _ranked(knowledge.names, 1)[0][0]  # 取最常用的名稱
 
             inputs = []
             for nick, full_names in knowledge.inputs.items():
                 inputs.append({
                     "nickname": nick,
-                    "fullName": list(full_names)[0] if full_names else nick
+                    "fullName": _ranked(full_names, 1)[0][0] if full_names else nick
                 })
 
             outputs = []
             for nick, full_names in knowledge.outputs.items():
                 outputs.append({
                     "nickname": nick,
-                    "fullName": list(full_names)[0] if full_names else nick
+                    "fullName": _ranked(full_names, 1)[0][0] if full_names else nick
                 })
 
             result["components"][name] = {
@@ -284,9 +522,10 @@ if __name__ == "__main__":
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: python knowledge_extractor.py <ghx_folder> [output.json] [--report]")
+        print("Usage: python knowledge_extractor.py <ghx_folder | parsed.npz | parsed.json> [output.json] [--report]")
         print("\nExamples:")
         print("  python knowledge_extractor.py ./ghx_samples/")
+        print("  python knowledge_extractor.py ../knowledge/parsed_data.npz")
         print("  python knowledge_extractor.py ./ghx_samples/ knowledge.json")
         print("  python knowledge_extractor.py ./ghx_samples/ knowledge.json --report")
         sys.exit(1)
@@ -295,11 +534,14 @@ if __name__ == "__main__":
     output_path = sys.argv[2] if len(sys.argv) > 2 and not sys.argv[2].startswith('--') else None
     generate_report_flag = '--report' in sys.argv
 
-    # 解析
-    parser = GHXParser()
-    docs = parser.batch_parse(ghx_folder)
+    # 解析（或載入已解析的語料）
+    if Path(ghx_folder).is_file():
+        docs = load_documents(ghx_folder)
+    else:
+        parser = GHXParser()
+        docs = parser.batch_parse(ghx_folder)
 
-    if not docs:
+    if not len(docs):
         print("No documents parsed successfully.")
         sys.exit(1)
 
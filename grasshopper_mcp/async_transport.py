@@ -0,0 +1,403 @@
+"""
+GH_MCP 非同步傳輸層
+
+基於 asyncio streams，供 async 路徑（AgentOrchestrator / EnhancedGHOrchestrator
+及其呼叫的工具）使用，不會阻塞事件迴圈：
+- 多條持久連接，每條連接上管線化多個在途請求
+- 以信號量限制整體在途請求數
+- GH_MCP 在同一條連接上按順序處理並回應，因此每條連接以 FIFO 佇列配對回應，
+  不需要請求 ID；超時的請求留在佇列中，遲到的回應被丟棄，後續配對不受影響
+- 第一條連接先管線化送出兩個無副作用的 ping 探測伺服器是否保持連接；
+  舊版 GH_MCP 每處理一個命令就關閉連接，之後每條連接只送一個命令
+- 連接被關閉時，排在第一個未回應請求之後的請求尚未被伺服器讀取，自動改用新連接重送；
+  第一個未回應的請求可能已被執行，只有唯讀 / 不修改文檔的命令會重送
+
+統計與同步傳輸相同（TransportMetrics，含延遲百分位），每個命令同樣建立一個 span；
+錯誤型別也相同（TransportError 系列）。
+
+用法：
+    transport = AsyncTransport("localhost", 8080)
+    response = await transport.send_command("get_document_info")
+    responses = await asyncio.gather(*(transport.request(cmd) for cmd in commands))
+    await transport.close()
+"""
+
+import asyncio
+import json
+import socket
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from .snapshot_cache import NON_MUTATING_COMMANDS, READ_ONLY_COMMANDS
+from .tracing import get_tracer
+from .transport import (
+    TransportConnectError,
+    TransportError,
+    TransportMetrics,
+    TransportTimeout,
+)
+
+
+# 重送也不會改變文檔的命令：連接中斷時即使可能已被執行也可以重送
+IDEMPOTENT_COMMANDS = READ_ONLY_COMMANDS | NON_MUTATING_COMMANDS
+
+_PROBE = b'{"type": "ping", "parameters": {}}'
+
+
+class _ConnectionClosed(TransportError):
+    """請求尚未收到回應時連接被關閉"""
+
+    def __init__(self, message: str, unread: bool):
+        super().__init__(message)
+        # 對端正常關閉 (EOF) 時，第一個未回應請求之後的請求尚未被伺服器讀取，可以安全重送；
+        # 第一個未回應的請求可能已被執行後伺服器才關閉（崩潰或處理後立即關閉），狀態未知
+        self.unread = unread
+
+
+class _AsyncConnection:
+    """單一 stream 連接及其在途請求佇列"""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        on_change: Callable[[], None]
+    ):
+        self.reader = reader
+        self.writer = writer
+        # 每收到一個回應或連接關閉時呼叫，通知等待空位的請求
+        self.on_change = on_change
+        self.pending: Deque[asyncio.Future] = deque()
+        self.answered = 0
+        self.closed = False
+        self.bytes_received = 0
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    @property
+    def in_flight(self) -> int:
+        return len(self.pending)
+
+    def send(self, payload: bytes) -> asyncio.Future:
+        """寫出一個請求並返回等待其回應的 future（寫入與入列之間沒有 await，順序一致）"""
+        future = asyncio.get_running_loop().create_future()
+        self.writer.write(payload + b"\n")
+        self.pending.append(future)
+        return future
+
+    async def _read_loop(self):
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                line = await self.reader.readline()
+                if not line:
+                    break
+                self.bytes_received += len(line)
+                if not self.pending:
+                    # 收到不屬於任何請求的資料：協議不同步，不再使用此連接
+                    error = TransportError("Unexpected data from server")
+                    break
+                future = self.pending.popleft()
+                self.answered += 1
+                if not future.done():
+                    future.set_result(line)
+                self.on_change()
+        except asyncio.CancelledError:
+            error = TransportError("Connection closed")
+        except (OSError, ValueError) as e:
+            # ValueError: 單一回應超過 StreamReader 的 limit
+            error = e
+        finally:
+            self.closed = True
+            head = True
+            while self.pending:
+                future = self.pending.popleft()
+                if not future.done():
+                    reason = error or ("EOF, command may have been executed" if head else "EOF")
+                    future.set_exception(_ConnectionClosed(
+                        f"Connection closed before response: {reason}",
+                        unread=error is None and not head,
+                    ))
+                head = False
+            self.writer.close()
+            self.on_change()
+
+    async def close(self):
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+
+
+class AsyncTransport:
+    """
+    GH_MCP 非同步傳輸
+
+    request() 失敗時拋出 TransportError，由各客戶端轉換為自己的錯誤回應格式。
+    一個實例只能在一個事件迴圈中使用。
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8080,
+        timeout: Optional[float] = 30.0,
+        connect_timeout: float = 5.0,
+        pool_size: int = 4,
+        pipeline_depth: int = 8,
+        max_concurrency: Optional[int] = None,
+        retries: int = 1,
+        retry_backoff: float = 0.1,
+        max_message_size: int = 64 * 1024 * 1024
+    ):
+        """
+        初始化非同步傳輸
+
+        Args:
+            host: 服務器地址
+            port: 服務器端口
+            timeout: 等待回應的超時（秒）
+            connect_timeout: 建立連接的超時（秒）
+            pool_size: 最多同時開啟的連接數
+            pipeline_depth: 每條連接上同時在途的最大請求數
+            max_concurrency: 整體在途請求上限，None 表示 pool_size * pipeline_depth
+            retries: 無法建立連接時的重試次數
+            retry_backoff: 第一次重試前的等待秒數，之後每次加倍
+            max_message_size: 單一回應的最大位元組數
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.pool_size = max(1, pool_size)
+        self.pipeline_depth = max(1, pipeline_depth)
+        self.max_concurrency = max_concurrency or self.pool_size * self.pipeline_depth
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+        self.max_message_size = max_message_size
+        self.metrics = TransportMetrics()
+        self.capabilities: Dict[str, bool] = {}
+        self._connections: List[_AsyncConnection] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._opened = 0
+        self._resent = 0
+
+    # -------------------------------------------------------------------------
+    # 連接管理
+    # -------------------------------------------------------------------------
+
+    async def _open(self) -> _AsyncConnection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, limit=self.max_message_size),
+            self.connect_timeout,
+        )
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._opened += 1
+        return _AsyncConnection(reader, writer, self._notify)
+
+    def _notify(self):
+        if self._changed is not None:
+            self._changed.set()
+
+    def _pick(self) -> Optional[_AsyncConnection]:
+        """選出在途請求最少且未滿的連接"""
+        single_use = self.capabilities.get("keep_alive") is False
+        alive = []
+        for conn in self._connections:
+            if single_use and conn.answered and not conn.closed:
+                # 伺服器回應後就會關閉此連接，不再使用
+                asyncio.ensure_future(conn.close())
+            elif not conn.closed:
+                alive.append(conn)
+        self._connections = alive
+        available = [conn for conn in self._connections if conn.in_flight < self.pipeline_depth]
+        if not available:
+            return None
+        return min(available, key=lambda conn: conn.in_flight)
+
+    async def _probe_keep_alive(self, conn: _AsyncConnection) -> bool:
+        """
+        在新連接上管線化送出兩個 ping（未知命令，無副作用）
+
+        兩個都收到回應即為持久連接伺服器；第二個遇到 EOF 即為每條連接只處理
+        一個命令的舊版 GH_MCP，之後每條連接只送一個命令。結果記在 capabilities。
+
+        Raises:
+            asyncio.TimeoutError / OSError: 探測沒有完成（由呼叫端按連接失敗重試）
+        """
+        probes = [conn.send(_PROBE) for _ in range(2)]
+        try:
+            await conn.writer.drain()
+            results = await asyncio.wait_for(asyncio.gather(*probes, return_exceptions=True), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            await conn.close()
+            raise
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors and not isinstance(errors[0], _ConnectionClosed):
+            await conn.close()
+            raise OSError(f"Keep-alive probe failed: {errors[0]}")
+
+        keep_alive = not errors
+        self.capabilities["keep_alive"] = keep_alive
+        if not keep_alive:
+            self.capabilities["pipelining"] = False
+            self.pipeline_depth = 1
+            await conn.close()
+        return keep_alive
+
+    async def _acquire(self) -> _AsyncConnection:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+            self._changed = asyncio.Event()
+        while True:
+            conn = self._pick()
+            # 已有閒置連接，或連接數已達上限時直接使用
+            if conn is not None and (conn.in_flight == 0 or len(self._connections) >= self.pool_size):
+                return conn
+            if len(self._connections) < self.pool_size:
+                async with self._connect_lock:
+                    if len(self._connections) < self.pool_size:
+                        new_conn = await self._open()
+                        if "keep_alive" not in self.capabilities and not await self._probe_keep_alive(new_conn):
+                            # 探測用的連接已被伺服器關閉
+                            new_conn = await self._open()
+                        self._connections.append(new_conn)
+                        return new_conn
+                continue
+            # 所有連接的管線都已滿：等到有回應返回或連接關閉後重試
+            self._changed.clear()
+            await self._changed.wait()
+
+    # -------------------------------------------------------------------------
+    # 請求
+    # -------------------------------------------------------------------------
+
+    async def request(self, command: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        發送一個命令並等待回應
+
+        Args:
+            command: {"type": ..., "parameters": {...}} 命令字典
+            timeout: 本次請求的回應超時（秒），None 使用傳輸的預設值
+
+        Returns:
+            解析後的 JSON 回應
+
+        Raises:
+            TransportConnectError: 無法建立連接
+            TransportTimeout: 等待回應超時
+            TransportError: 連接中斷或回應不是合法 JSON
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        command_type = str(command.get("type", ""))
+        payload = json.dumps(command, ensure_ascii=False).encode("utf-8")
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        bytes_sent = 0
+        retries = 0
+        connect_attempts = 0
+        resent = False
+        raw = b""
+
+        with get_tracer().span(f"command {command_type}", server=f"{self.host}:{self.port}") as span:
+            async with self._semaphore:
+                try:
+                    while True:
+                        try:
+                            conn = await self._acquire()
+                        except (OSError, asyncio.TimeoutError) as e:
+                            connect_attempts += 1
+                            if connect_attempts <= self.retries:
+                                retries += 1
+                                await asyncio.sleep(self.retry_backoff * (2 ** (connect_attempts - 1)))
+                                continue
+                            raise TransportConnectError(
+                                f"Cannot connect to {self.host}:{self.port}: {e}"
+                            ) from e
+
+                        future = conn.send(payload)
+                        bytes_sent += len(payload) + 1
+                        try:
+                            await conn.writer.drain()
+                            raw = await asyncio.wait_for(future, timeout)
+                            break
+                        except asyncio.TimeoutError as e:
+                            raise TransportTimeout(
+                                f"Timed out waiting for response from {self.host}:{self.port}"
+                            ) from e
+                        except _ConnectionClosed as e:
+                            if not resent and (e.unread or command_type in IDEMPOTENT_COMMANDS):
+                                if e.unread and conn.answered:
+                                    # 伺服器回應後就關閉連接（舊版 GH_MCP）：每條連接只送一個命令
+                                    self.pipeline_depth = 1
+                                    self.capabilities["keep_alive"] = False
+                                    self.capabilities["pipelining"] = False
+                                resent = True
+                                retries += 1
+                                self._resent += 1
+                                continue
+                            raise TransportError(f"Connection to {self.host}:{self.port} lost: {e}") from e
+                        except OSError as e:
+                            future.cancel()
+                            await conn.close()
+                            raise TransportError(f"Error communicating with {self.host}:{self.port}: {e}") from e
+
+                    try:
+                        response = json.loads(raw.decode("utf-8-sig").strip())
+                    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+                        raise TransportError(f"Invalid JSON response from {self.host}:{self.port}: {e}") from e
+                except TransportError:
+                    self.metrics.record(
+                        command_type, time.perf_counter() - start, bytes_sent, len(raw),
+                        ok=False, retries=retries
+                    )
+                    span.set(bytes_sent=bytes_sent, bytes_received=len(raw), retries=retries, ok=False)
+                    raise
+
+            self.metrics.record(
+                command_type, time.perf_counter() - start, bytes_sent, len(raw),
+                ok=True, retries=retries
+            )
+            span.set(bytes_sent=bytes_sent, bytes_received=len(raw), retries=retries, ok=True)
+            return response
+
+    async def send_command(
+        self,
+        command_type: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """以 {"type", "parameters"} 格式發送命令（失敗時拋出 TransportError）"""
+        return await self.request({"type": command_type, "parameters": params or {}}, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回連接統計與命令統計"""
+        stats: Dict[str, Any] = {
+            "opened": self._opened,
+            "open": sum(1 for conn in self._connections if not conn.closed),
+            "in_flight": sum(conn.in_flight for conn in self._connections if not conn.closed),
+            "resent": self._resent,
+            "pool_size": self.pool_size,
+            "pipeline_depth": self.pipeline_depth,
+            "max_concurrency": self.max_concurrency,
+        }
+        stats.update(self.metrics.snapshot())
+        return stats
+
+    async def close(self):
+        """關閉所有連接"""
+        connections, self._connections = self._connections, []
+        for conn in connections:
+            await conn.close()
+
+    async def __aenter__(self) -> "AsyncTransport":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
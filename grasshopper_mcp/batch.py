@@ -0,0 +1,388 @@
+"""
+GH_MCP 批次命令
+
+把多個命令打包成一個 batch 信封，一次往返送出，逐項返回結果（順序與加入順序相同）。
+後面的命令可以用 {"$ref": "<名稱>"} 引用同一批次中較早 add_component 創建的組件。
+
+信封格式：
+    {"type": "batch", "parameters": {"commands": [
+        {"type": "add_component", "parameters": {"guid": "...", "x": 0, "y": 0}, "ref": "SLIDER_A"},
+        {"type": "connect_components", "parameters": {"sourceId": {"$ref": "SLIDER_A"}, "targetId": "..."}}
+    ]}}
+
+原生回應：
+    {"success": true, "data": {"results": [<每項回應>, ...], "refs": {"SLIDER_A": "<組件 ID>"}}}
+
+伺服器不支援 batch 時自動降級：
+- pipelined: 在同一條連接上管線化發送；遇到引用尚未返回的組件時先讀回前面的回應
+- sequential: 伺服器每條連接只處理一個命令（舊版 GH_MCP），逐一發送
+
+所有往返都經過傳輸共用的自適應並發控制器（flow_control）：batch 信封與每波管線化命令
+各佔一個名額，延遲按命令數平均後分別與 "batch" / "pipeline" 自己的基準比較。
+
+用法：
+    batch = CommandBatch()
+    batch.add("add_component", {"guid": guid, "x": 0, "y": 0}, ref="SLIDER_A")
+    batch.add("connect_components", {"sourceId": ref("SLIDER_A"), "targetId": target_id})
+    result = BatchExecutor(get_transport()).execute(batch)
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .flow_control import AdaptiveConcurrencyController, get_flow_controller
+from .transport import Transport, TransportError
+
+REF_KEY = "$ref"
+
+MODE_NATIVE = "native"
+MODE_PIPELINED = "pipelined"
+MODE_SEQUENTIAL = "sequential"
+
+
+def ref(name: str) -> Dict[str, str]:
+    """建立對同批次中 ref=name 的命令所創建組件的引用"""
+    return {REF_KEY: name}
+
+
+def is_ref(value: Any) -> bool:
+    """判斷參數值是否為批次內引用"""
+    return isinstance(value, dict) and len(value) == 1 and REF_KEY in value
+
+
+def collect_refs(value: Any) -> Set[str]:
+    """收集參數中出現的所有引用名稱"""
+    if is_ref(value):
+        return {value[REF_KEY]}
+    names: Set[str] = set()
+    if isinstance(value, dict):
+        for item in value.values():
+            names |= collect_refs(item)
+    elif isinstance(value, list):
+        for item in value:
+            names |= collect_refs(item)
+    return names
+
+
+def resolve_refs(value: Any, refs: Dict[str, str]) -> Any:
+    """把參數中的引用替換為實際組件 ID（缺少的引用拋出 KeyError）"""
+    if is_ref(value):
+        return refs[value[REF_KEY]]
+    if isinstance(value, dict):
+        return {key: resolve_refs(item, refs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_refs(item, refs) for item in value]
+    return value
+
+
+def extract_component_id(response: Dict[str, Any]) -> Optional[str]:
+    """從 add_component 回應中提取組件 ID（支援 data.id / result.id / 直接字串）"""
+    if not isinstance(response, dict) or not response.get("success"):
+        return None
+    for key in ("data", "result"):
+        payload = response.get(key)
+        if isinstance(payload, dict):
+            comp_id = payload.get("id") or payload.get("componentId")
+            if comp_id:
+                return str(comp_id)
+        elif isinstance(payload, str) and payload:
+            return payload
+    return None
+
+
+@dataclass
+class BatchItem:
+    """批次中的單一命令"""
+    command_type: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    ref: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        item: Dict[str, Any] = {"type": self.command_type, "parameters": self.params}
+        if self.ref:
+            item["ref"] = self.ref
+        return item
+
+
+@dataclass
+class BatchResult:
+    """批次執行結果"""
+    results: List[Dict[str, Any]]
+    refs: Dict[str, str]
+    mode: str
+    elapsed: float = 0.0
+    # 每項回應可用的時間點（相對於開始執行，秒）
+    completed_at: List[float] = field(default_factory=list)
+
+    @property
+    def success_count(self) -> int:
+        return sum(1 for result in self.results if result.get("success"))
+
+    @property
+    def fail_count(self) -> int:
+        return len(self.results) - self.success_count
+
+    @property
+    def success(self) -> bool:
+        return self.fail_count == 0
+
+
+class CommandBatch:
+    """批次命令建構器"""
+
+    def __init__(self):
+        self.items: List[BatchItem] = []
+        self._ref_names: Set[str] = set()
+
+    def add(self, command_type: str, params: Optional[Dict[str, Any]] = None, ref: Optional[str] = None) -> int:
+        """
+        加入一個命令
+
+        Args:
+            command_type: 命令類型
+            params: 命令參數，值可以是 ref(name) 引用
+            ref: 為此命令創建的組件命名，供後續命令引用
+
+        Returns:
+            此命令在批次中的索引
+        """
+        if ref:
+            if ref in self._ref_names:
+                raise ValueError(f"Duplicate batch reference '{ref}'")
+            self._ref_names.add(ref)
+        self.items.append(BatchItem(command_type, dict(params or {}), ref))
+        return len(self.items) - 1
+
+    def has_ref(self, name: str) -> bool:
+        return name in self._ref_names
+
+    def to_envelope(self) -> Dict[str, Any]:
+        """轉為 batch 信封命令"""
+        return {
+            "type": "batch",
+            "parameters": {"commands": [item.to_dict() for item in self.items]}
+        }
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class BatchExecutor:
+    """
+    批次執行器
+
+    第一次使用時探測伺服器能力（空 batch + 一個未知命令，均無副作用），
+    結果快取在 transport.capabilities 中。
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        timeout: Optional[float] = None,
+        window: int = 64,
+        flow_control: Optional[AdaptiveConcurrencyController] = None
+    ):
+        """
+        Args:
+            transport: 傳輸層實例
+            timeout: 每個回應的讀取超時（秒），None 使用傳輸預設值
+            window: 管線化時同時在途的最大命令數
+            flow_control: 自適應並發控制器，如果為 None 則使用該傳輸的共用控制器
+        """
+        self.transport = transport
+        self.timeout = timeout
+        self.window = window
+        self.flow_control = flow_control or get_flow_controller(transport)
+
+    # -------------------------------------------------------------------------
+    # 能力探測
+    # -------------------------------------------------------------------------
+
+    def detect_mode(self) -> str:
+        """探測並返回執行模式：native / pipelined / sequential"""
+        caps = self.transport.capabilities
+        if "batch" not in caps or "pipelining" not in caps:
+            probe = [
+                {"type": "batch", "parameters": {"commands": []}},
+                {"type": "ping", "parameters": {}},
+            ]
+            try:
+                responses = self.transport.pipeline(probe, timeout=self.timeout)
+            except TransportError:
+                return MODE_SEQUENTIAL
+            caps["batch"] = bool(responses) and bool(responses[0].get("success"))
+            caps["pipelining"] = len(responses) == len(probe)
+        if caps["batch"]:
+            return MODE_NATIVE
+        if caps["pipelining"]:
+            return MODE_PIPELINED
+        return MODE_SEQUENTIAL
+
+    # -------------------------------------------------------------------------
+    # 執行
+    # -------------------------------------------------------------------------
+
+    def execute(self, batch: CommandBatch, mode: Optional[str] = None) -> BatchResult:
+        """
+        執行批次
+
+        Args:
+            batch: 批次命令
+            mode: 強制指定執行模式，None 表示自動探測
+
+        Returns:
+            BatchResult，results 與 batch.items 一一對應
+        """
+        start = time.perf_counter()
+        mode = mode or self.detect_mode()
+
+        if mode == MODE_NATIVE:
+            native = self._execute_native(batch, start)
+            if native is not None:
+                return native
+            mode = MODE_PIPELINED if self.transport.capabilities.get("pipelining") else MODE_SEQUENTIAL
+
+        results, refs, completed_at = self._execute_waves(batch, start, pipelined=(mode == MODE_PIPELINED))
+        return BatchResult(
+            results=results,
+            refs=refs,
+            mode=mode,
+            elapsed=time.perf_counter() - start,
+            completed_at=completed_at,
+        )
+
+    def _execute_native(self, batch: CommandBatch, start: float) -> Optional[BatchResult]:
+        """以單一 batch 信封執行；伺服器不認得 batch 時返回 None"""
+        count = len(batch)
+        started = self.flow_control.acquire()
+        try:
+            response = self.transport.request(batch.to_envelope(), timeout=self.timeout)
+        except TransportError as e:
+            self.flow_control.release(started, False, "batch", count)
+            return self._failed(batch, str(e), MODE_NATIVE, start)
+        self.flow_control.release(started, True, "batch", count)
+
+        data = response.get("data") or response.get("result") or {}
+        results = data.get("results") if isinstance(data, dict) else None
+        if not response.get("success") or not isinstance(results, list) or len(results) != count:
+            error = str(response.get("error", "Invalid batch response"))
+            if "batch" in error.lower() or "no handler" in error.lower():
+                self.transport.capabilities["batch"] = False
+                return None
+            return self._failed(batch, error, MODE_NATIVE, start)
+
+        refs = dict(data.get("refs") or {})
+        for item, result in zip(batch.items, results):
+            if item.ref and item.ref not in refs:
+                comp_id = extract_component_id(result)
+                if comp_id:
+                    refs[item.ref] = comp_id
+        elapsed = time.perf_counter() - start
+        return BatchResult(results, refs, MODE_NATIVE, elapsed, [elapsed] * count)
+
+    def _execute_waves(
+        self,
+        batch: CommandBatch,
+        start: float,
+        pipelined: bool
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, str], List[float]]:
+        """
+        依引用關係分波發送
+
+        連續的命令累積成一波；當某個命令引用的組件仍在本波中等待回應時，
+        先送出本波並讀回 ID，再繼續。典型的 placement（先 add 再 connect）只需兩波。
+        """
+        count = len(batch)
+        results: List[Dict[str, Any]] = [{} for _ in range(count)]
+        completed_at = [0.0] * count
+        refs: Dict[str, str] = {}
+        pending: List[Tuple[int, Dict[str, Any]]] = []
+        pending_refs: Set[str] = set()
+
+        def flush():
+            if not pending:
+                return
+            commands = [command for _, command in pending]
+            responses = self._send_wave(commands, pipelined)
+            now = time.perf_counter() - start
+            for (index, _), response in zip(pending, responses):
+                results[index] = response
+                completed_at[index] = now
+                name = batch.items[index].ref
+                if name:
+                    comp_id = extract_component_id(response)
+                    if comp_id:
+                        refs[name] = comp_id
+            pending.clear()
+            pending_refs.clear()
+
+        for index, item in enumerate(batch.items):
+            needed = collect_refs(item.params)
+            if needed & pending_refs:
+                flush()
+            missing = sorted(name for name in needed if name not in refs)
+            if missing:
+                results[index] = {
+                    "success": False,
+                    "error": f"Unresolved batch reference(s): {', '.join(missing)}"
+                }
+                completed_at[index] = time.perf_counter() - start
+                continue
+            command = {"type": item.command_type, "parameters": resolve_refs(item.params, refs)}
+            pending.append((index, command))
+            if item.ref:
+                pending_refs.add(item.ref)
+        flush()
+
+        return results, refs, completed_at
+
+    def _send_wave(self, commands: List[Dict[str, Any]], pipelined: bool) -> List[Dict[str, Any]]:
+        """
+        發送一波命令；傳輸錯誤轉為逐項錯誤回應
+
+        管線化中途失敗時保留已讀回的回應（其中 add_component 的 ID 仍會被記錄），
+        已送出但未回應的命令標記 unknown（可能已在畫布上執行），其餘標記失敗。
+        """
+        responses: List[Dict[str, Any]] = []
+        if pipelined:
+            started = self.flow_control.acquire()
+            try:
+                responses = self.transport.pipeline(commands, timeout=self.timeout, window=self.window)
+            except TransportError as e:
+                self.flow_control.release(started, False, "pipeline", len(commands))
+                responses = list(e.responses or [])
+                unknown = len(responses) + e.in_flight
+                for index in range(len(responses), len(commands)):
+                    response = {"success": False, "error": str(e)}
+                    if index < unknown:
+                        response["unknown"] = True
+                    responses.append(response)
+                return responses
+            self.flow_control.release(started, True, "pipeline", len(commands))
+            if len(responses) < len(commands):
+                # 伺服器提前關閉連接：之後改為逐一發送
+                self.transport.capabilities["pipelining"] = False
+
+        for command in commands[len(responses):]:
+            started = self.flow_control.acquire()
+            try:
+                responses.append(self.transport.request(command, timeout=self.timeout))
+            except TransportError as e:
+                self.flow_control.release(started, False, command["type"])
+                responses.append({"success": False, "error": str(e)})
+            else:
+                self.flow_control.release(started, True, command["type"])
+        return responses
+
+    @staticmethod
+    def _failed(batch: CommandBatch, error: str, mode: str, start: float) -> BatchResult:
+        elapsed = time.perf_counter() - start
+        count = len(batch)
+        return BatchResult(
+            results=[{"success": False, "error": error} for _ in range(count)],
+            refs={},
+            mode=mode,
+            elapsed=elapsed,
+            completed_at=[elapsed] * count,
+        )
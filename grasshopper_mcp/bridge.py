@@ -1,24 +1,57 @@
-import socket
 import json
+import os
 import sys
 import traceback
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional
 
 # 使用 MCP 服務器
 from mcp.server.fastmcp import FastMCP
 
+from .batch import BatchExecutor, CommandBatch
+from .connection_index import ConnectionIndex
+from .snapshot_cache import DocumentSnapshotCache
+from .transport import get_transport
+
 # 設置 Grasshopper MCP 連接參數
-GRASSHOPPER_HOST = "localhost"
-GRASSHOPPER_PORT = 8080  # 默認端口，可以根據需要修改
+GRASSHOPPER_HOST = os.environ.get("GRASSHOPPER_HOST", "localhost")
+GRASSHOPPER_PORT = int(os.environ.get("GRASSHOPPER_PORT", "8080"))  # 默認端口，可以根據需要修改
+GRASSHOPPER_POOL_SIZE = int(os.environ.get("GRASSHOPPER_POOL_SIZE", "4"))  # 保留的持久連接數
+GRASSHOPPER_ENRICH_LIMIT = int(os.environ.get("GRASSHOPPER_ENRICH_LIMIT", "200"))  # auto 模式下完整增強的最大組件數
+GRASSHOPPER_SNAPSHOT_TTL = float(os.environ.get("GRASSHOPPER_SNAPSHOT_TTL", "2.0"))  # 文檔快照快取有效時間（秒），0 停用
+# 連接索引重新建立的間隔（秒），預設與快照快取相同：畫布上的手動修改最多在這段時間內看不到
+GRASSHOPPER_CONNECTION_INDEX_MAX_AGE = float(
+    os.environ.get("GRASSHOPPER_CONNECTION_INDEX_MAX_AGE", str(GRASSHOPPER_SNAPSHOT_TTL))
+)
 
 # 創建 MCP 服務器
 server = FastMCP("Grasshopper Bridge")
 
+# 共用傳輸層：持久連接池，重用 TCP 連接，避免每個命令都重新建立連接
+transport = get_transport(GRASSHOPPER_HOST, GRASSHOPPER_PORT, pool_size=GRASSHOPPER_POOL_SIZE)
+
+# 文檔快照快取：唯讀命令的回應短暫保存在記憶體中，修改文檔的命令使其失效
+snapshot_cache = DocumentSnapshotCache(ttl=GRASSHOPPER_SNAPSHOT_TTL)
+
+# 連接鄰接索引：建立後隨每個成功的連接 / 刪除命令增量更新，最多使用 GRASSHOPPER_CONNECTION_INDEX_MAX_AGE 秒
+connection_index = ConnectionIndex(max_age=GRASSHOPPER_CONNECTION_INDEX_MAX_AGE)
+
 def send_to_grasshopper(command_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """向 Grasshopper MCP 發送命令"""
+    """向 Grasshopper MCP 發送命令（唯讀命令經過文檔快照快取）"""
     if params is None:
         params = {}
     
+    response = snapshot_cache.fetch(command_type, params, lambda: _send_uncached(command_type, params))
+    connection_index.observe(command_type, params, response)
+    return response
+
+def _fetch_connections() -> Optional[List[Dict[str, Any]]]:
+    """獲取完整的連接列表，用於建立連接索引；失敗時返回 None"""
+    connections = send_to_grasshopper("get_connections")
+    if connections and "result" in connections:
+        return connections["result"]
+    return None
+
+def _send_uncached(command_type: str, params: Dict[str, Any]) -> Dict[str, Any]:
     # 創建命令
     command = {
         "type": command_type,
@@ -28,32 +61,9 @@ def send_to_grasshopper(command_type: str, params: Optional[Dict[str, Any]] = No
     try:
         print(f"Sending command to Grasshopper: {command_type} with params: {params}", file=sys.stderr)
         
-        # 連接到 Grasshopper MCP
-        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client.connect((GRASSHOPPER_HOST, GRASSHOPPER_PORT))
-        
-        # 發送命令
-        command_json = json.dumps(command)
-        client.sendall((command_json + "\n").encode("utf-8"))
-        print(f"Command sent: {command_json}", file=sys.stderr)
-        
-        # 接收響應
-        response_data = b""
-        while True:
-            chunk = client.recv(4096)
-            if not chunk:
-                break
-            response_data += chunk
-            if response_data.endswith(b"\n"):
-                break
-        
-        # 處理可能的 BOM
-        response_str = response_data.decode("utf-8-sig").strip()
-        print(f"Response received: {response_str}", file=sys.stderr)
-        
-        # 解析 JSON 響應
-        response = json.loads(response_str)
-        client.close()
+        # 透過共用傳輸層發送命令並接收響應
+        response = transport.request(command)
+        print(f"Response received: {json.dumps(response)[:500]}", file=sys.stderr)
         return response
     except Exception as e:
         print(f"Error communicating with Grasshopper: {str(e)}", file=sys.stderr)
@@ -63,6 +73,132 @@ def send_to_grasshopper(command_type: str, params: Optional[Dict[str, Any]] = No
             "error": f"Error communicating with Grasshopper: {str(e)}"
         }
 
+# 組件庫索引：按 name / fullName / aliases 建立一次，之後每次查詢都是 O(1)
+_component_library_index: Optional[Dict[str, Dict[str, Any]]] = None
+
+def _library_key(name: str) -> str:
+    """組件名稱正規化：忽略大小寫與多餘空白"""
+    return " ".join(str(name).split()).casefold()
+
+def get_component_library_index() -> Dict[str, Dict[str, Any]]:
+    """獲取組件庫索引（首次使用時從 get_component_library() 建立）"""
+    global _component_library_index
+    if _component_library_index is None:
+        index: Dict[str, Dict[str, Any]] = {}
+        for category in get_component_library().get("categories", []):
+            for entry in category.get("components", []):
+                for key in (entry.get("name"), entry.get("fullName"), *entry.get("aliases", [])):
+                    # 同名時保留第一個條目，與原先線性掃描的結果一致
+                    if key:
+                        index.setdefault(_library_key(key), entry)
+        _component_library_index = index
+    return _component_library_index
+
+def lookup_library_component(component_type: Optional[str]) -> Optional[Dict[str, Any]]:
+    """按組件類型（name、fullName 或別名，例如 GH 類名 GH_NumberSlider）查找組件庫條目"""
+    if not component_type:
+        return None
+    return get_component_library_index().get(_library_key(component_type))
+
+def merge_library_details(component: Dict[str, Any], component_type: Optional[str], include_examples: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    將組件庫中的參數信息合併到組件數據中
+    
+    Returns:
+        對應的組件庫條目，找不到時返回 None
+    """
+    entry = lookup_library_component(component_type)
+    if entry is None:
+        return None
+    fields = [("settings", "availableSettings"), ("inputs", "inputDetails"), ("outputs", "outputDetails")]
+    if include_examples:
+        fields += [("usage_examples", "usageExamples"), ("common_issues", "commonIssues")]
+    for source, target in fields:
+        if source in entry:
+            component[target] = entry[source]
+    return entry
+
+def group_connections(connections: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """按組件 ID 分組連接（每條連接同時歸入源組件與目標組件），單次遍歷"""
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for conn in connections:
+        source_id = conn.get("sourceId")
+        target_id = conn.get("targetId")
+        if source_id:
+            grouped.setdefault(source_id, []).append(conn)
+        if target_id and target_id != source_id:
+            grouped.setdefault(target_id, []).append(conn)
+    return grouped
+
+def fetch_slider_settings(component_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    以一個批次請求獲取多個 Number Slider 的當前設置
+    
+    伺服器不支援 batch 信封時由 BatchExecutor 降級為同一連接上的管線化發送。
+    
+    Returns:
+        組件 ID → {"min", "max", "value", "rounding"}；請求失敗的組件不在結果中
+    """
+    if not component_ids:
+        return {}
+    batch = CommandBatch()
+    for component_id in component_ids:
+        batch.add("get_component_info", {"componentId": component_id})
+    batch_result = BatchExecutor(transport).execute(batch)
+    
+    settings: Dict[str, Dict[str, Any]] = {}
+    for component_id, response in zip(component_ids, batch_result.results):
+        if not response.get("success", True):
+            continue
+        info_data = response.get("result") or response.get("data")
+        if not isinstance(info_data, dict):
+            continue
+        # GH_MCP 返回 minimum / maximum
+        settings[component_id] = {
+            "min": info_data.get("min", info_data.get("minimum", 0)),
+            "max": info_data.get("max", info_data.get("maximum", 10)),
+            "value": info_data.get("value", 5),
+            "rounding": info_data.get("rounding", 0.1)
+        }
+    return settings
+
+def enrich_components(
+    components: List[Dict[str, Any]],
+    connections_data: List[Dict[str, Any]],
+    fetch_sliders: bool = True
+) -> None:
+    """
+    單次遍歷增強組件列表：組件庫參數信息、相關連接、滑桿當前設置
+    
+    連接先按組件 ID 分組，滑桿設置以一個批次請求獲取，
+    總共 O(N + E) 且與組件數量無關的往返次數。
+    """
+    connections_by_id = group_connections(connections_data)
+    slider_ids = []
+    
+    for component in components:
+        if "id" in component and "type" in component:
+            component_id = component["id"]
+            
+            # 添加組件的詳細參數信息
+            library_entry = merge_library_details(component, component["type"])
+            
+            # 添加組件的連接信息
+            related_connections = connections_by_id.get(component_id)
+            if related_connections:
+                component["connections"] = related_connections
+            
+            # 特殊處理某些組件類型
+            if library_entry is not None and library_entry["name"] == "Number Slider":
+                slider_ids.append(component_id)
+    
+    if fetch_sliders and slider_ids:
+        slider_settings = fetch_slider_settings(slider_ids)
+        for component in components:
+            current_settings = slider_settings.get(component.get("id"))
+            if current_settings is not None:
+                component["currentSettings"] = current_settings
+
 # 註冊 MCP 工具
 @server.tool("add_component")
 def add_component(guid: str, x: float, y: float):
@@ -167,32 +303,23 @@ def connect_components(source_id: str, target_id: str, source_param: Optional[st
     Returns:
         Result of connecting the components
     """
-    # 獲取目標組件的信息，檢查是否已有連接
-    target_info = send_to_grasshopper("get_component_info", {"componentId": target_id})
+    # 獲取目標組件的類型（同一 ID 的類型不會改變，查過一次就記在連接索引中）
+    component_type = connection_index.component_type(target_id)
+    if component_type is None:
+        target_info = send_to_grasshopper("get_component_info", {"componentId": target_id})
+        if target_info and "result" in target_info and "type" in target_info["result"]:
+            component_type = target_info["result"]["type"]
+            connection_index.remember_type(target_id, component_type)
     
     # 檢查組件類型，如果是需要多個輸入的組件（如 Addition, Subtraction 等），智能分配輸入
-    if target_info and "result" in target_info and "type" in target_info["result"]:
-        component_type = target_info["result"]["type"]
-        
-        # 獲取現有連接
-        connections = send_to_grasshopper("get_connections")
-        existing_connections = []
-        
-        if connections and "result" in connections:
-            for conn in connections["result"]:
-                if conn.get("targetId") == target_id:
-                    existing_connections.append(conn)
-        
+    if component_type is not None:
         # 對於特定需要多個輸入的組件，自動選擇正確的輸入端口
         if component_type in ["Addition", "Subtraction", "Multiplication", "Division", "Math", "Amplitude"]:
             # 如果沒有指定目標參數，且已有連接到第一個輸入，則自動連接到第二個輸入
             if target_param is None and target_param_index is None:
-                # 檢查第一個輸入是否已被佔用
-                first_input_occupied = False
-                for conn in existing_connections:
-                    if conn.get("targetParam") == "A" or conn.get("targetParamIndex") == 0:
-                        first_input_occupied = True
-                        break
+                # 檢查第一個輸入是否已被佔用（連接索引 O(1) 查詢，只在首次使用時獲取全部連接）
+                connection_index.ensure(_fetch_connections)
+                first_input_occupied = connection_index.is_input_occupied(target_id, "A", 0)
                 
                 # 如果第一個輸入已被佔用，則連接到第二個輸入
                 if first_input_occupied:
@@ -268,7 +395,9 @@ def get_component_info(component_id: str):
         component_id: ID of the component to get information about
     
     Returns:
-        Detailed information about the component, including inputs, outputs, and current values
+        Detailed information about the component, including inputs, outputs, and current values.
+        Connections come from the bridge's connection index and may miss wires edited by hand
+        on the canvas within the last GRASSHOPPER_CONNECTION_INDEX_MAX_AGE seconds.
     """
     params = {
         "componentId": component_id
@@ -284,26 +413,11 @@ def get_component_info(component_id: str):
         if "type" in component_data:
             component_type = component_data["type"]
             
-            # 查詢組件庫，獲取該類型組件的詳細參數信息
-            component_library = get_component_library()
-            if "components" in component_library:
-                for lib_component in component_library["components"]:
-                    if lib_component.get("name") == component_type or lib_component.get("fullName") == component_type:
-                        # 將組件庫中的參數信息合併到返回結果中
-                        if "settings" in lib_component:
-                            component_data["availableSettings"] = lib_component["settings"]
-                        if "inputs" in lib_component:
-                            component_data["inputDetails"] = lib_component["inputs"]
-                        if "outputs" in lib_component:
-                            component_data["outputDetails"] = lib_component["outputs"]
-                        if "usage_examples" in lib_component:
-                            component_data["usageExamples"] = lib_component["usage_examples"]
-                        if "common_issues" in lib_component:
-                            component_data["commonIssues"] = lib_component["common_issues"]
-                        break
+            # 從組件庫索引中合併該類型組件的詳細參數信息
+            library_entry = merge_library_details(component_data, component_type, include_examples=True)
             
-            # 特殊處理某些組件類型
-            if component_type == "Number Slider":
+            # 特殊處理某些組件類型（GH 返回的 type 是類名，例如 GH_NumberSlider）
+            if library_entry is not None and library_entry["name"] == "Number Slider":
                 # 嘗試從組件數據中獲取當前滑桿的實際設置
                 if "currentSettings" not in component_data:
                     component_data["currentSettings"] = {
@@ -314,17 +428,11 @@ def get_component_info(component_id: str):
                         "type": component_data.get("type", "float")
                     }
             
-            # 添加組件的連接信息
-            connections = send_to_grasshopper("get_connections")
-            if connections and "result" in connections:
-                # 查找與該組件相關的所有連接
-                related_connections = []
-                for conn in connections["result"]:
-                    if conn.get("sourceId") == component_id or conn.get("targetId") == component_id:
-                        related_connections.append(conn)
-                
-                if related_connections:
-                    component_data["connections"] = related_connections
+            # 添加組件的連接信息（從連接索引查詢）
+            connection_index.ensure(_fetch_connections)
+            related_connections = connection_index.connections_of(component_id)
+            if related_connections:
+                component_data["connections"] = related_connections
     
     return result
 
@@ -340,10 +448,16 @@ def get_document_errors():
     return result
 
 @server.tool("get_all_components")
-def get_all_components():
+def get_all_components(detail: str = "auto", limit: Optional[int] = None):
     """
     Get a list of all components in the current document
     
+    Args:
+        detail: "full" adds library parameter details, connections and current slider settings;
+                "summary" returns ids, types and positions only (no extra requests);
+                "auto" (default) uses "full" unless the document has more than `limit` components
+        limit: Component count above which "auto" falls back to "summary" (default: GRASSHOPPER_ENRICH_LIMIT)
+    
     Returns:
         List of all components in the document with their IDs, types, and positions
     """
@@ -352,55 +466,27 @@ def get_all_components():
     # 增強返回結果，為每個組件添加更多參數信息
     if result and "result" in result:
         components = result["result"]
-        component_library = get_component_library()
+        detail = _resolve_detail(detail, len(components), limit)
         
-        # 獲取所有連接信息
-        connections = send_to_grasshopper("get_connections")
-        connections_data = connections.get("result", []) if connections else []
+        if detail == "full":
+            # 獲取所有連接信息（一次請求）
+            connections = send_to_grasshopper("get_connections")
+            connections_data = connections.get("result", []) if connections else []
+            enrich_components(components, connections_data)
         
-        # 為每個組件添加詳細信息
-        for component in components:
-            if "id" in component and "type" in component:
-                component_id = component["id"]
-                component_type = component["type"]
-                
-                # 添加組件的詳細參數信息
-                if "components" in component_library:
-                    for lib_component in component_library["components"]:
-                        if lib_component.get("name") == component_type or lib_component.get("fullName") == component_type:
-                            # 將組件庫中的參數信息合併到組件數據中
-                            if "settings" in lib_component:
-                                component["availableSettings"] = lib_component["settings"]
-                            if "inputs" in lib_component:
-                                component["inputDetails"] = lib_component["inputs"]
-                            if "outputs" in lib_component:
-                                component["outputDetails"] = lib_component["outputs"]
-                            break
-                
-                # 添加組件的連接信息
-                related_connections = []
-                for conn in connections_data:
-                    if conn.get("sourceId") == component_id or conn.get("targetId") == component_id:
-                        related_connections.append(conn)
-                
-                if related_connections:
-                    component["connections"] = related_connections
-                
-                # 特殊處理某些組件類型
-                if component_type == "Number Slider":
-                    # 嘗試獲取滑桿的當前設置
-                    component_info = send_to_grasshopper("get_component_info", {"componentId": component_id})
-                    if component_info and "result" in component_info:
-                        info_data = component_info["result"]
-                        component["currentSettings"] = {
-                            "min": info_data.get("min", 0),
-                            "max": info_data.get("max", 10),
-                            "value": info_data.get("value", 5),
-                            "rounding": info_data.get("rounding", 0.1)
-                        }
+        result["detail"] = detail
     
     return result
 
+def _resolve_detail(detail: str, component_count: int, limit: Optional[int] = None) -> str:
+    """將 auto 解析為 full 或 summary"""
+    if detail not in ("auto", "full", "summary"):
+        raise ValueError(f"Unknown detail level '{detail}', expected 'auto', 'full' or 'summary'")
+    if detail == "auto":
+        limit = GRASSHOPPER_ENRICH_LIMIT if limit is None else limit
+        return "full" if component_count <= limit else "summary"
+    return detail
+
 @server.tool("get_connections")
 def get_connections():
     """
@@ -655,13 +741,15 @@ def get_grasshopper_status():
         # 獲取文檔信息
         doc_info = send_to_grasshopper("get_document_info")
         
-        # 獲取所有組件（使用增強版的 get_all_components）
-        components_result = get_all_components()
+        # 獲取所有組件與所有連接（各一次請求）
+        components_result = send_to_grasshopper("get_all_components")
         components = components_result.get("result", []) if components_result else []
-        
-        # 獲取所有連接
         connections = send_to_grasshopper("get_connections")
         
+        # 單次遍歷增強；大型文檔跳過滑桿設置的批次請求，快速返回摘要
+        detail = _resolve_detail("auto", len(components))
+        enrich_components(components, connections.get("result", []), fetch_sliders=(detail == "full"))
+        
         # 添加常用組件的提示信息
         component_hints = {
             "Number Slider": {
@@ -747,7 +835,8 @@ def get_grasshopper_status():
                 "Use 'Panel' to display outputs and debug values",
                 "When connecting multiple sliders to Addition, first slider goes to input A, second to input B"
             ],
-            "canvas_summary": f"Current canvas has {len(component_summaries)} components and {len(connections.get('result', []))} connections"
+            "canvas_summary": f"Current canvas has {len(component_summaries)} components and {len(connections.get('result', []))} connections",
+            "detail": detail
         }
     except Exception as e:
         print(f"Error getting Grasshopper status: {str(e)}", file=sys.stderr)
@@ -759,6 +848,18 @@ def get_grasshopper_status():
             "connections": []
         }
 
+@server.resource("grasshopper://transport_stats")
+def get_transport_stats():
+    """Get transport statistics (sockets opened vs. reused, per-command counts and timings)"""
+    return transport.stats()
+
+@server.resource("grasshopper://cache_stats")
+def get_cache_stats():
+    """Get document snapshot cache and connection index statistics (hits, misses, hit rate, invalidations)"""
+    stats = snapshot_cache.stats()
+    stats["connection_index"] = connection_index.stats()
+    return stats
+
 @server.resource("grasshopper://component_guide")
 def get_component_guide():
     """Get guide for Grasshopper components and connections"""
@@ -1150,6 +1251,7 @@ def get_component_library():
                     {
                         "name": "Point",
                         "fullName": "Point Parameter",
+                        "aliases": ["Param_Point"],
                         "description": "Creates a point parameter",
                         "inputs": [
                             {"name": "X", "type": "Number", "description": "X coordinate"},
@@ -1163,6 +1265,7 @@ def get_component_library():
                     {
                         "name": "Number Slider",
                         "fullName": "Number Slider",
+                        "aliases": ["GH_NumberSlider"],
                         "description": "Creates a slider for numeric input with adjustable range and precision",
                         "inputs": [],
                         "outputs": [
@@ -1203,6 +1306,7 @@ def get_component_library():
                     {
                         "name": "Panel",
                         "fullName": "Panel",
+                        "aliases": ["GH_Panel"],
                         "description": "Displays text or numeric data",
                         "inputs": [
                             {"name": "Input", "type": "Any", "description": "Any input data"}
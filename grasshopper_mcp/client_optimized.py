@@ -17,13 +17,13 @@ GH_MCP 優化客戶端 - 整合所有最佳實踐
 2026-01-09 from DEV_LOG.md
 """
 
-import socket
-import json
-import time
 from typing import Optional, Dict, List, Tuple, Any
 from dataclasses import dataclass
 from pathlib import Path
 
+from .flow_control import get_flow_controller
+from .transport import TransportConnectError, TransportTimeout, get_transport
+
 # 嘗試導入 Gemini 分析器
 try:
     from gh_learning.src.gemini_analyzer import GeminiAnalyzer
@@ -72,10 +72,27 @@ class GH_MCP_ClientOptimized:
     START_X = 50
     START_Y = 50
 
-    def __init__(self, host: str = '127.0.0.1', port: int = 8080, debug: bool = True, use_gemini: bool = False):
+    def __init__(
+        self,
+        host: str = '127.0.0.1',
+        port: int = 8080,
+        debug: bool = True,
+        use_gemini: bool = False,
+        vision_port: int = 8081,
+        framing: str = 'newline'
+    ):
         self.host = host
         self.port = port
+        self.vision_port = vision_port
         self.debug = debug
+
+        # 共用傳輸層 (連接池 + 統計)
+        # GH_MCP 與 GH_MCP_Vision 都以換行分隔協議通訊；
+        # 'shutdown' (SHUT_WR 半關閉) 僅供舊版 GH_MCP 使用
+        self._transport = get_transport(host, port, framing=framing)
+        self._vision_transport = get_transport(host, vision_port, framing='newline')
+        # 自適應並發與發送間隔（GH_MCP 跟不上時自動退讓）
+        self._flow_control = get_flow_controller(self._transport)
         self.use_gemini = use_gemini and GEMINI_AVAILABLE
 
         # 組件追蹤
@@ -102,27 +119,12 @@ class GH_MCP_ClientOptimized:
         }
 
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(10)
-                s.connect((self.host, self.port))
-                s.sendall(json.dumps(command).encode('utf-8'))
-                s.shutdown(socket.SHUT_WR)
-
-                response = b''
-                while True:
-                    chunk = s.recv(4096)
-                    if not chunk:
-                        break
-                    response += chunk
-
-                # 處理 BOM
-                result = json.loads(response.decode('utf-8-sig'))
-                return result
-
-        except socket.timeout:
+            with self._flow_control.slot(cmd_type):
+                return self._transport.request(command, timeout=10)
+        except TransportTimeout:
             return {'success': False, 'error': 'Connection timeout'}
-        except ConnectionRefusedError:
-            return {'success': False, 'error': 'GH_MCP not running (port 8080)'}
+        except TransportConnectError:
+            return {'success': False, 'error': f'GH_MCP not running (port {self.port})'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
@@ -235,7 +237,6 @@ class GH_MCP_ClientOptimized:
         )
 
         # Step 2: 設置範圍 (先於 value!)
-        time.sleep(0.05)
         range_result = self.send_command(
             'set_slider_properties',
             id=comp_id,  # 注意: 是 'id' 不是 'component_id'
@@ -244,7 +245,6 @@ class GH_MCP_ClientOptimized:
         )
 
         # Step 3: 設置 value
-        time.sleep(0.05)
         value_result = self.send_command(
             'set_slider_properties',
             id=comp_id,
@@ -459,6 +459,7 @@ class GH_MCP_ClientOptimized:
             'total_components': len(self.components),
             'total_connections': self.connection_count,
             'component_types': comp_types,
+            'transport': self._transport.stats(),
         }
 
     def print_summary(self):
@@ -549,26 +550,12 @@ class GH_MCP_ClientOptimized:
         }
 
         try:
-            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                s.settimeout(30)  # Vision 操作可能較慢
-                s.connect((self.host, 8081))  # Vision 端口
-                s.sendall(json.dumps(command).encode('utf-8'))
-                s.shutdown(socket.SHUT_WR)
-
-                response = b''
-                while True:
-                    chunk = s.recv(4096)
-                    if not chunk:
-                        break
-                    response += chunk
-
-                result = json.loads(response.decode('utf-8-sig'))
-                return result
-
-        except socket.timeout:
+            # Vision 操作可能較慢
+            return self._vision_transport.request(command, timeout=30)
+        except TransportTimeout:
             return {'success': False, 'error': 'Vision timeout (may be exporting large library)'}
-        except ConnectionRefusedError:
-            return {'success': False, 'error': 'GH_MCP_Vision not running (port 8081)'}
+        except TransportConnectError:
+            return {'success': False, 'error': f'GH_MCP_Vision not running (port {self.vision_port})'}
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
@@ -0,0 +1,222 @@
+"""
+連接鄰接索引
+
+connect_components 在 Addition / Subtraction / Amplitude 等組件上自動分配輸入端口時，
+需要知道目標組件的第一個輸入是否已被佔用。ConnectionIndex 在記憶體中保存
+源 / 目標 → 連接的鄰接表與目標端口佔用集合：
+
+- 第一次使用時以一次 get_connections 建立（seed）；之後觀察到的完整
+  get_connections 回應也會重新建立索引
+- 根據每個成功命令的參數增量更新：connect_components 加入一條邊，
+  delete_component 移除組件及其所有邊
+- 不影響連接的命令（add_component、move_component、設置屬性……）保留索引；
+  其他可能修改文檔的命令（clear / load / create_pattern、未知命令）重置索引，
+  下次使用時重新建立
+- max_age 限制索引的最長使用時間，避免使用者在畫布上手動修改後長期失準
+
+組件 ID 的類型不會改變，索引同時記住查詢過的組件類型，省去重複的 get_component_info。
+
+用法：
+    index = ConnectionIndex()
+    index.ensure(lambda: fetch_connections())
+    if index.is_input_occupied(target_id, "A", 0): ...
+    index.observe(command_type, params, response)
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .snapshot_cache import DocumentSnapshotCache
+
+# 不改變連接的修改命令
+CONNECTION_NEUTRAL_COMMANDS = frozenset({
+    "add_component",
+    "move_component",
+    "set_component_value",
+    "set_slider_properties",
+    "set_component_visibility",
+    "group_components",
+})
+
+PortKey = Tuple[str, Any]
+
+
+def _port_keys(connection: Dict[str, Any]) -> List[PortKey]:
+    """連接佔用的目標端口（按名稱與按索引兩種表示）"""
+    keys: List[PortKey] = []
+    if connection.get("targetParam") is not None:
+        keys.append(("name", connection["targetParam"]))
+    if connection.get("targetParamIndex") is not None:
+        keys.append(("index", connection["targetParamIndex"]))
+    return keys
+
+
+class ConnectionIndex:
+    """增量維護的連接鄰接索引"""
+
+    def __init__(self, max_age: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_age: 索引建立後的最長使用時間（秒），None 表示不限
+            clock: 單調時鐘（測試時可替換）
+        """
+        self.max_age = max_age
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._seeded_at: Optional[float] = None
+        self._complete = False
+        self._incoming: Dict[str, List[Dict[str, Any]]] = {}
+        self._outgoing: Dict[str, List[Dict[str, Any]]] = {}
+        self._occupied: Dict[str, Set[PortKey]] = {}
+        self._types: Dict[str, str] = {}
+        self._seeds = 0
+        self._lookups = 0
+
+    # -------------------------------------------------------------------------
+    # 建立與重置
+    # -------------------------------------------------------------------------
+
+    @property
+    def seeded(self) -> bool:
+        if self._seeded_at is None:
+            return False
+        return self.max_age is None or self._clock() - self._seeded_at < self.max_age
+
+    def seed(self, connections: Optional[List[Dict[str, Any]]]):
+        """
+        以完整的連接列表建立索引
+
+        Args:
+            connections: get_connections 的結果；None 表示獲取失敗，
+                         索引以空表開始，只記錄之後觀察到的連接
+        """
+        with self._lock:
+            self._clear_edges()
+            for connection in connections or []:
+                self._add_edge(dict(connection))
+            self._complete = connections is not None
+            self._seeded_at = self._clock()
+            self._seeds += 1
+
+    def ensure(self, fetch: Callable[[], Optional[List[Dict[str, Any]]]]) -> bool:
+        """
+        索引尚未建立或已過期時呼叫 fetch 建立
+
+        Returns:
+            索引是否反映完整的文檔連接
+        """
+        if not self.seeded:
+            connections = fetch()
+            # fetch 經過 send_to_grasshopper 時，observe 可能已經用同一份結果建立了索引
+            if not self.seeded:
+                self.seed(connections)
+        return self._complete
+
+    def reset(self):
+        """丟棄索引（文檔已被整體修改）"""
+        with self._lock:
+            self._clear_edges()
+            self._types.clear()
+            self._seeded_at = None
+            self._complete = False
+
+    def _clear_edges(self):
+        self._incoming.clear()
+        self._outgoing.clear()
+        self._occupied.clear()
+
+    # -------------------------------------------------------------------------
+    # 增量更新
+    # -------------------------------------------------------------------------
+
+    def _add_edge(self, connection: Dict[str, Any]):
+        source_id = connection.get("sourceId")
+        target_id = connection.get("targetId")
+        if source_id:
+            self._outgoing.setdefault(source_id, []).append(connection)
+        if target_id:
+            self._incoming.setdefault(target_id, []).append(connection)
+            self._occupied.setdefault(target_id, set()).update(_port_keys(connection))
+
+    def add(self, connection: Dict[str, Any]):
+        """記錄一條新連接"""
+        with self._lock:
+            if self._seeded_at is not None:
+                self._add_edge(dict(connection))
+
+    def remove_component(self, component_id: str):
+        """移除組件及其所有連接"""
+        with self._lock:
+            self._types.pop(component_id, None)
+            for connection in self._outgoing.pop(component_id, []):
+                target_id = connection.get("targetId")
+                remaining = [c for c in self._incoming.get(target_id, []) if c is not connection]
+                self._incoming[target_id] = remaining
+                self._occupied[target_id] = {key for c in remaining for key in _port_keys(c)}
+            for connection in self._incoming.pop(component_id, []):
+                source_id = connection.get("sourceId")
+                self._outgoing[source_id] = [c for c in self._outgoing.get(source_id, []) if c is not connection]
+            self._occupied.pop(component_id, None)
+
+    def observe(self, command_type: str, params: Optional[Dict[str, Any]], response: Dict[str, Any]):
+        """根據已發送命令的參數與回應更新索引"""
+        params = params or {}
+        if command_type == "get_connections":
+            # 任何完整的連接列表都是最新的狀態
+            if response.get("success", True) and isinstance(response.get("result"), list):
+                self.seed(response["result"])
+        elif command_type == "connect_components":
+            if response.get("success"):
+                self.add({key: params[key] for key in
+                          ("sourceId", "targetId", "sourceParam", "targetParam", "sourceParamIndex", "targetParamIndex")
+                          if key in params})
+        elif command_type == "delete_component":
+            if response.get("success") and params.get("componentId"):
+                self.remove_component(params["componentId"])
+        elif command_type not in CONNECTION_NEUTRAL_COMMANDS and DocumentSnapshotCache.is_mutating(command_type):
+            self.reset()
+
+    # -------------------------------------------------------------------------
+    # 查詢
+    # -------------------------------------------------------------------------
+
+    def incoming(self, target_id: str) -> List[Dict[str, Any]]:
+        """連到組件輸入端的連接"""
+        with self._lock:
+            self._lookups += 1
+            return list(self._incoming.get(target_id, []))
+
+    def connections_of(self, component_id: str) -> List[Dict[str, Any]]:
+        """與組件相關的所有連接（輸出在前）"""
+        with self._lock:
+            self._lookups += 1
+            outgoing = self._outgoing.get(component_id, [])
+            return outgoing + [c for c in self._incoming.get(component_id, []) if c.get("sourceId") != component_id]
+
+    def is_input_occupied(self, target_id: str, param: Optional[str] = None, index: Optional[int] = None) -> bool:
+        """目標組件的指定輸入（按名稱或索引）是否已有連接"""
+        with self._lock:
+            self._lookups += 1
+            occupied = self._occupied.get(target_id)
+            if not occupied:
+                return False
+            return (param is not None and ("name", param) in occupied) or \
+                (index is not None and ("index", index) in occupied)
+
+    def component_type(self, component_id: str) -> Optional[str]:
+        return self._types.get(component_id)
+
+    def remember_type(self, component_id: str, component_type: str):
+        self._types[component_id] = component_type
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "seeded": self.seeded,
+                "complete": self._complete,
+                "seeds": self._seeds,
+                "lookups": self._lookups,
+                "connections": sum(len(edges) for edges in self._outgoing.values()),
+                "known_types": len(self._types),
+            }
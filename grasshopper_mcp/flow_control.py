@@ -0,0 +1,236 @@
+"""
+自適應並發與速率控制 (AIMD)
+
+GH_MCP 在 Rhino 的 UI 執行緒上逐一執行命令。送得太快時命令在 UI 佇列中排隊，
+延遲上升、甚至超時；送得太慢則浪費時間。過去各管理器以固定的 sleep
+（50 ms / 100 ms / 200 ms）保守地限速，AdaptiveConcurrencyController 改為根據
+實際觀察到的延遲與錯誤調整：
+
+- 並發窗口 limit：同時在途的命令數上限
+  - 每個正常回應加性增加 1/limit（約每一輪往返 +1）
+  - 過載時乘性減少（× backoff），同一輪往返內最多減少一次
+- 發送間隔 interval：相鄰兩個命令開始發送的最小間隔
+  - 過載時加倍（至少 interval_step，最多 max_interval）
+  - 每個正常回應減少 interval_step，直到 0
+- 過載信號：傳輸錯誤 / 超時，或延遲超過基準延遲 × latency_tolerance + latency_slack
+  - 基準延遲按命令類型分開追蹤（connect 約 1 ms，get_all_components / 截圖正常就慢得多），
+    追蹤該類型觀察到的最小延遲，並緩慢上移，以適應整體變慢的伺服器
+- 批次與管線化（BatchExecutor 傳入 flow_control 時）：整個 batch 信封或一波管線化命令
+  佔一個名額，延遲按命令數平均後與該模式自己的基準比較
+
+用法：
+    controller = get_flow_controller(transport)
+    with controller.slot("get_document_info"):
+        response = transport.request(command)
+    controller.stats()
+"""
+
+import math
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator
+
+# 基準延遲向較慢觀察值靠攏的速度
+_BASELINE_DRIFT = 0.01
+# 平滑延遲的 EWMA 係數
+_SMOOTHING = 0.2
+
+
+@dataclass
+class _LatencyStats:
+    """單一命令類型的基準延遲與平滑延遲（秒）"""
+    baseline: float
+    smoothed: float
+
+    def observe(self, latency: float):
+        if latency < self.baseline:
+            self.baseline = latency
+        else:
+            self.baseline += (latency - self.baseline) * _BASELINE_DRIFT
+        self.smoothed += (latency - self.smoothed) * _SMOOTHING
+
+
+class AdaptiveConcurrencyController:
+    """以 AIMD 調整並發窗口與發送間隔"""
+
+    def __init__(
+        self,
+        initial_limit: float = 4,
+        min_limit: float = 1,
+        max_limit: float = 32,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_slack: float = 0.005,
+        interval_step: float = 0.01,
+        max_interval: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            initial_limit: 初始並發窗口
+            min_limit: 最小並發窗口
+            max_limit: 最大並發窗口
+            backoff: 過載時窗口的乘數
+            latency_tolerance: 延遲超過基準延遲的倍數視為過載
+            latency_slack: 過載判斷的絕對寬容（秒），避免極短延遲的抖動被當成過載
+            interval_step: 發送間隔的加減步長（秒）
+            max_interval: 最大發送間隔（秒）
+            clock: 單調時鐘（測試時可替換）
+            sleep: 等待函數（測試時可替換）
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.latency_slack = latency_slack
+        self.interval_step = interval_step
+        self.max_interval = max_interval
+        self._clock = clock
+        self._sleep = sleep
+        self._cond = threading.Condition()
+
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.interval = 0.0
+        self._in_flight = 0
+        self._next_start = 0.0
+        self._latency: Dict[str, _LatencyStats] = {}
+        self._last_decrease = -math.inf
+
+        self._requests = 0
+        self._errors = 0
+        self._overloads = 0
+        self._decreases = 0
+        self._waited = 0.0
+
+    # -------------------------------------------------------------------------
+    # 取得 / 釋放發送名額
+    # -------------------------------------------------------------------------
+
+    def acquire(self) -> float:
+        """
+        等待一個發送名額（並發窗口內且滿足發送間隔）
+
+        Returns:
+            實際開始發送的時間點，交給 release() 計算延遲
+        """
+        with self._cond:
+            while self._in_flight >= max(1, int(self.limit)):
+                self._cond.wait()
+            self._in_flight += 1
+            now = self._clock()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        delay = start - now
+        if delay > 0:
+            self._sleep(delay)
+            with self._cond:
+                self._waited += delay
+        return self._clock()
+
+    def release(self, started: float, ok: bool = True, command_type: str = "", commands: int = 1):
+        """
+        歸還名額並根據延遲與結果調整窗口
+
+        Args:
+            started: acquire() 返回的時間點
+            ok: 是否正常收到回應（傳輸錯誤 / 超時為 False）
+            command_type: 命令類型，延遲與同類型的基準比較
+            commands: 名額內送出的命令數（批次 / 管線化），延遲按命令數平均
+        """
+        now = self._clock()
+        with self._cond:
+            self._in_flight -= 1
+            self._observe((now - started) / max(1, commands), ok, now, command_type)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, command_type: str = "", commands: int = 1) -> Iterator[None]:
+        """取得名額的上下文管理器；區塊內拋出異常視為過載"""
+        started = self.acquire()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.release(started, ok, command_type, commands)
+
+    # -------------------------------------------------------------------------
+    # AIMD
+    # -------------------------------------------------------------------------
+
+    def _observe(self, latency: float, ok: bool, now: float, command_type: str = ""):
+        self._requests += 1
+        stats = self._latency.get(command_type)
+        if ok:
+            if stats is None:
+                stats = self._latency[command_type] = _LatencyStats(latency, latency)
+            else:
+                stats.observe(latency)
+        else:
+            self._errors += 1
+
+        # 只與同類型命令的歷史比較：慢命令不會因為快命令的基準而被當成過載
+        overloaded = not ok or latency > stats.baseline * self.latency_tolerance + self.latency_slack
+        if overloaded:
+            self._overloads += 1
+            # 同一輪往返內的多個過載信號只算一次
+            if now - self._last_decrease >= (stats.smoothed if stats else 0.0):
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self.interval = min(self.max_interval, max(self.interval_step, self.interval * 2))
+                self._last_decrease = now
+                self._decreases += 1
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.interval = max(0.0, self.interval - self.interval_step)
+
+    # -------------------------------------------------------------------------
+    # 統計
+    # -------------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "interval": round(self.interval, 4),
+                "in_flight": self._in_flight,
+                "latency": {
+                    command_type or "(untyped)": {
+                        "baseline": round(stats.baseline, 4),
+                        "smoothed": round(stats.smoothed, 4),
+                    }
+                    for command_type, stats in sorted(self._latency.items())
+                },
+                "requests": self._requests,
+                "errors": self._errors,
+                "overloads": self._overloads,
+                "decreases": self._decreases,
+                "waited": round(self._waited, 3),
+            }
+
+
+# =============================================================================
+# 共用控制器：同一個傳輸（同一個伺服器）上的所有客戶端共用一個控制器
+# =============================================================================
+
+_controllers: "weakref.WeakKeyDictionary[Any, AdaptiveConcurrencyController]" = weakref.WeakKeyDictionary()
+_controllers_lock = threading.Lock()
+
+
+def get_flow_controller(transport: Any, **kwargs) -> AdaptiveConcurrencyController:
+    """
+    返回傳輸實例對應的共用控制器（首次呼叫時以 kwargs 建立）
+
+    Args:
+        transport: 傳輸實例
+        **kwargs: AdaptiveConcurrencyController 的參數
+    """
+    with _controllers_lock:
+        controller = _controllers.get(transport)
+        if controller is None:
+            controller = AdaptiveConcurrencyController(**kwargs)
+            _controllers[transport] = controller
+        return controller
@@ -9,6 +9,8 @@ Connects LangGraph workflows with existing Grasshopper tools:
 - Parser utilities
 """
 
+import asyncio
+import json
 import os
 import sys
 from pathlib import Path
@@ -224,10 +226,7 @@ class GrasshopperLangGraphIntegration:
             return {"success": False, "error": "No placement_info provided"}
 
         # Save placement_info to file
-        placement_path = self.work_dir / "placement_info.json"
-        import json
-        with open(placement_path, "w") as f:
-            json.dump(placement_info, f, indent=2)
+        placement_path = self._save_placement_info(placement_info)
 
         # Execute
         try:
@@ -236,6 +235,40 @@ class GrasshopperLangGraphIntegration:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
+    async def execute_placement_async(self, placement_info: Optional[dict] = None) -> dict:
+        """
+        Execute placement without blocking the event loop (for async orchestrators)
+
+        Args:
+            placement_info: Placement data (or use from current state)
+
+        Returns:
+            Execution result
+        """
+        if not self._tools_available:
+            return {"success": False, "error": "Grasshopper tools not available"}
+
+        if placement_info is None and self.runner:
+            placement_info = self.runner.state.get("placement_info")
+
+        if not placement_info:
+            return {"success": False, "error": "No placement_info provided"}
+
+        # File I/O runs in a worker thread so the event loop keeps serving other tasks
+        placement_path = await asyncio.to_thread(self._save_placement_info, placement_info)
+
+        try:
+            return await self.executor.execute_placement_info_async(str(placement_path))
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    def _save_placement_info(self, placement_info: dict) -> Path:
+        """Write placement_info to <work_dir>/placement_info.json"""
+        placement_path = self.work_dir / "placement_info.json"
+        with open(placement_path, "w") as f:
+            json.dump(placement_info, f, indent=2)
+        return placement_path
+
     def parse_component_info(self, mmd_path: Optional[str] = None) -> tuple:
         """
         Parse component_info.mmd file
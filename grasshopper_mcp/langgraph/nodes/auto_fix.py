@@ -9,12 +9,11 @@ Implements the self-correction loop:
 5. Record results for learning
 """
 
-import json
-import socket
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 from datetime import datetime
 from ..state import DesignState
+from ...transport import get_transport
 
 
 @dataclass
@@ -42,30 +41,20 @@ class AutoFixAgent:
     def __init__(self, mcp_host: str = "127.0.0.1", mcp_port: int = 8080):
         self.mcp_host = mcp_host
         self.mcp_port = mcp_port
+        self.transport = get_transport(mcp_host, mcp_port)
         self.fix_history: List[FixAttempt] = []
         self.max_fix_attempts = 5
 
     def _send_mcp_command(self, command_type: str, parameters: Optional[Dict] = None) -> Dict:
         """Send command to GH_MCP server"""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(30.0)
+        command: Dict[str, Any] = {"type": command_type}
+        if parameters:
+            command["parameters"] = parameters
 
         try:
-            sock.connect((self.mcp_host, self.mcp_port))
-
-            command = {"type": command_type}
-            if parameters:
-                command["parameters"] = parameters
-
-            message = json.dumps(command) + "\n"
-            sock.sendall(message.encode())
-
-            response = sock.recv(65536).decode('utf-8-sig').strip()
-            return json.loads(response)
+            return self.transport.request(command, timeout=30.0)
         except Exception as e:
             return {"success": False, "error": str(e)}
-        finally:
-            sock.close()
 
     def get_document_errors(self) -> List[Dict]:
         """Get all errors from current Grasshopper document"""
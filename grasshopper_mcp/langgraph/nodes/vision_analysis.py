@@ -8,11 +8,14 @@ to detect errors, verify connections, and understand component state.
 import base64
 import os
 import json
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Union
 from dataclasses import dataclass
 from enum import Enum
 from ..state import DesignState
 
+# A PNG as raw bytes (bytes / bytearray / memoryview from VisionCapture) or a base64 string
+ImageInput = Union[str, bytes, bytearray, memoryview]
+
 
 class VisionModel(str, Enum):
     """Available vision models"""
@@ -69,8 +72,9 @@ class VisionAnalyzer:
             except ImportError:
                 raise ImportError("google-generativeai package required: pip install google-generativeai")
 
-    def _analyze_with_claude(self, image_base64: str, prompt: str) -> str:
-        """Analyze image using Claude Vision"""
+    def _analyze_with_claude(self, image: ImageInput, prompt: str) -> str:
+        """Analyze image using Claude Vision (the API takes base64, encoded once here)"""
+        image_base64 = image if isinstance(image, str) else base64.b64encode(image).decode("ascii")
         response = self.client.messages.create(
             model="claude-sonnet-4-20250514",
             max_tokens=2000,
@@ -96,26 +100,22 @@ class VisionAnalyzer:
         )
         return response.content[0].text
 
-    def _analyze_with_gemini(self, image_base64: str, prompt: str) -> str:
-        """Analyze image using Gemini Vision"""
-        import PIL.Image
-        import io
-
-        # Convert base64 to PIL Image
-        image_bytes = base64.b64decode(image_base64)
-        image = PIL.Image.open(io.BytesIO(image_bytes))
+    def _analyze_with_gemini(self, image: ImageInput, prompt: str) -> str:
+        """Analyze image using Gemini Vision (PNG bytes are sent as an inline blob)"""
+        image_bytes = base64.b64decode(image) if isinstance(image, str) else bytes(image)
+        blob = {"mime_type": "image/png", "data": image_bytes}
 
-        response = self.client.generate_content([prompt, image])
+        response = self.client.generate_content([prompt, blob])
         return response.text
 
-    def analyze(self, image_base64: str, prompt: str) -> str:
-        """Analyze image with configured model"""
+    def analyze(self, image: ImageInput, prompt: str) -> str:
+        """Analyze image with configured model (raw PNG bytes or base64 string)"""
         if self.model == VisionModel.CLAUDE:
-            return self._analyze_with_claude(image_base64, prompt)
+            return self._analyze_with_claude(image, prompt)
         else:
-            return self._analyze_with_gemini(image_base64, prompt)
+            return self._analyze_with_gemini(image, prompt)
 
-    def detect_errors(self, canvas_image: str) -> ErrorDetection:
+    def detect_errors(self, canvas_image: ImageInput) -> ErrorDetection:
         """
         Detect errors in Grasshopper canvas
 
@@ -177,7 +177,7 @@ Respond in JSON format:
                 raw_analysis=str(e)
             )
 
-    def understand_canvas(self, canvas_image: str) -> CanvasUnderstanding:
+    def understand_canvas(self, canvas_image: ImageInput) -> CanvasUnderstanding:
         """
         Understand the overall canvas structure
 
@@ -230,12 +230,12 @@ Respond in JSON format:
                 suggestions=[f"Analysis failed: {str(e)}"]
             )
 
-    def verify_geometry(self, viewport_image: str, expected: str) -> Dict[str, Any]:
+    def verify_geometry(self, viewport_image: ImageInput, expected: str) -> Dict[str, Any]:
         """
         Verify 3D geometry matches expectations
 
         Args:
-            viewport_image: Base64 Rhino viewport screenshot
+            viewport_image: Rhino viewport screenshot (PNG bytes or base64)
             expected: Description of what geometry should look like
 
         Returns:
@@ -294,6 +294,10 @@ def vision_analysis_node(state: DesignState) -> Dict[str, Any]:
         }
 
     canvas_image = current_snapshot.get("canvas_image")
+    canvas_path = current_snapshot.get("canvas_image_path")
+    if canvas_path and os.path.exists(canvas_path):
+        with open(canvas_path, "rb") as f:
+            canvas_image = f.read()
     if not canvas_image:
         return {
             "error_detection": None,
@@ -350,11 +354,11 @@ def test_analysis():
     image_path = sys.argv[1]
 
     with open(image_path, 'rb') as f:
-        image_base64 = base64.b64encode(f.read()).decode()
+        image_bytes = f.read()
 
     print("Testing error detection...")
     analyzer = VisionAnalyzer(model=VisionModel.GEMINI)
-    result = analyzer.detect_errors(image_base64)
+    result = analyzer.detect_errors(image_bytes)
 
     print(f"Has errors: {result.has_errors}")
     print(f"Red components: {result.red_components}")
@@ -1,28 +1,54 @@
 """
 Vision Capture Node for Grasshopper LangGraph Workflow
 
-Provides canvas and viewport capture capabilities via GH_MCP.
-Returns base64 images for vision model analysis.
+Provides canvas and viewport capture capabilities via GH_MCP_Vision.
+Images arrive as raw PNG bytes and are never base64-decoded on the client:
+
+- "binary" (default): JSON header line followed by a raw PNG frame
+- "file": the server writes a temp PNG and returns its path (local server only)
+- "base64": PNG embedded in the JSON, decoded incrementally off the socket
+
+Servers that ignore the transfer parameter answer with base64, which is
+handled by the same code path. base64 is only produced on demand.
 """
 
 import base64
-import json
-import socket
-from typing import Optional, Dict, Any
+import os
+import shutil
+import tempfile
+from typing import Optional, Dict, Any, Union
 from dataclasses import dataclass
 from ..state import DesignState
+from ...streaming import Base64FieldDecoder
+from ...transport import get_transport
+
+ImageData = Union[str, bytes, bytearray, memoryview]
+
+# Snapshot PNG pairs kept on disk per run; older pairs are deleted on the next capture
+SNAPSHOT_KEEP = max(1, int(os.environ.get("GH_VISION_SNAPSHOT_KEEP", "2")))
 
 
 @dataclass
 class CaptureResult:
     """Result from a capture operation"""
     success: bool
-    image_base64: Optional[str] = None
+    image_bytes: Optional[memoryview] = None
+    image_path: Optional[str] = None
     width: int = 0
     height: int = 0
     bounds: Optional[Dict[str, float]] = None
     error: Optional[str] = None
 
+    @property
+    def image_base64(self) -> Optional[str]:
+        """Base64-encoded PNG, computed on demand (for JSON state and vision APIs)"""
+        if self.image_bytes is not None:
+            return base64.b64encode(self.image_bytes).decode("ascii")
+        if self.image_path:
+            with open(self.image_path, "rb") as f:
+                return base64.b64encode(f.read()).decode("ascii")
+        return None
+
 
 class VisionCapture:
     """
@@ -33,115 +59,170 @@ class VisionCapture:
     - Rhino viewport (3D geometry preview)
     """
 
-    def __init__(self, host: str = "127.0.0.1", port: int = 8080, timeout: float = 30.0):
+    TRANSFER_MODES = ("binary", "file", "base64")
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8081,
+        timeout: float = 30.0,
+        transfer: str = "binary"
+    ):
+        if transfer not in self.TRANSFER_MODES:
+            raise ValueError(f"Unknown transfer mode '{transfer}', expected one of {self.TRANSFER_MODES}")
         self.host = host
         self.port = port
         self.timeout = timeout
+        self.transfer = transfer
+        self.transport = get_transport(host, port)
 
     def _send_command(self, command_type: str, parameters: Optional[Dict] = None) -> Dict:
-        """Send command to GH_MCP server"""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(self.timeout)
+        """
+        Send command to GH_MCP server
+
+        Raises:
+            TransportError: on connection failure, timeout or malformed response
+        """
+        command: Dict[str, Any] = {"type": command_type}
+        if parameters:
+            command["parameters"] = parameters
+
+        return self.transport.request(command, timeout=self.timeout)
+
+    def _capture(
+        self,
+        command_type: str,
+        parameters: Optional[Dict] = None,
+        save_to: Optional[str] = None
+    ) -> CaptureResult:
+        """
+        Run a capture command and receive the PNG in the configured transfer mode
+
+        The PNG ends up either as a memoryview (image_bytes) or, when save_to is
+        given, written straight to that file while it is received.
+
+        Raises:
+            TransportError: on connection failure or timeout
+            ValueError: on a truncated or malformed response
+        """
+        parameters = dict(parameters or {})
+        if self.transfer != "base64":
+            parameters["transfer"] = self.transfer
+        command: Dict[str, Any] = {"type": command_type, "parameters": parameters}
+
+        # file 模式下 PNG 已在磁碟上，只有伺服器不支援而退回 base64 時才需要寫入
+        sink = open(save_to, "wb") if save_to and self.transfer != "file" else None
+        decoder = Base64FieldDecoder("image", sink=sink)
+        response: Dict[str, Any] = {}
+
+        def attachment_size() -> int:
+            response.update(decoder.finish())
+            attachment = (response.get("data") or {}).get("attachment") or {}
+            return int(attachment.get("length") or 0)
 
         try:
-            sock.connect((self.host, self.port))
-
-            command = {"type": command_type}
-            if parameters:
-                command["parameters"] = parameters
-
-            message = json.dumps(command) + "\n"
-            sock.sendall(message.encode())
-
-            # Receive response (may be large for images)
-            chunks = []
-            while True:
-                try:
-                    chunk = sock.recv(65536)
-                    if not chunk:
-                        break
-                    chunks.append(chunk)
-                    # Check if we have complete JSON
-                    try:
-                        data = b''.join(chunks).decode('utf-8-sig')
-                        json.loads(data.strip())
-                        break  # Valid JSON, we're done
-                    except json.JSONDecodeError:
-                        continue  # Need more data
-                except socket.timeout:
-                    break
-
-            response_text = b''.join(chunks).decode('utf-8-sig').strip()
-            return json.loads(response_text)
-
-        finally:
-            sock.close()
-
-    def capture_canvas(self, bounds: Optional[Dict[str, float]] = None) -> CaptureResult:
+            attachment = self.transport.request_attachment(
+                command, decoder.feed, attachment_size, timeout=self.timeout, sink=sink
+            )
+        except Exception:
+            if sink:
+                sink.close()
+                os.remove(save_to)
+            raise
+        if sink:
+            sink.close()
+
+        data = response.get("data") or {}
+        image_bytes: Optional[memoryview] = None
+        if attachment is not None:
+            image_bytes = memoryview(attachment)
+        elif decoder.data is not None:
+            image_bytes = decoder.data
+        received = (
+            image_bytes is not None
+            or decoder.found
+            or bool((data.get("attachment") or {}).get("length"))
+        )
+
+        server_path = data.get("path")
+        if server_path and not received:
+            received = True
+            if save_to:
+                shutil.move(server_path, save_to)
+            else:
+                with open(server_path, "rb") as f:
+                    image_bytes = memoryview(f.read())
+                os.remove(server_path)
+        elif save_to and image_bytes is not None:
+            # file 模式但伺服器退回 base64
+            self.save_image(image_bytes, save_to)
+            image_bytes = None
+
+        if not response.get("success") or not received:
+            if save_to and os.path.exists(save_to):
+                os.remove(save_to)
+            return CaptureResult(
+                success=False,
+                error=response.get("error") or "No image in response"
+            )
+
+        return CaptureResult(
+            success=True,
+            image_bytes=image_bytes,
+            image_path=save_to,
+            width=data.get("width", 0),
+            height=data.get("height", 0),
+            bounds=data.get("bounds")
+        )
+
+    def capture_canvas(
+        self,
+        bounds: Optional[Dict[str, float]] = None,
+        save_to: Optional[str] = None
+    ) -> CaptureResult:
         """
         Capture Grasshopper canvas as PNG image
 
         Args:
             bounds: Optional dict with x, y, width, height to capture specific region
                    If None, captures entire document
+            save_to: Optional file path; the PNG is written there while it is
+                     received instead of being kept in memory
 
         Returns:
-            CaptureResult with base64 image data
+            CaptureResult with PNG bytes (or image_path when save_to is given)
         """
         params = {}
         if bounds:
             params["bounds"] = bounds
 
         try:
-            response = self._send_command("capture_canvas", params if params else None)
-
-            if response.get("success"):
-                data = response.get("data", {})
-                return CaptureResult(
-                    success=True,
-                    image_base64=data.get("image"),
-                    width=data.get("width", 0),
-                    height=data.get("height", 0),
-                    bounds=data.get("bounds")
-                )
-            else:
-                return CaptureResult(
-                    success=False,
-                    error=response.get("error", "Unknown error")
-                )
+            return self._capture("capture_canvas", params if params else None, save_to)
         except Exception as e:
             return CaptureResult(success=False, error=str(e))
 
-    def capture_rhino_view(self, width: int = 1920, height: int = 1080) -> CaptureResult:
+    def capture_rhino_view(
+        self,
+        width: int = 1920,
+        height: int = 1080,
+        save_to: Optional[str] = None
+    ) -> CaptureResult:
         """
         Capture Rhino 3D viewport as PNG image
 
         Args:
             width: Output image width
             height: Output image height
+            save_to: Optional file path to stream the PNG into
 
         Returns:
-            CaptureResult with base64 image data
+            CaptureResult with PNG bytes (or image_path when save_to is given)
         """
         try:
-            response = self._send_command("capture_rhino_view", {
+            return self._capture("capture_rhino_view", {
                 "width": width,
                 "height": height
-            })
-
-            if response.get("success"):
-                data = response.get("data", {})
-                return CaptureResult(
-                    success=True,
-                    image_base64=data.get("image"),
-                    width=data.get("width", 0),
-                    height=data.get("height", 0)
-                )
-            else:
-                return CaptureResult(
-                    success=False,
-                    error=response.get("error", "Unknown error")
-                )
+            }, save_to)
         except Exception as e:
             return CaptureResult(success=False, error=str(e))
 
@@ -162,37 +243,61 @@ class VisionCapture:
         except Exception as e:
             return {"success": False, "error": str(e)}
 
-    def save_image(self, base64_data: str, filepath: str) -> bool:
-        """Save base64 image to file"""
+    def save_image(self, image_data: ImageData, filepath: str) -> bool:
+        """Save an image to file (raw bytes / memoryview, or a base64 string)"""
         try:
-            image_bytes = base64.b64decode(base64_data)
+            if isinstance(image_data, str):
+                image_data = base64.b64decode(image_data)
             with open(filepath, 'wb') as f:
-                f.write(image_bytes)
+                f.write(image_data)
             return True
         except Exception:
             return False
 
 
+def _release_snapshot(snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """Delete a snapshot's PNG files; the returned entry no longer carries their paths"""
+    released = dict(snapshot)
+    for key in ("canvas_image_path", "viewport_image_path"):
+        path = released.get(key)
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            released[key] = None
+    return released
+
+
 def vision_capture_node(state: DesignState) -> Dict[str, Any]:
     """
     LangGraph node: Capture canvas and viewport images
 
-    Adds vision snapshots to state for subsequent analysis.
+    Adds vision snapshots to state for subsequent analysis. Only the last
+    SNAPSHOT_KEEP snapshots (GH_VISION_SNAPSHOT_KEEP) keep their PNG files;
+    older ones are deleted from GH_VISION_SNAPSHOT_DIR.
     """
     from datetime import datetime
 
     capture = VisionCapture()
-    snapshots = state.get("vision_snapshots", [])
-
-    # Capture canvas
-    canvas_result = capture.capture_canvas()
-    viewport_result = capture.capture_rhino_view(width=1280, height=720)
+    snapshots = list(state.get("vision_snapshots", []))
+
+    # Stream both captures straight to disk; the state only carries file paths
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    snapshot_dir = os.environ.get(
+        "GH_VISION_SNAPSHOT_DIR", os.path.join(tempfile.gettempdir(), "gh_mcp_vision")
+    )
+    os.makedirs(snapshot_dir, exist_ok=True)
+    canvas_result = capture.capture_canvas(save_to=os.path.join(snapshot_dir, f"canvas_{stamp}.png"))
+    viewport_result = capture.capture_rhino_view(
+        width=1280, height=720, save_to=os.path.join(snapshot_dir, f"viewport_{stamp}.png")
+    )
 
     snapshot = {
         "timestamp": datetime.now().isoformat(),
-        "canvas_image": canvas_result.image_base64 if canvas_result.success else None,
+        "canvas_image_path": canvas_result.image_path if canvas_result.success else None,
         "canvas_bounds": canvas_result.bounds,
-        "viewport_image": viewport_result.image_base64 if viewport_result.success else None,
+        "viewport_image_path": viewport_result.image_path if viewport_result.success else None,
         "canvas_success": canvas_result.success,
         "viewport_success": viewport_result.success,
         "errors": []
@@ -204,6 +309,7 @@ def vision_capture_node(state: DesignState) -> Dict[str, Any]:
         snapshot["errors"].append(f"Viewport capture failed: {viewport_result.error}")
 
     snapshots.append(snapshot)
+    snapshots = [_release_snapshot(old) for old in snapshots[:-SNAPSHOT_KEEP]] + snapshots[-SNAPSHOT_KEEP:]
 
     return {
         "vision_snapshots": snapshots,
@@ -221,7 +327,7 @@ def test_capture():
     print(f"  Success: {result.success}")
     if result.success:
         print(f"  Size: {result.width}x{result.height}")
-        print(f"  Image data length: {len(result.image_base64) if result.image_base64 else 0}")
+        print(f"  Image bytes: {result.image_bytes.nbytes if result.image_bytes is not None else 0}")
     else:
         print(f"  Error: {result.error}")
 
@@ -8,12 +8,11 @@ GH MCP Layout Executor
 - 支持群組和視圖調整
 """
 
-import socket
-import json
 import time
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, field
 from .canvas_layout import CanvasLayoutCalculator, LayoutConfig
+from ..transport import get_transport
 
 
 @dataclass
@@ -94,6 +93,7 @@ class MCPLayoutExecutor:
     def __init__(self, host: str = '127.0.0.1', port: int = 8080):
         self.host = host
         self.port = port
+        self.transport = get_transport(host, port)
         self.layout_calc = CanvasLayoutCalculator(LayoutConfig(
             horizontal_spacing=200,  # 增加水平間距
             vertical_spacing=80,     # 增加垂直間距
@@ -170,30 +170,12 @@ class MCPLayoutExecutor:
 
     def _send_command(self, cmd_type: str, params: Optional[Dict] = None) -> Dict:
         """發送 MCP 命令"""
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(15.0)
-            sock.connect((self.host, self.port))
-
-            command = {'type': cmd_type}
-            if params:
-                command['parameters'] = params
-
-            message = json.dumps(command) + '\n'
-            sock.sendall(message.encode('utf-8'))
-
-            response = b''
-            while True:
-                chunk = sock.recv(4096)
-                if not chunk:
-                    break
-                response += chunk
-                if b'\n' in response:
-                    break
-
-            sock.close()
-            return json.loads(response.decode('utf-8-sig').strip())
+        command: Dict[str, Any] = {'type': cmd_type}
+        if params:
+            command['parameters'] = params
 
+        try:
+            return self.transport.request(command, timeout=15.0)
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
@@ -0,0 +1,182 @@
+"""
+文檔快照快取
+
+LLM 的一個回合內常連續讀取同一份文檔狀態（grasshopper://status、
+get_all_components、get_connections、get_component_info、connect_components
+的前置檢查……）。DocumentSnapshotCache 以短 TTL 快取唯讀命令的成功回應，
+讀取突發直接命中記憶體；任何可能修改文檔的命令都會使整個快取失效。
+
+- 快取鍵為 (命令類型, 參數)，只快取 READ_ONLY_COMMANDS 中的命令
+- NON_MUTATING_COMMANDS 既不快取也不失效；其他命令（含未知命令）一律視為修改
+- 失效時遞增世代號：發送前後各失效一次，與修改命令並發的讀取結果不會寫回快取
+- 回應以 JSON 字串保存，每次命中都返回新的字典，呼叫端可以就地修改
+
+用法：
+    cache = DocumentSnapshotCache(ttl=2.0)
+    response = cache.fetch("get_connections", {}, lambda: transport.request(command))
+    cache.stats()   # {"hits": ..., "misses": ..., "hit_rate": ...}
+"""
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# 可快取的唯讀命令
+READ_ONLY_COMMANDS = frozenset({
+    "get_document_info",
+    "get_all_components",
+    "get_connections",
+    "get_component_info",
+    "get_document_errors",
+})
+
+# 不讀取文檔狀態、也不修改文檔的命令
+NON_MUTATING_COMMANDS = frozenset({
+    "ping",
+    "save_document",
+    "search_components",
+    "get_component_parameters",
+    "get_component_candidates",
+    "get_available_patterns",
+    "validate_connection",
+    "zoom_to_components",
+})
+
+
+class DocumentSnapshotCache:
+    """唯讀命令回應的短 TTL 快取"""
+
+    def __init__(self, ttl: float = 2.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttl: 快取有效時間（秒），0 表示停用快取
+            clock: 單調時鐘（測試時可替換）
+        """
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Tuple[float, str]] = {}
+        self._generation = 0
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def is_cacheable(command_type: str) -> bool:
+        return command_type in READ_ONLY_COMMANDS
+
+    @staticmethod
+    def is_mutating(command_type: str) -> bool:
+        return command_type not in READ_ONLY_COMMANDS and command_type not in NON_MUTATING_COMMANDS
+
+    @staticmethod
+    def _key(command_type: str, params: Optional[Dict[str, Any]]) -> Tuple[str, str]:
+        return command_type, json.dumps(params or {}, sort_keys=True, default=str)
+
+    # -------------------------------------------------------------------------
+    # 讀寫
+    # -------------------------------------------------------------------------
+
+    def get(self, command_type: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """返回未過期的快取回應（新的字典），否則返回 None 並記一次未命中"""
+        key = self._key(command_type, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] < self.ttl:
+                self._hits += 1
+                raw = entry[1]
+            else:
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+        return json.loads(raw)
+
+    def put(
+        self,
+        command_type: str,
+        params: Optional[Dict[str, Any]],
+        response: Dict[str, Any],
+        generation: Optional[int] = None
+    ):
+        """
+        保存成功的唯讀回應
+
+        Args:
+            generation: 發送請求前的世代號；期間快取被失效過則不保存
+        """
+        if self.ttl <= 0 or not self.is_cacheable(command_type) or not response.get("success"):
+            return
+        raw = json.dumps(response)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[self._key(command_type, params)] = (self._clock(), raw)
+
+    def invalidate(self):
+        """清空快取（文檔可能已被修改）"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidations += 1
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def fetch(
+        self,
+        command_type: str,
+        params: Optional[Dict[str, Any]],
+        send: Callable[[], Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        經過快取發送命令
+
+        唯讀命令先查快取；修改命令在發送前後各使快取失效一次。
+
+        Args:
+            command_type: 命令類型
+            params: 命令參數
+            send: 實際發送命令並返回回應的函數
+        """
+        if self.is_cacheable(command_type):
+            cached = self.get(command_type, params)
+            if cached is not None:
+                return cached
+            generation = self._generation
+            response = send()
+            self.put(command_type, params, response, generation)
+            return response
+
+        if not self.is_mutating(command_type):
+            return send()
+
+        self.invalidate()
+        try:
+            return send()
+        finally:
+            self.invalidate()
+
+    # -------------------------------------------------------------------------
+    # 統計
+    # -------------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+                "entries": len(self._entries),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+            self._invalidations = 0
@@ -0,0 +1,123 @@
+"""
+大型回應的串流解碼
+
+capture_canvas / capture_rhino_view 的回應是一行 JSON，圖片以 base64 字串放在
+"image" 欄位中，1920x1080 的 PNG 約 4 MB。Base64FieldDecoder 配合
+Transport.request_stream() 逐塊接收回應：
+- 找到指定欄位後，base64 內容按 4 字元對齊逐塊解碼為位元組，直接寫入
+  bytearray 或檔案，不建立完整的 base64 字串
+- 欄位以外的部分（通常只有幾百位元組）照常以 json 解析，欄位值替換為 null
+
+每個位元組只被掃描一次，總工作量與回應大小成線性關係。
+
+用法：
+    decoder = Base64FieldDecoder("image")
+    transport.request_stream({"type": "capture_canvas"}, decoder.feed)
+    response = decoder.finish()
+    png = decoder.data          # memoryview，或傳入 sink 時為 None
+"""
+
+import binascii
+import json
+import re
+from typing import Any, BinaryIO, Dict, Optional
+
+_SCAN = 0
+_VALUE = 1
+_DONE = 2
+
+# 欄位名與開頭引號之間允許的最大空白，跨塊時保留這麼多尾部重新掃描
+_KEY_OVERLAP = 64
+
+
+class Base64FieldDecoder:
+    """
+    JSON 回應串流解碼器：把指定欄位的 base64 字串直接解碼為位元組
+
+    只處理第一個出現的同名欄位；之後的同名欄位留在 JSON 中照常解析。
+    """
+
+    def __init__(self, field: str = "image", sink: Optional[BinaryIO] = None):
+        """
+        Args:
+            field: 要串流解碼的欄位名稱
+            sink: 可寫入的二進位檔案物件；提供時解碼結果直接寫入，不保留在記憶體中
+        """
+        self.field = field
+        self.sink = sink
+        self.size = 0
+        self._pattern = re.compile(rb'(?<!\\)"' + re.escape(field.encode("utf-8")) + rb'"\s*:\s*"')
+        self._state = _SCAN
+        self._scan_from = 0
+        self._skeleton = bytearray()
+        self._pending = bytearray()
+        self._out: Optional[bytearray] = None if sink is not None else bytearray()
+
+    @property
+    def found(self) -> bool:
+        """是否找到並完整讀取了欄位"""
+        return self._state == _DONE
+
+    @property
+    def data(self) -> Optional[memoryview]:
+        """解碼後的位元組（未找到欄位或寫入 sink 時為 None）"""
+        if not self.found or self._out is None:
+            return None
+        return memoryview(self._out)
+
+    def feed(self, chunk: bytes):
+        """接收回應的下一個片段"""
+        if self._state == _SCAN:
+            self._skeleton += chunk
+            match = self._pattern.search(self._skeleton, self._scan_from)
+            if match is None:
+                self._scan_from = max(0, len(self._skeleton) - _KEY_OVERLAP)
+                return
+            chunk = bytes(self._skeleton[match.end():])
+            # 去掉值的開頭引號，以 null 佔位
+            del self._skeleton[match.end() - 1:]
+            self._skeleton += b"null"
+            self._state = _VALUE
+
+        if self._state == _VALUE:
+            end = chunk.find(b'"')
+            self._decode(chunk if end < 0 else chunk[:end], final=end >= 0)
+            if end < 0:
+                return
+            self._state = _DONE
+            chunk = chunk[end + 1:]
+
+        self._skeleton += chunk
+
+    def _decode(self, part: bytes, final: bool):
+        if b"\\" in part:
+            # JSON 可能把 "/" 轉義為 "\/"；base64 字元表中沒有反斜線
+            part = part.replace(b"\\", b"")
+        self._pending += part
+        usable = len(self._pending) if final else len(self._pending) - len(self._pending) % 4
+        if not usable:
+            return
+        try:
+            decoded = binascii.a2b_base64(self._pending[:usable])
+        except binascii.Error as e:
+            raise ValueError(f"Invalid base64 in field '{self.field}': {e}") from e
+        del self._pending[:usable]
+        self.size += len(decoded)
+        if self.sink is not None:
+            self.sink.write(decoded)
+        else:
+            self._out += decoded
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        結束解碼並解析欄位以外的 JSON
+
+        Returns:
+            回應字典，已解碼的欄位值為 None
+
+        Raises:
+            ValueError: 欄位值未結束（回應被截斷）或 JSON 不合法
+        """
+        if self._state == _VALUE:
+            raise ValueError(f"Response ended inside field '{self.field}'")
+        return json.loads(self._skeleton.decode("utf-8-sig").strip())
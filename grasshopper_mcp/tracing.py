@@ -0,0 +1,357 @@
+"""
+延遲直方圖與巢狀追蹤 (spans)
+
+TransportMetrics 以 LatencyHistogram 記錄每種命令的延遲分佈（p50 / p95 / p99）；
+Tracer 以 OpenTelemetry 風格的 span 記錄呼叫的巢狀關係：
+
+    placement.execute
+    └── component_manager.add_components   （分階段執行時）
+        └── component_manager.add
+            └── command add_component      ← 傳輸層自動建立
+
+- LatencyHistogram：對數分桶（每桶寬約 19%），記錄為 O(1)，百分位誤差約 ±9%，
+  可合併、可序列化，適合跨版本比較
+- Tracer：預設關閉，關閉時 span() 只返回共用的空上下文；
+  開啟後完成的 span 保存在有上限的列表中
+- 目前的 span 存在 contextvars 中：同一執行緒與 asyncio 任務自動繼承；
+  交給執行緒池的函數需以 tracer.bind(fn) 包裝才會掛在目前的 span 之下
+- export_metrics() 把所有共用傳輸的統計與 span 匯出為 JSON
+
+用法：
+    tracer = get_tracer()
+    tracer.enable()
+    with tracer.span("placement.execute", json_path=path):
+        pool.submit(tracer.bind(work), item)
+    export_metrics("GH_WIP/metrics.json")
+
+環境變數 GH_MCP_TRACE=1 時 tracer 在匯入時即開啟。
+"""
+
+import contextvars
+import itertools
+import json
+import math
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# 直方圖最小的桶上界（秒）與相鄰桶的比例
+_HISTOGRAM_BASE = 1e-5
+_HISTOGRAM_RATIO = 2 ** 0.25
+_LOG_RATIO = math.log(_HISTOGRAM_RATIO)
+
+PERCENTILES = (50, 95, 99)
+
+
+# =============================================================================
+# 延遲直方圖
+# =============================================================================
+
+class LatencyHistogram:
+    """對數分桶的延遲直方圖（非執行緒安全，由呼叫端加鎖）"""
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @staticmethod
+    def bucket_index(seconds: float) -> int:
+        """延遲所在的桶；桶 i 的範圍是 (base·ratio^(i-1), base·ratio^i]"""
+        if seconds <= _HISTOGRAM_BASE:
+            return 0
+        return math.ceil(math.log(seconds / _HISTOGRAM_BASE) / _LOG_RATIO - 1e-9)
+
+    @staticmethod
+    def bucket_upper(index: int) -> float:
+        return _HISTOGRAM_BASE * _HISTOGRAM_RATIO ** index
+
+    def record(self, seconds: float):
+        index = self.bucket_index(seconds)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q: float) -> float:
+        """
+        估計第 q 百分位的延遲（秒）
+
+        返回所在桶的幾何中點，並限制在觀察到的最小值與最大值之間
+        """
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100.0))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                estimate = self.bucket_upper(index) / math.sqrt(_HISTOGRAM_RATIO)
+                return min(self.max, max(self.min, estimate))
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """可序列化的摘要；buckets 以桶上界（秒）為鍵，可用 from_dict 還原後合併"""
+        return {
+            "count": self.count,
+            "total": round(self.total, 6),
+            "min": round(self.min, 6) if self.count else 0.0,
+            "max": round(self.max, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            **{f"p{q}": round(self.percentile(q), 6) for q in PERCENTILES},
+            "buckets": {
+                f"{self.bucket_upper(index):.6g}": count
+                for index, count in sorted(self.buckets.items())
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        for upper, count in data.get("buckets", {}).items():
+            # 上界在匯出時四捨五入過，取最接近的桶
+            index = max(0, round(math.log(float(upper) / _HISTOGRAM_BASE) / _LOG_RATIO))
+            histogram.buckets[index] = histogram.buckets.get(index, 0) + int(count)
+        histogram.count = int(data.get("count", 0))
+        histogram.total = float(data.get("total", 0.0))
+        histogram.min = float(data.get("min", 0.0)) if histogram.count else math.inf
+        histogram.max = float(data.get("max", 0.0))
+        return histogram
+
+
+# =============================================================================
+# 追蹤
+# =============================================================================
+
+class Span:
+    """一個已開始的 span；結束時由 Tracer 記錄"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "duration", "attributes", "status")
+
+    def __init__(self, name: str, trace_id: int, span_id: int, parent_id: Optional[int], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.duration = 0.0
+        self.attributes = attributes
+        self.status = "ok"
+
+    def set(self, **attributes):
+        """追加屬性（例如回應大小、重試次數）"""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": f"{self.trace_id:016x}",
+            "span_id": f"{self.span_id:016x}",
+            "parent_id": f"{self.parent_id:016x}" if self.parent_id is not None else None,
+            "start": round(self.start, 6),
+            "duration": round(self.duration, 6),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("gh_mcp_span", default=None)
+
+
+class _NoopSpan:
+    """tracer 關閉時 span() 產生的對象：set() 不做任何事"""
+
+    __slots__ = ()
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """記錄巢狀 span；預設關閉"""
+
+    def __init__(self, enabled: bool = False, max_spans: int = 100_000):
+        """
+        Args:
+            enabled: 是否記錄 span
+            max_spans: 保留的完成 span 上限，超過後丟棄新的 span 並計數
+        """
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self._lock = threading.Lock()
+        self._spans: List[Span] = []
+        self._dropped = 0
+        self._ids = itertools.count(1)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def span(self, name: str, **attributes):
+        """
+        開始一個 span 的上下文管理器，掛在目前的 span 之下
+
+        區塊內拋出異常時 status 為 "error"，並記錄異常類型；
+        tracer 關閉時返回空上下文，set() 不做任何事
+        """
+        if not self.enabled:
+            return nullcontext(_NOOP_SPAN)
+        return self._span(name, attributes)
+
+    @contextmanager
+    def _span(self, name: str, attributes: Dict[str, Any]) -> Iterator[Span]:
+        parent = _current_span.get()
+        span_id = next(self._ids)
+        span = Span(
+            name,
+            parent.trace_id if parent is not None else span_id,
+            span_id,
+            parent.span_id if parent is not None else None,
+            attributes,
+        )
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.attributes.setdefault("exception", type(e).__name__)
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            _current_span.reset(token)
+            with self._lock:
+                if len(self._spans) < self.max_spans:
+                    self._spans.append(span)
+                else:
+                    self._dropped += 1
+
+    def current(self) -> Optional[Span]:
+        """目前的 span（沒有或 tracer 關閉時為 None）"""
+        return _current_span.get() if self.enabled else None
+
+    def bind(self, fn: F) -> F:
+        """
+        把目前的 span 綁定到 fn：在其他執行緒中呼叫時，fn 內的 span 掛在它之下
+
+        tracer 關閉或沒有目前的 span 時原樣返回 fn
+        """
+        parent = self.current()
+        if parent is None:
+            return fn
+
+        def bound(*args, **kwargs):
+            token = _current_span.set(parent)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _current_span.reset(token)
+
+        return bound  # type: ignore[return-value]
+
+    def spans(self) -> List[Dict[str, Any]]:
+        """已完成的 span（按結束順序）"""
+        with self._lock:
+            spans = list(self._spans)
+        return [span.to_dict() for span in spans]
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """按名稱彙總的 span 耗時直方圖"""
+        with self._lock:
+            spans = list(self._spans)
+        histograms: Dict[str, LatencyHistogram] = {}
+        for span in spans:
+            histogram = histograms.get(span.name)
+            if histogram is None:
+                histogram = histograms[span.name] = LatencyHistogram()
+            histogram.record(span.duration)
+        return {name: histogram.to_dict() for name, histogram in sorted(histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._dropped = 0
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+
+_tracer = Tracer(enabled=os.environ.get("GH_MCP_TRACE", "") not in ("", "0"))
+
+
+def get_tracer() -> Tracer:
+    """返回全域 tracer"""
+    return _tracer
+
+
+# =============================================================================
+# 匯出
+# =============================================================================
+
+def export_metrics(
+    path: Optional[str] = None,
+    transports: Optional[Dict[str, Dict[str, Any]]] = None,
+    include_spans: bool = True,
+    label: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    匯出命令統計與 span 為 JSON
+
+    Args:
+        path: 寫入的文件路徑；None 時只返回字典
+        transports: {名稱: transport.stats()}；None 時使用所有共用傳輸
+        include_spans: 是否包含每個 span（大型執行可關閉，只保留 span_summary）
+        label: 標記此次匯出（例如 commit 或版本），方便跨版本比較
+
+    Returns:
+        {"label", "generated_at", "python", "transports", "span_summary", "spans", "dropped_spans"}
+    """
+    if transports is None:
+        from .transport import all_transport_stats
+        transports = all_transport_stats()
+
+    tracer = get_tracer()
+    report: Dict[str, Any] = {
+        "label": label,
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "transports": transports,
+        "span_summary": tracer.summary(),
+        "dropped_spans": tracer.dropped,
+    }
+    if include_spans:
+        report["spans"] = tracer.spans()
+
+    if path is not None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
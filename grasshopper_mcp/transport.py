@@ -0,0 +1,927 @@
+"""
+GH_MCP 傳輸層
+
+所有與 GH_MCP / GH_MCP_Vision 通信的客戶端共用此模組：
+- 可插拔的訊息框架 (framing)：換行分隔、寫端半關閉 (SHUT_WR)
+- 持久連接池：連接重用，取出前做健康檢查
+- 重試：連接失敗時退避重試；重用的連接被重置時自動重連
+- 超時：建立連接與讀寫分別設定
+- 統計：開啟 / 重用 socket 數、每種命令的次數、延遲分佈 (p50/p95/p99)、收發位元組與重試次數
+- 追蹤：每個命令一個 span（tracing.get_tracer() 開啟時），掛在呼叫端目前的 span 之下
+
+舊版 GH_MCP 每處理一個命令就關閉連接，連接池會在健康檢查時
+偵測到並改開新連接，因此對新舊伺服器皆相容。
+
+用法：
+    transport = get_transport("localhost", 8080)
+    response = transport.send_command("get_document_info")
+"""
+
+import json
+import select
+import socket
+import time
+from threading import Lock
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+from .tracing import LatencyHistogram, get_tracer
+
+T = TypeVar("T")
+
+# 串流讀取時接收回應片段的回調（片段不含框架分隔符）
+ChunkConsumer = Callable[[bytes], None]
+
+
+class TransportError(Exception):
+    """
+    傳輸層錯誤（連接失敗、連接中斷、回應格式錯誤）
+
+    pipeline() 中途失敗時，responses 為失敗前已讀回的回應（commands 的前綴），
+    in_flight 為其後已送出但未收到回應的命令數（這些命令可能已被執行）。
+    """
+
+    responses: Optional[List[Dict[str, Any]]] = None
+    in_flight: int = 0
+
+
+class TransportConnectError(TransportError):
+    """無法建立連接（伺服器未啟動或拒絕連接）"""
+
+
+class TransportTimeout(TransportError):
+    """等待回應超時"""
+
+
+# =============================================================================
+# 連接
+# =============================================================================
+
+class _Connection:
+    """單一 socket 及其讀取緩衝區"""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.buffer = bytearray()
+        self.last_used = time.monotonic()
+        self.uses = 0
+        self.bytes_received = 0
+
+    def is_alive(self) -> bool:
+        """非阻塞檢查連接是否仍可重用"""
+        if self.buffer:
+            # 殘留未讀資料代表上一個回應框架不同步，不可重用
+            return False
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        # 閒置連接變為可讀：不是對端已關閉 (recv 返回空)，就是收到了
+        # 不屬於任何請求的多餘資料，兩者都不可重用
+        return not readable
+
+    def fill(self, size: int = 65536) -> bool:
+        """從 socket 讀取一塊資料追加到緩衝區；對端關閉時返回 False"""
+        chunk = self.sock.recv(size)
+        if not chunk:
+            return False
+        self.bytes_received += len(chunk)
+        self.buffer += chunk
+        return True
+
+    def take(self, size: int) -> bytes:
+        """從緩衝區頭部取出 size 個位元組"""
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def read_exact(self, size: int, sink: Optional[BinaryIO] = None) -> Optional[bytearray]:
+        """
+        讀取恰好 size 個原始位元組（二進位附件）
+
+        不提供 sink 時預先配置 size 大小的緩衝區，以 recv_into 直接寫入，不產生中間物件；
+        提供 sink 時分塊寫入 sink 並返回 None。
+
+        Raises:
+            TransportError: 附件未讀完連接就被關閉
+        """
+        buffered = min(size, len(self.buffer))
+        if sink is None:
+            out = bytearray(size)
+            view = memoryview(out)
+            view[:buffered] = self.buffer[:buffered]
+        else:
+            out = None
+            view = memoryview(bytearray(min(size, 65536)))
+            sink.write(self.buffer[:buffered])
+        del self.buffer[:buffered]
+
+        received = buffered
+        while received < size:
+            if sink is None:
+                count = self.sock.recv_into(view[received:], size - received)
+            else:
+                count = self.sock.recv_into(view, min(len(view), size - received))
+                sink.write(view[:count])
+            if not count:
+                raise TransportError(f"Connection closed after {received} of {size} attachment bytes")
+            received += count
+            self.bytes_received += count
+        return out
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+# =============================================================================
+# 訊息框架
+# =============================================================================
+
+class Framing:
+    """
+    訊息框架基類
+
+    子類定義如何把一個 JSON 請求寫到 socket，以及如何從連接中切出一個完整回應。
+    reusable 為 False 的框架（例如半關閉）每個請求都會使用新連接。
+    """
+
+    name = "base"
+    reusable = True
+
+    def write(self, sock: socket.socket, payload: bytes) -> int:
+        """寫出一個請求，返回寫出的位元組數"""
+        raise NotImplementedError
+
+    def read(self, conn: _Connection) -> bytes:
+        """
+        讀取一個完整回應
+
+        Raises:
+            ConnectionResetError: 在收到任何回應位元組前連接已被關閉
+        """
+        raise NotImplementedError
+
+    def read_stream(self, conn: _Connection, consume: ChunkConsumer) -> int:
+        """
+        逐塊讀取一個回應並交給 consume，不在記憶體中組合完整回應
+
+        Returns:
+            回應的位元組數
+
+        Raises:
+            ConnectionResetError: 在收到任何回應位元組前連接已被關閉
+        """
+        raise NotImplementedError
+
+
+class NewlineFraming(Framing):
+    """換行分隔：每個請求和回應各佔一行（GH_MCP 與 GH_MCP_Vision 的原生協議）"""
+
+    name = "newline"
+
+    def write(self, sock: socket.socket, payload: bytes) -> int:
+        data = payload + b"\n"
+        sock.sendall(data)
+        return len(data)
+
+    def read(self, conn: _Connection) -> bytes:
+        scan_from = 0
+        while True:
+            newline = conn.buffer.find(b"\n", scan_from)
+            if newline >= 0:
+                line = conn.take(newline)
+                del conn.buffer[:1]
+                return line
+            scan_from = len(conn.buffer)
+            if not conn.fill():
+                if conn.buffer:
+                    # 舊式伺服器可能不送結尾換行就關閉連接
+                    return conn.take(len(conn.buffer))
+                raise ConnectionResetError("Connection closed by server")
+
+    def read_stream(self, conn: _Connection, consume: ChunkConsumer) -> int:
+        total = 0
+        while True:
+            newline = conn.buffer.find(b"\n")
+            if newline >= 0:
+                if newline:
+                    consume(conn.take(newline))
+                    total += newline
+                del conn.buffer[:1]
+                return total
+            if conn.buffer:
+                # 已檢查過的資料立即交出，緩衝區只保留尚未掃描的新資料
+                total += len(conn.buffer)
+                consume(conn.take(len(conn.buffer)))
+            if not conn.fill():
+                if total:
+                    return total
+                raise ConnectionResetError("Connection closed by server")
+
+
+class ShutdownFraming(Framing):
+    """寫端半關閉：送出請求後 shutdown(SHUT_WR)，讀到 EOF 為止（連接不可重用）"""
+
+    name = "shutdown"
+    reusable = False
+
+    def write(self, sock: socket.socket, payload: bytes) -> int:
+        sock.sendall(payload)
+        sock.shutdown(socket.SHUT_WR)
+        return len(payload)
+
+    def read(self, conn: _Connection) -> bytes:
+        while conn.fill():
+            pass
+        if not conn.buffer:
+            raise ConnectionResetError("Connection closed by server")
+        return conn.take(len(conn.buffer))
+
+    def read_stream(self, conn: _Connection, consume: ChunkConsumer) -> int:
+        total = 0
+        while True:
+            if conn.buffer:
+                total += len(conn.buffer)
+                consume(conn.take(len(conn.buffer)))
+            if not conn.fill():
+                if total:
+                    return total
+                raise ConnectionResetError("Connection closed by server")
+
+
+FRAMINGS: Dict[str, type] = {
+    NewlineFraming.name: NewlineFraming,
+    ShutdownFraming.name: ShutdownFraming,
+}
+
+
+def get_framing(framing: Union[str, Framing]) -> Framing:
+    """將框架名稱或實例轉為 Framing 實例"""
+    if isinstance(framing, Framing):
+        return framing
+    if framing not in FRAMINGS:
+        raise ValueError(f"Unknown framing '{framing}', expected one of {sorted(FRAMINGS)}")
+    return FRAMINGS[framing]()
+
+
+# =============================================================================
+# 連接池
+# =============================================================================
+
+class ConnectionPool:
+    """
+    持久連接池
+
+    執行緒安全；每次請求取出一條閒置連接，用完歸還。
+    超過 pool_size 的閒置連接會直接關閉。
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8080,
+        pool_size: int = 4,
+        timeout: Optional[float] = 30.0,
+        connect_timeout: float = 5.0,
+        idle_timeout: float = 60.0
+    ):
+        """
+        初始化連接池
+
+        Args:
+            host: 服務器地址
+            port: 服務器端口
+            pool_size: 最多保留的閒置連接數（0 表示不重用）
+            timeout: 讀寫超時（秒），None 表示不超時
+            connect_timeout: 建立連接的超時（秒）
+            idle_timeout: 閒置超過此秒數的連接不再重用
+        """
+        self.host = host
+        self.port = port
+        self.pool_size = max(0, pool_size)
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.idle_timeout = idle_timeout
+
+        self._idle: List[_Connection] = []
+        self._lock = Lock()
+        self._stats = {
+            "opened": 0,
+            "reused": 0,
+            "discarded": 0,
+        }
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def open(self) -> _Connection:
+        """開啟新連接"""
+        sock = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+        sock.settimeout(self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._count("opened")
+        return _Connection(sock)
+
+    def acquire(self) -> Tuple[_Connection, bool]:
+        """取出一條健康的閒置連接，若無則新開；返回 (連接, 是否為重用)"""
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                return self.open(), False
+            idle_for = time.monotonic() - conn.last_used
+            if idle_for <= self.idle_timeout and conn.is_alive():
+                self._count("reused")
+                return conn, True
+            self.discard(conn)
+
+    def release(self, conn: _Connection):
+        """歸還連接；池已滿則關閉"""
+        conn.last_used = time.monotonic()
+        conn.uses += 1
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def discard(self, conn: _Connection):
+        """關閉並丟棄一條損壞或不可重用的連接"""
+        conn.close()
+        self._count("discarded")
+
+    def close(self):
+        """關閉所有閒置連接"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回連接統計：opened / reused / discarded / idle / pool_size"""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["idle"] = len(self._idle)
+        stats["pool_size"] = self.pool_size
+        return stats
+
+    def reset_stats(self):
+        """重置統計計數"""
+        with self._lock:
+            for key in self._stats:
+                self._stats[key] = 0
+
+
+# =============================================================================
+# 統計
+# =============================================================================
+
+class _CommandMetrics:
+    """單一命令類型的計數與延遲直方圖"""
+
+    __slots__ = ("count", "errors", "retries", "bytes_sent", "bytes_received", "latency")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latency = LatencyHistogram()
+
+
+class TransportMetrics:
+    """每種命令的次數、錯誤數、延遲分佈、收發位元組與重試次數，以及整體合計"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """重置所有計數"""
+        with self._lock:
+            self.commands: Dict[str, _CommandMetrics] = {}
+            self.requests = 0
+            self.errors = 0
+            self.retries = 0
+            self.bytes_sent = 0
+            self.bytes_received = 0
+
+    def record(
+        self,
+        command_type: str,
+        elapsed: float,
+        bytes_sent: int,
+        bytes_received: int,
+        ok: bool,
+        retries: int = 0
+    ):
+        """記錄一次請求"""
+        with self._lock:
+            entry = self.commands.get(command_type)
+            if entry is None:
+                entry = self.commands[command_type] = _CommandMetrics()
+            entry.count += 1
+            entry.retries += retries
+            entry.bytes_sent += bytes_sent
+            entry.bytes_received += bytes_received
+            entry.latency.record(elapsed)
+            self.requests += 1
+            self.retries += retries
+            self.bytes_sent += bytes_sent
+            self.bytes_received += bytes_received
+            if not ok:
+                entry.errors += 1
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """返回可序列化的統計快照；每種命令附帶延遲百分位與直方圖分桶"""
+        with self._lock:
+            commands = {}
+            for command_type, entry in self.commands.items():
+                latency = entry.latency.to_dict()
+                commands[command_type] = {
+                    "count": entry.count,
+                    "errors": entry.errors,
+                    "retries": entry.retries,
+                    "bytes_sent": entry.bytes_sent,
+                    "bytes_received": entry.bytes_received,
+                    "total_time": latency["total"],
+                    "avg_time": latency["mean"],
+                    "max_time": latency["max"],
+                    "p50": latency["p50"],
+                    "p95": latency["p95"],
+                    "p99": latency["p99"],
+                    "latency_buckets": latency["buckets"],
+                }
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "retries": self.retries,
+                "bytes_sent": self.bytes_sent,
+                "bytes_received": self.bytes_received,
+                "commands": commands,
+            }
+
+
+# =============================================================================
+# 傳輸
+# =============================================================================
+
+class Transport:
+    """
+    GH_MCP 傳輸
+
+    組合訊息框架、連接池、重試與統計。request() 失敗時拋出 TransportError，
+    由各客戶端轉換為自己的錯誤回應格式。
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8080,
+        framing: Union[str, Framing] = "newline",
+        timeout: Optional[float] = 30.0,
+        connect_timeout: float = 5.0,
+        pool_size: int = 4,
+        retries: int = 1,
+        retry_backoff: float = 0.1,
+        idle_timeout: float = 60.0
+    ):
+        """
+        初始化傳輸
+
+        Args:
+            host: 服務器地址
+            port: 服務器端口
+            framing: 訊息框架名稱 ("newline" / "shutdown") 或 Framing 實例
+            timeout: 讀寫超時（秒）
+            connect_timeout: 建立連接的超時（秒）
+            pool_size: 最多保留的閒置連接數
+            retries: 無法建立連接時的重試次數（命令尚未送出，重試是安全的）
+            retry_backoff: 第一次重試前的等待秒數，之後每次加倍
+            idle_timeout: 閒置超過此秒數的連接不再重用
+        """
+        self.host = host
+        self.port = port
+        self.framing = get_framing(framing)
+        self.retries = max(0, retries)
+        self.retry_backoff = retry_backoff
+        self.pool = ConnectionPool(
+            host,
+            port,
+            pool_size=pool_size if self.framing.reusable else 0,
+            timeout=timeout,
+            connect_timeout=connect_timeout,
+            idle_timeout=idle_timeout,
+        )
+        self.metrics = TransportMetrics()
+        # 伺服器能力探測結果（例如 "batch"、"pipelining"），由上層模組填寫與快取
+        self.capabilities: Dict[str, bool] = {}
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self.pool.timeout
+
+    def request(self, command: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        發送一個命令並等待回應
+
+        重試策略：
+        - 無法建立連接：按 retries 次數退避重試
+        - 重用的連接在收到任何回應前被對端重置：改用新連接重送一次
+          （舊式伺服器已關閉的連接，命令未被處理，重送是安全的）
+        - 已送出命令後超時或中斷：不重試，避免重複執行
+
+        Args:
+            command: {"type": ..., "parameters": {...}} 命令字典
+            timeout: 本次請求的讀寫超時（秒），None 使用傳輸的預設值
+
+        Returns:
+            解析後的 JSON 回應
+
+        Raises:
+            TransportConnectError: 無法建立連接
+            TransportTimeout: 等待回應超時
+            TransportError: 連接中斷或回應不是合法 JSON
+        """
+        return self._exchange(command, self.framing.read, self._parse, timeout)
+
+    def request_stream(
+        self,
+        command: Dict[str, Any],
+        consume: ChunkConsumer,
+        timeout: Optional[float] = None
+    ) -> int:
+        """
+        發送一個命令，回應逐塊交給 consume（用於大型回應，例如影像擷取）
+
+        重試策略與 request() 相同；重送只會發生在 consume 收到任何資料之前。
+
+        Args:
+            command: {"type": ..., "parameters": {...}} 命令字典
+            consume: 接收回應片段的回調，片段按順序到達，不含框架分隔符
+            timeout: 本次請求的讀寫超時（秒）
+
+        Returns:
+            回應的位元組數
+
+        Raises:
+            與 request() 相同；consume 拋出的異常會原樣傳出（連接不再重用）
+        """
+        return self._exchange(
+            command,
+            lambda conn: self.framing.read_stream(conn, consume),
+            lambda size: size,
+            timeout,
+        )
+
+    def request_attachment(
+        self,
+        command: Dict[str, Any],
+        consume: ChunkConsumer,
+        attachment_size: Callable[[], int],
+        timeout: Optional[float] = None,
+        sink: Optional[BinaryIO] = None
+    ) -> Optional[bytearray]:
+        """
+        發送一個命令，讀取 JSON 回應行之後的二進位附件
+
+        回應行照 request_stream() 逐塊交給 consume；讀完後呼叫 attachment_size()
+        （通常從 consume 解析出的 data.attachment.length 取得）決定接著要讀的原始位元組數，
+        0 表示沒有附件。僅適用於換行框架。
+
+        Args:
+            command: {"type": ..., "parameters": {...}} 命令字典
+            consume: 接收回應行片段的回調
+            attachment_size: 回應行讀完後返回附件長度的回調
+            timeout: 本次請求的讀寫超時（秒）
+            sink: 可寫入的二進位檔案物件；提供時附件直接寫入並返回 None
+
+        Returns:
+            附件位元組（無附件或寫入 sink 時為 None）
+        """
+        if not self.framing.reusable:
+            raise ValueError("Binary attachments require a persistent framing such as 'newline'")
+
+        def read(conn: _Connection) -> Optional[bytearray]:
+            self.framing.read_stream(conn, consume)
+            size = attachment_size()
+            if not size:
+                return None
+            return conn.read_exact(size, sink)
+
+        return self._exchange(command, read, lambda attachment: attachment, timeout)
+
+    def _parse(self, raw: bytes) -> Dict[str, Any]:
+        try:
+            return json.loads(raw.decode("utf-8-sig").strip())
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise TransportError(f"Invalid JSON response from {self.host}:{self.port}: {e}") from e
+
+    def _exchange(
+        self,
+        command: Dict[str, Any],
+        read: Callable[[_Connection], Any],
+        finish: Callable[[Any], T],
+        timeout: Optional[float]
+    ) -> T:
+        """取得連接、送出命令、以 read 讀回回應、以 finish 轉換結果，並記錄統計"""
+        command_type = str(command.get("type", ""))
+        payload = json.dumps(command, ensure_ascii=False).encode("utf-8")
+        start = time.perf_counter()
+        bytes_sent = 0
+        bytes_received = 0
+        retries = 0
+        connect_attempts = 0
+        stale_retry_used = False
+
+        with get_tracer().span(f"command {command_type}", server=f"{self.host}:{self.port}") as span:
+            try:
+                while True:
+                    try:
+                        conn, reused = self.pool.acquire()
+                    except OSError as e:
+                        connect_attempts += 1
+                        if connect_attempts <= self.retries:
+                            retries += 1
+                            time.sleep(self.retry_backoff * (2 ** (connect_attempts - 1)))
+                            continue
+                        raise TransportConnectError(
+                            f"Cannot connect to {self.host}:{self.port}: {e}"
+                        ) from e
+
+                    try:
+                        if timeout is not None:
+                            conn.sock.settimeout(timeout)
+                        bytes_sent += self.framing.write(conn.sock, payload)
+                        raw = read(conn)
+                        if timeout is not None:
+                            conn.sock.settimeout(self.pool.timeout)
+                    except socket.timeout as e:
+                        bytes_received += conn.bytes_received
+                        self.pool.discard(conn)
+                        raise TransportTimeout(
+                            f"Timed out waiting for response from {self.host}:{self.port}"
+                        ) from e
+                    except (ConnectionResetError, BrokenPipeError, ConnectionAbortedError) as e:
+                        # 已收到部分回應：伺服器已執行命令，重送會重複執行（例如 add_component）
+                        answered = conn.bytes_received > 0
+                        bytes_received += conn.bytes_received
+                        self.pool.discard(conn)
+                        if reused and not stale_retry_used and not answered:
+                            stale_retry_used = True
+                            retries += 1
+                            continue
+                        raise TransportError(f"Connection to {self.host}:{self.port} lost: {e}") from e
+                    except OSError as e:
+                        bytes_received += conn.bytes_received
+                        self.pool.discard(conn)
+                        raise TransportError(f"Error communicating with {self.host}:{self.port}: {e}") from e
+                    except BaseException:
+                        # 呼叫端的 consume 出錯：回應可能只讀了一半，連接不可重用
+                        self.pool.discard(conn)
+                        raise
+
+                    bytes_received += conn.bytes_received
+                    conn.bytes_received = 0
+                    if self.framing.reusable:
+                        self.pool.release(conn)
+                    else:
+                        conn.close()
+
+                    result = finish(raw)
+                    self._record(span, command_type, start, bytes_sent, bytes_received, True, retries)
+                    return result
+            except TransportError:
+                self._record(span, command_type, start, bytes_sent, bytes_received, False, retries)
+                raise
+
+    def _record(
+        self,
+        span: Any,
+        command_type: str,
+        start: float,
+        bytes_sent: int,
+        bytes_received: int,
+        ok: bool,
+        retries: int
+    ):
+        """記錄一次請求的統計，並把大小與重試次數附加到命令的 span"""
+        self.metrics.record(
+            command_type, time.perf_counter() - start, bytes_sent, bytes_received,
+            ok=ok, retries=retries
+        )
+        span.set(bytes_sent=bytes_sent, bytes_received=bytes_received, retries=retries, ok=ok)
+
+    def pipeline(
+        self,
+        commands: List[Dict[str, Any]],
+        timeout: Optional[float] = None,
+        window: int = 64
+    ) -> List[Dict[str, Any]]:
+        """
+        在同一條連接上管線化發送多個命令，按順序讀回回應
+
+        每次最多送出 window 個命令再讀回它們的回應，避免雙方發送緩衝區
+        互相塞滿造成死結。
+
+        若伺服器在回應完所有命令前關閉連接（舊版 GH_MCP 每條連接只處理
+        一個命令），返回的列表會比 commands 短；舊版伺服器未回應的命令
+        並未被讀取，呼叫端可以安全地逐一重送。
+
+        Args:
+            commands: 命令字典列表
+            timeout: 每個回應的讀取超時（秒）
+            window: 同時在途的最大命令數
+
+        Returns:
+            回應列表，順序與 commands 相同（可能較短，見上）
+
+        Raises:
+            TransportError: 無法建立連接、超時或回應不是合法 JSON；
+                已讀回的回應與在途命令數附在 error.responses / error.in_flight
+        """
+        if not commands:
+            return []
+        if not self.framing.reusable:
+            return [self.request(command, timeout=timeout) for command in commands]
+
+        with get_tracer().span("pipeline", commands=len(commands), server=f"{self.host}:{self.port}"):
+            start = time.perf_counter()
+            payloads = [json.dumps(command, ensure_ascii=False).encode("utf-8") for command in commands]
+            sizes = [len(payload) + 1 for payload in payloads]
+            window = max(1, window)
+            bytes_received = 0
+            responses: List[Dict[str, Any]] = []
+
+            for attempt in range(2):
+                try:
+                    conn, reused = self.pool.acquire()
+                except OSError as e:
+                    # 沒有任何命令送出：每個命令各計一次失敗
+                    self._record_pipeline(commands, [0] * len(commands), start, bytes_received, 0, len(commands))
+                    raise TransportConnectError(f"Cannot connect to {self.host}:{self.port}: {e}") from e
+
+                closed_early = True
+                try:
+                    if timeout is not None:
+                        conn.sock.settimeout(timeout)
+                    closed_early = self._pipeline_on(conn, payloads, window, responses)
+                    if timeout is not None:
+                        conn.sock.settimeout(self.pool.timeout)
+                except (OSError, TransportError) as e:
+                    if isinstance(e, socket.timeout):
+                        error: TransportError = TransportTimeout(
+                            f"Timed out waiting for pipelined response from {self.host}:{self.port}"
+                        )
+                    elif isinstance(e, OSError):
+                        error = TransportError(f"Error communicating with {self.host}:{self.port}: {e}")
+                    else:
+                        error = e
+                    # 失敗發生在第 len(responses) 個命令所在的那一段：該段已（部分）送出但未讀完
+                    answered = len(responses)
+                    error.responses = list(responses)
+                    error.in_flight = min(len(commands), (answered // window + 1) * window) - answered
+                    bytes_received += conn.bytes_received
+                    conn.bytes_received = 0
+                    self._record_pipeline(commands, sizes, start, bytes_received, answered, error.in_flight)
+                    if error is e:
+                        raise
+                    raise error from e
+                finally:
+                    bytes_received += conn.bytes_received
+                    conn.bytes_received = 0
+                    if closed_early:
+                        self.pool.discard(conn)
+                    else:
+                        self.pool.release(conn)
+
+                # 重用的連接在任何回應前就被關閉：多半是閒置時被舊版伺服器關閉，換新連接重送一次
+                if closed_early and reused and not responses and attempt == 0:
+                    continue
+                break
+
+            self._record_pipeline(commands, sizes, start, bytes_received, len(responses))
+            return responses
+
+    def _record_pipeline(
+        self,
+        commands: List[Dict[str, Any]],
+        sizes: List[int],
+        start: float,
+        bytes_received: int,
+        answered: int,
+        failed: int = 0
+    ):
+        """
+        記錄管線化請求的統計：前 answered 個命令計為成功，其後 failed 個計為失敗；
+        耗時與接收位元組平均分攤，sizes 為每個命令送出的位元組
+        """
+        total = answered + failed
+        if not total:
+            return
+        elapsed = (time.perf_counter() - start) / total
+        for index, command in enumerate(commands[:total]):
+            self.metrics.record(
+                str(command.get("type", "")), elapsed, sizes[index], bytes_received // total,
+                ok=index < answered
+            )
+
+    def _pipeline_on(
+        self,
+        conn: _Connection,
+        payloads: List[bytes],
+        window: int,
+        responses: List[Dict[str, Any]]
+    ) -> bool:
+        """在指定連接上管線化發送並把回應追加到 responses；返回連接是否被提前關閉"""
+        for offset in range(0, len(payloads), window):
+            chunk = payloads[offset:offset + window]
+            try:
+                conn.sock.sendall(b"".join(payload + b"\n" for payload in chunk))
+            except (BrokenPipeError, ConnectionResetError, ConnectionAbortedError):
+                return True
+            for _ in chunk:
+                try:
+                    raw = self.framing.read(conn)
+                except (ConnectionResetError, ConnectionAbortedError):
+                    return True
+                responses.append(self._parse(raw))
+        return False
+
+    def send_command(
+        self,
+        command_type: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """以 {"type", "parameters"} 格式發送命令（失敗時拋出 TransportError）"""
+        return self.request({"type": command_type, "parameters": params or {}}, timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """返回連接池統計與命令統計"""
+        stats = self.pool.stats()
+        stats.update(self.metrics.snapshot())
+        stats["framing"] = self.framing.name
+        return stats
+
+    def reset_stats(self):
+        """重置所有統計計數"""
+        self.pool.reset_stats()
+        self.metrics.reset()
+
+    def close(self):
+        """關閉所有閒置連接"""
+        self.pool.close()
+
+
+# =============================================================================
+# 共用傳輸實例
+# =============================================================================
+
+_transports: Dict[Tuple[str, int, str], Transport] = {}
+_transports_lock = Lock()
+
+
+def get_transport(
+    host: str = "localhost",
+    port: int = 8080,
+    framing: str = "newline",
+    **kwargs
+) -> Transport:
+    """
+    取得（或建立）共用傳輸實例
+
+    相同 (host, port, framing) 的客戶端共用同一個連接池與統計；
+    超時可在每次 request() 時個別指定。其餘參數只在第一次建立時生效。
+    """
+    key = (host, port, framing)
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = Transport(host, port, framing=framing, **kwargs)
+            _transports[key] = transport
+        return transport
+
+
+def all_transport_stats() -> Dict[str, Dict[str, Any]]:
+    """返回所有共用傳輸的統計，鍵為 "host:port/framing" """
+    with _transports_lock:
+        transports = list(_transports.items())
+    return {
+        f"{host}:{port}/{framing}": transport.stats()
+        for (host, port, framing), transport in transports
+    }
+
+
+def close_all_transports():
+    """關閉並移除所有共用傳輸"""
+    with _transports_lock:
+        transports = list(_transports.values())
+        _transports.clear()
+    for transport in transports:
+        transport.close()
@@ -10,12 +10,14 @@ Grasshopper MCP 工具模組
 """
 
 from .client import GrasshopperClient
+from .async_client import AsyncGrasshopperClient
 from .component_manager import ComponentManager
 from .connection_manager import ConnectionManager
-from .parameter_setter import ParameterSetter
+from .parameter_setter import ParameterSetter, SliderResult
 from .group_manager import GroupManager
 from .parser_utils import MMDParser, JSONGenerator
 from .placement_executor import PlacementExecutor
+from .reconcile import CanvasReconciler, DesiredGraph
 from .utils import (
     load_component_id_map,
     save_component_id_map,
@@ -28,13 +30,17 @@ from .utils import (
 
 __all__ = [
     'GrasshopperClient',
+    'AsyncGrasshopperClient',
     'ComponentManager',
     'ConnectionManager',
     'ParameterSetter',
+    'SliderResult',
     'GroupManager',
     'MMDParser',
     'JSONGenerator',
     'PlacementExecutor',
+    'CanvasReconciler',
+    'DesiredGraph',
     'load_component_id_map',
     'save_component_id_map',
     'load_placement_info',
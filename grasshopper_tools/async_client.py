@@ -0,0 +1,236 @@
+"""
+Grasshopper MCP 非同步通信客戶端
+
+提供與 GrasshopperClient 相同的命令接口，但所有呼叫都是 awaitable，
+大量的 add_component / connect_components 以 asyncio.gather 並發送出，
+由 AsyncTransport 在少數幾條連接上管線化，不佔用執行緒也不阻塞事件迴圈。
+
+用法：
+    async with AsyncGrasshopperClient() as client:
+        slider_id = await client.add_component(guid, 0, 0, "SLIDER_A")
+        await client.connect(slider_id, target_id, target_param="A")
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from grasshopper_mcp.async_transport import AsyncTransport
+from grasshopper_mcp.batch import extract_component_id
+from grasshopper_mcp.transport import TransportError
+
+from .component_manager import ComponentManager
+
+
+class AsyncGrasshopperClient:
+    """Grasshopper MCP 非同步通信客戶端"""
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8080,
+        timeout: Optional[float] = 30.0,
+        max_concurrency: int = 32,
+        pool_size: int = 4,
+        transport: Optional[AsyncTransport] = None
+    ):
+        """
+        初始化非同步客戶端
+
+        Args:
+            host: Grasshopper MCP 服務器地址
+            port: Grasshopper MCP 服務器端口
+            timeout: 單一命令的回應超時（秒）
+            max_concurrency: 同時在途的最大命令數
+            pool_size: 最多開啟的連接數
+            transport: 非同步傳輸實例，如果為 None 則新建
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.transport = transport or AsyncTransport(
+            host,
+            port,
+            timeout=timeout,
+            pool_size=pool_size,
+            pipeline_depth=max(1, max_concurrency // max(1, pool_size)),
+            max_concurrency=max_concurrency,
+        )
+        self.component_id_map: Dict[str, str] = {}
+
+    async def send_command(self, command_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        向 Grasshopper MCP 發送命令
+
+        Args:
+            command_type: 命令類型（如 "add_component", "connect_components"）
+            params: 命令參數字典
+
+        Returns:
+            響應字典，包含 success 和 data/error 字段
+        """
+        command = {
+            "type": command_type,
+            "parameters": params or {}
+        }
+
+        try:
+            return await self.transport.request(command, timeout=self.timeout)
+        except TransportError as e:
+            return {
+                "success": False,
+                "error": f"與 Grasshopper 通信時出錯: {str(e)}"
+            }
+
+    def get_component_id(self, key: str) -> Optional[str]:
+        """從映射中獲取組件實際 ID"""
+        return self.component_id_map.get(key)
+
+    async def add_component(
+        self,
+        guid: str,
+        x: float,
+        y: float,
+        component_id: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        創建組件
+
+        Args:
+            guid: 組件類型 GUID
+            x: X 座標
+            y: Y 座標
+            component_id: 可選的組件 ID（用於映射）
+
+        Returns:
+            創建的組件實際 ID，如果失敗則返回 None
+        """
+        response = await self.send_command("add_component", {
+            "guid": guid,
+            "x": x,
+            "y": y
+        })
+
+        actual_id = extract_component_id(response)
+        if actual_id and component_id:
+            self.component_id_map[component_id] = actual_id
+        if not actual_id:
+            print(f"創建組件失敗: {response.get('error', '未知錯誤')}")
+        return actual_id
+
+    async def connect(
+        self,
+        source_id: str,
+        target_id: str,
+        source_param: Optional[str] = None,
+        target_param: Optional[str] = None
+    ) -> bool:
+        """
+        連接兩個組件
+
+        Args:
+            source_id: 源組件實際 ID
+            target_id: 目標組件實際 ID
+            source_param: 源組件參數名稱
+            target_param: 目標組件參數名稱
+
+        Returns:
+            是否成功連接
+        """
+        params = {
+            "sourceId": source_id,
+            "targetId": target_id
+        }
+        if source_param:
+            params["sourceParam"] = source_param
+        if target_param:
+            params["targetParam"] = target_param
+
+        response = await self.send_command("connect_components", params)
+        if response.get("success"):
+            return True
+        print(f"連接失敗: {response.get('error', '未知錯誤')}")
+        return False
+
+    async def add_components(
+        self,
+        commands: List[Dict[str, Any]],
+        on_success: Optional[Callable[[Dict[str, Any], str], None]] = None
+    ) -> Tuple[int, int]:
+        """
+        並發創建多個組件（placement_info 的 add_component 命令格式）
+
+        Args:
+            commands: add_component 命令列表
+            on_success: 每個組件創建成功後的回調 (命令, 實際組件 ID)；可能寫檔，以 asyncio.to_thread 執行
+
+        Returns:
+            (成功數量, 失敗數量) 元組
+        """
+        async def execute_add(cmd: Dict[str, Any], index: int) -> bool:
+            params, error = ComponentManager.parse_add_command(cmd)
+            if params is None:
+                print(f"  ✗ [{index}/{len(commands)}] 錯誤: {error}")
+                return False
+            component_id = cmd.get("componentId") or None
+            actual_id = await self.add_component(params["guid"], params["x"], params["y"], component_id)
+            if actual_id is None:
+                return False
+            if on_success is not None:
+                await asyncio.to_thread(on_success, cmd, actual_id)
+            return True
+
+        results = await asyncio.gather(*(
+            execute_add(cmd, i) for i, cmd in enumerate(commands, 1)
+        ))
+        success_count = sum(1 for ok in results if ok)
+        return success_count, len(results) - success_count
+
+    async def connect_components(
+        self,
+        commands: List[Dict[str, Any]],
+        on_success: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[int, int]:
+        """
+        並發執行多個 connect_components 命令，sourceId / targetId 先從 ID 映射中查找
+
+        Args:
+            commands: connect_components 命令列表
+            on_success: 每條連接成功後的回調 (命令)；以 asyncio.to_thread 執行
+
+        Returns:
+            (成功數量, 失敗數量) 元組
+        """
+        async def execute_connect(cmd: Dict[str, Any]) -> bool:
+            params = cmd.get("parameters", {})
+            source_key = params.get("sourceId", "")
+            target_key = params.get("targetId", "")
+            source_id = self.get_component_id(source_key)
+            target_id = self.get_component_id(target_key)
+            if not source_id or not target_id:
+                missing = source_key if not source_id else target_key
+                print(f"  ✗ 錯誤: 找不到組件 ID '{missing}'")
+                return False
+            if not await self.connect(
+                source_id,
+                target_id,
+                params.get("sourceParam"),
+                params.get("targetParam")
+            ):
+                return False
+            if on_success is not None:
+                await asyncio.to_thread(on_success, cmd)
+            return True
+
+        results = await asyncio.gather(*(execute_connect(cmd) for cmd in commands))
+        success_count = sum(1 for ok in results if ok)
+        return success_count, len(results) - success_count
+
+    async def close(self):
+        """關閉所有連接"""
+        await self.transport.close()
+
+    async def __aenter__(self) -> "AsyncGrasshopperClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
@@ -75,18 +75,31 @@ except ImportError:
 
 def cmd_execute_placement(args):
     """執行 placement_info.json"""
+    from grasshopper_mcp.tracing import export_metrics, get_tracer
+    
+    if args.metrics_out:
+        get_tracer().enable()
     executor = PlacementExecutor()
     result = executor.execute_placement_info(
         json_path=args.json_path,
         max_workers=args.max_workers,
-        save_id_map=args.save_id_map
+        save_id_map=args.save_id_map,
+        use_batch=args.batch,
+        use_dag=not args.phased,
+        resume=args.resume
     )
     
+    if args.metrics_out:
+        export_metrics(args.metrics_out, label=args.metrics_label)
+        print(f"\n命令統計與追蹤已匯出到: {args.metrics_out}")
+    
     if result["success"]:
         print("\n✓ 所有命令執行成功！")
         sys.exit(0)
     else:
         print("\n⚠️  部分命令失敗")
+        if result.get("journal_path"):
+            print(f"執行日誌: {result['journal_path']}（加上 --resume 重跑可跳過已完成的命令）")
         sys.exit(1)
 
 
@@ -560,6 +573,35 @@ def cmd_get_errors(args):
         print(f"已保存到: {args.output}")
 
 
+def cmd_reconcile(args):
+    """只把期望圖與文檔之間的差異應用到畫布"""
+    from grasshopper_tools.reconcile import CanvasReconciler, DesiredGraph
+    
+    desired = DesiredGraph.load(args.json_path)
+    print(f"期望圖: {len(desired.components)} 個組件，{len(desired.connections)} 條連接")
+    
+    client = GrasshopperClient()
+    comp_mgr = ComponentManager(client)
+    comp_mgr.load_id_map(args.id_map)
+    reconciler = CanvasReconciler(client, comp_mgr)
+    
+    result = reconciler.reconcile(desired, dry_run=args.dry_run, prune=args.prune, max_workers=args.max_workers)
+    if not result["success"]:
+        print(f"\n✗ 同步失敗: {result.get('error', '部分操作失敗')}")
+        if "applied" in result:
+            comp_mgr.save_id_map(args.id_map)
+        sys.exit(1)
+    
+    if args.dry_run:
+        print("\n(dry-run) 未修改文檔")
+    elif "applied" in result:
+        comp_mgr.save_id_map(args.id_map)
+        print("\n✓ 同步完成")
+    else:
+        print("\n✓ 文檔已與期望圖一致")
+    sys.exit(0)
+
+
 def cmd_execute_full_workflow(args):
     """執行完整工作流程：放置組件 -> 設置 Slider -> 群組組件 -> 檢查錯誤"""
     from pathlib import Path
@@ -606,11 +648,16 @@ def cmd_execute_full_workflow(args):
         json_path=str(placement_json),
         max_workers=args.max_workers,
         save_id_map=True,
-        id_map_path=str(id_map_path) if args.id_map else None
+        id_map_path=str(id_map_path) if args.id_map else None,
+        use_batch=args.batch,
+        use_dag=not args.phased,
+        resume=args.resume
     )
     
     if not result["success"]:
         print("\n✗ 步驟 1 失敗，停止執行")
+        if result.get("journal_path"):
+            print(f"執行日誌: {result['journal_path']}（加上 --resume 重跑可跳過已完成的命令）")
         sys.exit(1)
     
     # 步驟 2: 自動設置 Slider
@@ -778,6 +825,9 @@ def main():
   # 執行 placement_info.json（文件在 GH_WIP 目錄下）
   python -m grasshopper_tools.cli execute-placement GH_WIP/placement_info.json
 
+  # 中途失敗後重跑，跳過執行日誌中已完成的命令
+  python -m grasshopper_tools.cli execute-placement GH_WIP/placement_info.json --resume
+
   # 執行完整工作流程（放置 -> 設置 Slider -> 群組 -> 檢查錯誤）
   python -m grasshopper_tools.cli execute-full-workflow GH_WIP/placement_info.json --clear-first
 
@@ -822,6 +872,9 @@ def main():
 
   # 獲取文檔錯誤
   python -m grasshopper_tools.cli get-errors -o errors.json
+
+  # 只把 placement_info / Joseki 與畫布之間的差異應用到文檔（先預覽編輯腳本）
+  python -m grasshopper_tools.cli reconcile GH_WIP/placement_info.json --id-map GH_WIP/component_id_map.json --dry-run
         """
     )
     
@@ -832,6 +885,11 @@ def main():
     parser_execute.add_argument('json_path', help='placement_info.json 文件路徑（例如: GH_WIP/placement_info.json）')
     parser_execute.add_argument('--max-workers', type=int, default=10, help='最大並行線程數')
     parser_execute.add_argument('--no-save-id-map', dest='save_id_map', action='store_false', help='不保存 ID 映射')
+    parser_execute.add_argument('--batch', action='store_true', help='以批次信封一次送出所有命令')
+    parser_execute.add_argument('--phased', action='store_true', help='分兩個階段執行（先全部創建，再全部連接），不按依賴調度')
+    parser_execute.add_argument('--resume', action='store_true', help='根據執行日誌跳過已完成的命令（預設清空日誌從頭執行）')
+    parser_execute.add_argument('--metrics-out', help='開啟追蹤，並把每種命令的延遲分佈 (p50/p95/p99) 與 span 匯出為 JSON')
+    parser_execute.add_argument('--metrics-label', help='匯出 JSON 的標記（例如 commit），方便跨版本比較')
     parser_execute.set_defaults(func=cmd_execute_placement)
     
     # execute-full-workflow 命令
@@ -841,6 +899,9 @@ def main():
     parser_full_workflow.add_argument('--id-map', default='component_id_map.json', help='組件 ID 映射文件路徑（默認: component_id_map.json）')
     parser_full_workflow.add_argument('--max-workers', type=int, default=5, help='最大並行線程數（默認: 5）')
     parser_full_workflow.add_argument('--clear-first', action='store_true', help='執行前先清理 Grasshopper 文檔')
+    parser_full_workflow.add_argument('--batch', action='store_true', help='以批次信封一次送出所有命令')
+    parser_full_workflow.add_argument('--phased', action='store_true', help='分兩個階段執行（先全部創建，再全部連接），不按依賴調度')
+    parser_full_workflow.add_argument('--resume', action='store_true', help='根據執行日誌跳過已完成的命令（預設清空日誌從頭執行）')
     parser_full_workflow.set_defaults(func=cmd_execute_full_workflow)
     
     # parse-mmd 命令
@@ -944,6 +1005,15 @@ def main():
     parser_errors.add_argument('-o', '--output', help='輸出 JSON 文件路徑')
     parser_errors.set_defaults(func=cmd_get_errors)
     
+    # reconcile 命令
+    parser_reconcile = subparsers.add_parser('reconcile', help='比對期望圖與文檔，只執行差異（add / delete / 重新連線 / 設置值）')
+    parser_reconcile.add_argument('json_path', help='placement_info.json 或 Joseki JSON 文件路徑')
+    parser_reconcile.add_argument('--id-map', default='component_id_map.json', help='組件 ID 映射文件路徑（默認: component_id_map.json）')
+    parser_reconcile.add_argument('--dry-run', action='store_true', help='只打印編輯腳本，不修改文檔')
+    parser_reconcile.add_argument('--prune', action='store_true', help='同時刪除不在 ID 映射中的組件')
+    parser_reconcile.add_argument('--max-workers', type=int, default=10, help='最大並行線程數')
+    parser_reconcile.set_defaults(func=cmd_reconcile)
+    
     # 解析參數
     args = parser.parse_args()
     
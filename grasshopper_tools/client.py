@@ -4,25 +4,40 @@ Grasshopper MCP 通信客戶端
 提供統一的 Grasshopper MCP 通信接口
 """
 
-import socket
-import json
 from typing import Dict, Any, Optional
 from threading import Lock
 
+from grasshopper_mcp.flow_control import AdaptiveConcurrencyController, get_flow_controller
+from grasshopper_mcp.transport import Transport, get_transport
+
 
 class GrasshopperClient:
     """Grasshopper MCP 通信客戶端"""
     
-    def __init__(self, host: str = "localhost", port: int = 8080):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8080,
+        timeout: Optional[float] = 30.0,
+        transport: Optional[Transport] = None,
+        flow_control: Optional[AdaptiveConcurrencyController] = None
+    ):
         """
         初始化 Grasshopper 客戶端
         
         Args:
             host: Grasshopper MCP 服務器地址
             port: Grasshopper MCP 服務器端口
+            timeout: 單一命令的讀寫超時（秒）
+            transport: 傳輸層實例，如果為 None 則使用 host:port 的共用傳輸
+            flow_control: 自適應並發控制器，如果為 None 則使用該傳輸的共用控制器
         """
         self.host = host
         self.port = port
+        self.timeout = timeout
+        self.transport = transport or get_transport(host, port)
+        # 根據延遲與錯誤自動調整並發與發送間隔，取代固定的 sleep
+        self.flow_control = flow_control or get_flow_controller(self.transport)
         self._print_lock = Lock()  # 線程安全的打印鎖
     
     def send_command(self, command_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -45,29 +60,8 @@ class GrasshopperClient:
         }
         
         try:
-            # 連接到 Grasshopper MCP
-            client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            client.connect((self.host, self.port))
-            
-            # 發送命令
-            command_json = json.dumps(command, ensure_ascii=False)
-            client.sendall((command_json + "\n").encode("utf-8"))
-            
-            # 接收響應
-            response_data = b""
-            while True:
-                chunk = client.recv(4096)
-                if not chunk:
-                    break
-                response_data += chunk
-                if response_data.endswith(b"\n"):
-                    break
-            
-            # 處理可能的 BOM
-            response_str = response_data.decode("utf-8-sig").strip()
-            response = json.loads(response_str)
-            client.close()
-            return response
+            with self.flow_control.slot(command_type):
+                return self.transport.request(command, timeout=self.timeout)
         except Exception as e:
             return {
                 "success": False,
@@ -4,13 +4,14 @@
 提供組件的創建、查詢、刪除等功能
 """
 
-import time
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+
+from grasshopper_mcp.tracing import get_tracer
 
 from .client import GrasshopperClient
-from .utils import save_component_id_map
+from .id_map import ComponentIdMap
+from .utils import default_component_id_map_path
 
 
 class ComponentManager:
@@ -24,8 +25,8 @@ class ComponentManager:
             client: Grasshopper 客戶端實例，如果為 None 則創建新實例
         """
         self.client = client or GrasshopperClient()
-        self.component_id_map: Dict[str, str] = {}
-        self._map_lock = Lock()  # 保護 component_id_map 的鎖
+        # 讀取不加鎖；load_id_map / save_id_map 之後的寫入增量追加到映射文件的日誌
+        self.component_id_map = ComponentIdMap()
     
     def add_component(self, guid: str, x: float, y: float, component_id: Optional[str] = None) -> Optional[str]:
         """
@@ -49,15 +50,95 @@ class ComponentManager:
         if response.get("success"):
             actual_id = self.client.extract_component_id(response)
             if actual_id and component_id:
-                with self._map_lock:
-                    self.component_id_map[component_id] = actual_id
+                self.component_id_map[component_id] = actual_id
             return actual_id
         else:
             error = response.get("error", "未知錯誤")
             self.client.safe_print(f"創建組件失敗: {error}")
             return None
     
-    def add_components_parallel(self, commands: List[Dict[str, Any]], max_workers: int = 10) -> Tuple[int, int]:
+    @staticmethod
+    def parse_add_command(cmd: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        解析 add_component 命令的參數
+        
+        支持兩種格式：
+        1. 直接格式: {"guid": "...", "x": 100, "y": 50}
+        2. parameters 格式: {"parameters": {"guid": "...", "x": 100, "y": 50}}
+        
+        Args:
+            cmd: placement_info 中的 add_component 命令
+        
+        Returns:
+            ({"guid", "x", "y"}, None) 或 (None, 錯誤信息)
+        """
+        parameters = cmd.get("parameters", {})
+        if parameters:
+            # 從 parameters 中提取
+            guid = parameters.get("guid") or cmd.get("guid")
+            x = parameters.get("x") if "x" in parameters else cmd.get("x")
+            y = parameters.get("y") if "y" in parameters else cmd.get("y")
+        else:
+            # 直接從命令中提取
+            guid = cmd.get("guid")
+            x = cmd.get("x")
+            y = cmd.get("y")
+        
+        if not guid:
+            return None, "缺少 GUID"
+        
+        # 確保 x 和 y 是 float 類型
+        if x is None or not isinstance(x, (int, float)):
+            return None, "無效的 x 座標"
+        if y is None or not isinstance(y, (int, float)):
+            return None, "無效的 y 座標"
+        
+        return {"guid": guid, "x": float(x), "y": float(y)}, None
+    
+    def add_from_command(self, cmd: Dict[str, Any], index: int = 1, total: int = 1) -> Tuple[bool, Optional[str]]:
+        """
+        執行一個 placement_info 的 add_component 命令
+        
+        Args:
+            cmd: add_component 命令
+            index: 命令序號（用於輸出）
+            total: 命令總數（用於輸出）
+        
+        Returns:
+            (是否成功, 實際組件 ID) 元組
+        """
+        component_id = cmd.get("componentId", "")
+        
+        params, error = self.parse_add_command(cmd)
+        if params is None:
+            self.client.safe_print(f"  ✗ [{index}/{total}] 錯誤: {error}")
+            return False, None
+        
+        guid = params["guid"]
+        x_float = params["x"]
+        y_float = params["y"]
+        
+        comment = cmd.get("comment", component_id or f"組件 {index}")
+        self.client.safe_print(f"  [{index}/{total}] 創建組件: {comment} (GUID: {guid[:8]}...)")
+        
+        # 發送速率由 client.flow_control 根據延遲自動調整
+        with get_tracer().span("component_manager.add", component=component_id) as span:
+            actual_id = self.add_component(guid, x_float, y_float, component_id)
+            span.set(ok=bool(actual_id))
+        
+        if actual_id:
+            self.client.safe_print(f"      ✓ 成功創建，ID: {actual_id}")
+            return True, actual_id
+        else:
+            self.client.safe_print("      ✗ 創建失敗")
+            return False, None
+    
+    def add_components_parallel(
+        self,
+        commands: List[Dict[str, Any]],
+        max_workers: int = 10,
+        on_success: Optional[Callable[[Dict[str, Any], str], None]] = None
+    ) -> Tuple[int, int]:
         """
         並行創建多個組件
         
@@ -68,6 +149,7 @@ class ComponentManager:
                 - y: Y 座標
                 - componentId: 可選的組件 ID（用於映射）
             max_workers: 最大並行線程數
+            on_success: 每個組件創建成功後的回調 (命令, 實際組件 ID)
         
         Returns:
             (成功數量, 失敗數量) 元組
@@ -75,57 +157,12 @@ class ComponentManager:
         success_count = 0
         fail_count = 0
         
-        def execute_add(cmd: Dict[str, Any], index: int, total: int) -> Tuple[bool, Optional[str]]:
-            component_id = cmd.get("componentId", "")
-            
-            # 支持兩種格式：
-            # 1. 直接格式: {"guid": "...", "x": 100, "y": 50}
-            # 2. parameters 格式: {"parameters": {"guid": "...", "x": 100, "y": 50}}
-            parameters = cmd.get("parameters", {})
-            if parameters:
-                # 從 parameters 中提取
-                guid = parameters.get("guid") or cmd.get("guid")
-                x = parameters.get("x") if "x" in parameters else cmd.get("x")
-                y = parameters.get("y") if "y" in parameters else cmd.get("y")
-            else:
-                # 直接從命令中提取
-                guid = cmd.get("guid")
-                x = cmd.get("x")
-                y = cmd.get("y")
-            
-            if not guid:
-                self.client.safe_print(f"  ✗ [{index}/{total}] 錯誤: 缺少 GUID")
-                return False, None
-            
-            # 確保 x 和 y 是 float 類型
-            if x is None or not isinstance(x, (int, float)):
-                self.client.safe_print(f"  ✗ [{index}/{total}] 錯誤: 無效的 x 座標")
-                return False, None
-            if y is None or not isinstance(y, (int, float)):
-                self.client.safe_print(f"  ✗ [{index}/{total}] 錯誤: 無效的 y 座標")
-                return False, None
-            
-            x_float = float(x)
-            y_float = float(y)
-            
-            comment = cmd.get("comment", component_id or f"組件 {index}")
-            self.client.safe_print(f"  [{index}/{total}] 創建組件: {comment} (GUID: {guid[:8]}...)")
-            
-            actual_id = self.add_component(guid, x_float, y_float, component_id)
-            
-            # 添加延遲，避免 Grasshopper 處理過快
-            time.sleep(0.05)  # 50 毫秒延遲
-            
-            if actual_id:
-                self.client.safe_print(f"      ✓ 成功創建，ID: {actual_id}")
-                return True, actual_id
-            else:
-                self.client.safe_print("      ✗ 創建失敗")
-                return False, None
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tracer = get_tracer()
+        with tracer.span("component_manager.add_components", commands=len(commands)), \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            add_from_command = tracer.bind(self.add_from_command)
             future_to_command = {
-                executor.submit(execute_add, cmd, i, len(commands)): (i, cmd)
+                executor.submit(add_from_command, cmd, i, len(commands)): (i, cmd)
                 for i, cmd in enumerate(commands, 1)
             }
             
@@ -135,6 +172,8 @@ class ComponentManager:
                     success, actual_id = future.result()
                     if success:
                         success_count += 1
+                        if on_success is not None:
+                            on_success(cmd, actual_id)
                     else:
                         fail_count += 1
                 except Exception as e:
@@ -159,10 +198,7 @@ class ComponentManager:
         
         if response.get("success"):
             # 從映射中移除
-            with self._map_lock:
-                keys_to_remove = [k for k, v in self.component_id_map.items() if v == component_id]
-                for key in keys_to_remove:
-                    del self.component_id_map[key]
+            self.component_id_map.remove_id(component_id)
             return True
         else:
             error = response.get("error", "未知錯誤")
@@ -290,19 +326,40 @@ class ComponentManager:
         Returns:
             實際組件 ID，如果未找到則返回 None
         """
-        with self._map_lock:
-            return self.component_id_map.get(component_id)
+        return self.component_id_map.get(component_id)
+    
+    def register_component_id(self, component_id: str, actual_id: str):
+        """
+        記錄組件 ID 映射
+        
+        Args:
+            component_id: 組件 ID 鍵
+            actual_id: Grasshopper 中的實際組件 ID
+        """
+        self.component_id_map[component_id] = actual_id
     
     def save_id_map(self, file_path: Optional[str] = None):
-        """保存組件 ID 映射到文件"""
-        with self._map_lock:
-            save_component_id_map(self.component_id_map, file_path)
+        """
+        保存組件 ID 映射到文件（原子地寫入完整快照並清空日誌）
+        
+        之後的修改增量追加到 <file_path>.log，直到下一次保存或日誌達到壓縮閾值
+        """
+        file_path = file_path or default_component_id_map_path()
+        try:
+            self.component_id_map.compact(file_path)
+            print(f"組件 ID 映射已保存到: {file_path}")
+        except Exception as e:
+            print(f"保存組件 ID 映射失敗: {e}")
     
     def load_id_map(self, file_path: Optional[str] = None):
-        """從文件加載組件 ID 映射"""
-        from .utils import load_component_id_map
-        loaded_map = load_component_id_map(file_path)
-        if loaded_map:
-            with self._map_lock:
-                self.component_id_map.update(loaded_map)
+        """
+        從文件加載組件 ID 映射（快照 + 尚未壓縮的日誌）
+        
+        之後的修改增量追加到 <file_path>.log
+        """
+        file_path = file_path or default_component_id_map_path()
+        try:
+            self.component_id_map.load(file_path)
+        except Exception as e:
+            print(f"讀取組件 ID 映射文件失敗: {e}")
 
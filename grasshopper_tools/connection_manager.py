@@ -4,10 +4,11 @@
 提供組件連接的創建、修正、錯誤檢查等功能
 """
 
-import time
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from grasshopper_mcp.tracing import get_tracer
+
 from .client import GrasshopperClient
 from .component_manager import ComponentManager
 
@@ -85,7 +86,63 @@ class ConnectionManager:
             self.client.safe_print(f"連接失敗: {error}")
             return False
     
-    def connect_components_parallel(self, commands: List[Dict[str, Any]], max_workers: int = 10) -> Tuple[int, int]:
+    def connect_from_command(self, cmd: Dict[str, Any], index: int = 1, total: int = 1) -> bool:
+        """
+        執行一個 placement_info 的 connect_components 命令（sourceId / targetId 從 ID 映射中查找）
+        
+        Args:
+            cmd: connect_components 命令
+            index: 命令序號（用於輸出）
+            total: 命令總數（用於輸出）
+        
+        Returns:
+            是否成功連接
+        """
+        params = cmd.get("parameters", {})
+        params.get("sourceId", "")
+        params.get("targetId", "")
+        source_id_key = params.get("sourceId", "")  # 如果使用映射，這裡應該是鍵
+        target_id_key = params.get("targetId", "")
+        source_param = params.get("sourceParam")
+        target_param = params.get("targetParam")
+        
+        # 嘗試從映射中獲取實際 ID
+        actual_source_id = self.component_manager.get_component_id(source_id_key)
+        actual_target_id = self.component_manager.get_component_id(target_id_key)
+        
+        if not actual_source_id:
+            self.client.safe_print(f"  ✗ [{index}/{total}] 錯誤: 找不到源組件 ID '{source_id_key}'")
+            return False
+        
+        if not actual_target_id:
+            self.client.safe_print(f"  ✗ [{index}/{total}] 錯誤: 找不到目標組件 ID '{target_id_key}'")
+            return False
+        
+        comment = cmd.get("comment", f"{source_id_key} -> {target_id_key}")
+        self.client.safe_print(f"  [{index}/{total}] 連接: {comment}")
+        
+        with get_tracer().span("connection_manager.connect", source=source_id_key, target=target_id_key) as span:
+            success = self.connect_components(
+                actual_source_id,
+                actual_target_id,
+                source_param,
+                target_param
+            )
+            span.set(ok=success)
+        
+        if success:
+            self.client.safe_print("      ✓ 連接成功")
+        else:
+            self.client.safe_print("      ✗ 連接失敗")
+        
+        return success
+    
+    def connect_components_parallel(
+        self,
+        commands: List[Dict[str, Any]],
+        max_workers: int = 10,
+        on_success: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Tuple[int, int]:
         """
         並行連接多個組件
         
@@ -96,6 +153,7 @@ class ConnectionManager:
                 - sourceParam: 源組件參數名稱
                 - targetParam: 目標組件參數名稱
             max_workers: 最大並行線程數
+            on_success: 每條連接成功後的回調 (命令)
         
         Returns:
             (成功數量, 失敗數量) 元組
@@ -103,50 +161,12 @@ class ConnectionManager:
         success_count = 0
         fail_count = 0
         
-        def execute_connect(cmd: Dict[str, Any], index: int, total: int) -> bool:
-            params = cmd.get("parameters", {})
-            params.get("sourceId", "")
-            params.get("targetId", "")
-            source_id_key = params.get("sourceId", "")  # 如果使用映射，這裡應該是鍵
-            target_id_key = params.get("targetId", "")
-            source_param = params.get("sourceParam")
-            target_param = params.get("targetParam")
-            
-            # 嘗試從映射中獲取實際 ID
-            actual_source_id = self.component_manager.get_component_id(source_id_key)
-            actual_target_id = self.component_manager.get_component_id(target_id_key)
-            
-            if not actual_source_id:
-                self.client.safe_print(f"  ✗ [{index}/{total}] 錯誤: 找不到源組件 ID '{source_id_key}'")
-                return False
-            
-            if not actual_target_id:
-                self.client.safe_print(f"  ✗ [{index}/{total}] 錯誤: 找不到目標組件 ID '{target_id_key}'")
-                return False
-            
-            comment = cmd.get("comment", f"{source_id_key} -> {target_id_key}")
-            self.client.safe_print(f"  [{index}/{total}] 連接: {comment}")
-            
-            success = self.connect_components(
-                actual_source_id,
-                actual_target_id,
-                source_param,
-                target_param
-            )
-            
-            # 添加延遲，避免 Grasshopper 處理過快
-            time.sleep(0.05)  # 50 毫秒延遲
-            
-            if success:
-                self.client.safe_print("      ✓ 連接成功")
-            else:
-                self.client.safe_print("      ✗ 連接失敗")
-            
-            return success
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tracer = get_tracer()
+        with tracer.span("connection_manager.connect_components", commands=len(commands)), \
+                ThreadPoolExecutor(max_workers=max_workers) as executor:
+            connect_from_command = tracer.bind(self.connect_from_command)
             future_to_command = {
-                executor.submit(execute_connect, cmd, i, len(commands)): (i, cmd)
+                executor.submit(connect_from_command, cmd, i, len(commands)): (i, cmd)
                 for i, cmd in enumerate(commands, 1)
             }
             
@@ -155,6 +175,8 @@ class ConnectionManager:
                 try:
                     if future.result():
                         success_count += 1
+                        if on_success is not None:
+                            on_success(cmd)
                     else:
                         fail_count += 1
                 except Exception as e:
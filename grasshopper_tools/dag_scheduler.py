@@ -0,0 +1,266 @@
+"""
+Placement DAG 調度器
+
+placement_info.json 的命令構成一個依賴圖：每個 connect_components 依賴創建其
+sourceId / targetId 的 add_component。分階段執行（先全部創建、再全部連接）時，
+一條連接必須等整個創建階段結束；DagScheduler 則在兩個端點都創建完成後立即
+開始該連接，讓創建與連接重疊。
+
+- 新解鎖的任務排在就緒佇列最前面，下一個空閒的工作執行緒就會執行它
+- 端點創建失敗的連接直接標記為跳過，不再發送
+- 每個任務開始 / 完成 / 失敗 / 跳過時發出 ProgressEvent
+- 執行結束後按實際耗時計算關鍵路徑（無限並行時的最短完成時間）
+
+用法：
+    graph = PlacementGraph.from_commands(add_commands, connect_commands)
+    scheduler = DagScheduler(graph, max_workers=10, on_progress=print)
+    report = scheduler.run(execute)      # execute(task) -> bool
+    report.critical_path                 # [PlacementTask, ...]
+"""
+
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+TASK_ADD = "add"
+TASK_CONNECT = "connect"
+
+EVENT_STARTED = "started"
+EVENT_COMPLETED = "completed"
+EVENT_FAILED = "failed"
+EVENT_SKIPPED = "skipped"
+
+
+@dataclass
+class PlacementTask:
+    """依賴圖中的一個命令"""
+    index: int
+    kind: str
+    command: Dict[str, Any]
+    label: str
+    deps: List[int] = field(default_factory=list)
+    dependents: List[int] = field(default_factory=list)
+    status: str = "pending"
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class ProgressEvent:
+    """任務進度事件"""
+    event: str
+    task: PlacementTask
+    done: int
+    total: int
+    elapsed: float
+
+
+@dataclass
+class ScheduleReport:
+    """調度執行結果"""
+    tasks: List[PlacementTask]
+    makespan: float
+    critical_path: List[PlacementTask]
+
+    def _count(self, kind: str, status: str) -> int:
+        return sum(1 for task in self.tasks if task.kind == kind and task.status == status)
+
+    @property
+    def add_success(self) -> int:
+        return self._count(TASK_ADD, EVENT_COMPLETED)
+
+    @property
+    def connect_success(self) -> int:
+        return self._count(TASK_CONNECT, EVENT_COMPLETED)
+
+    @property
+    def skipped(self) -> int:
+        return sum(1 for task in self.tasks if task.status == EVENT_SKIPPED)
+
+    @property
+    def critical_path_time(self) -> float:
+        return sum(task.duration for task in self.critical_path)
+
+    @property
+    def work(self) -> float:
+        """所有任務耗時總和"""
+        return sum(task.duration for task in self.tasks)
+
+    def last_finish(self, kind: str) -> float:
+        """某類任務最後完成的時間點（相對開始，秒）"""
+        return max((task.finished_at for task in self.tasks
+                    if task.kind == kind and task.finished_at is not None), default=0.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "makespan": round(self.makespan, 4),
+            "work": round(self.work, 4),
+            "parallelism": round(self.work / self.makespan, 2) if self.makespan else 0.0,
+            "skipped": self.skipped,
+            "critical_path_time": round(self.critical_path_time, 4),
+            "critical_path": [
+                {"kind": task.kind, "label": task.label, "duration": round(task.duration, 4)}
+                for task in self.critical_path
+            ],
+        }
+
+
+class PlacementGraph:
+    """placement_info 命令的依賴圖"""
+
+    def __init__(self, tasks: List[PlacementTask]):
+        self.tasks = tasks
+
+    @classmethod
+    def from_commands(
+        cls,
+        add_commands: List[Dict[str, Any]],
+        connect_commands: List[Dict[str, Any]]
+    ) -> "PlacementGraph":
+        """
+        建立依賴圖
+
+        連接的端點若不是由本次 placement 創建（已在 ID 映射中，或根本不存在），
+        則不產生依賴，由執行函數自行查找 / 報錯。
+        """
+        tasks: List[PlacementTask] = []
+        creator: Dict[str, int] = {}
+
+        for cmd in add_commands:
+            key = cmd.get("componentId") or ""
+            task = PlacementTask(len(tasks), TASK_ADD, cmd, cmd.get("comment") or key or f"組件 {len(tasks) + 1}")
+            if key:
+                # 重複的 componentId 以最後一個為準，與 ID 映射的覆蓋行為一致
+                creator[key] = task.index
+            tasks.append(task)
+
+        for cmd in connect_commands:
+            params = cmd.get("parameters", {})
+            source_key = params.get("sourceId", "")
+            target_key = params.get("targetId", "")
+            task = PlacementTask(len(tasks), TASK_CONNECT, cmd, cmd.get("comment") or f"{source_key} -> {target_key}")
+            for key in (source_key, target_key):
+                dep = creator.get(key)
+                if dep is not None and dep not in task.deps:
+                    task.deps.append(dep)
+                    tasks[dep].dependents.append(task.index)
+            tasks.append(task)
+
+        return cls(tasks)
+
+    def critical_path(self) -> List[PlacementTask]:
+        """按實際耗時計算的最長依賴鏈（任務按索引排列時依賴總在前面）"""
+        finish: List[float] = []
+        previous: List[Optional[int]] = []
+        for task in self.tasks:
+            best = max(task.deps, key=lambda dep: finish[dep], default=None)
+            previous.append(best)
+            finish.append(task.duration + (finish[best] if best is not None else 0.0))
+        if not finish:
+            return []
+        index: Optional[int] = max(range(len(finish)), key=finish.__getitem__)
+        path: List[PlacementTask] = []
+        while index is not None:
+            path.append(self.tasks[index])
+            index = previous[index]
+        return list(reversed(path))
+
+
+class DagScheduler:
+    """以執行緒池按依賴順序執行 PlacementGraph"""
+
+    def __init__(
+        self,
+        graph: PlacementGraph,
+        max_workers: int = 10,
+        on_progress: Optional[Callable[[ProgressEvent], None]] = None
+    ):
+        """
+        Args:
+            graph: 依賴圖
+            max_workers: 最大並行線程數
+            on_progress: 進度事件回調（在調度執行緒中呼叫）
+        """
+        self.graph = graph
+        self.max_workers = max(1, max_workers)
+        self.on_progress = on_progress
+        self._start = 0.0
+        self._done = 0
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._start
+
+    def _emit(self, event: str, task: PlacementTask):
+        if self.on_progress is not None:
+            self.on_progress(ProgressEvent(event, task, self._done, len(self.graph.tasks), self._now()))
+
+    def _finish(self, task: PlacementTask, status: str, ready: Deque[PlacementTask], remaining: List[int]):
+        task.status = status
+        self._done += 1
+        self._emit(status, task)
+        for index in task.dependents:
+            dependent = self.graph.tasks[index]
+            if status != EVENT_COMPLETED and dependent.error is None:
+                dependent.error = f"依賴的組件未創建: {task.label}"
+            remaining[index] -= 1
+            if remaining[index] == 0:
+                # 剛解鎖的任務優先執行
+                ready.appendleft(dependent)
+
+    def run(self, execute: Callable[[PlacementTask], bool]) -> ScheduleReport:
+        """
+        執行所有任務
+
+        Args:
+            execute: 執行單一任務的函數，返回是否成功（可以拋出異常，視為失敗）
+
+        Returns:
+            ScheduleReport
+        """
+        tasks = self.graph.tasks
+        remaining = [len(task.deps) for task in tasks]
+        ready: Deque[PlacementTask] = deque(task for task in tasks if not task.deps)
+        self._start = time.perf_counter()
+        self._done = 0
+
+        def run_task(task: PlacementTask) -> bool:
+            task.started_at = self._now()
+            try:
+                return bool(execute(task))
+            finally:
+                task.finished_at = self._now()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {}
+            while ready or running:
+                while ready and len(running) < self.max_workers:
+                    task = ready.popleft()
+                    if task.error is not None:
+                        self._finish(task, EVENT_SKIPPED, ready, remaining)
+                        continue
+                    task.status = "running"
+                    self._emit(EVENT_STARTED, task)
+                    running[pool.submit(run_task, task)] = task
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        ok = future.result()
+                    except Exception as e:
+                        task.error = str(e)
+                        ok = False
+                    self._finish(task, EVENT_COMPLETED if ok else EVENT_FAILED, ready, remaining)
+
+        return ScheduleReport(tasks, self._now(), self.graph.critical_path())
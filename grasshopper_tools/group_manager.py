@@ -4,7 +4,6 @@
 提供組件群組的創建和管理功能
 """
 
-import time
 from typing import Dict, Any, Optional, List, Tuple
 
 from .client import GrasshopperClient
@@ -133,8 +132,6 @@ class GroupManager:
                 success_count += 1
             else:
                 fail_count += 1
-            
-            time.sleep(0.2)
         
         return success_count, fail_count
 
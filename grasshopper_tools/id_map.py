@@ -0,0 +1,221 @@
+"""
+組件 ID 映射（無鎖讀取、增量持久化）
+
+ComponentManager 的 componentId → 實際組件 ID 映射在每條連接時都會被多個工作執行緒查詢，
+而寫入只發生在每個組件創建成功時。ComponentIdMap：
+
+- 讀取不加鎖：CPython 中單個 dict 的 get / in / len / 複製都是原子操作，
+  寫入者在鎖內修改 dict，讀取者永遠看到一致的值
+- 寫入在一個小鎖內修改 dict 並追加一行到日誌文件 <path>.log（JSON Lines），
+  不再每次重寫整個 JSON
+- compact() 把完整映射以臨時文件 + os.replace 原子地寫回 <path>，並清空日誌；
+  日誌行數超過 compact_threshold 時自動壓縮
+- load() 以一次 json.load 讀取快照，再重放日誌；日誌末尾不完整的一行被忽略
+
+<path> 本身始終是普通的 {key: id} JSON，其他腳本（load_component_id_map、json.load）
+讀取方式不變；尚未壓縮的修改只在日誌中。
+
+用法：
+    id_map = ComponentIdMap()
+    id_map.load("GH_WIP/component_id_map.json")    # 之後的寫入追加到 .log
+    id_map["SLIDER_A"] = actual_id
+    id_map.get("SLIDER_A")
+    id_map.compact()
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterator, List, MutableMapping, Optional
+
+# 日誌中表示刪除的值
+_DELETED = None
+
+
+class ComponentIdMap(MutableMapping[str, str]):
+    """讀取不加鎖、寫入追加到日誌的組件 ID 映射"""
+
+    def __init__(self, path: Optional[str] = None, compact_threshold: int = 1000):
+        """
+        Args:
+            path: 快照 JSON 路徑；None 表示只在記憶體中（直到 load / compact 指定路徑）
+            compact_threshold: 日誌行數超過此值時自動壓縮
+        """
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self._data: Dict[str, str] = {}
+        self._write_lock = threading.Lock()
+        self._log = None
+        self._log_lines = 0
+        self._appends = 0
+        self._compactions = 0
+
+    @staticmethod
+    def log_path(path: str) -> str:
+        return path + ".log"
+
+    # -------------------------------------------------------------------------
+    # 讀取（不加鎖）
+    # -------------------------------------------------------------------------
+
+    def __getitem__(self, key: str) -> str:
+        return self._data[key]
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return self._data.get(key, default)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[str]:
+        # 迭代快照，寫入者同時修改時不會拋出 "dictionary changed size during iteration"
+        return iter(list(self._data))
+
+    def snapshot(self) -> Dict[str, str]:
+        """映射的一致副本"""
+        return self._data.copy()
+
+    # -------------------------------------------------------------------------
+    # 寫入
+    # -------------------------------------------------------------------------
+
+    def __setitem__(self, key: str, actual_id: str):
+        with self._write_lock:
+            if self._data.get(key) == actual_id:
+                return
+            self._data[key] = actual_id
+            self._append({"k": key, "v": actual_id})
+
+    def __delitem__(self, key: str):
+        with self._write_lock:
+            del self._data[key]
+            self._append({"k": key, "v": _DELETED})
+
+    def update_many(self, mapping: Dict[str, str]):
+        """一次寫入多個映射（持有一次鎖）"""
+        with self._write_lock:
+            for key, actual_id in mapping.items():
+                if self._data.get(key) != actual_id:
+                    self._data[key] = actual_id
+                    self._append({"k": key, "v": actual_id})
+
+    def remove_id(self, actual_id: str) -> List[str]:
+        """移除所有指向 actual_id 的鍵，返回被移除的鍵"""
+        with self._write_lock:
+            keys = [key for key, value in self._data.items() if value == actual_id]
+            for key in keys:
+                del self._data[key]
+                self._append({"k": key, "v": _DELETED})
+            return keys
+
+    def _append(self, entry: Dict[str, Optional[str]]):
+        """在寫入鎖內追加日誌行；沒有路徑時只更新記憶體"""
+        if self.path is None:
+            return
+        if self._log is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._log = open(self.log_path(self.path), "a", encoding="utf-8")
+        self._log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._log.flush()
+        self._log_lines += 1
+        self._appends += 1
+        if self._log_lines >= self.compact_threshold:
+            self._compact_locked(self.path)
+
+    # -------------------------------------------------------------------------
+    # 持久化
+    # -------------------------------------------------------------------------
+
+    def load(self, path: Optional[str] = None) -> int:
+        """
+        讀取快照並重放日誌，合併到目前的映射；之後的寫入追加到此路徑的日誌
+
+        Returns:
+            讀取的映射數量（快照 + 日誌重放後）
+        """
+        path = path or self.path
+        if path is None:
+            raise ValueError("ComponentIdMap.load 需要路徑")
+        loaded: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+        lines = 0
+        log_path = self.log_path(path)
+        if os.path.exists(log_path):
+            with open(log_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 寫入中斷留下的半行
+                        continue
+                    lines += 1
+                    if entry.get("v") is _DELETED:
+                        loaded.pop(entry.get("k"), None)
+                    else:
+                        loaded[entry["k"]] = entry["v"]
+
+        with self._write_lock:
+            if path != self.path:
+                self._close_log()
+                self.path = path
+            self._data.update(loaded)
+            self._log_lines = lines
+        return len(loaded)
+
+    def compact(self, path: Optional[str] = None) -> str:
+        """
+        把完整映射原子地寫入快照並清空日誌
+
+        Args:
+            path: 快照路徑，None 使用目前路徑；指定新路徑時之後的寫入追加到新路徑的日誌
+
+        Returns:
+            寫入的快照路徑
+        """
+        with self._write_lock:
+            return self._compact_locked(path or self.path)
+
+    def _compact_locked(self, path: Optional[str]) -> str:
+        if path is None:
+            raise ValueError("ComponentIdMap.compact 需要路徑")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, indent=2, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+        # 快照已包含所有修改，日誌可以丟棄；換到新路徑時舊路徑的快照 + 日誌保持原樣
+        self._close_log()
+        if os.path.exists(self.log_path(path)):
+            os.remove(self.log_path(path))
+        self.path = path
+        self._log_lines = 0
+        self._compactions += 1
+        return path
+
+    def _close_log(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def close(self):
+        with self._write_lock:
+            self._close_log()
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "size": len(self._data),
+            "path": self.path,
+            "log_lines": self._log_lines,
+            "appends": self._appends,
+            "compactions": self._compactions,
+        }
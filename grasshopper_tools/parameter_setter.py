@@ -4,14 +4,30 @@
 提供組件參數設置功能，包括 Number Slider 和 Vector XYZ 等
 """
 
-import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Dict, Any, Optional, List, Tuple
 
+from grasshopper_mcp.batch import MODE_NATIVE, BatchExecutor, CommandBatch
+
 from .client import GrasshopperClient
 from .component_manager import ComponentManager
 from .utils import determine_slider_range
 
 
+@dataclass
+class SliderResult:
+    """單一 Slider 的設置結果"""
+    key: str
+    value: str
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    rounding: Optional[float] = None
+    component_id: Optional[str] = None
+    success: bool = False
+    error: Optional[str] = None
+
+
 class ParameterSetter:
     """參數設置器"""
     
@@ -195,43 +211,135 @@ class ParameterSetter:
         Returns:
             是否全部成功設置
         """
+        # 依序設置三個軸；發送間隔由 client.flow_control 根據延遲自動調整
         success_x = self.set_component_value("", str(x), "X", component_id_key=component_id_key)
-        time.sleep(0.05)
         success_y = self.set_component_value("", str(y), "Y", component_id_key=component_id_key)
-        time.sleep(0.05)
         success_z = self.set_component_value("", str(z), "Z", component_id_key=component_id_key)
         
         return success_x and success_y and success_z
     
-    def set_sliders_batch(self, slider_configs: List[Tuple[str, str, Optional[float], Optional[float], float]]) -> Tuple[int, int]:
+    def configure_sliders(
+        self,
+        slider_configs: List[Tuple[str, str, Optional[float], Optional[float], float]],
+        max_workers: int = 8,
+        auto_range: bool = True
+    ) -> List[SliderResult]:
+        """
+        批量設置多個 Slider 的範圍與值
+
+        每個 Slider 發送一對 set_slider_properties（先範圍、再值，避免值被 clamp 到舊範圍），
+        所有命令以批次送出：
+        - 伺服器支援 batch 信封時，全部 Slider 在一次往返內完成
+        - 否則把 Slider 分組並行發送，每組在一條連接上管線化（舊版伺服器逐一發送）；
+          同一個 Slider 的兩個命令始終在同一組內按順序執行
+        - 組數取 client.flow_control 當前的並發窗口（不超過 max_workers），
+          每組的每一波命令都佔用控制器的一個名額
+
+        Args:
+            slider_configs: Slider 配置列表，每個配置為：
+                (component_id_key, value, min_value, max_value, rounding)
+            max_workers: 無 batch 支援時並行組數的上限
+            auto_range: min / max 為 None 時是否根據名稱自動確定範圍
+
+        Returns:
+            與 slider_configs 順序相同的 SliderResult 列表
+        """
+        results: List[SliderResult] = []
+        pending: List[SliderResult] = []
+
+        for config in slider_configs:
+            result = SliderResult(
+                key=config[0],
+                value=str(config[1]),
+                min_value=config[2] if len(config) > 2 else None,
+                max_value=config[3] if len(config) > 3 else None,
+                rounding=config[4] if len(config) > 4 else 0.1
+            )
+            results.append(result)
+
+            if auto_range and (result.min_value is None or result.max_value is None):
+                try:
+                    min_val, max_val = determine_slider_range(result.key, float(result.value))
+                except ValueError:
+                    result.error = f"無效的 Slider 值: {result.value}"
+                    continue
+                if result.min_value is None:
+                    result.min_value = min_val
+                if result.max_value is None:
+                    result.max_value = max_val
+
+            result.component_id = self.component_manager.get_component_id(result.key)
+            if not result.component_id:
+                result.error = f"找不到組件 ID '{result.key}'"
+                continue
+            pending.append(result)
+
+        if not pending:
+            return results
+
+        executor = BatchExecutor(
+            self.client.transport, timeout=self.client.timeout, flow_control=self.client.flow_control
+        )
+        mode = executor.detect_mode()
+        if mode == MODE_NATIVE:
+            groups = [pending]
+        else:
+            group_count = max(1, min(max_workers, int(executor.flow_control.limit), len(pending)))
+            groups = [pending[i::group_count] for i in range(group_count)]
+
+        def run_group(group: List[SliderResult]):
+            batch = CommandBatch()
+            for result in group:
+                range_params: Dict[str, Any] = {"id": result.component_id}
+                if result.min_value is not None:
+                    range_params["min"] = result.min_value
+                if result.max_value is not None:
+                    range_params["max"] = result.max_value
+                if result.rounding is not None:
+                    range_params["rounding"] = result.rounding
+                batch.add("set_slider_properties", range_params)
+                batch.add("set_slider_properties", {"id": result.component_id, "value": result.value})
+
+            responses = executor.execute(batch, mode=mode).results
+            for i, result in enumerate(group):
+                failed = [r for r in responses[2 * i:2 * i + 2] if not r.get("success")]
+                result.success = not failed
+                if failed:
+                    result.error = str(failed[0].get("error", "未知錯誤"))
+
+        if len(groups) == 1:
+            run_group(groups[0])
+        else:
+            with ThreadPoolExecutor(max_workers=len(groups)) as pool:
+                list(pool.map(run_group, groups))
+
+        return results
+
+    def set_sliders_batch(
+        self,
+        slider_configs: List[Tuple[str, str, Optional[float], Optional[float], float]],
+        max_workers: int = 8
+    ) -> Tuple[int, int]:
         """
         批量設置多個 Slider
-        
+
         Args:
             slider_configs: Slider 配置列表，每個配置為：
                 (component_id_key, value, min_value, max_value, rounding)
-        
+            max_workers: 無 batch 支援時並行組數的上限
+
         Returns:
             (成功數量, 失敗數量) 元組
         """
-        success_count = 0
-        fail_count = 0
-        
-        for config in slider_configs:
-            component_id_key = config[0]
-            value = config[1]
-            min_value = config[2] if len(config) > 2 else None
-            max_value = config[3] if len(config) > 3 else None
-            rounding = config[4] if len(config) > 4 else 0.1
-            
-            self.client.safe_print(f"\n設置 {component_id_key} = {value}")
-            
-            if self.set_slider(component_id_key, value, min_value, max_value, rounding):
-                success_count += 1
+        results = self.configure_sliders(slider_configs, max_workers=max_workers)
+
+        for result in results:
+            if result.success:
+                self.client.safe_print(
+                    f"✓ {result.key} = {result.value} (range: {result.min_value}-{result.max_value})"
+                )
             else:
-                fail_count += 1
-            
-            time.sleep(0.1)
-        
-        return success_count, fail_count
+                self.client.safe_print(f"✗ {result.key}: {result.error}")
 
+        success_count = sum(1 for result in results if result.success)
+        return success_count, len(results) - success_count
@@ -4,12 +4,19 @@ Placement 執行器
 提供執行 placement_info.json 的完整流程
 """
 
+import asyncio
 import time
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, List, Tuple
 
+from grasshopper_mcp.batch import BatchExecutor, CommandBatch, ref
+from grasshopper_mcp.tracing import get_tracer
+
+from .async_client import AsyncGrasshopperClient
 from .client import GrasshopperClient
 from .component_manager import ComponentManager
 from .connection_manager import ConnectionManager
+from .dag_scheduler import EVENT_SKIPPED, TASK_ADD, DagScheduler, PlacementGraph, PlacementTask, ProgressEvent
+from .placement_journal import PlacementJournal
 from .utils import load_placement_info
 
 
@@ -39,16 +46,29 @@ class PlacementExecutor:
         json_path: str,
         max_workers: int = 10,
         save_id_map: bool = True,
-        id_map_path: Optional[str] = None
+        id_map_path: Optional[str] = None,
+        use_batch: bool = False,
+        use_dag: bool = True,
+        on_progress: Optional[Callable[[ProgressEvent], None]] = None,
+        journal_path: Optional[str] = None,
+        resume: bool = False
     ) -> Dict[str, Any]:
         """
         執行 placement_info.json 中的命令
         
+        每個完成的命令都寫入執行日誌。resume=True 時跳過日誌中已完成、且在文檔中仍然存在的
+        組件與連線，中途失敗後重試不會重複創建組件；預設（resume=False）清空日誌從頭執行。
+        
         Args:
             json_path: placement_info.json 文件路徑
             max_workers: 最大並行線程數
             save_id_map: 是否保存組件 ID 映射
             id_map_path: 組件 ID 映射保存路徑，如果為 None 則使用默認路徑
+            use_batch: 使用 batch 信封一次送出所有命令（伺服器不支援時自動降級為管線化）
+            use_dag: 按依賴調度，連接在兩端組件創建後立即執行；False 時分兩個階段執行
+            on_progress: 依賴調度時的進度事件回調
+            journal_path: 執行日誌路徑，如果為 None 則使用 <json 文件名>.journal.jsonl
+            resume: 根據執行日誌跳過已完成的命令；False 時清空日誌從頭執行
         
         Returns:
             執行結果字典，包含：
@@ -59,6 +79,10 @@ class PlacementExecutor:
                 - add_time: 組件創建耗時
                 - connect_time: 連接耗時
                 - total_time: 總耗時
+                - resumed_add: 從執行日誌恢復（未重新發送）的組件數量
+                - resumed_connect: 從執行日誌恢復的連接數量
+                - schedule: 依賴調度的關鍵路徑與並行度（僅 use_dag）
+                - journal_path: 執行日誌路徑
         """
         print("=" * 80)
         print("執行 placement_info.json")
@@ -95,6 +119,189 @@ class PlacementExecutor:
         print(f"\n組件創建命令: {len(add_commands)} 個")
         print(f"連接命令: {len(connect_commands)} 個")
         
+        journal = PlacementJournal(journal_path or PlacementJournal.default_path(json_path))
+        print(f"\n執行日誌: {journal.path}")
+        resumed = (0, 0)
+        if resume:
+            pending = self._resume_from_journal(journal, add_commands, connect_commands)
+            if pending is None:
+                return {
+                    "success": False,
+                    "error": "無法讀取文檔以驗證執行日誌",
+                    "journal_path": journal.path
+                }
+            add_commands, connect_commands, resumed = pending
+        else:
+            journal.reset()
+        
+        mode = "batch" if use_batch else "dag" if use_dag else "phased"
+        try:
+            with get_tracer().span(
+                "placement.execute", json_path=json_path, mode=mode,
+                add=len(add_commands), connect=len(connect_commands)
+            ):
+                if use_batch:
+                    add_success, add_fail, connect_success, connect_fail, add_time, connect_time = \
+                        self._execute_batched(add_commands, connect_commands, journal)
+                    if save_id_map:
+                        self.component_manager.save_id_map(id_map_path)
+                    result = self._summarize(
+                        add_commands, connect_commands,
+                        add_success, add_fail, connect_success, connect_fail,
+                        add_time, connect_time, resumed
+                    )
+                elif use_dag:
+                    result = self._execute_dag(
+                        add_commands, connect_commands, max_workers,
+                        save_id_map, id_map_path, on_progress, journal, resumed
+                    )
+                else:
+                    result = self._execute_phased(
+                        add_commands, connect_commands, max_workers,
+                        save_id_map, id_map_path, journal, resumed
+                    )
+        finally:
+            journal.close()
+        result["journal_path"] = journal.path
+        return result
+    
+    # -------------------------------------------------------------------------
+    # 執行日誌
+    # -------------------------------------------------------------------------
+    
+    @staticmethod
+    def _component_ids_from(response: Dict[str, Any]) -> Optional[List[str]]:
+        """get_document_info 回應中所有組件的實際 ID；失敗時返回 None"""
+        if not response.get("success"):
+            print(f"讀取文檔信息失敗: {response.get('error', '未知錯誤')}")
+            return None
+        data = response.get("data") or response.get("result") or {}
+        components = data.get("components") if isinstance(data, dict) else None
+        if not isinstance(components, list):
+            return None
+        return [str(component.get("id")) for component in components if isinstance(component, dict)]
+    
+    @staticmethod
+    def _connections_from(response: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """get_connections 回應中的連線列表；伺服器無法列出連線時返回 None"""
+        if not response.get("success"):
+            print(f"無法列出連線，重新執行所有連接: {response.get('error', '未知錯誤')}")
+            return None
+        data = response.get("data")
+        if data is None:
+            data = response.get("result")
+        if isinstance(data, dict):
+            data = data.get("connections")
+        return data if isinstance(data, list) else None
+    
+    def _resume_from_journal(
+        self,
+        journal: PlacementJournal,
+        add_commands: List[Dict[str, Any]],
+        connect_commands: List[Dict[str, Any]]
+    ) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Tuple[int, int]]]:
+        """
+        讀取執行日誌，以一次 get_document_info 與一次 get_connections 對照文檔驗證後
+        過濾掉已完成的命令
+        
+        Returns:
+            (待執行的 add 命令, 待執行的 connect 命令, (恢復的組件數, 恢復的連接數))；
+            日誌非空但無法讀取文檔時返回 None
+        """
+        if not journal.load():
+            return add_commands, connect_commands, (0, 0)
+        
+        live_ids = self._component_ids_from(self.client.send_command("get_document_info", {}))
+        if live_ids is None:
+            return None
+        live_connections = self._connections_from(self.client.send_command("get_connections", {}))
+        return self._skip_completed(journal, add_commands, connect_commands, live_ids, live_connections)
+    
+    async def _resume_from_journal_async(
+        self,
+        client: AsyncGrasshopperClient,
+        journal: PlacementJournal,
+        add_commands: List[Dict[str, Any]],
+        connect_commands: List[Dict[str, Any]]
+    ) -> Optional[Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Tuple[int, int]]]:
+        """_resume_from_journal 的非同步版本：以非同步客戶端讀取文檔，日誌讀寫交給 asyncio.to_thread"""
+        if not await asyncio.to_thread(journal.load):
+            return add_commands, connect_commands, (0, 0)
+        
+        document, connections = await asyncio.gather(
+            client.send_command("get_document_info", {}),
+            client.send_command("get_connections", {})
+        )
+        live_ids = self._component_ids_from(document)
+        if live_ids is None:
+            return None
+        return await asyncio.to_thread(
+            self._skip_completed, journal, add_commands, connect_commands,
+            live_ids, self._connections_from(connections)
+        )
+    
+    def _skip_completed(
+        self,
+        journal: PlacementJournal,
+        add_commands: List[Dict[str, Any]],
+        connect_commands: List[Dict[str, Any]],
+        live_ids: List[str],
+        live_connections: Optional[List[Dict[str, Any]]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Tuple[int, int]]:
+        """以文檔驗證執行日誌，登記已完成組件的實際 ID，返回待執行的命令"""
+        stats = journal.verify(live_ids, live_connections)
+        
+        pending_adds = []
+        pending_keys = set()
+        for cmd in add_commands:
+            actual_id = journal.completed_add(cmd)
+            if actual_id:
+                self.component_manager.register_component_id(cmd["componentId"], actual_id)
+            else:
+                pending_adds.append(cmd)
+                if cmd.get("componentId"):
+                    pending_keys.add(cmd["componentId"])
+        
+        pending_connects = []
+        for cmd in connect_commands:
+            params = cmd.get("parameters", {})
+            source_key = params.get("sourceId", "")
+            target_key = params.get("targetId", "")
+            # 端點需要重建的連接一定要重做
+            if source_key not in pending_keys and target_key not in pending_keys and journal.completed_connect(
+                cmd,
+                self.component_manager.get_component_id(source_key),
+                self.component_manager.get_component_id(target_key)
+            ):
+                continue
+            pending_connects.append(cmd)
+        
+        resumed = (len(add_commands) - len(pending_adds), len(connect_commands) - len(pending_connects))
+        print(f"已完成並通過文檔驗證: 組件 {resumed[0]} 個，連接 {resumed[1]} 個"
+              f"（失效記錄: 組件 {stats['stale_adds']} 個，連接 {stats['stale_connects']} 個）")
+        print(f"待執行: 組件 {len(pending_adds)} 個，連接 {len(pending_connects)} 個")
+        return pending_adds, pending_connects, resumed
+    
+    def _record_connect(self, journal: PlacementJournal, cmd: Dict[str, Any]):
+        """把成功的連接及其兩端目前的實際 ID 寫入執行日誌"""
+        params = cmd.get("parameters", {})
+        journal.record_connect(
+            cmd,
+            self.component_manager.get_component_id(params.get("sourceId", "")),
+            self.component_manager.get_component_id(params.get("targetId", ""))
+        )
+    
+    def _execute_phased(
+        self,
+        add_commands: List[Dict[str, Any]],
+        connect_commands: List[Dict[str, Any]],
+        max_workers: int,
+        save_id_map: bool,
+        id_map_path: Optional[str],
+        journal: PlacementJournal,
+        resumed: Tuple[int, int]
+    ) -> Dict[str, Any]:
+        """分兩個階段執行：先並行創建所有組件，再並行連接"""
         # 設置並行工作線程數
         add_max_workers = min(max_workers, max(1, len(add_commands)))
         connect_max_workers = min(max_workers, max(1, len(connect_commands)))
@@ -108,7 +315,8 @@ class PlacementExecutor:
         start_time = time.time()
         add_success, add_fail = self.component_manager.add_components_parallel(
             add_commands,
-            max_workers=add_max_workers
+            max_workers=add_max_workers,
+            on_success=journal.record_add
         )
         add_time = time.time() - start_time
         
@@ -131,22 +339,208 @@ class PlacementExecutor:
         start_time = time.time()
         connect_success, connect_fail = self.connection_manager.connect_components_parallel(
             connect_commands,
-            max_workers=connect_max_workers
+            max_workers=connect_max_workers,
+            on_success=lambda cmd: self._record_connect(journal, cmd)
         )
         connect_time = time.time() - start_time
         
         print(f"\n連接完成: 成功 {connect_success} 個，失敗 {connect_fail} 個（耗時 {connect_time:.2f} 秒）")
         
+        return self._summarize(
+            add_commands, connect_commands,
+            add_success, add_fail, connect_success, connect_fail,
+            add_time, connect_time, resumed
+        )
+    
+    def _execute_dag(
+        self,
+        add_commands: List[Dict[str, Any]],
+        connect_commands: List[Dict[str, Any]],
+        max_workers: int,
+        save_id_map: bool,
+        id_map_path: Optional[str],
+        on_progress: Optional[Callable[[ProgressEvent], None]],
+        journal: PlacementJournal,
+        resumed: Tuple[int, int]
+    ) -> Dict[str, Any]:
+        """按依賴圖執行：創建與連接共用一個執行緒池，連接在兩端組件創建後立即開始"""
+        print("\n" + "=" * 80)
+        print(f"依賴調度: 創建組件 + 連接組件（並行執行，{max_workers} 個線程）")
+        print("=" * 80)
+        
+        graph = PlacementGraph.from_commands(add_commands, connect_commands)
+        add_total = len(add_commands)
+        
+        def execute(task: PlacementTask) -> bool:
+            if task.kind == TASK_ADD:
+                success, actual_id = self.component_manager.add_from_command(task.command, task.index + 1, add_total)
+                if success:
+                    journal.record_add(task.command, actual_id)
+                return success
+            success = self.connection_manager.connect_from_command(
+                task.command, task.index - add_total + 1, len(connect_commands)
+            )
+            if success:
+                self._record_connect(journal, task.command)
+            return success
+        
+        # 工作執行緒中的 span 掛在 placement.execute 之下
+        report = DagScheduler(graph, max_workers=max_workers, on_progress=on_progress).run(get_tracer().bind(execute))
+        
+        for task in report.tasks:
+            if task.status == EVENT_SKIPPED:
+                self.client.safe_print(f"  ✗ 跳過連接: {task.label}（{task.error}）")
+        
+        if save_id_map:
+            self.component_manager.save_id_map(id_map_path)
+        
+        add_success = report.add_success
+        connect_success = report.connect_success
+        add_time = report.last_finish(TASK_ADD)
+        connect_time = max(0.0, report.makespan - add_time)
+        
+        schedule = report.to_dict()
+        print(f"\n關鍵路徑: {len(report.critical_path)} 個命令，"
+              f"{schedule['critical_path_time']:.2f} 秒（總耗時 {schedule['makespan']:.2f} 秒，並行度 {schedule['parallelism']}）")
+        
+        result = self._summarize(
+            add_commands, connect_commands,
+            add_success, add_total - add_success,
+            connect_success, len(connect_commands) - connect_success,
+            add_time, connect_time, resumed
+        )
+        result["schedule"] = schedule
+        return result
+    
+    async def execute_placement_info_async(
+        self,
+        json_path: str,
+        save_id_map: bool = True,
+        id_map_path: Optional[str] = None,
+        client: Optional[AsyncGrasshopperClient] = None,
+        journal_path: Optional[str] = None,
+        resume: bool = False
+    ) -> Dict[str, Any]:
+        """
+        在事件迴圈中執行 placement_info.json（不阻塞事件迴圈）
+        
+        命令以 AsyncGrasshopperClient 並發送出，不佔用執行緒；讀取命令文件、寫入執行日誌、
+        登記與保存 ID 映射等文件 I/O 交給 asyncio.to_thread 執行。執行日誌與 resume 的行為
+        與 execute_placement_info 相同。
+        
+        Args:
+            json_path: placement_info.json 文件路徑
+            save_id_map: 是否保存組件 ID 映射
+            id_map_path: 組件 ID 映射保存路徑，如果為 None 則使用默認路徑
+            client: 非同步客戶端，如果為 None 則使用與同步客戶端相同的 host/port 新建
+            journal_path: 執行日誌路徑，如果為 None 則使用 <json 文件名>.journal.jsonl
+            resume: 根據執行日誌跳過已完成的命令；False 時清空日誌從頭執行
+        
+        Returns:
+            與 execute_placement_info 相同的結果字典
+        """
+        placement_data = await asyncio.to_thread(load_placement_info, json_path)
+        if not placement_data:
+            return {
+                "success": False,
+                "error": "無法讀取命令文件"
+            }
+        
+        commands = placement_data.get("commands", [])
+        add_commands = [cmd for cmd in commands if cmd.get("type") == "add_component"]
+        connect_commands = [cmd for cmd in commands if cmd.get("type") == "connect_components"]
+        
+        owns_client = client is None
+        if client is None:
+            client = AsyncGrasshopperClient(self.client.host, self.client.port, timeout=self.client.timeout)
+        
+        journal = PlacementJournal(journal_path or PlacementJournal.default_path(json_path))
+        print(f"\n執行日誌: {journal.path}")
+        try:
+            resumed = (0, 0)
+            if resume:
+                pending = await self._resume_from_journal_async(client, journal, add_commands, connect_commands)
+                if pending is None:
+                    return {
+                        "success": False,
+                        "error": "無法讀取文檔以驗證執行日誌",
+                        "journal_path": journal.path
+                    }
+                add_commands, connect_commands, resumed = pending
+            else:
+                await asyncio.to_thread(journal.reset)
+            # 包含從執行日誌恢復的組件
+            client.component_id_map.update(self.component_manager.component_id_map)
+            
+            start_time = time.time()
+            add_success, add_fail = await client.add_components(add_commands, on_success=journal.record_add)
+            add_time = time.time() - start_time
+            
+            # ID 映射可能綁定了增量日誌文件，登記與保存都會寫檔
+            await asyncio.to_thread(self._register_ids, dict(client.component_id_map))
+            if save_id_map:
+                await asyncio.to_thread(self.component_manager.save_id_map, id_map_path)
+            
+            start_time = time.time()
+            connect_success, connect_fail = await client.connect_components(
+                connect_commands,
+                on_success=lambda cmd: self._record_connect(journal, cmd)
+            )
+            connect_time = time.time() - start_time
+        finally:
+            journal.close()
+            if owns_client:
+                await client.close()
+        
+        result = self._summarize(
+            add_commands, connect_commands,
+            add_success, add_fail, connect_success, connect_fail,
+            add_time, connect_time, resumed
+        )
+        result["journal_path"] = journal.path
+        return result
+    
+    def _register_ids(self, id_map: Dict[str, str]):
+        """把非同步客戶端得到的組件 ID 登記到組件管理器"""
+        for key, actual_id in id_map.items():
+            self.component_manager.register_component_id(key, actual_id)
+    
+    def _summarize(
+        self,
+        add_commands: List[Dict[str, Any]],
+        connect_commands: List[Dict[str, Any]],
+        add_success: int,
+        add_fail: int,
+        connect_success: int,
+        connect_fail: int,
+        add_time: float,
+        connect_time: float,
+        resumed: Tuple[int, int] = (0, 0)
+    ) -> Dict[str, Any]:
+        """
+        打印執行總結並返回結果字典
+        
+        add_commands / connect_commands 是本次實際執行的命令；resumed 是從執行日誌恢復、
+        未重新發送的 (組件數, 連接數)，計入成功數量。
+        """
+        resumed_add, resumed_connect = resumed
+        add_success += resumed_add
+        connect_success += resumed_connect
+        add_total = len(add_commands) + resumed_add
+        connect_total = len(connect_commands) + resumed_connect
+        
         # 總結
         total_time = add_time + connect_time
         print("\n" + "=" * 80)
         print("執行總結")
         print("=" * 80)
-        print(f"組件創建: {add_success}/{len(add_commands)} 成功（耗時 {add_time:.2f} 秒）")
-        print(f"組件連接: {connect_success}/{len(connect_commands)} 成功（耗時 {connect_time:.2f} 秒）")
+        print(f"組件創建: {add_success}/{add_total} 成功（耗時 {add_time:.2f} 秒）")
+        print(f"組件連接: {connect_success}/{connect_total} 成功（耗時 {connect_time:.2f} 秒）")
+        if resumed_add or resumed_connect:
+            print(f"從執行日誌恢復: 組件 {resumed_add} 個，連接 {resumed_connect} 個")
         print(f"總耗時: {total_time:.2f} 秒")
         
-        success = (add_success == len(add_commands) and connect_success == len(connect_commands))
+        success = (add_success == add_total and connect_success == connect_total)
         
         if success:
             print("\n✓ 所有命令執行成功！")
@@ -162,6 +556,99 @@ class PlacementExecutor:
             "add_time": add_time,
             "connect_time": connect_time,
             "total_time": total_time,
+            "resumed_add": resumed_add,
+            "resumed_connect": resumed_connect,
             "component_id_map_size": len(self.component_manager.component_id_map)
         }
-
+    
+    def _execute_batched(
+        self,
+        add_commands: List[Dict[str, Any]],
+        connect_commands: List[Dict[str, Any]],
+        journal: Optional[PlacementJournal] = None
+    ) -> Tuple[int, int, int, int, float, float]:
+        """
+        以單一 batch 執行所有 add_component 與 connect_components 命令
+        
+        add_component 以 componentId 命名 (ref)，connect_components 直接引用同批次中
+        創建的組件；不在本批次中的組件從現有 ID 映射中查找。
+        
+        Returns:
+            (add_success, add_fail, connect_success, connect_fail, add_time, connect_time)
+        """
+        print("\n" + "=" * 80)
+        print("批次執行: 創建組件 + 連接組件")
+        print("=" * 80)
+        
+        batch = CommandBatch()
+        add_items: List[Tuple[int, Dict[str, Any]]] = []
+        connect_items: List[Tuple[int, Dict[str, Any]]] = []
+        add_fail = 0
+        connect_fail = 0
+        
+        for i, cmd in enumerate(add_commands, 1):
+            params, error = self.component_manager.parse_add_command(cmd)
+            if params is None:
+                print(f"  ✗ [{i}/{len(add_commands)}] 錯誤: {error}")
+                add_fail += 1
+                continue
+            component_id = cmd.get("componentId") or None
+            if component_id and batch.has_ref(component_id):
+                print(f"  ✗ [{i}/{len(add_commands)}] 錯誤: 重複的組件 ID '{component_id}'")
+                add_fail += 1
+                continue
+            add_items.append((batch.add("add_component", params, ref=component_id), cmd))
+        
+        for cmd in connect_commands:
+            cmd_params = cmd.get("parameters", {})
+            params: Dict[str, Any] = {}
+            for key in ("sourceId", "targetId"):
+                id_key = cmd_params.get(key, "")
+                if batch.has_ref(id_key):
+                    params[key] = ref(id_key)
+                else:
+                    # 不在本批次中：使用既有映射，找不到則保留引用讓其以未解析錯誤失敗
+                    params[key] = self.component_manager.get_component_id(id_key) or ref(id_key)
+            if cmd_params.get("sourceParam"):
+                params["sourceParam"] = cmd_params["sourceParam"]
+            if cmd_params.get("targetParam"):
+                params["targetParam"] = cmd_params["targetParam"]
+            connect_items.append((batch.add("connect_components", params), cmd))
+        
+        executor = BatchExecutor(self.client.transport, timeout=self.client.timeout)
+        result = executor.execute(batch)
+        print(f"執行模式: {result.mode}，共 {len(batch)} 個命令（耗時 {result.elapsed:.2f} 秒）")
+        
+        for name, actual_id in result.refs.items():
+            self.component_manager.register_component_id(name, actual_id)
+        
+        add_success = 0
+        for index, cmd in add_items:
+            response = result.results[index]
+            comment = cmd.get("comment", cmd.get("componentId", f"組件 {index + 1}"))
+            if response.get("success"):
+                add_success += 1
+                if journal is not None:
+                    journal.record_add(cmd, result.refs.get(cmd.get("componentId") or ""))
+            else:
+                add_fail += 1
+                print(f"  ✗ 創建失敗: {comment}: {response.get('error', '未知錯誤')}")
+        
+        connect_success = 0
+        for index, cmd in connect_items:
+            response = result.results[index]
+            if response.get("success"):
+                connect_success += 1
+                if journal is not None:
+                    self._record_connect(journal, cmd)
+            else:
+                connect_fail += 1
+                print(f"  ✗ 連接失敗: {cmd.get('comment', '')}: {response.get('error', '未知錯誤')}")
+        
+        add_time = max((result.completed_at[i] for i, _ in add_items), default=0.0)
+        connect_time = max(0.0, result.elapsed - add_time)
+        
+        print(f"\n組件創建完成: 成功 {add_success} 個，失敗 {add_fail} 個")
+        print(f"連接完成: 成功 {connect_success} 個，失敗 {connect_fail} 個")
+        
+        return add_success, add_fail, connect_success, connect_fail, add_time, connect_time
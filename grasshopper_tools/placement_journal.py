@@ -0,0 +1,230 @@
+"""
+Placement 執行日誌（write-ahead journal）
+
+execute_placement_info 在中途失敗（GH 當機、超時）後，重跑會把已經創建的組件再創建一次。
+PlacementJournal 以 append-only 的 JSON Lines 文件記錄每個已完成的命令：
+
+    {"op": "add", "key": "SLIDER_A", "fp": "<命令指紋>", "id": "<實際組件 ID>"}
+    {"op": "connect", "key": ["SLIDER_A", "N", "ADD_1", "A"], "source": "<實際 ID>", "target": "<實際 ID>"}
+
+- add_component 以 componentId 為鍵；命令內容（指紋）改變時視為新的命令
+- connect_components 以 (sourceId, sourceParam, targetId, targetParam) 為鍵，
+  並記錄連接時兩端的實際組件 ID
+- 每條記錄寫入後立即 flush；文件末尾不完整的一行（寫入時中斷）在讀取時忽略
+
+重跑時先以 get_document_info 取得文檔中實際存在的組件、以 get_connections 取得實際的連線，
+再用 verify() 丟棄失效的記錄：組件已被刪除的 add 需要重做；端點被重建、已不存在，或連線
+已從畫布上移除的 connect 也需要重做。伺服器無法列出連線時不信任任何 connect 記錄。
+
+用法：
+    journal = PlacementJournal(PlacementJournal.default_path(json_path))
+    journal.load()
+    journal.verify(live_ids, live_connections)
+    actual_id = journal.completed_add(cmd)
+    journal.record_add(cmd, actual_id)
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+ConnectionKey = Tuple[str, str, str, str]
+
+
+class PlacementJournal:
+    """已完成 placement 命令的 append-only 日誌"""
+
+    def __init__(self, path: str, fsync: bool = False):
+        """
+        Args:
+            path: 日誌文件路徑（JSON Lines）
+            fsync: 每條記錄寫入後是否 fsync（較慢，防止作業系統當機時遺失記錄）
+        """
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._adds: Dict[str, Dict[str, Any]] = {}
+        self._connects: Dict[ConnectionKey, Dict[str, Any]] = {}
+        self._file = None
+
+    @staticmethod
+    def default_path(json_path: str) -> str:
+        """placement_info.json 對應的日誌路徑：placement_info.journal.jsonl"""
+        return os.path.splitext(json_path)[0] + ".journal.jsonl"
+
+    # -------------------------------------------------------------------------
+    # 鍵與指紋
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def fingerprint(cmd: Dict[str, Any]) -> str:
+        """add_component 命令的指紋（忽略 comment）"""
+        content = {key: value for key, value in cmd.items() if key != "comment"}
+        encoded = json.dumps(content, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        return hashlib.sha1(encoded).hexdigest()[:16]
+
+    @staticmethod
+    def connection_key(cmd: Dict[str, Any]) -> ConnectionKey:
+        """connect_components 命令的鍵"""
+        params = cmd.get("parameters", {})
+        return (
+            params.get("sourceId") or "",
+            params.get("sourceParam") or "",
+            params.get("targetId") or "",
+            params.get("targetParam") or "",
+        )
+
+    # -------------------------------------------------------------------------
+    # 讀取與寫入
+    # -------------------------------------------------------------------------
+
+    def load(self) -> int:
+        """
+        重放日誌文件
+
+        Returns:
+            讀取的記錄數
+        """
+        count = 0
+        with self._lock:
+            self._adds.clear()
+            self._connects.clear()
+            if not os.path.exists(self.path):
+                return 0
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 寫入中斷留下的半行
+                        continue
+                    if entry.get("op") == "add" and entry.get("key") and entry.get("id"):
+                        self._adds[entry["key"]] = entry
+                    elif entry.get("op") == "connect" and isinstance(entry.get("key"), list):
+                        self._connects[tuple(entry["key"])] = entry
+                    else:
+                        continue
+                    count += 1
+        return count
+
+    def _append(self, entry: Dict[str, Any]):
+        if self._file is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def record_add(self, cmd: Dict[str, Any], actual_id: Optional[str]):
+        """記錄一個已完成的 add_component（沒有 componentId 的命令無法恢復，不記錄）"""
+        key = cmd.get("componentId")
+        if not key or not actual_id:
+            return
+        entry = {"op": "add", "key": key, "fp": self.fingerprint(cmd), "id": actual_id}
+        with self._lock:
+            self._adds[key] = entry
+            self._append(entry)
+
+    def record_connect(self, cmd: Dict[str, Any], source_id: Optional[str], target_id: Optional[str]):
+        """記錄一條已完成的連接及其兩端的實際組件 ID"""
+        key = self.connection_key(cmd)
+        entry = {"op": "connect", "key": list(key), "source": source_id, "target": target_id}
+        with self._lock:
+            self._connects[key] = entry
+            self._append(entry)
+
+    def reset(self):
+        """清空日誌（從頭開始執行）"""
+        with self._lock:
+            self.close()
+            self._adds.clear()
+            self._connects.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # -------------------------------------------------------------------------
+    # 驗證與查詢
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _param_matches(recorded: str, live: Optional[str]) -> bool:
+        """命令未指定參數名、或文檔未提供參數名時視為相同"""
+        return not recorded or live is None or recorded.casefold() == str(live).casefold()
+
+    def _wire_exists(self, entry: Dict[str, Any], wires: Dict[Tuple[str, str], List[Dict[str, Any]]]) -> bool:
+        _, source_param, _, target_param = entry["key"]
+        return any(
+            self._param_matches(source_param, wire.get("sourceParam"))
+            and self._param_matches(target_param, wire.get("targetParam"))
+            for wire in wires.get((entry.get("source"), entry.get("target")), ())
+        )
+
+    def verify(
+        self,
+        live_ids: Iterable[str],
+        live_connections: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, int]:
+        """
+        以文檔中實際存在的組件與連線驗證記錄，丟棄失效的記錄
+
+        Args:
+            live_ids: 文檔中所有組件的實際 ID
+            live_connections: get_connections 的結果（sourceId / sourceParam / targetId / targetParam）；
+                None 表示伺服器無法列出連線，此時丟棄所有 connect 記錄讓連接重做
+
+        Returns:
+            {"adds": 有效的 add 數, "connects": 有效的連接數,
+             "stale_adds": 丟棄的 add 數, "stale_connects": 丟棄的連接數}
+        """
+        live: Set[str] = set(live_ids)
+        wires: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for wire in live_connections or ():
+            if isinstance(wire, dict):
+                wires.setdefault((str(wire.get("sourceId")), str(wire.get("targetId"))), []).append(wire)
+        with self._lock:
+            stale_adds = [key for key, entry in self._adds.items() if entry["id"] not in live]
+            for key in stale_adds:
+                del self._adds[key]
+            stale_connects = [
+                key for key, entry in self._connects.items()
+                if entry.get("source") not in live or entry.get("target") not in live
+                or live_connections is None or not self._wire_exists(entry, wires)
+            ]
+            for key in stale_connects:
+                del self._connects[key]
+            return {
+                "adds": len(self._adds),
+                "connects": len(self._connects),
+                "stale_adds": len(stale_adds),
+                "stale_connects": len(stale_connects),
+            }
+
+    def completed_add(self, cmd: Dict[str, Any]) -> Optional[str]:
+        """命令已完成（且內容未改變）時返回其實際組件 ID"""
+        key = cmd.get("componentId")
+        if not key:
+            return None
+        with self._lock:
+            entry = self._adds.get(key)
+        if entry is None or entry.get("fp") != self.fingerprint(cmd):
+            return None
+        return entry["id"]
+
+    def completed_connect(self, cmd: Dict[str, Any], source_id: Optional[str], target_id: Optional[str]) -> bool:
+        """連接已完成，且當時的兩端就是目前的 source_id / target_id"""
+        with self._lock:
+            entry = self._connects.get(self.connection_key(cmd))
+        return entry is not None and entry.get("source") == source_id and entry.get("target") == target_id
+
+    def __len__(self) -> int:
+        return len(self._adds) + len(self._connects)
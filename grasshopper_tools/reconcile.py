@@ -0,0 +1,628 @@
+"""
+畫布差異比對與同步（reconcile）
+
+rebuild 腳本與 execute-full-workflow --clear-first 會清空文檔再重建所有組件，
+即使只改了兩個 Slider。CanvasReconciler 比對期望的圖（placement_info 或 Joseki）
+與文檔中的實際圖，生成最小的編輯腳本並只執行這些修改：
+
+- 期望組件以 ID 映射（componentId → 實際 ID）對應到文檔中的組件
+  - 映射中沒有、或映射的組件已不在文檔中：add
+  - 文檔提供組件 GUID 且與期望的不同：delete + add
+  - 文檔提供位置且與期望的不同：move
+  - 期望的值與文檔中的值不同（Slider 值以一個批次 get_component_info 讀取）：set_value
+- 映射中有、但期望圖中已沒有的組件：delete（不在映射中的組件屬於使用者，prune=True 時才刪除）
+- 兩端都已存在的連接與 get_connections 比對：缺少的 connect，多出的 disconnect；
+  伺服器無法列出連接時假設這些連接都存在
+- 新組件的連接、新組件的值與 Joseki 的 input_values 直接加入
+
+執行順序：disconnect → delete → move → add / connect（依賴調度）→ set_value。
+
+用法：
+    reconciler = CanvasReconciler(client, component_manager)
+    desired = DesiredGraph.load("GH_WIP/placement_info.json")
+    result = reconciler.reconcile(desired, dry_run=True)    # 只打印編輯腳本
+    result = reconciler.reconcile(desired)
+"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from grasshopper_mcp.batch import BatchExecutor, CommandBatch
+
+from .client import GrasshopperClient
+from .component_manager import ComponentManager
+from .connection_manager import ConnectionManager
+from .dag_scheduler import TASK_ADD, DagScheduler, PlacementGraph, PlacementTask
+from .parameter_setter import ParameterSetter
+
+OP_DISCONNECT = "disconnect"
+OP_DELETE = "delete"
+OP_MOVE = "move"
+OP_ADD = "add"
+OP_CONNECT = "connect"
+OP_SET_VALUE = "set_value"
+
+# 編輯腳本的執行順序
+OP_ORDER = (OP_DISCONNECT, OP_DELETE, OP_MOVE, OP_ADD, OP_CONNECT, OP_SET_VALUE)
+
+# 位置差異小於此值（畫布單位）視為相同
+POSITION_TOLERANCE = 0.5
+# 數值差異小於此值視為相同
+VALUE_TOLERANCE = 1e-9
+
+# placement_info 中表示「組件的唯一輸出」的通用參數名，不參與比對
+_GENERIC_PARAMS = frozenset({"", "output", "input"})
+
+
+# =============================================================================
+# 期望的圖
+# =============================================================================
+
+@dataclass
+class DesiredComponent:
+    """期望圖中的組件"""
+    key: str
+    command: Dict[str, Any]
+    guid: Optional[str] = None
+    component_type: Optional[str] = None
+    x: Optional[float] = None
+    y: Optional[float] = None
+    value: Any = None
+    inputs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_slider(self) -> bool:
+        return (self.component_type or "").replace(" ", "").casefold() == "numberslider"
+
+
+@dataclass(frozen=True)
+class WireSpec:
+    """期望圖中的連接（兩端為 componentId）"""
+    source: str
+    source_param: Optional[str]
+    target: str
+    target_param: Optional[str]
+
+    @classmethod
+    def from_command(cls, cmd: Dict[str, Any]) -> "WireSpec":
+        params = cmd.get("parameters", {})
+        return cls(
+            params.get("sourceId", ""),
+            params.get("sourceParam"),
+            params.get("targetId", ""),
+            params.get("targetParam"),
+        )
+
+    def label(self) -> str:
+        source = f"{self.source}.{self.source_param}" if self.source_param else self.source
+        target = f"{self.target}.{self.target_param}" if self.target_param else self.target
+        return f"{source} -> {target}"
+
+
+@dataclass
+class DesiredGraph:
+    """期望的組件與連接"""
+    components: Dict[str, DesiredComponent] = field(default_factory=dict)
+    connections: List[Tuple[WireSpec, Dict[str, Any]]] = field(default_factory=list)
+
+    @classmethod
+    def from_placement_info(cls, data: Dict[str, Any]) -> "DesiredGraph":
+        """從 placement_info 的命令列表建立（沒有 componentId 的組件無法對應，會被忽略）"""
+        graph = cls()
+        for cmd in data.get("commands", []):
+            if cmd.get("type") == "add_component" and cmd.get("componentId"):
+                params = cmd.get("parameters", {})
+                key = cmd["componentId"]
+                graph.components[key] = DesiredComponent(
+                    key=key,
+                    command=cmd,
+                    guid=params.get("guid") or cmd.get("guid"),
+                    component_type=cmd.get("componentType"),
+                    x=params.get("x", cmd.get("x")),
+                    y=params.get("y", cmd.get("y")),
+                    value=cmd.get("value"),
+                )
+            elif cmd.get("type") == "connect_components":
+                graph.connections.append((WireSpec.from_command(cmd), cmd))
+        return graph
+
+    @classmethod
+    def from_joseki(cls, joseki: Any) -> "DesiredGraph":
+        """從 Joseki（GrasshopperJoseki 或其字典形式）建立，節點 ID 作為 componentId"""
+        data = joseki if isinstance(joseki, dict) else joseki.to_dict()
+        graph = cls()
+        for node in data.get("nodes", []):
+            position = node.get("position") or {}
+            x, y = float(position.get("x", 0.0)), float(position.get("y", 0.0))
+            command = {
+                "type": "add_component",
+                "componentId": node["id"],
+                "comment": node.get("nickname") or node.get("name") or node["id"],
+                "parameters": {"guid": node.get("component_guid"), "x": x, "y": y},
+            }
+            graph.components[node["id"]] = DesiredComponent(
+                key=node["id"],
+                command=command,
+                guid=node.get("component_guid"),
+                component_type=node.get("name"),
+                x=x,
+                y=y,
+                inputs=dict(node.get("input_values") or {}),
+            )
+        for conn in data.get("connections", []):
+            command = {
+                "type": "connect_components",
+                "parameters": {
+                    "sourceId": conn["from_node_id"],
+                    "sourceParam": conn.get("from_port"),
+                    "targetId": conn["to_node_id"],
+                    "targetParam": conn.get("to_port"),
+                },
+            }
+            graph.connections.append((WireSpec.from_command(command), command))
+        return graph
+
+    @classmethod
+    def load(cls, path: str) -> "DesiredGraph":
+        """讀取 placement_info.json 或 Joseki JSON 文件"""
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if "nodes" in data and "commands" not in data:
+            return cls.from_joseki(data)
+        return cls.from_placement_info(data)
+
+
+# =============================================================================
+# 文檔中的實際圖
+# =============================================================================
+
+def _payload(response: Dict[str, Any]) -> Any:
+    """GH_MCP 回應的數據部分（data 或舊版的 result）"""
+    data = response.get("data")
+    return data if data is not None else response.get("result")
+
+
+def _components_from(payload: Any) -> Optional[List[Dict[str, Any]]]:
+    if isinstance(payload, dict):
+        payload = payload.get("components")
+    if isinstance(payload, list):
+        return [component for component in payload if isinstance(component, dict) and component.get("id")]
+    return None
+
+
+@dataclass
+class LiveGraph:
+    """文檔中的組件（實際 ID → 組件信息）與連接；connections 為 None 表示伺服器無法列出連接"""
+    components: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    connections: Optional[List[Dict[str, Any]]] = None
+
+    @classmethod
+    def fetch(cls, client: GrasshopperClient, value_ids: Iterable[str] = ()) -> Optional["LiveGraph"]:
+        """
+        讀取文檔
+
+        組件列表優先使用 get_all_components，不支援時使用 get_document_info；
+        value_ids 中的組件以一個批次 get_component_info 讀取當前值。
+
+        Returns:
+            LiveGraph，無法讀取組件列表時返回 None
+        """
+        components = None
+        for command in ("get_all_components", "get_document_info"):
+            response = client.send_command(command, {})
+            if response.get("success"):
+                components = _components_from(_payload(response))
+                if components is not None:
+                    break
+        if components is None:
+            return None
+
+        graph = cls(components={str(component["id"]): dict(component) for component in components})
+
+        response = client.send_command("get_connections", {})
+        connections = _payload(response) if response.get("success") else None
+        if isinstance(connections, dict):
+            connections = connections.get("connections")
+        if isinstance(connections, list):
+            graph.connections = connections
+
+        ids = [comp_id for comp_id in dict.fromkeys(value_ids)
+               if comp_id in graph.components and graph.value_of(comp_id) is None]
+        if ids:
+            batch = CommandBatch()
+            for comp_id in ids:
+                batch.add("get_component_info", {"componentId": comp_id})
+            result = BatchExecutor(client.transport, timeout=client.timeout).execute(batch)
+            for comp_id, info in zip(ids, result.results):
+                data = _payload(info) if info.get("success") else None
+                if isinstance(data, dict) and data.get("value") is not None:
+                    graph.components[comp_id]["value"] = data["value"]
+        return graph
+
+    def value_of(self, comp_id: str) -> Any:
+        component = self.components.get(comp_id) or {}
+        if component.get("value") is not None:
+            return component["value"]
+        settings = component.get("currentSettings")
+        return settings.get("value") if isinstance(settings, dict) else None
+
+    def position_of(self, comp_id: str) -> Optional[Tuple[float, float]]:
+        component = self.components.get(comp_id) or {}
+        position = component.get("position")
+        if isinstance(position, dict):
+            x, y = position.get("x"), position.get("y")
+        else:
+            x, y = component.get("x"), component.get("y")
+        if isinstance(x, (int, float)) and isinstance(y, (int, float)):
+            return float(x), float(y)
+        return None
+
+
+# =============================================================================
+# 編輯腳本
+# =============================================================================
+
+@dataclass
+class EditOp:
+    """編輯腳本中的一個操作"""
+    op: str
+    key: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    reason: str = ""
+
+    def describe(self) -> str:
+        text = f"{self.op:<10} {self.key}"
+        if self.op == OP_SET_VALUE:
+            parameter = self.params.get("parameter")
+            text += f"{'.' + parameter if parameter else ''} = {self.params.get('value')}"
+        elif self.op == OP_MOVE:
+            text += f" -> ({self.params['x']}, {self.params['y']})"
+        return f"{text}（{self.reason}）" if self.reason else text
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"op": self.op, "key": self.key, "params": self.params, "reason": self.reason}
+
+
+@dataclass
+class EditScript:
+    """期望圖與實際圖之間的最小編輯腳本"""
+    ops: List[EditOp] = field(default_factory=list)
+    unchanged: int = 0
+    warnings: List[str] = field(default_factory=list)
+
+    def of(self, op: str) -> List[EditOp]:
+        return [item for item in self.ops if item.op == op]
+
+    def counts(self) -> Dict[str, int]:
+        return {op: len(self.of(op)) for op in OP_ORDER}
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.ops
+
+    def print_plan(self):
+        """按執行順序打印編輯腳本"""
+        counts = self.counts()
+        summary = "，".join(f"{op} {count}" for op, count in counts.items() if count)
+        print(f"編輯腳本: {summary or '無需修改'}（未改變的組件: {self.unchanged} 個）")
+        for op in OP_ORDER:
+            for item in self.of(op):
+                print(f"  {item.describe()}")
+        for warning in self.warnings:
+            print(f"  ⚠️  {warning}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "counts": self.counts(),
+            "unchanged": self.unchanged,
+            "ops": [item.to_dict() for item in self.ops],
+            "warnings": list(self.warnings),
+        }
+
+
+def _param_matches(desired: Optional[str], live: Optional[str]) -> bool:
+    """期望的參數名未指定（或是通用名）或文檔未提供參數名時視為相同"""
+    if desired is None or live is None or desired.casefold() in _GENERIC_PARAMS:
+        return True
+    return desired.casefold() == str(live).casefold()
+
+
+def _values_equal(desired: Any, live: Any) -> bool:
+    try:
+        return abs(float(desired) - float(live)) <= VALUE_TOLERANCE
+    except (TypeError, ValueError):
+        return str(desired) == str(live)
+
+
+# =============================================================================
+# Reconciler
+# =============================================================================
+
+class CanvasReconciler:
+    """比對期望圖與文檔，只執行差異"""
+
+    def __init__(
+        self,
+        client: Optional[GrasshopperClient] = None,
+        component_manager: Optional[ComponentManager] = None,
+        connection_manager: Optional[ConnectionManager] = None,
+        parameter_setter: Optional[ParameterSetter] = None
+    ):
+        """
+        Args:
+            client: Grasshopper 客戶端實例
+            component_manager: 組件管理器實例（其 ID 映射決定期望組件對應的實際組件）
+            connection_manager: 連接管理器實例
+            parameter_setter: 參數設置器實例
+        """
+        self.client = client or GrasshopperClient()
+        self.component_manager = component_manager or ComponentManager(self.client)
+        self.connection_manager = connection_manager or ConnectionManager(self.client, self.component_manager)
+        self.parameter_setter = parameter_setter or ParameterSetter(self.client, self.component_manager)
+
+    def _id_map(self) -> Dict[str, str]:
+        return dict(self.component_manager.component_id_map)
+
+    def fetch_live(self, desired: DesiredGraph) -> Optional[LiveGraph]:
+        """讀取文檔，並讀取已對應的期望組件中需要比對值的當前值"""
+        id_map = self._id_map()
+        value_ids = [id_map[key] for key, component in desired.components.items()
+                     if component.value is not None and key in id_map]
+        return LiveGraph.fetch(self.client, value_ids)
+
+    # -------------------------------------------------------------------------
+    # 計劃
+    # -------------------------------------------------------------------------
+
+    def plan(self, desired: DesiredGraph, live: LiveGraph, prune: bool = False) -> EditScript:
+        """
+        計算編輯腳本
+
+        Args:
+            desired: 期望的圖
+            live: 文檔中的圖
+            prune: 是否刪除不在 ID 映射中的組件（預設保留使用者自己放置的組件）
+        """
+        script = EditScript()
+        id_map = self._id_map()
+        matched: Dict[str, str] = {}
+        deleted: set = set()
+
+        for key, component in desired.components.items():
+            live_id = id_map.get(key)
+            live_component = live.components.get(live_id) if live_id else None
+            if live_component is None:
+                script.ops.append(EditOp(OP_ADD, key, reason="文檔中沒有此組件"))
+                self._plan_values(script, component, new=True)
+                continue
+
+            live_guid = live_component.get("guid") or live_component.get("componentGuid")
+            if component.guid and live_guid and str(live_guid).lower() != component.guid.lower():
+                script.ops.append(EditOp(OP_DELETE, key, {"componentId": live_id}, reason="組件類型改變"))
+                script.ops.append(EditOp(OP_ADD, key, reason="組件類型改變"))
+                self._plan_values(script, component, new=True)
+                deleted.add(live_id)
+                continue
+
+            matched[key] = live_id
+            changed = False
+            position = live.position_of(live_id)
+            if position is not None and component.x is not None and component.y is not None and (
+                abs(position[0] - component.x) > POSITION_TOLERANCE
+                or abs(position[1] - component.y) > POSITION_TOLERANCE
+            ):
+                script.ops.append(EditOp(
+                    OP_MOVE, key, {"componentId": live_id, "x": component.x, "y": component.y},
+                    reason=f"目前在 ({position[0]}, {position[1]})"
+                ))
+                changed = True
+            if component.value is not None:
+                live_value = live.value_of(live_id)
+                if live_value is None or not _values_equal(component.value, live_value):
+                    reason = "無法讀取目前的值" if live_value is None else f"目前為 {live_value}"
+                    script.ops.append(EditOp(
+                        OP_SET_VALUE, key, {"value": component.value, "slider": component.is_slider}, reason=reason
+                    ))
+                    changed = True
+            if not changed:
+                script.unchanged += 1
+
+        # 映射中不再需要的組件；prune 時連同不在映射中的組件
+        managed = {actual_id: key for key, actual_id in id_map.items() if key not in desired.components}
+        kept = set(matched.values())
+        for live_id in live.components:
+            if live_id in kept or live_id in deleted:
+                continue
+            if live_id in managed:
+                script.ops.append(EditOp(OP_DELETE, managed[live_id], {"componentId": live_id},
+                                         reason="期望圖中已沒有此組件"))
+                deleted.add(live_id)
+            elif prune:
+                script.ops.append(EditOp(OP_DELETE, live_id, {"componentId": live_id}, reason="不在 ID 映射中"))
+                deleted.add(live_id)
+
+        self._plan_connections(script, desired, live, matched, id_map)
+        return script
+
+    @staticmethod
+    def _plan_values(script: EditScript, component: DesiredComponent, new: bool):
+        """新組件的值與輸入值"""
+        reason = "新組件" if new else ""
+        if component.value is not None:
+            script.ops.append(EditOp(
+                OP_SET_VALUE, component.key, {"value": component.value, "slider": component.is_slider}, reason=reason
+            ))
+        for parameter, value in component.inputs.items():
+            script.ops.append(EditOp(
+                OP_SET_VALUE, component.key, {"value": value, "parameter": parameter, "slider": False}, reason=reason
+            ))
+
+    @staticmethod
+    def _plan_connections(
+        script: EditScript,
+        desired: DesiredGraph,
+        live: LiveGraph,
+        matched: Dict[str, str],
+        id_map: Dict[str, str]
+    ):
+        live_edges = live.connections or []
+        managed_ids = set(matched.values())
+        used_edges: set = set()
+
+        for spec, cmd in desired.connections:
+            for endpoint in (spec.source, spec.target):
+                if endpoint not in desired.components and endpoint not in id_map:
+                    script.warnings.append(f"連接 {spec.label()} 的端點 '{endpoint}' 不在期望圖或 ID 映射中")
+            source_id = matched.get(spec.source)
+            target_id = matched.get(spec.target)
+            if source_id is None or target_id is None:
+                script.ops.append(EditOp(OP_CONNECT, spec.label(), {"command": cmd}, reason="端點為新組件"))
+                continue
+            if live.connections is None:
+                continue
+            match = next((
+                index for index, edge in enumerate(live_edges)
+                if index not in used_edges
+                and edge.get("sourceId") == source_id and edge.get("targetId") == target_id
+                and _param_matches(spec.source_param, edge.get("sourceParam"))
+                and _param_matches(spec.target_param, edge.get("targetParam"))
+            ), None)
+            if match is None:
+                script.ops.append(EditOp(OP_CONNECT, spec.label(), {"command": cmd}, reason="文檔中沒有此連接"))
+            else:
+                used_edges.add(match)
+
+        if live.connections is None:
+            if desired.connections:
+                script.warnings.append("伺服器無法列出連接（get_connections），假設既有組件之間的連接都存在")
+            return
+
+        # 兩端都是期望組件、但期望圖中沒有的連接
+        keys = {actual_id: key for key, actual_id in matched.items()}
+        for index, edge in enumerate(live_edges):
+            source_id, target_id = edge.get("sourceId"), edge.get("targetId")
+            if index in used_edges or source_id not in managed_ids or target_id not in managed_ids:
+                continue
+            label = WireSpec(keys[source_id], edge.get("sourceParam"), keys[target_id], edge.get("targetParam")).label()
+            params = {"sourceId": source_id, "targetId": target_id}
+            for name in ("sourceParam", "targetParam"):
+                if edge.get(name):
+                    params[name] = edge[name]
+            script.ops.append(EditOp(OP_DISCONNECT, label, params, reason="期望圖中沒有此連接"))
+
+    # -------------------------------------------------------------------------
+    # 執行
+    # -------------------------------------------------------------------------
+
+    def apply(self, script: EditScript, desired: DesiredGraph, max_workers: int = 10) -> Dict[str, Dict[str, int]]:
+        """
+        按順序執行編輯腳本
+
+        Returns:
+            {操作: {"success": 數量, "fail": 數量}}
+        """
+        results = {op: {"success": 0, "fail": 0} for op in OP_ORDER}
+
+        def tally(op: str, outcomes: Iterable[bool]):
+            for ok in outcomes:
+                results[op]["success" if ok else "fail"] += 1
+
+        def run_parallel(ops: List[EditOp], execute) -> List[bool]:
+            if not ops:
+                return []
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(ops)))) as pool:
+                return list(pool.map(execute, ops))
+
+        tally(OP_DISCONNECT, run_parallel(script.of(OP_DISCONNECT), self._disconnect))
+        tally(OP_DELETE, run_parallel(
+            script.of(OP_DELETE), lambda item: self.component_manager.delete_component(item.params["componentId"])
+        ))
+        tally(OP_MOVE, run_parallel(script.of(OP_MOVE), self._move))
+
+        add_commands = [desired.components[item.key].command for item in script.of(OP_ADD)]
+        connect_commands = [item.params["command"] for item in script.of(OP_CONNECT)]
+        if add_commands or connect_commands:
+            add_total = len(add_commands)
+
+            def execute(task: PlacementTask) -> bool:
+                if task.kind == TASK_ADD:
+                    success, _ = self.component_manager.add_from_command(task.command, task.index + 1, add_total)
+                    return success
+                return self.connection_manager.connect_from_command(
+                    task.command, task.index - add_total + 1, len(connect_commands)
+                )
+
+            graph = PlacementGraph.from_commands(add_commands, connect_commands)
+            report = DagScheduler(graph, max_workers=max_workers).run(execute)
+            results[OP_ADD] = {"success": report.add_success, "fail": add_total - report.add_success}
+            results[OP_CONNECT] = {
+                "success": report.connect_success,
+                "fail": len(connect_commands) - report.connect_success,
+            }
+
+        set_ops = script.of(OP_SET_VALUE)
+        slider_ops = [item for item in set_ops if item.params.get("slider")]
+        if slider_ops:
+            slider_results = self.parameter_setter.configure_sliders(
+                [(item.key, str(item.params["value"]), None, None, 0.1) for item in slider_ops],
+                max_workers=max_workers
+            )
+            tally(OP_SET_VALUE, (result.success for result in slider_results))
+        tally(OP_SET_VALUE, run_parallel(
+            [item for item in set_ops if not item.params.get("slider")],
+            lambda item: self.parameter_setter.set_component_value(
+                "", str(item.params["value"]), item.params.get("parameter"), component_id_key=item.key
+            )
+        ))
+        return results
+
+    def _disconnect(self, item: EditOp) -> bool:
+        response = self.client.send_command("disconnect_components", item.params)
+        if not response.get("success"):
+            self.client.safe_print(f"  ✗ 斷開連接失敗: {item.key}: {response.get('error', '未知錯誤')}")
+        return bool(response.get("success"))
+
+    def _move(self, item: EditOp) -> bool:
+        response = self.client.send_command("move_component", item.params)
+        if not response.get("success"):
+            self.client.safe_print(f"  ✗ 移動組件失敗: {item.key}: {response.get('error', '未知錯誤')}")
+        return bool(response.get("success"))
+
+    def reconcile(
+        self,
+        desired: DesiredGraph,
+        dry_run: bool = False,
+        prune: bool = False,
+        max_workers: int = 10
+    ) -> Dict[str, Any]:
+        """
+        讀取文檔、計算並執行編輯腳本
+
+        Args:
+            desired: 期望的圖
+            dry_run: 只打印編輯腳本，不修改文檔
+            prune: 是否刪除不在 ID 映射中的組件
+            max_workers: 最大並行線程數
+
+        Returns:
+            結果字典，包含：
+                - success: 是否全部成功（dry_run 時為能否讀取文檔）
+                - plan: 編輯腳本（counts / unchanged / ops / warnings）
+                - applied: 每種操作的成功 / 失敗數量（dry_run 時沒有）
+        """
+        live = self.fetch_live(desired)
+        if live is None:
+            return {"success": False, "error": "無法讀取文檔中的組件"}
+
+        script = self.plan(desired, live, prune=prune)
+        script.print_plan()
+        result: Dict[str, Any] = {"success": True, "dry_run": dry_run, "plan": script.to_dict()}
+        if dry_run or script.is_empty:
+            return result
+
+        applied = self.apply(script, desired, max_workers=max_workers)
+        result["applied"] = applied
+        result["success"] = all(counts["fail"] == 0 for counts in applied.values())
+        return result
@@ -7,6 +7,12 @@ import json
 from typing import Dict, Optional, Tuple
 
 
+def default_component_id_map_path() -> str:
+    """默認的組件 ID 映射路徑：頂層目錄下的 component_id_map.json"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(script_dir, "..", "component_id_map.json")
+
+
 def load_component_id_map(file_path: Optional[str] = None) -> Optional[Dict[str, str]]:
     """
     從文件加載組件 ID 映射
@@ -18,9 +24,7 @@ def load_component_id_map(file_path: Optional[str] = None) -> Optional[Dict[str,
         組件 ID 映射字典，如果文件不存在則返回 None
     """
     if file_path is None:
-        # 默認路徑：頂層目錄下的 component_id_map.json
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(script_dir, "..", "component_id_map.json")
+        file_path = default_component_id_map_path()
     
     if os.path.exists(file_path):
         try:
@@ -41,8 +45,7 @@ def save_component_id_map(component_id_map: Dict[str, str], file_path: Optional[
         file_path: 保存路徑，如果為 None 則使用默認路徑
     """
     if file_path is None:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        file_path = os.path.join(script_dir, "..", "component_id_map.json")
+        file_path = default_component_id_map_path()
     
     try:
         with open(file_path, 'w', encoding='utf-8') as f:
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+截圖傳輸模式基準測試 (1920x1080)
+
+在本機啟動一個模擬 GH_MCP_Vision 的伺服器（換行分隔、持久連接，支援 transfer
+參數），對同一張 1920x1080 PNG 比較：
+
+- legacy:        舊版路徑，整行讀入 → json.loads → b64decode
+- base64-stream: 串流解碼 base64 欄位（Base64FieldDecoder）
+- binary:        JSON 標頭 + 原始 PNG 附件（recv_into 預先配置的緩衝區）
+- file:          伺服器寫暫存檔，客戶端讀回
+
+每種模式報告每次截圖的耗時中位數、傳輸位元組與相對 legacy 的加速比。
+
+用法：
+    python scripts/benchmark_capture_transfer.py
+    python scripts/benchmark_capture_transfer.py --iterations 20 --json results.json
+"""
+
+import argparse
+import base64
+import json
+import os
+import random
+import socket
+import statistics
+import struct
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+
+# 添加專案路徑
+PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from grasshopper_mcp.streaming import Base64FieldDecoder
+from grasshopper_mcp.transport import Transport
+
+
+def make_png(width: int = 1920, height: int = 1080, seed: int = 0) -> bytes:
+    """產生一張 RGB PNG：漸層與雜訊行交錯，壓縮後約 3 MB，接近真實截圖大小"""
+    rng = random.Random(seed)
+    gradient = bytes((x * 255 // width) & 0xFF for x in range(width * 3))
+    rows = []
+    for y in range(height):
+        row = rng.randbytes(width * 3) if y % 2 else gradient
+        rows.append(b"\x00" + row)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(b"".join(rows), 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+class MockVisionServer:
+    """支援 transfer=base64/binary/file 的最小 capture 伺服器"""
+
+    def __init__(self, png: bytes, width: int, height: int):
+        self.png = png
+        self.width = width
+        self.height = height
+        self.base64_line = self._line({"image": base64.b64encode(png).decode("ascii")})
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(4)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _line(self, extra: dict) -> bytes:
+        data = {"width": self.width, "height": self.height, "format": "png"}
+        data.update(extra)
+        return (json.dumps({"success": True, "data": data}) + "\n").encode("utf-8")
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _handle(self, client: socket.socket):
+        with client, client.makefile("rb") as reader:
+            for line in reader:
+                transfer = (json.loads(line).get("parameters") or {}).get("transfer", "base64")
+                if transfer == "binary":
+                    client.sendall(self._line({"image": None, "attachment": {"length": len(self.png), "encoding": "png"}}))
+                    client.sendall(self.png)
+                elif transfer == "file":
+                    fd, path = tempfile.mkstemp(prefix="gh_mcp_vision_", suffix=".png")
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(self.png)
+                    client.sendall(self._line({"image": None, "path": path, "length": len(self.png)}))
+                else:
+                    client.sendall(self.base64_line)
+
+    def close(self):
+        self._sock.close()
+
+
+def capture_legacy(transport: Transport) -> bytes:
+    response = transport.request({"type": "capture_canvas", "parameters": {}})
+    return base64.b64decode(response["data"]["image"])
+
+
+def capture_streaming(transport: Transport, transfer: str):
+    command = {"type": "capture_canvas", "parameters": {"transfer": transfer}}
+    decoder = Base64FieldDecoder("image")
+    response = {}
+
+    def attachment_size() -> int:
+        response.update(decoder.finish())
+        return int(((response.get("data") or {}).get("attachment") or {}).get("length") or 0)
+
+    attachment = transport.request_attachment(command, decoder.feed, attachment_size)
+    if attachment is not None:
+        return memoryview(attachment)
+    path = (response.get("data") or {}).get("path")
+    if path:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.remove(path)
+        return data
+    return decoder.data
+
+
+def run(iterations: int, width: int, height: int) -> dict:
+    png = make_png(width, height)
+    server = MockVisionServer(png, width, height)
+    modes = {
+        "legacy": capture_legacy,
+        "base64-stream": lambda t: capture_streaming(t, "base64"),
+        "binary": lambda t: capture_streaming(t, "binary"),
+        "file": lambda t: capture_streaming(t, "file"),
+    }
+    results = {"png_bytes": len(png), "width": width, "height": height, "iterations": iterations, "modes": {}}
+    try:
+        for name, capture in modes.items():
+            transport = Transport("127.0.0.1", server.port, pool_size=1)
+            assert bytes(capture(transport)) == png, f"{name}: image mismatch"  # 預熱 + 驗證
+            transport.reset_stats()
+            timings = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                capture(transport)
+                timings.append(time.perf_counter() - start)
+            stats = transport.stats()
+            results["modes"][name] = {
+                "median_ms": round(statistics.median(timings) * 1000, 2),
+                "min_ms": round(min(timings) * 1000, 2),
+                "wire_bytes": stats["bytes_received"] // iterations,
+            }
+            transport.close()
+    finally:
+        server.close()
+
+    legacy = results["modes"]["legacy"]["median_ms"]
+    for entry in results["modes"].values():
+        entry["speedup"] = round(legacy / entry["median_ms"], 2) if entry["median_ms"] else None
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比較截圖的 base64 與二進位傳輸模式")
+    parser.add_argument("--iterations", type=int, default=10, help="每種模式的截圖次數（默認: 10）")
+    parser.add_argument("--width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--json", dest="json_path", help="將結果寫入 JSON 文件")
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.width, args.height)
+
+    print(f"PNG {results['width']}x{results['height']}: {results['png_bytes'] / 1e6:.2f} MB, "
+          f"{results['iterations']} 次/模式")
+    print(f"{'模式':<16}{'中位數 (ms)':>14}{'最小 (ms)':>12}{'傳輸 (MB)':>12}{'加速比':>10}")
+    for name, entry in results["modes"].items():
+        print(f"{name:<16}{entry['median_ms']:>14.2f}{entry['min_ms']:>12.2f}"
+              f"{entry['wire_bytes'] / 1e6:>12.2f}{entry['speedup']:>10.2f}")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n結果已保存到: {args.json_path}")
+
+
+if __name__ == "__main__":
+    main()
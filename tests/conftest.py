@@ -0,0 +1,33 @@
+"""
+共用測試夾具
+
+gh_mcp: 啟動離線 GH_MCP 模擬伺服器（tests/mock_gh_mcp.py）的工廠，測試結束時全部關閉。
+預設不啟動 Vision 伺服器、不讀取 component_knowledge.json（未知 GUID 的組件為 GH_Component），
+需要 Slider 等組件類型時以 knowledge 傳入。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mock_gh_mcp import MockDocument, MockGHMCP
+
+
+@pytest.fixture
+def gh_mcp():
+    mocks = []
+
+    def start(knowledge=None, **kwargs) -> MockGHMCP:
+        kwargs.setdefault("vision_port", None)
+        kwargs.setdefault("document", MockDocument(knowledge=knowledge or {}))
+        mock = MockGHMCP(**kwargs)
+        mocks.append(mock)
+        return mock
+
+    yield start
+    for mock in mocks:
+        mock.close()
@@ -0,0 +1,768 @@
+"""
+離線 GH_MCP 模擬伺服器
+
+以與 GH_MCP (8080) / GH_MCP_Vision (8081) 相同的 JSON-over-TCP 協議（每行一個 JSON 請求、
+每行一個 {"success", "data", "error"} 回應）在記憶體中的文檔上執行命令，
+不需要 Rhino / Grasshopper 即可測試與量測客戶端。
+
+- 主伺服器：add_component、connect_components、disconnect_components、get_connections、
+  get_all_components、get_document_info、get_component_info、get_component_candidates、
+  set_slider_properties、set_component_value、delete_component、move_component、
+  set_component_visibility、group_components、get_document_errors、clear_document、
+  zoom_to_components、batch
+- Vision 伺服器：capture_canvas（base64 / binary 附件）、get_canvas_info、vision_zoom_extents
+- 回應格式取自 GH_MCP 的 C# 處理器（組件 ID 為 GUID 字串、錯誤訊息相同）
+- 命令預設在一個「UI 執行緒」鎖內逐一執行，與 Rhino 相同；latency 在鎖內等待
+- 延遲注入：每種命令的固定延遲 + 抖動；失敗注入：按機率返回錯誤回應，或不回應直接斷線
+- 隨機數以 seed 初始化，注入的失敗可重現
+
+用法（測試中）：
+    with MockGHMCP() as mock:                          # 埠 0：自動分配
+        transport = Transport("127.0.0.1", mock.port)
+        ...
+        mock.document.components                        # 檢查文檔狀態
+
+用法（命令行，取代 Rhino 執行工具或 benchmarks）：
+    python tests/mock_gh_mcp.py --port 8080 --vision-port 8081 --latency 0.005 \\
+        --fail connect_components=0.01
+"""
+
+import argparse
+import base64
+import json
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+KNOWLEDGE_PATH = Path(__file__).parent.parent / "GH_WIP" / "component_knowledge.json"
+
+# 輸入類組件：沒有輸入端，不會產生「未收集到資料」警告
+INPUT_TYPES = {"GH_NumberSlider", "GH_Panel", "GH_BooleanToggle", "GH_ValueList"}
+SLIDER_NAMES = {"Number Slider", "Slider"}
+
+
+# =============================================================================
+# 記憶體文檔
+# =============================================================================
+
+@dataclass
+class MockComponent:
+    """文檔中的一個組件"""
+    id: str
+    guid: str
+    name: str
+    type_name: str
+    x: float
+    y: float
+    inputs: List[Dict[str, str]] = field(default_factory=list)
+    outputs: List[Dict[str, str]] = field(default_factory=list)
+    hidden: bool = False
+    value: Any = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    rounding: Optional[float] = None
+    messages: List[Tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def is_slider(self) -> bool:
+        return self.type_name == "GH_NumberSlider"
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "type": self.type_name,
+            "name": self.name,
+            "guid": self.guid,
+            "position": {"x": self.x, "y": self.y},
+        }
+
+
+@dataclass
+class MockWire:
+    source_id: str
+    source_param: Optional[str]
+    target_id: str
+    target_param: Optional[str]
+
+    @property
+    def key(self) -> Tuple[str, Optional[str], str, Optional[str]]:
+        return (self.source_id, self.source_param, self.target_id, self.target_param)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sourceId": self.source_id,
+            "sourceParam": self.source_param,
+            "targetId": self.target_id,
+            "targetParam": self.target_param,
+        }
+
+
+class CommandError(Exception):
+    """命令執行失敗：轉為 {"success": false, "error": ...}"""
+
+
+def load_knowledge(path: Path = KNOWLEDGE_PATH) -> Dict[str, Dict[str, Any]]:
+    """以 GUID 與名稱為鍵的組件資訊（component_knowledge.json）；文件不存在時為空"""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        knowledge = json.load(f)
+    index: Dict[str, Dict[str, Any]] = {}
+    for name, info in knowledge.items():
+        entry = dict(info, name=name)
+        index.setdefault(name, entry)
+        if info.get("guid"):
+            index.setdefault(info["guid"], entry)
+    return index
+
+
+class MockDocument:
+    """記憶體中的 Grasshopper 文檔與 GH_MCP 命令處理器（非執行緒安全，由伺服器加鎖）"""
+
+    def __init__(self, knowledge: Optional[Dict[str, Dict[str, Any]]] = None, strict_params: bool = False):
+        """
+        Args:
+            knowledge: load_knowledge() 的結果，用於組件名稱與參數；None 時自動讀取
+            strict_params: 連接時檢查參數名是否存在於組件的輸入 / 輸出（已知組件才檢查）
+        """
+        self.knowledge = load_knowledge() if knowledge is None else knowledge
+        self.strict_params = strict_params
+        self.components: Dict[str, MockComponent] = {}
+        # 以 (sourceId, sourceParam, targetId, targetParam) 為鍵，保持插入順序
+        self.wires: Dict[Tuple[str, Optional[str], str, Optional[str]], MockWire] = {}
+        self.groups: List[Dict[str, Any]] = []
+
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "add_component": self.add_component,
+            "connect_components": self.connect_components,
+            "disconnect_components": self.disconnect_components,
+            "get_connections": self.get_connections,
+            "get_all_components": self.get_all_components,
+            "get_document_info": self.get_document_info,
+            "get_component_info": self.get_component_info,
+            "get_component_candidates": self.get_component_candidates,
+            "set_slider_properties": self.set_slider_properties,
+            "set_component_value": self.set_component_value,
+            "delete_component": self.delete_component,
+            "move_component": self.move_component,
+            "set_component_visibility": self.set_component_visibility,
+            "group_components": self.group_components,
+            "get_document_errors": self.get_document_errors,
+            "clear_document": self.clear_document,
+            "zoom_to_components": self.zoom_to_components,
+        }
+        self.vision_handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "capture_canvas": self.capture_canvas,
+            "get_canvas_info": self.get_canvas_info,
+            "vision_zoom_extents": lambda params: {"success": True, "message": "Zoomed to extents"},
+        }
+
+    # -------------------------------------------------------------------------
+    # 查詢輔助
+    # -------------------------------------------------------------------------
+
+    def _component(self, params: Dict[str, Any], *keys: str) -> MockComponent:
+        for key in keys:
+            component_id = params.get(key)
+            if component_id:
+                component = self.components.get(str(component_id))
+                if component is None:
+                    raise CommandError(f"Component not found: {component_id}")
+                return component
+        raise CommandError(f"Missing required parameter: {keys[0]}")
+
+    @staticmethod
+    def _find_param(params: List[Dict[str, str]], requested: Optional[str], kind: str) -> Optional[str]:
+        if not params:
+            return requested
+        if requested is None:
+            return params[0].get("name")
+        for param in params:
+            if requested in (param.get("name"), param.get("nickname")):
+                return param.get("name")
+        available = ", ".join(param.get("name", "") for param in params)
+        raise CommandError(f"{kind} parameter '{requested}' not found. Available {kind.lower()}s: [{available}]")
+
+    def incoming(self, component_id: str) -> List[MockWire]:
+        return [wire for wire in self.wires.values() if wire.target_id == component_id]
+
+    # -------------------------------------------------------------------------
+    # 主伺服器命令
+    # -------------------------------------------------------------------------
+
+    def add_component(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        guid = params.get("guid") or ""
+        name = params.get("type") or ""
+        if not guid and not name:
+            raise CommandError("Missing required parameter: guid")
+        info = self.knowledge.get(guid) or self.knowledge.get(name) or {}
+        name = info.get("name") or name or guid
+        type_name = info.get("typeName") or ("GH_NumberSlider" if name in SLIDER_NAMES else "GH_Component")
+        component = MockComponent(
+            id=str(uuid.uuid4()),
+            guid=guid or info.get("guid", ""),
+            name=name,
+            type_name=type_name,
+            x=float(params.get("x", 0.0)),
+            y=float(params.get("y", 0.0)),
+            inputs=list(info.get("inputs", [])),
+            outputs=list(info.get("outputs", [])),
+        )
+        if component.is_slider:
+            # Grasshopper 新建 Number Slider 的預設值
+            component.minimum, component.maximum, component.value, component.rounding = 0.0, 1.0, 0.25, 0.01
+        self.components[component.id] = component
+        return {"id": component.id, "type": type_name, "name": name, "x": component.x, "y": component.y}
+
+    def connect_components(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        source = self._component(params, "sourceId")
+        target = self._component(params, "targetId")
+        source_param = params.get("sourceParam")
+        target_param = params.get("targetParam")
+        if self.strict_params:
+            source_param = self._find_param(source.outputs, source_param, "Output")
+            target_param = self._find_param(target.inputs, target_param, "Input")
+        wire = MockWire(source.id, source_param, target.id, target_param)
+        self.wires.setdefault(wire.key, wire)
+        return {
+            "from": {"id": source.id, "name": source.name, "parameter": source_param},
+            "to": {"id": target.id, "name": target.name, "parameter": target_param},
+        }
+
+    def disconnect_components(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        source_id, target_id = params.get("sourceId"), params.get("targetId")
+        target_param = params.get("targetParam")
+        removed = [
+            key for key, wire in self.wires.items()
+            if wire.source_id == source_id and wire.target_id == target_id
+            and (target_param is None or wire.target_param == target_param)
+        ]
+        for key in removed:
+            del self.wires[key]
+        return {"removed": len(removed)}
+
+    def get_connections(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [wire.to_dict() for wire in self.wires.values()]
+
+    def get_all_components(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [component.summary() for component in self.components.values()]
+
+    def get_document_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": "mock.gh",
+            "path": None,
+            "componentCount": len(self.components),
+            "components": [
+                {"id": c.id, "type": c.type_name, "name": c.name} for c in self.components.values()
+            ],
+        }
+
+    def get_component_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        component = self._component(params, "componentId", "id")
+        connected = {wire.target_param for wire in self.incoming(component.id)}
+        info: Dict[str, Any] = {
+            "id": component.id,
+            "type": component.type_name,
+            "name": component.name,
+            "description": component.name,
+            "inputs": [
+                {"name": p.get("name"), "nickname": p.get("nickname"), "sourceCount": int(p.get("name") in connected)}
+                for p in component.inputs
+            ],
+            "outputs": [{"name": p.get("name"), "nickname": p.get("nickname")} for p in component.outputs],
+        }
+        if component.messages:
+            info["runtimeMessages"] = [{"level": level, "message": message} for level, message in component.messages]
+        if component.is_slider:
+            info.update(value=component.value, minimum=component.minimum, maximum=component.maximum)
+        elif component.value is not None:
+            info["value"] = component.value
+        return info
+
+    def get_component_candidates(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        query = params.get("name")
+        if not query:
+            raise CommandError("Component name is required")
+        entries = {id(info): info for info in self.knowledge.values()}.values()
+        candidates = [
+            {
+                "name": info["name"],
+                "fullName": info["name"],
+                "guid": info.get("guid", ""),
+                "typeName": info.get("typeName", "Unknown"),
+                "obsolete": "obsolete" in info.get("typeName", "").lower(),
+                "inputs": list(info.get("inputs", [])),
+                "outputs": list(info.get("outputs", [])),
+            }
+            for info in entries if query.lower() in info["name"].lower()
+        ]
+        return {"query": query, "normalizedQuery": query, "count": len(candidates), "candidates": candidates}
+
+    def set_slider_properties(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        component = self._component(params, "id", "componentId")
+        if not component.is_slider:
+            raise CommandError(f"Component is not a slider: {component.id}")
+        if params.get("min") is not None:
+            component.minimum = float(params["min"])
+        if params.get("max") is not None:
+            component.maximum = float(params["max"])
+        if params.get("rounding") is not None:
+            component.rounding = float(params["rounding"])
+        if params.get("value") not in (None, ""):
+            value = float(params["value"])
+            # Grasshopper 把值夾在範圍內
+            component.value = min(component.maximum, max(component.minimum, value))
+        return {
+            "id": component.id,
+            "value": component.value,
+            "min": component.minimum,
+            "max": component.maximum,
+            "rounding": component.rounding,
+        }
+
+    def set_component_value(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        component = self._component(params, "id", "componentId")
+        value = params.get("value")
+        if component.is_slider:
+            return self.set_slider_properties({"id": component.id, "value": value})
+        component.value = value
+        return {"id": component.id, "type": component.type_name, "value": value}
+
+    def delete_component(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        component = self._component(params, "componentId", "id")
+        del self.components[component.id]
+        for key in [k for k, w in self.wires.items() if component.id in (w.source_id, w.target_id)]:
+            del self.wires[key]
+        return {"success": True, "message": "Component deleted successfully", "componentId": component.id}
+
+    def move_component(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        component = self._component(params, "componentId", "id")
+        component.x, component.y = float(params.get("x", 0.0)), float(params.get("y", 0.0))
+        return {"success": True, "message": "Component moved successfully",
+                "componentId": component.id, "x": component.x, "y": component.y}
+
+    def set_component_visibility(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        component = self._component(params, "componentId", "id")
+        component.hidden = bool(params.get("hidden"))
+        return {"success": True, "componentId": component.id, "hidden": component.hidden,
+                "message": f"Component visibility set to {'hidden' if component.hidden else 'visible'}"}
+
+    def group_components(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        ids = [str(i) for i in params.get("componentIds") or []]
+        missing = [i for i in ids if i not in self.components]
+        if not ids or missing:
+            raise CommandError(f"Components not found: {missing}" if missing else "No components to group")
+        group = {"id": str(uuid.uuid4()), "name": params.get("groupName"), "componentIds": ids,
+                 "color": params.get("color")}
+        self.groups.append(group)
+        return {"groupId": group["id"], "componentCount": len(ids)}
+
+    def get_document_errors(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        errors = []
+        wired = {wire.target_id for wire in self.wires.values()}
+        for component in self.components.values():
+            messages = list(component.messages)
+            # 有輸入端卻沒有任何連入的組件：Grasshopper 報「未收集到資料」警告
+            if component.inputs and component.type_name not in INPUT_TYPES and component.id not in wired:
+                messages.append(("Warning", f"Input parameter {component.inputs[0].get('nickname')} failed to collect data"))
+            for level, message in messages:
+                errors.append({
+                    "componentId": component.id,
+                    "componentName": component.name,
+                    "componentType": component.type_name,
+                    "messageType": level,
+                    "message": message,
+                    "description": message,
+                })
+        return {"errorCount": len(errors), "errors": errors}
+
+    def clear_document(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.components.clear()
+        self.wires.clear()
+        self.groups.clear()
+        return {"success": True, "message": "Document cleared"}
+
+    def zoom_to_components(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        ids = [str(i) for i in params.get("componentIds") or []]
+        found = [i for i in ids if i in self.components]
+        return {"success": True, "message": f"Zoomed to {len(found)} component(s)", "componentCount": len(found),
+                "componentIds": found, "notFoundIds": [i for i in ids if i not in self.components]}
+
+    # -------------------------------------------------------------------------
+    # Vision 命令
+    # -------------------------------------------------------------------------
+
+    def bounds(self) -> Dict[str, float]:
+        if not self.components:
+            return {"x": 0.0, "y": 0.0, "width": 1000.0, "height": 800.0}
+        xs = [c.x for c in self.components.values()]
+        ys = [c.y for c in self.components.values()]
+        return {"x": min(xs), "y": min(ys), "width": max(xs) - min(xs) + 100.0, "height": max(ys) - min(ys) + 60.0}
+
+    def capture_canvas(self, params: Dict[str, Any]) -> "Attachment":
+        bounds = params.get("bounds") or self.bounds()
+        png = render_png(self, bounds)
+        width, height = struct.unpack(">II", png[16:24])
+        data = {"width": width, "height": height, "bounds": bounds, "format": "png"}
+        return Attachment(data, png, params.get("transfer") or "base64")
+
+    def get_canvas_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {"componentCount": len(self.components), "bounds": self.bounds(), "zoom": 1.0}
+
+
+@dataclass
+class Attachment:
+    """帶 PNG 的回應；binary 模式在 JSON 行之後直接送出原始位元組"""
+    data: Dict[str, Any]
+    png: bytes
+    transfer: str
+
+    def pack(self) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        data = dict(self.data)
+        if self.transfer == "binary":
+            data["image"] = None
+            data["attachment"] = {"length": len(self.png), "encoding": "png"}
+            return data, self.png
+        data["image"] = base64.b64encode(self.png).decode("ascii")
+        return data, None
+
+
+def render_png(document: MockDocument, bounds: Dict[str, float], scale: float = 0.25) -> bytes:
+    """把組件畫成灰色方塊的灰階 PNG（大小隨畫布範圍，最多 2000 像素）"""
+    width = max(8, min(2000, int(float(bounds["width"]) * scale)))
+    height = max(8, min(2000, int(float(bounds["height"]) * scale)))
+    rows = [bytearray(b"\xff" * width) for _ in range(height)]
+    for component in document.components.values():
+        left = int((component.x - float(bounds["x"])) * scale)
+        top = int((component.y - float(bounds["y"])) * scale)
+        for row in rows[max(0, top):max(0, top + 10)]:
+            row[max(0, left):max(0, left + 20)] = b"\x80" * len(row[max(0, left):max(0, left + 20)])
+    raw = b"".join(b"\x00" + bytes(row) for row in rows)
+
+    def chunk(tag: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+# =============================================================================
+# 延遲與失敗注入
+# =============================================================================
+
+@dataclass
+class FaultConfig:
+    """
+    延遲與失敗注入設定
+
+    Attributes:
+        latency: 每種命令的延遲（秒），未列出的命令使用 default_latency
+        default_latency: 預設延遲（秒）
+        jitter: 延遲的隨機比例（0.2 表示 ±20%）
+        failures: 每種命令返回錯誤回應的機率
+        drops: 每種命令不回應直接斷線的機率（模擬 GH 當機 / 連接中斷）
+        seed: 隨機數種子
+    """
+    latency: Dict[str, float] = field(default_factory=dict)
+    default_latency: float = 0.0
+    jitter: float = 0.0
+    failures: Dict[str, float] = field(default_factory=dict)
+    drops: Dict[str, float] = field(default_factory=dict)
+    seed: int = 0
+
+
+class _Dropped(Exception):
+    """注入的斷線"""
+
+
+# =============================================================================
+# TCP 伺服器
+# =============================================================================
+
+class MockServer:
+    """在一個埠上以換行分隔 JSON 協議提供一組命令處理器"""
+
+    def __init__(self, mock: "MockGHMCP", handlers: Dict[str, Callable[[Dict[str, Any]], Any]],
+                 host: str = "127.0.0.1", port: int = 0):
+        self.mock = mock
+        self.handlers = handlers
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((host, port))
+        self._sock.listen(64)
+        self.host = host
+        self.port = self._sock.getsockname()[1]
+        self._clients: set = set()
+        self._clients_lock = threading.Lock()
+        # 同時打開的連接數峰值（檢查客戶端的並行度）
+        self.peak_clients = 0
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._clients_lock:
+                self._clients.add(client)
+                self.peak_clients = max(self.peak_clients, len(self._clients))
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _handle(self, client: socket.socket):
+        try:
+            self._serve_client(client)
+        finally:
+            with self._clients_lock:
+                self._clients.discard(client)
+
+    def _serve_client(self, client: socket.socket):
+        with client, client.makefile("rb") as reader:
+            for line in reader:
+                if not line.strip():
+                    continue
+                try:
+                    command = json.loads(line.decode("utf-8-sig"))
+                    response, attachment = self.mock.dispatch(self.handlers, command)
+                except _Dropped:
+                    return
+                except json.JSONDecodeError as e:
+                    response, attachment = {"success": False, "data": None, "error": f"Invalid JSON: {e}"}, None
+                try:
+                    client.sendall((json.dumps(response, ensure_ascii=False) + "\n").encode("utf-8"))
+                    if attachment:
+                        client.sendall(attachment)
+                except OSError:
+                    return
+                if not self.mock.keep_alive:
+                    return
+
+    def close(self):
+        """停止監聽並斷開所有連接（與關閉 Rhino 相同），之後同一埠可立即重新綁定"""
+        # 先 shutdown 才能喚醒阻塞在 accept() 的執行緒並釋放埠
+        for sock in [self._sock, *self._connections()]:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._sock.close()
+
+    def _connections(self) -> List[socket.socket]:
+        with self._clients_lock:
+            return list(self._clients)
+
+
+class MockGHMCP:
+    """GH_MCP + GH_MCP_Vision 模擬伺服器"""
+
+    def __init__(
+        self,
+        port: int = 0,
+        vision_port: Optional[int] = 0,
+        host: str = "127.0.0.1",
+        faults: Optional[FaultConfig] = None,
+        serialize: bool = True,
+        keep_alive: bool = True,
+        native_batch: bool = True,
+        document: Optional[MockDocument] = None
+    ):
+        """
+        Args:
+            port: 主伺服器埠（0 表示自動分配）
+            vision_port: Vision 伺服器埠（0 自動分配，None 不啟動）
+            host: 綁定地址
+            faults: 延遲與失敗注入設定
+            serialize: 命令是否在單一「UI 執行緒」鎖內逐一執行（與 Rhino 相同）
+            keep_alive: False 時每條連接只處理一個命令（舊版 GH_MCP）
+            native_batch: 是否支援 batch 信封
+            document: 記憶體文檔，None 時新建
+        """
+        self.document = document or MockDocument()
+        self.faults = faults or FaultConfig()
+        self.serialize = serialize
+        self.keep_alive = keep_alive
+        self.native_batch = native_batch
+        self.received: List[str] = []
+        self._ui_thread = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._random = random.Random(self.faults.seed)
+
+        self.server = MockServer(self, self.document.handlers, host, port)
+        self.vision = MockServer(self, self.document.vision_handlers, host, vision_port) \
+            if vision_port is not None else None
+
+    @property
+    def port(self) -> int:
+        return self.server.port
+
+    @property
+    def vision_port(self) -> Optional[int]:
+        return self.vision.port if self.vision else None
+
+    def __enter__(self) -> "MockGHMCP":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.server.close()
+        if self.vision:
+            self.vision.close()
+
+    # -------------------------------------------------------------------------
+    # 執行
+    # -------------------------------------------------------------------------
+
+    def _roll(self, rates: Dict[str, float], command_type: str) -> bool:
+        rate = rates.get(command_type, rates.get("*", 0.0))
+        return rate > 0 and self._random.random() < rate
+
+    def _delay(self, command_type: str) -> float:
+        delay = self.faults.latency.get(command_type, self.faults.default_latency)
+        if delay and self.faults.jitter:
+            delay *= 1.0 + self._random.uniform(-self.faults.jitter, self.faults.jitter)
+        return max(0.0, delay)
+
+    def dispatch(self, handlers: Dict[str, Callable], command: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        """執行一個命令（含注入），返回 (回應, 二進位附件)"""
+        command_type = str(command.get("type", ""))
+        params = command.get("parameters") or {}
+        with self._state_lock:
+            self.received.append(command_type)
+            drop = self._roll(self.faults.drops, command_type)
+            fail = self._roll(self.faults.failures, command_type)
+            delay = self._delay(command_type)
+        if drop:
+            raise _Dropped()
+
+        lock = self._ui_thread if self.serialize else _NO_LOCK
+        with lock:
+            if delay:
+                time.sleep(delay)
+            if fail:
+                return {"success": False, "data": None, "error": f"Injected failure in '{command_type}'"}, None
+            if command_type == "batch" and self.native_batch and handlers is self.document.handlers:
+                return {"success": True, "data": self._batch(params), "error": None}, None
+            return self._run(handlers, command_type, params)
+
+    def _run(self, handlers: Dict[str, Callable], command_type: str,
+             params: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[bytes]]:
+        handler = handlers.get(command_type)
+        if handler is None:
+            return {"success": False, "data": None,
+                    "error": f"No handler registered for command type '{command_type}'"}, None
+        try:
+            with self._state_lock:
+                result = handler(params)
+        except CommandError as e:
+            return {"success": False, "data": None, "error": str(e)}, None
+        except (KeyError, TypeError, ValueError) as e:
+            return {"success": False, "data": None,
+                    "error": f"Error executing command '{command_type}': {e}"}, None
+        if isinstance(result, Attachment):
+            data, attachment = result.pack()
+            return {"success": True, "data": data, "error": None}, attachment
+        return {"success": True, "data": result, "error": None}, None
+
+    def _batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        results: List[Dict[str, Any]] = []
+        refs: Dict[str, str] = {}
+        for item in params.get("commands", []):
+            resolved = {
+                key: refs.get(value["$ref"], "") if isinstance(value, dict) and "$ref" in value else value
+                for key, value in (item.get("parameters") or {}).items()
+            }
+            with self._state_lock:
+                self.received.append(str(item.get("type", "")))
+            response, _ = self._run(self.document.handlers, item.get("type", ""), resolved)
+            if item.get("ref") and response["success"]:
+                refs[item["ref"]] = response["data"]["id"]
+            results.append(response)
+        return {"results": results, "refs": refs}
+
+    def counts(self) -> Dict[str, int]:
+        """每種命令收到的次數；batch 信封與其中的每個命令都分別計入"""
+        with self._state_lock:
+            counts: Dict[str, int] = {}
+            for command_type in self.received:
+                counts[command_type] = counts.get(command_type, 0) + 1
+            return counts
+
+
+class _NoLock:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_LOCK = _NoLock()
+
+
+# =============================================================================
+# 命令行
+# =============================================================================
+
+def _rates(values: List[str]) -> Dict[str, float]:
+    rates = {}
+    for value in values:
+        command_type, _, rate = value.partition("=")
+        rates[command_type] = float(rate)
+    return rates
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="離線 GH_MCP 模擬伺服器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--vision-port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="每個命令的預設延遲（秒）")
+    parser.add_argument("--command-latency", action="append", default=[], metavar="TYPE=SECONDS",
+                        help="個別命令的延遲，可重複")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延遲的隨機比例")
+    parser.add_argument("--fail", action="append", default=[], metavar="TYPE=RATE",
+                        help="返回錯誤回應的機率（TYPE 可為 *），可重複")
+    parser.add_argument("--drop", action="append", default=[], metavar="TYPE=RATE",
+                        help="不回應直接斷線的機率，可重複")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--legacy", action="store_true", help="每條連接只處理一個命令、不支援 batch（舊版 GH_MCP）")
+    parser.add_argument("--strict-params", action="store_true", help="連接時檢查參數名")
+    args = parser.parse_args(argv)
+
+    faults = FaultConfig(
+        latency=_rates(args.command_latency),
+        default_latency=args.latency,
+        jitter=args.jitter,
+        failures=_rates(args.fail),
+        drops=_rates(args.drop),
+        seed=args.seed,
+    )
+    mock = MockGHMCP(
+        port=args.port, vision_port=args.vision_port, host=args.host, faults=faults,
+        keep_alive=not args.legacy, native_batch=not args.legacy,
+        document=MockDocument(strict_params=args.strict_params),
+    )
+    print(f"GH_MCP 模擬伺服器: {args.host}:{mock.port}，Vision: {args.host}:{mock.vision_port}（Ctrl+C 結束）")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        mock.close()
+        print(json.dumps(mock.counts(), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Test: 非同步客戶端 AsyncGrasshopperClient / AsyncTransport
+
+測試項目：
+1. 並發 add_component / connect：多個在途請求，回應與請求正確配對
+2. 管線化與多連接：總耗時遠小於逐一發送
+3. 舊式伺服器（每個命令後關閉連接）：探測後每條連接只送一個命令
+4. 伺服器執行命令後未回應就關閉連接：第一個未回應的非冪等命令不重送，排在後面的未讀請求重送
+5. 超時的請求不會讓後續回應錯位
+6. PlacementExecutor.execute_placement_info_async；讀取命令文件與保存 ID 映射不在事件迴圈執行緒中進行
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_mcp.async_transport import AsyncTransport
+from grasshopper_mcp.transport import TransportError, TransportTimeout
+from grasshopper_tools.async_client import AsyncGrasshopperClient
+
+
+class AsyncGraphServer:
+    """asyncio 版最小 GH_MCP 伺服器：每條連接按順序處理命令，可設定每個命令的延遲"""
+
+    def __init__(self, latency: float = 0.0, keep_alive: bool = True, drop_after_add: int = 0):
+        self.latency = latency
+        self.keep_alive = keep_alive
+        # 前 drop_after_add 個 add_component 執行後不回應，直接關閉連接
+        self.drop_after_add = drop_after_add
+        self.components = {}
+        self.connections = []
+        self.accepted = 0
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def _handle(self, reader, writer):
+        self.accepted += 1
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            command = json.loads(line)
+            params = command.get("parameters", {})
+            delay = params.get("delay", self.latency)
+            if delay:
+                await asyncio.sleep(delay)
+            if command["type"] == "add_component":
+                comp_id = f"id-{len(self.components)}"
+                self.components[comp_id] = params.get("guid")
+                response = {"success": True, "data": {"id": comp_id}}
+                if self.drop_after_add:
+                    self.drop_after_add -= 1
+                    break
+            elif command["type"] == "connect_components":
+                ok = params.get("sourceId") in self.components and params.get("targetId") in self.components
+                if ok:
+                    self.connections.append((params["sourceId"], params["targetId"]))
+                response = {"success": ok, "error": None if ok else "Component not found"}
+            else:
+                response = {"success": True, "data": {"echo": params.get("tag")}}
+            writer.write((json.dumps(response) + "\n").encode("utf-8"))
+            await writer.drain()
+            if not self.keep_alive:
+                break
+        writer.close()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def test_concurrent_add_and_connect():
+    """100 個組件並發創建後串接，ID 映射與連接正確"""
+    async def scenario():
+        server = await AsyncGraphServer().start()
+        async with AsyncGrasshopperClient("127.0.0.1", server.port) as client:
+            ids = await asyncio.gather(*(
+                client.add_component("guid", i * 10, 0, f"C{i}") for i in range(100)
+            ))
+            assert all(ids)
+            assert len(set(ids)) == 100
+            assert client.get_component_id("C5") == ids[5]
+
+            results = await asyncio.gather(*(
+                client.connect(ids[i], ids[i + 1], target_param="A") for i in range(99)
+            ))
+            assert all(results)
+            stats = client.transport.stats()
+            assert stats["opened"] <= 4
+            assert stats["commands"]["add_component"]["count"] == 100
+        await server.close()
+        assert len(server.connections) == 99
+
+    asyncio.run(scenario())
+
+
+def test_pipelining_is_faster_than_sequential():
+    """每個命令 10 ms 延遲，80 個命令經 4 條連接管線化約 0.2 秒（逐一發送需 0.8 秒）"""
+    async def scenario():
+        server = await AsyncGraphServer(latency=0.01).start()
+        transport = AsyncTransport("127.0.0.1", server.port, pool_size=4, pipeline_depth=8)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        ticker_task = asyncio.ensure_future(ticker())
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(
+            transport.send_command("ping", {"tag": i}) for i in range(80)
+        ))
+        elapsed = time.perf_counter() - start
+        ticker_task.cancel()
+
+        # 回應與請求一一對應
+        assert [r["data"]["echo"] for r in responses] == list(range(80))
+        assert elapsed < 0.6
+        # 事件迴圈在等待期間仍在運行
+        assert ticks > 5
+        await transport.close()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_legacy_server_single_command_per_connection():
+    """伺服器每處理一個命令就關閉連接：探測後每條連接只送一個命令，不需要重送"""
+    async def scenario():
+        server = await AsyncGraphServer(latency=0.02, keep_alive=False).start()
+        transport = AsyncTransport("127.0.0.1", server.port, pool_size=1, pipeline_depth=4)
+        responses = await asyncio.gather(*(
+            transport.send_command("ping", {"tag": i}) for i in range(12)
+        ))
+        assert [r["data"]["echo"] for r in responses] == list(range(12))
+        stats = transport.stats()
+        assert transport.pipeline_depth == 1
+        assert transport.capabilities["keep_alive"] is False
+        assert stats["resent"] == 0
+        assert stats["errors"] == 0
+        await transport.close()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_close_without_reply_not_resent():
+    """伺服器執行 add_component 後未回應就關閉連接：該命令報錯而不重送，後面未讀的請求重送"""
+    async def scenario():
+        server = await AsyncGraphServer(latency=0.02, drop_after_add=1).start()
+        transport = AsyncTransport("127.0.0.1", server.port, pool_size=1, pipeline_depth=4)
+        await transport.send_command("ping")
+        results = await asyncio.gather(
+            *(transport.send_command("add_component", {"guid": f"g{i}"}) for i in range(3)),
+            transport.send_command("get_document_info", {"tag": "read"}),
+            return_exceptions=True,
+        )
+        assert isinstance(results[0], TransportError) and "may have been executed" in str(results[0])
+        assert [r["data"]["id"] for r in results[1:3]] == ["id-1", "id-2"]
+        assert results[3]["data"]["echo"] == "read"
+        # 第一個命令只執行一次
+        assert len(server.components) == 3
+        assert transport.stats()["resent"] == 3
+        await transport.close()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_timeout_does_not_misalign_responses():
+    """超時請求的遲到回應被丟棄，同一連接上的下一個請求拿到自己的回應"""
+    async def scenario():
+        server = await AsyncGraphServer().start()
+        transport = AsyncTransport("127.0.0.1", server.port, pool_size=1)
+        try:
+            await transport.send_command("ping", {"tag": "slow", "delay": 0.2}, timeout=0.05)
+            raise AssertionError("expected timeout")
+        except TransportTimeout:
+            pass
+        response = await transport.send_command("ping", {"tag": "next"})
+        assert response["data"]["echo"] == "next"
+        assert transport.stats()["opened"] == 1
+        await transport.close()
+        await server.close()
+
+    asyncio.run(scenario())
+
+
+def test_placement_executor_async(tmp_path, monkeypatch):
+    """execute_placement_info_async 與同步版返回相同的結果字典"""
+    from grasshopper_tools import placement_executor
+    from grasshopper_tools.client import GrasshopperClient
+    from grasshopper_tools.component_manager import ComponentManager
+    from grasshopper_tools.placement_executor import PlacementExecutor
+
+    io_threads = []
+
+    def on_thread(function):
+        def wrapper(*args, **kwargs):
+            io_threads.append(threading.current_thread())
+            return function(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(placement_executor, "load_placement_info", on_thread(placement_executor.load_placement_info))
+    monkeypatch.setattr(ComponentManager, "save_id_map", on_thread(ComponentManager.save_id_map))
+
+    commands = [
+        {"type": "add_component", "componentId": f"C{i}", "x": i * 50, "y": 0,
+         "parameters": {"guid": "57da07bd-ecab-415d-9d86-af36d7073abc"}}
+        for i in range(20)
+    ]
+    commands += [
+        {"type": "connect_components",
+         "parameters": {"sourceId": f"C{i}", "targetId": f"C{i + 10}", "targetParam": "A"}}
+        for i in range(10)
+    ]
+    json_path = tmp_path / "placement_info.json"
+    json_path.write_text(json.dumps({"description": "async", "commands": commands}), encoding="utf-8")
+
+    async def scenario():
+        server = await AsyncGraphServer().start()
+        executor = PlacementExecutor(client=GrasshopperClient("127.0.0.1", server.port))
+        result = await executor.execute_placement_info_async(
+            str(json_path), id_map_path=str(tmp_path / "component_id_map.json")
+        )
+        await server.close()
+        return result, executor
+
+    result, executor = asyncio.run(scenario())
+    assert result["success"]
+    assert result["add_success"] == 20
+    assert result["connect_success"] == 10
+    assert executor.component_manager.get_component_id("C3")
+    assert len(io_threads) == 2 and threading.main_thread() not in io_threads
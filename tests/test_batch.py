@@ -0,0 +1,184 @@
+"""
+Test: GH_MCP 批次命令
+
+測試項目：
+1. 原生 batch 信封：一次往返，引用解析
+2. 不支援 batch 的伺服器：自動降級為管線化，仍保持順序與引用
+3. 舊式伺服器（每個命令後關閉連接）：降級為逐一發送
+4. 未解析的引用返回逐項錯誤
+5. PlacementExecutor 批次模式：150 個命令遠小於 1 秒
+6. 管線化中途超時：保留已回應的結果與 ID，在途命令標記 unknown，並記錄失敗統計
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_mcp.batch import (
+    MODE_NATIVE, MODE_PIPELINED, MODE_SEQUENTIAL,
+    BatchExecutor, CommandBatch, ref,
+)
+from grasshopper_mcp.transport import Transport
+from mock_gh_mcp import CommandError
+
+
+def wires(server):
+    """文檔中的連線 (sourceId, targetId)，保持連接順序"""
+    return [(wire.source_id, wire.target_id) for wire in server.document.wires.values()]
+
+
+def stall_after(server, count):
+    """文檔中已有 count 個組件後，add_component 不再及時回應（模擬 UI 執行緒卡住）"""
+    handlers = server.document.handlers
+    add_component = handlers["add_component"]
+
+    def stalled(params):
+        if len(server.document.components) >= count:
+            time.sleep(1.0)
+            raise CommandError("Timeout")
+        return add_component(params)
+
+    handlers["add_component"] = stalled
+
+
+def make_batch(count: int) -> CommandBatch:
+    """count 個組件 + 串成鏈的 count - 1 條連接"""
+    batch = CommandBatch()
+    for i in range(count):
+        batch.add("add_component", {"guid": f"g{i}", "x": i * 100, "y": 0}, ref=f"C{i}")
+    for i in range(count - 1):
+        batch.add("connect_components", {"sourceId": ref(f"C{i}"), "targetId": ref(f"C{i + 1}")})
+    return batch
+
+
+@pytest.mark.parametrize("native, expected_mode", [(True, MODE_NATIVE), (False, MODE_PIPELINED)])
+def test_batch_modes(gh_mcp, native, expected_mode):
+    """原生與管線化模式結果一致"""
+    server = gh_mcp(native_batch=native)
+    transport = Transport("127.0.0.1", server.port)
+    try:
+        result = BatchExecutor(transport).execute(make_batch(10))
+
+        assert result.mode == expected_mode
+        assert result.success
+        assert len(result.results) == 19
+        assert set(result.refs) == {f"C{i}" for i in range(10)}
+        assert len(wires(server)) == 9
+        assert wires(server)[0] == (result.refs["C0"], result.refs["C1"])
+        if native:
+            # 探測 + 一個 batch 信封
+            assert transport.stats()["requests"] <= 3
+    finally:
+        transport.close()
+
+
+def test_batch_sequential_on_legacy_server(gh_mcp):
+    """每條連接只處理一個命令的舊式伺服器：降級為逐一發送"""
+    server = gh_mcp(native_batch=False, keep_alive=False)
+    transport = Transport("127.0.0.1", server.port)
+    try:
+        result = BatchExecutor(transport).execute(make_batch(5))
+
+        assert result.mode == MODE_SEQUENTIAL
+        assert result.success
+        assert len(wires(server)) == 4
+    finally:
+        transport.close()
+
+
+def test_batch_unresolved_reference(gh_mcp):
+    """引用未在批次中定義或創建失敗時，該項返回錯誤，其餘照常執行"""
+    server = gh_mcp(native_batch=False)
+    transport = Transport("127.0.0.1", server.port)
+    try:
+        batch = CommandBatch()
+        batch.add("add_component", {"guid": "g"}, ref="A")
+        batch.add("connect_components", {"sourceId": ref("A"), "targetId": ref("MISSING")})
+        batch.add("add_component", {"guid": "g"}, ref="B")
+        result = BatchExecutor(transport).execute(batch)
+
+        assert result.results[0]["success"]
+        assert not result.results[1]["success"]
+        assert "MISSING" in result.results[1]["error"]
+        assert result.results[2]["success"]
+        assert "connect_components" not in server.received
+    finally:
+        transport.close()
+
+
+def test_pipeline_timeout_keeps_answered_prefix(gh_mcp):
+    """管線化一波中途超時：已回應的命令保留結果與 ID，只有未回應的尾部失敗"""
+    server = gh_mcp(native_batch=False)
+    stall_after(server, 6)
+    transport = Transport("127.0.0.1", server.port)
+    try:
+        batch = CommandBatch()
+        for i in range(10):
+            batch.add("add_component", {"guid": f"g{i}"}, ref=f"C{i}")
+        result = BatchExecutor(transport, timeout=0.3, window=4).execute(batch)
+
+        assert result.mode == MODE_PIPELINED
+        assert [r["success"] for r in result.results] == [True] * 6 + [False] * 4
+        assert set(result.refs) == {f"C{i}" for i in range(6)}
+        # 第二段 (6, 7) 已送出但未回應：可能已執行；第三段未送出
+        assert [r.get("unknown", False) for r in result.results[6:]] == [True, True, False, False]
+
+        stats = transport.stats()["commands"]["add_component"]
+        assert stats["count"] == 8 and stats["errors"] == 2
+    finally:
+        transport.close()
+
+
+def test_batch_duplicate_ref():
+    batch = CommandBatch()
+    batch.add("add_component", {}, ref="A")
+    with pytest.raises(ValueError):
+        batch.add("add_component", {}, ref="A")
+
+
+@pytest.mark.parametrize("native", [True, False])
+def test_placement_executor_batch(gh_mcp, tmp_path, native):
+    """placement_info 批次執行：100 個組件 + 50 條連接"""
+    from grasshopper_tools.client import GrasshopperClient
+    from grasshopper_tools.placement_executor import PlacementExecutor
+
+    commands = [
+        {"type": "add_component", "componentId": f"C{i}", "componentType": "Number Slider",
+         "x": i * 50, "y": 0, "parameters": {"guid": "57da07bd-ecab-415d-9d86-af36d7073abc"}}
+        for i in range(100)
+    ]
+    commands += [
+        {"type": "connect_components", "comment": f"C{i} -> C{i + 50}",
+         "parameters": {"sourceId": f"C{i}", "targetId": f"C{i + 50}", "targetParam": "A"}}
+        for i in range(50)
+    ]
+    json_path = tmp_path / "placement_info.json"
+    json_path.write_text(json.dumps({"description": "batch test", "commands": commands}), encoding="utf-8")
+
+    server = gh_mcp(native_batch=native)
+    transport = Transport("127.0.0.1", server.port)
+    try:
+        executor = PlacementExecutor(client=GrasshopperClient(transport=transport))
+        start = time.perf_counter()
+        result = executor.execute_placement_info(
+            str(json_path),
+            id_map_path=str(tmp_path / "component_id_map.json"),
+            use_batch=True
+        )
+        elapsed = time.perf_counter() - start
+
+        assert result["success"]
+        assert result["add_success"] == 100
+        assert result["connect_success"] == 50
+        assert len(wires(server)) == 50
+        assert elapsed < 1.0
+        saved = json.loads((tmp_path / "component_id_map.json").read_text(encoding="utf-8"))
+        assert saved["C0"] == executor.component_manager.get_component_id("C0")
+    finally:
+        transport.close()
@@ -0,0 +1,100 @@
+"""
+Test: 端到端基準測試工具 (benchmarks/)
+
+測試項目：
+1. 內建工作負載（GH_WIP placement_info 與錄製的建模腳本）都有 GUID，縮放到 N 個組件時
+   鍵唯一、連接兩端都存在，並可與 placement_info 格式互轉
+2. 三種執行器在模擬伺服器上執行同一個工作負載，報告命令數、commands/sec 與各階段耗時
+3. 結果歷史：跳過損壞的行、每個案例取相同設定下最近一次的結果為基線，超過閾值的變差標記為回歸
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from workloads import Workload, builtin_workloads
+import run_benchmarks
+
+
+def test_workloads_scale_and_roundtrip():
+    workloads = builtin_workloads()
+    for name in ("placement_info", "table", "chair", "cup", "sofa", "seesaw", "tower"):
+        assert name in workloads
+        assert workloads[name].components and workloads[name].connections
+        assert all(component.guid for component in workloads[name].components)
+    assert all(slider.max_val is not None for slider in workloads["cup"].sliders)
+
+    tower = workloads["tower"]
+    scaled = tower.scaled(1000)
+    assert len(scaled.components) == 1000
+    keys = {component.key for component in scaled.components}
+    assert len(keys) == 1000
+    assert all(c.source in keys and c.target in keys for c in scaled.connections)
+    # 完整副本的連接數是原始的整數倍，最後一份副本只保留兩端都存在的連接
+    full_copies = 1000 // len(tower.components)
+    assert len(scaled.connections) >= full_copies * len(tower.connections)
+    assert max(c.y for c in scaled.components) > max(c.y for c in tower.components)
+
+    restored = Workload.from_placement_info("copy", scaled.to_placement_info())
+    assert restored.components == scaled.components
+    assert restored.connections == scaled.connections
+
+
+@pytest.mark.parametrize("executor", list(run_benchmarks.EXECUTORS))
+def test_run_case_per_executor(executor):
+    case = run_benchmarks.run_case("cup", 40, executor, isolate=False)
+    assert case["components"] == 40
+    assert case["commands_by_type"]["add_component"] == 40
+    assert case["commands"] >= 40 + case["connections"]
+    assert case["commands_per_sec"] > 0
+    assert case["wall_time"] >= sum(case["phases"].values()) * 0.5
+    # batch 模式在客戶端只看到 batch 信封
+    assert case["latency"]["batch" if executor == "placement-batch" else "add_component"]["count"] >= 1
+    if executor.startswith("placement"):
+        assert case["ok"] == {"add": 40, "connect": case["connections"]}
+    else:
+        assert case["ok"]["components"] + (case["ok"]["sliders"] if executor == "client-optimized" else 0) == 40
+
+
+def test_history_and_regressions(tmp_path):
+    settings = {"latency": 0.0, "workers": 8}
+    case = {"workload": "tower", "scale": 1000, "executor": "placement-dag",
+            "commands_per_sec": 1000.0, "wall_time": 2.0, "peak_rss_mb": 50.0}
+    baseline = {"commit": "aaa", "settings": settings, "cases": [case]}
+
+    history = tmp_path / "history.jsonl"
+    run_benchmarks.append_history(history, baseline)
+    run_benchmarks.append_history(history, {"commit": "other", "settings": {"latency": 0.01, "workers": 8},
+                                            "cases": [dict(case, commands_per_sec=1.0)]})
+    run_benchmarks.append_history(history, {"commit": "large", "settings": settings,
+                                            "cases": [dict(case, scale=10000)]})
+    with open(history, "a", encoding="utf-8") as f:
+        f.write('{"commit": "torn"')
+    runs = run_benchmarks.load_history(history)
+    assert [run["commit"] for run in runs] == ["aaa", "other", "large"]
+
+    # 每個案例取相同設定下最近一次的結果
+    baseline_cases = run_benchmarks.baseline_cases(runs, settings)
+    assert baseline_cases[("tower", 1000, "placement-dag")]["commit"] == "aaa"
+    assert baseline_cases[("tower", 10000, "placement-dag")]["commit"] == "large"
+    assert run_benchmarks.baseline_cases(runs, {"latency": 0.5, "workers": 1}) == {}
+
+    slower = dict(case, commands_per_sec=800.0, wall_time=2.5, peak_rss_mb=52.0)
+    rows = run_benchmarks.compare(baseline_cases, {"cases": [slower]}, threshold=0.1)
+    assert rows[0]["baseline_commit"] == "aaa"
+    assert rows[0]["regressions"] == ["commands_per_sec", "wall_time"]
+    assert rows[0]["peak_rss_mb"] == pytest.approx(0.04)
+
+    faster = dict(case, commands_per_sec=1500.0, wall_time=1.3)
+    assert run_benchmarks.compare(baseline_cases, {"cases": [faster]})[0]["regressions"] == []
+    # 耗時太短的案例只顯示變化，不判定吞吐量回歸
+    tiny = {("tower", 1000, "placement-dag"): dict(case, wall_time=0.02, commands_per_sec=5000.0)}
+    noisy = run_benchmarks.compare(tiny, {"cases": [dict(case, wall_time=0.03, commands_per_sec=3000.0)]})
+    assert noisy[0]["commands_per_sec"] == pytest.approx(-0.4) and noisy[0]["regressions"] == []
+    # 沒有基線的案例不參與比較
+    assert run_benchmarks.compare(baseline_cases, {"cases": [dict(case, workload="cup")]}) == []
@@ -0,0 +1,178 @@
+"""
+Test: MCP 橋接工具的組件增強
+
+測試項目：
+1. 組件庫索引：name / fullName / 別名（GH 類名）均可查到，大小寫不敏感
+2. get_all_components：一次 get_connections、滑桿設置批次獲取，往返次數與組件數無關
+3. 大型文檔 auto 模式返回摘要，不發送額外請求
+4. grasshopper://status 只獲取一次連接
+5. 文檔快照快取：讀取突發命中記憶體，connect_components 使快取失效
+6. 連接索引：連接 200 條邊只獲取一次連接列表，A / B 輸入自動分配
+"""
+
+import json
+import socket
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("mcp")
+
+from grasshopper_mcp import bridge
+from grasshopper_mcp.connection_index import ConnectionIndex
+from grasshopper_mcp.snapshot_cache import DocumentSnapshotCache
+from grasshopper_mcp.transport import Transport
+
+SLIDERS = 120
+CIRCLES = 30
+
+
+class DocumentServer:
+    """返回固定文檔的 GH_MCP 伺服器，記錄每種命令的次數"""
+
+    def __init__(self):
+        self.components = (
+            [{"id": f"s{i}", "type": "GH_NumberSlider"} for i in range(SLIDERS)]
+            + [{"id": f"c{i}", "type": "Circle"} for i in range(CIRCLES)]
+        )
+        self.connections = [{"sourceId": f"s{i}", "targetId": f"c{i % CIRCLES}"} for i in range(SLIDERS)]
+        self.received = Counter()
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(8)
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _execute(self, command_type, params):
+        self.received[command_type] += 1
+        if command_type == "get_all_components":
+            return {"success": True, "result": [dict(c) for c in self.components]}
+        if command_type == "get_connections":
+            return {"success": True, "result": self.connections}
+        if command_type == "get_component_info" and params["componentId"].startswith("add"):
+            return {"success": True, "result": {"id": params["componentId"], "type": "Addition"}}
+        if command_type == "get_component_info":
+            return {"success": True, "data": {"id": params["componentId"], "minimum": 1, "maximum": 9, "value": 3}}
+        if command_type == "get_document_info":
+            return {"success": True, "result": {"name": "test"}}
+        if command_type == "connect_components":
+            self.connections.append(dict(params))
+            return {"success": True, "data": {}}
+        return {"success": False, "error": f"No handler registered for command type '{command_type}'"}
+
+    def _handle(self, client):
+        with client, client.makefile("rb") as reader:
+            for line in reader:
+                command = json.loads(line)
+                response = self._execute(command["type"], command.get("parameters", {}))
+                client.sendall((json.dumps(response) + "\n").encode("utf-8"))
+
+    def close(self):
+        self._sock.close()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = DocumentServer()
+    transport = Transport("127.0.0.1", server.port)
+    monkeypatch.setattr(bridge, "transport", transport)
+    monkeypatch.setattr(bridge, "snapshot_cache", DocumentSnapshotCache(ttl=60))
+    monkeypatch.setattr(bridge, "connection_index", ConnectionIndex())
+    yield server
+    transport.close()
+    server.close()
+
+
+def test_library_index():
+    assert bridge.get_component_library_index() is bridge.get_component_library_index()
+    assert bridge.lookup_library_component("GH_NumberSlider")["name"] == "Number Slider"
+    assert bridge.lookup_library_component("boundary  SURFACES")["name"] == "Boundary Surfaces"
+    assert bridge.lookup_library_component("Point Parameter")["name"] == "Point"
+    assert bridge.lookup_library_component("NoSuchComponent") is None
+
+
+def test_get_all_components_full(server):
+    result = bridge.get_all_components(detail="full")
+    components = {c["id"]: c for c in result["result"]}
+
+    assert result["detail"] == "full"
+    assert components["s0"]["currentSettings"] == {"min": 1, "max": 9, "value": 3, "rounding": 0.1}
+    assert "availableSettings" in components["s0"]
+    assert "inputDetails" in components["c0"]
+    assert len(components["c0"]["connections"]) == SLIDERS // CIRCLES
+    # 一次 get_connections，滑桿設置在同一條連接上批次送出
+    assert server.received["get_all_components"] == 1
+    assert server.received["get_connections"] == 1
+    assert server.received["get_component_info"] == SLIDERS
+    assert bridge.transport.stats()["opened"] == 1
+
+
+def test_get_all_components_auto_summary(server):
+    result = bridge.get_all_components(limit=SLIDERS)
+    assert result["detail"] == "summary"
+    assert "currentSettings" not in result["result"][0]
+    assert set(server.received) == {"get_all_components"}
+
+    with pytest.raises(ValueError):
+        bridge.get_all_components(detail="everything")
+
+
+def test_status_fetches_connections_once(server):
+    status = bridge.get_grasshopper_status()
+    assert status["detail"] == "full"
+    assert status["components"][0]["settings"]["max"] == 9
+    assert status["components"][0]["connections"][0]["type"] == "output"
+    assert server.received["get_connections"] == 1
+    assert server.received["get_all_components"] == 1
+
+
+def test_snapshot_cache_read_burst(server):
+    """同一回合內的重複讀取命中快取；連接後重新讀取"""
+    bridge.get_grasshopper_status()
+    bridge.get_all_components()
+    bridge.get_connections()
+    assert server.received["get_all_components"] == 1
+    assert server.received["get_connections"] == 1
+    # 命中時返回新的字典，增強結果不會寫回快取
+    assert "detail" not in bridge.send_to_grasshopper("get_all_components")
+
+    bridge.connect_components("s0", "c1", target_param="A")
+    bridge.get_connections()
+    assert server.received["get_connections"] == 2
+    assert len(bridge.get_connections()["result"]) == SLIDERS + 1
+
+    stats = bridge.get_cache_stats()
+    assert stats["hits"] >= 3
+    assert stats["invalidations"] == 2
+
+
+def test_connection_index_wiring(server):
+    """100 個 Addition 各接兩個滑桿：第一條接 A、第二條接 B"""
+    for i in range(100):
+        bridge.connect_components(f"s{i % SLIDERS}", f"add{i}")
+        bridge.connect_components(f"s{(i + 1) % SLIDERS}", f"add{i}")
+
+    wired = [c for c in server.connections if c["targetId"].startswith("add")]
+    assert [c["targetParam"] for c in wired[:4]] == ["A", "B", "A", "B"]
+    assert server.received["get_connections"] == 1
+    # 每個目標組件的類型只查詢一次
+    assert server.received["get_component_info"] == 100
+
+    info = bridge.get_component_info("add7")
+    assert len(info["result"]["connections"]) == 2
+    assert server.received["get_connections"] == 1
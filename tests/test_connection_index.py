@@ -0,0 +1,91 @@
+"""
+Test: 連接鄰接索引 ConnectionIndex
+
+測試項目：
+1. 建立後的端口佔用查詢（按名稱與索引）
+2. connect_components / delete_component 的增量更新
+3. 修改整個文檔的命令重置索引；不影響連接的命令保留索引
+4. get_connections 失敗時以空表開始並標記為不完整；max_age 到期後重新建立；max_age=0 每次都重新建立
+"""
+
+import sys
+from pathlib import Path
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_mcp.connection_index import ConnectionIndex
+
+OK = {"success": True}
+
+
+def seeded_index():
+    index = ConnectionIndex()
+    index.ensure(lambda: [
+        {"sourceId": "s1", "targetId": "add", "targetParam": "A"},
+        {"sourceId": "s2", "targetId": "mul", "targetParamIndex": 0},
+        {"sourceId": "add", "targetId": "panel"},
+    ])
+    return index
+
+
+def test_occupancy_lookup():
+    index = seeded_index()
+    assert index.is_input_occupied("add", "A", 0)
+    assert not index.is_input_occupied("add", "B", 1)
+    assert index.is_input_occupied("mul", "A", 0)
+    assert not index.is_input_occupied("panel", "A", 0)
+    assert [c["targetId"] for c in index.connections_of("add")] == ["panel", "add"]
+
+
+def test_incremental_updates():
+    index = seeded_index()
+    fetches = []
+    index.observe("connect_components", {"sourceId": "s3", "targetId": "sub", "targetParam": "A"}, OK)
+    index.observe("connect_components", {"sourceId": "s4", "targetId": "div", "targetParam": "A"}, {"success": False})
+    index.observe("add_component", {"guid": "x"}, OK)
+    assert index.ensure(lambda: fetches.append(1))
+    assert not fetches
+    assert index.is_input_occupied("sub", "A")
+    assert not index.is_input_occupied("div", "A")
+
+    index.observe("delete_component", {"componentId": "s1"}, OK)
+    assert not index.is_input_occupied("add", "A", 0)
+    index.observe("delete_component", {"componentId": "add"}, OK)
+    assert index.connections_of("panel") == []
+    assert index.stats()["connections"] == 2
+
+
+def test_document_mutations_reset():
+    index = seeded_index()
+    index.remember_type("add", "Addition")
+    index.observe("load_document", {"path": "x.gh"}, OK)
+    assert not index.seeded
+    assert index.component_type("add") is None
+
+    index.observe("get_connections", {}, {"success": True, "result": [{"sourceId": "a", "targetId": "b", "targetParam": "A"}]})
+    assert index.seeded
+    assert index.is_input_occupied("b", "A")
+
+
+def test_failed_seed_and_max_age():
+    now = [0.0]
+    index = ConnectionIndex(max_age=60, clock=lambda: now[0])
+    assert not index.ensure(lambda: None)
+    index.observe("connect_components", {"sourceId": "a", "targetId": "b", "targetParamIndex": 0}, OK)
+    assert index.is_input_occupied("b", index=0)
+
+    now[0] = 61
+    assert index.ensure(lambda: [])
+    assert not index.is_input_occupied("b", index=0)
+    assert index.stats()["seeds"] == 2
+
+
+def test_zero_max_age_always_refetches():
+    """bridge 的快照快取停用（TTL 0）時，連接索引也不重用"""
+    fetches = []
+    index = ConnectionIndex(max_age=0)
+    for connections in ([{"sourceId": "a", "targetId": "b", "targetParam": "A"}], []):
+        assert index.ensure(lambda: fetches.append(1) or connections)
+    assert len(fetches) == 2
+    assert not index.is_input_occupied("b", "A")
@@ -0,0 +1,150 @@
+"""
+Test: Placement DAG 調度器
+
+測試項目：
+1. 依賴圖：連接依賴創建其端點的 add_component，外部組件不產生依賴
+2. 連接在兩端創建後立即開始，與其餘的創建重疊
+3. 端點創建失敗時連接被跳過；執行函數拋出異常視為失敗
+4. 關鍵路徑與進度事件
+5. PlacementExecutor 預設使用依賴調度
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_tools.dag_scheduler import (
+    EVENT_COMPLETED, EVENT_FAILED, EVENT_SKIPPED, EVENT_STARTED, TASK_ADD,
+    DagScheduler, PlacementGraph,
+)
+
+
+def add(key, comment=None):
+    cmd = {"type": "add_component", "componentId": key, "x": 0, "y": 0, "parameters": {"guid": "g"}}
+    if comment:
+        cmd["comment"] = comment
+    return cmd
+
+
+def connect(source, target):
+    return {"type": "connect_components", "parameters": {"sourceId": source, "targetId": target}}
+
+
+def test_graph_dependencies():
+    graph = PlacementGraph.from_commands(
+        [add("A"), add("B"), add("C")],
+        [connect("A", "B"), connect("B", "EXISTING"), connect("C", "C")]
+    )
+    tasks = graph.tasks
+    assert tasks[3].deps == [0, 1]
+    assert tasks[4].deps == [1]
+    assert tasks[5].deps == [2]
+    assert tasks[1].dependents == [3, 4]
+    assert tasks[3].label == "A -> B"
+
+
+def test_connects_overlap_with_creation():
+    """第一對組件的連接在最後一個組件創建完成前就已經開始"""
+    adds = [add(f"C{i}") for i in range(20)]
+    connects = [connect(f"C{i}", f"C{i + 1}") for i in range(0, 20, 2)]
+    graph = PlacementGraph.from_commands(adds, connects)
+
+    def execute(task):
+        time.sleep(0.01)
+        return True
+
+    report = DagScheduler(graph, max_workers=4).run(execute)
+    assert report.add_success == 20
+    assert report.connect_success == 10
+    first_connect = min(task.started_at for task in report.tasks if task.kind != TASK_ADD)
+    assert first_connect < report.last_finish(TASK_ADD)
+
+
+def test_failed_dependency_skips_connect():
+    graph = PlacementGraph.from_commands(
+        [add("A"), add("BAD"), add("C")],
+        [connect("A", "BAD"), connect("A", "C"), connect("C", "A")]
+    )
+    executed = []
+    lock = threading.Lock()
+
+    def execute(task):
+        with lock:
+            executed.append(task.index)
+        if task.command.get("componentId") == "BAD":
+            return False
+        if task.index == 5:
+            raise RuntimeError("boom")
+        return True
+
+    events = []
+    report = DagScheduler(graph, max_workers=2, on_progress=events.append).run(execute)
+
+    statuses = [task.status for task in report.tasks]
+    assert statuses == [EVENT_COMPLETED, EVENT_FAILED, EVENT_COMPLETED, EVENT_SKIPPED, EVENT_COMPLETED, EVENT_FAILED]
+    assert 3 not in executed
+    assert "BAD" in report.tasks[3].error
+    assert report.tasks[5].error == "boom"
+    assert report.skipped == 1
+    # 每個執行的任務都有 started 與結束事件，done 單調遞增到總數
+    assert sum(1 for e in events if e.event == EVENT_STARTED) == 5
+    finished = [e.done for e in events if e.event != EVENT_STARTED]
+    assert finished == sorted(finished) and finished[-1] == 6
+
+
+def test_critical_path():
+    """慢的 add 加上依賴它的連接構成關鍵路徑"""
+    graph = PlacementGraph.from_commands(
+        [add("FAST"), add("SLOW"), add("OTHER")],
+        [connect("FAST", "SLOW"), connect("FAST", "OTHER")]
+    )
+    delays = {"SLOW": 0.08}
+
+    def execute(task):
+        time.sleep(delays.get(task.command.get("componentId"), 0.01))
+        return True
+
+    report = DagScheduler(graph, max_workers=8).run(execute)
+    assert [task.label for task in report.critical_path] == ["SLOW", "FAST -> SLOW"]
+    assert report.critical_path_time >= 0.09
+    assert report.makespan >= report.critical_path_time * 0.9
+    summary = report.to_dict()
+    assert summary["critical_path"][0]["label"] == "SLOW"
+    assert summary["parallelism"] > 1
+
+
+def test_placement_executor_dag(gh_mcp, tmp_path):
+    from grasshopper_mcp.transport import Transport
+    from grasshopper_tools.client import GrasshopperClient
+    from grasshopper_tools.placement_executor import PlacementExecutor
+
+    commands = [add(f"C{i}") for i in range(20)]
+    commands += [connect(f"C{i}", f"C{i + 10}") for i in range(10)]
+    commands.append(connect("C0", "MISSING"))
+    json_path = tmp_path / "placement_info.json"
+    json_path.write_text(json.dumps({"description": "dag", "commands": commands}), encoding="utf-8")
+
+    server = gh_mcp()
+    transport = Transport("127.0.0.1", server.port)
+    try:
+        executor = PlacementExecutor(client=GrasshopperClient(transport=transport))
+        events = []
+        result = executor.execute_placement_info(
+            str(json_path), max_workers=8,
+            id_map_path=str(tmp_path / "component_id_map.json"),
+            on_progress=events.append
+        )
+    finally:
+        transport.close()
+
+    assert result["add_success"] == 20
+    assert result["connect_success"] == 10
+    assert result["connect_fail"] == 1
+    assert len(server.document.wires) == 10
+    assert result["schedule"]["critical_path"]
+    assert len(events) == 2 * len(commands)
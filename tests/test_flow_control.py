@@ -0,0 +1,230 @@
+"""
+Test: 自適應並發控制 AdaptiveConcurrencyController
+
+測試項目：
+1. 正常回應時窗口加性增加、發送間隔回落到 0
+2. 延遲升高或出錯時窗口乘性減少、發送間隔加倍；同一輪往返只減少一次
+3. 並發窗口限制同時在途的命令數
+4. 單執行緒處理的伺服器（模擬 UI 執行緒）排隊時自動退讓，且客戶端共用同一個控制器
+5. 基準延遲按命令類型分開：本來就慢的命令不被當成過載
+6. BatchExecutor 的 batch 信封、管線化與逐一發送都經過控制器，延遲按命令數平均
+"""
+
+import json
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_mcp.batch import MODE_NATIVE, MODE_PIPELINED, MODE_SEQUENTIAL, BatchExecutor, CommandBatch
+from grasshopper_mcp.flow_control import AdaptiveConcurrencyController, get_flow_controller
+from grasshopper_mcp.transport import Transport
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def respond(controller, clock, latency, ok=True, command_type=""):
+    started = controller.acquire()
+    clock.now += latency
+    controller.release(started, ok, command_type)
+
+
+def test_additive_increase_and_multiplicative_decrease():
+    clock = FakeClock()
+    controller = AdaptiveConcurrencyController(initial_limit=4, max_limit=16, clock=clock, sleep=clock.sleep)
+
+    for _ in range(40):
+        respond(controller, clock, 0.01)
+    assert 8 < controller.limit <= 16
+    assert controller.interval == 0.0
+
+    # UI 執行緒跟不上：延遲升到基準的 5 倍
+    limit = controller.limit
+    respond(controller, clock, 0.05)
+    assert controller.limit == limit / 2
+    assert controller.interval == controller.interval_step
+
+    # 同一輪往返內的第二個過載信號不再減少
+    controller.release(controller.acquire(), ok=False)
+    assert controller.limit == limit / 2
+
+    # 過一輪往返後的錯誤再次減少，間隔加倍
+    clock.now += 1.0
+    controller.release(controller.acquire(), ok=False)
+    assert controller.limit == limit / 4
+    assert controller.interval == 2 * controller.interval_step
+
+    stats = controller.stats()
+    assert stats["errors"] == 2
+    assert stats["decreases"] == 2
+
+
+def test_interval_paces_and_recovers():
+    clock = FakeClock()
+    controller = AdaptiveConcurrencyController(initial_limit=1, clock=clock, sleep=clock.sleep)
+    respond(controller, clock, 0.01)
+    controller.release(controller.acquire(), ok=False)
+    assert controller.interval > 0
+
+    before = clock.now
+    respond(controller, clock, 0.0)
+    respond(controller, clock, 0.0)
+    # 第二個命令至少等待了一個發送間隔
+    assert clock.now - before >= controller.interval_step
+    for _ in range(5):
+        respond(controller, clock, 0.0)
+    assert controller.interval == 0.0
+    assert controller.stats()["waited"] > 0
+
+
+def test_window_limits_in_flight():
+    controller = AdaptiveConcurrencyController(initial_limit=2, max_limit=2)
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(_):
+        nonlocal active, peak
+        with controller.slot():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.005)
+            with lock:
+                active -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(work, range(40)))
+    assert peak == 2
+
+
+def serve_serially(service_time):
+    """所有連接共用一個處理鎖：命令在伺服器端排隊，延遲隨並發線性增加"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(16)
+    ui_thread = threading.Lock()
+
+    def handle(client):
+        with client, client.makefile("rb") as reader:
+            for line in reader:
+                json.loads(line)
+                with ui_thread:
+                    time.sleep(service_time)
+                client.sendall(b'{"success": true, "data": {"id": "x"}}\n')
+
+    def serve():
+        while True:
+            try:
+                client, _ = sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=handle, args=(client,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return sock
+
+
+def test_backs_off_when_server_queues():
+    from grasshopper_tools.client import GrasshopperClient
+
+    sock = serve_serially(0.004)
+    transport = Transport("127.0.0.1", sock.getsockname()[1], pool_size=16)
+    client = GrasshopperClient(transport=transport)
+    # 同一個傳輸上的客戶端共用控制器
+    assert GrasshopperClient(transport=transport).flow_control is client.flow_control
+    assert get_flow_controller(transport) is client.flow_control
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        responses = list(pool.map(lambda i: client.send_command("add_component", {"i": i}), range(150)))
+
+    assert all(r["success"] for r in responses)
+    stats = client.flow_control.stats()
+    assert stats["decreases"] > 0
+    # 伺服器一次只處理一個命令，窗口不會長到執行緒數
+    assert stats["limit"] < 16
+    transport.close()
+    sock.close()
+
+
+def test_baseline_per_command_type():
+    clock = FakeClock()
+    controller = AdaptiveConcurrencyController(initial_limit=4, clock=clock, sleep=clock.sleep)
+    for _ in range(10):
+        respond(controller, clock, 0.001, command_type="connect_components")
+        respond(controller, clock, 0.2, command_type="get_all_components")
+    # 截圖 / 全畫布查詢比 connect 慢百倍，但與自己的歷史相比正常
+    assert controller.stats()["decreases"] == 0
+    latency = controller.stats()["latency"]
+    assert latency["connect_components"]["baseline"] == 0.001
+    assert latency["get_all_components"]["baseline"] == 0.2
+
+    # 同類型命令變慢才算過載
+    respond(controller, clock, 0.01, command_type="connect_components")
+    assert controller.stats()["decreases"] == 1
+
+
+class RecordingTransport:
+    """記錄每次往返時控制器中在途的名額數"""
+
+    def __init__(self, caps, clock, latency):
+        self.capabilities = dict(caps)
+        self.clock = clock
+        self.latency = latency
+        self.in_flight = []
+        self.controller = None
+
+    def _answer(self, commands):
+        self.in_flight.append(self.controller.stats()["in_flight"])
+        self.clock.now += self.latency * len(commands)
+        return [{"success": True, "data": {"id": f"id-{i}"}} for i in range(len(commands))]
+
+    def request(self, command, timeout=None):
+        if command["type"] == "batch":
+            results = self._answer(command["parameters"]["commands"])
+            return {"success": True, "data": {"results": results}}
+        return self._answer([command])[0]
+
+    def pipeline(self, commands, timeout=None, window=64):
+        return self._answer(commands)
+
+
+def test_batch_traffic_goes_through_controller():
+    for caps, mode, slots in [({"batch": True, "pipelining": True}, MODE_NATIVE, 1),
+                              ({"batch": False, "pipelining": True}, MODE_PIPELINED, 1),
+                              ({"batch": False, "pipelining": False}, MODE_SEQUENTIAL, 20)]:
+        clock = FakeClock()
+        transport = RecordingTransport(caps, clock, 0.002)
+        controller = AdaptiveConcurrencyController(clock=clock, sleep=clock.sleep)
+        transport.controller = controller
+        executor = BatchExecutor(transport)
+        assert executor.flow_control is get_flow_controller(transport)
+        executor.flow_control = controller
+
+        batch = CommandBatch()
+        for i in range(20):
+            batch.add("add_component", {"i": i})
+        result = executor.execute(batch)
+        assert result.mode == mode and result.success
+
+        stats = controller.stats()
+        assert transport.in_flight == [1] * slots and stats["requests"] == slots
+        assert stats["in_flight"] == 0 and stats["decreases"] == 0
+        # 延遲按命令數平均：20 個命令的 batch 與單一命令同一基準
+        (entry,) = stats["latency"].values()
+        assert abs(entry["baseline"] - 0.002) < 1e-9
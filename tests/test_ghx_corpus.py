@@ -0,0 +1,119 @@
+"""
+Test: 列式 GHX 語料 (gh_learning/src/ghx_corpus.py)
+
+測試項目：
+1. GHXDocument → .npz → GHXDocument 無損往返（含 None 的 type_hint、找不到端點的連線）
+2. 字串去重，文件比 to_json 小；載入時不讀取任何列，只讀取用到的列
+3. AdaptiveLearner 從 .npz 與 JSON 載入得到相同的組件類型、連接模式與統計嵌入
+4. KnowledgeExtractor 可直接萃取 GHXCorpus
+5. 不支援的格式版本被拒絕
+"""
+
+import contextlib
+import io
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "gh_learning" / "src"))
+
+from ghx_corpus import CORPUS_FORMAT, GHXCorpus, load_documents
+from ghx_parser import Component, Connection, GHXDocument, GHXParser, Parameter
+from graph_learner import AdaptiveLearner
+from knowledge_extractor import KnowledgeExtractor
+
+SAMPLES = Path(__file__).parent.parent / "gh_learning" / "ghx_samples"
+
+
+@pytest.fixture(scope="module")
+def documents():
+    parser = GHXParser()
+    docs = [parser.parse_ghx(str(path)) for path in sorted(SAMPLES.rglob("*.ghx"))[:6]]
+    handmade = GHXDocument(
+        file_path="handmade.ghx",
+        components=[
+            Component("a", "guid-add", "Addition", "Add", inputs=[Parameter("A", "First", "float", 1)],
+                      outputs=[Parameter("R", "Result")], position_x=12.5, position_y=-3.0),
+            Component("b", "guid-panel", "Panel", "面板", category="Params", subcategory="Input"),
+        ],
+        connections=[Connection("a", "R", "b", "In"), Connection("a", "R", "elsewhere", "X")],
+        groups=[{"name": "g", "nickname": "", "colour": "", "members": ["a"]}],
+        metadata={"version": "1.0", "name": "handmade"},
+    )
+    return docs + [handmade, GHXDocument(file_path="empty.ghx")]
+
+
+def _quiet(function, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+def test_roundtrip(tmp_path, documents):
+    path = tmp_path / "corpus.npz"
+    GHXCorpus.from_documents(documents).save(path)
+    corpus = GHXCorpus.load(path)
+
+    assert len(corpus) == len(documents)
+    assert corpus.component_count == sum(len(doc.components) for doc in documents)
+    assert [asdict(doc) for doc in corpus] == [asdict(doc) for doc in documents]
+    assert [asdict(doc) for doc in load_documents(path)] == [asdict(doc) for doc in documents]
+
+    handmade = corpus.document(len(documents) - 2)
+    assert handmade.components[0].inputs[0].type_hint == "float"
+    assert handmade.components[0].outputs[0].type_hint is None
+    # 找不到目標組件的連線保留，但不計入已解析的連線
+    rows = corpus["edge_target"][corpus["doc_connection_offsets"][len(documents) - 2]:]
+    assert rows.tolist()[-1] == -1
+
+
+def test_compact_and_lazy(tmp_path, documents):
+    npz, json_path = tmp_path / "corpus.npz", tmp_path / "parsed.json"
+    GHXCorpus.from_documents(documents).save(npz)
+    GHXParser().to_json(documents, str(json_path))
+    assert npz.stat().st_size < json_path.stat().st_size / 2
+
+    corpus = GHXCorpus.load(npz)
+    assert set(corpus._columns) == {"format"}
+    source, target = corpus.edge_type_indices()
+    assert set(corpus._columns) == {"format", "edge_source", "edge_target", "name"}
+    names = corpus.strings
+    assert ("Addition", "Panel") in zip(map(names.__getitem__, source), map(names.__getitem__, target))
+    # 名稱只存一次
+    assert len(names.to_list()) == len(set(names.to_list()))
+
+
+def test_learner_and_extractor_match_json(tmp_path, documents):
+    npz, json_path = tmp_path / "corpus.npz", tmp_path / "parsed.json"
+    GHXCorpus.from_documents(documents).save(npz)
+    GHXParser().to_json(documents, str(json_path))
+
+    from_json, from_npz = AdaptiveLearner(embedding_dim=8), AdaptiveLearner(embedding_dim=8)
+    _quiet(from_json.load_parsed_data, str(json_path))
+    _quiet(from_npz.load_parsed_data, str(npz))
+    assert from_npz.get_sample_count() == len(documents)
+    assert from_npz.component_types == from_json.component_types
+    assert dict(from_npz.connection_patterns) == dict(from_json.connection_patterns)
+
+    _quiet(from_json.train, "STATISTICAL")
+    _quiet(from_npz.train, "STATISTICAL")
+    assert from_npz.embeddings.keys() == from_json.embeddings.keys()
+    for name, vector in from_json.embeddings.items():
+        assert np.allclose(from_npz.embeddings[name], vector)
+
+    knowledge = KnowledgeExtractor().extract(GHXCorpus.load(npz))
+    assert knowledge == KnowledgeExtractor().extract(documents)
+
+
+def test_rejects_unknown_format(tmp_path, documents):
+    path = tmp_path / "corpus.npz"
+    corpus = GHXCorpus.from_documents(documents[:1])
+    arrays = {name: corpus[name] for name in corpus._arrays}
+    arrays["format"] = np.array([CORPUS_FORMAT + 1], dtype=np.int32)
+    np.savez(path, **arrays)
+    with pytest.raises(ValueError):
+        GHXCorpus.load(path)
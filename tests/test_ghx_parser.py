@@ -0,0 +1,232 @@
+"""
+Test: 串流 GHX 解析 (gh_learning/src/ghx_parser.py)
+
+測試項目：
+1. 範例 .ghx 全部可解析；純 XML（帶 BOM）與 gzip 壓縮的同一文件結果相同
+2. chunk 格式：Group 物件被跳過，輸入的 Source 解析為連線（含後出現的來源），未知來源被忽略
+3. 舊格式（Object / Guid 屬性、Wire、Group、Author）仍可解析
+4. 無法讀取與截斷的文件記錄為錯誤
+5. 峰值記憶體與文件大小無關
+6. batch_parse：進程池與逐一解析的結果相同且保持文件順序，失敗列入摘要
+7. 結果快取：未改動與只被觸碰的文件直接命中，改動的文件重新解析，壞文件的失敗也被快取
+"""
+
+import gzip
+import os
+import shutil
+import sys
+import tracemalloc
+from dataclasses import asdict
+from pathlib import Path
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "gh_learning" / "src"))
+
+from ghx_cache import CACHE_FORMAT, GHXCache
+from ghx_parser import GHXDocument, GHXParser
+
+SAMPLES = Path(__file__).parent.parent / "gh_learning" / "ghx_samples"
+
+
+# =============================================================================
+# 測試用 GHX
+# =============================================================================
+
+def _items(**values) -> str:
+    return "<items>" + "".join(f'<item name="{name}">{value}</item>' for name, value in values.items()) + "</items>"
+
+
+def _param(kind: str, guid: str, nickname: str, *sources: str) -> str:
+    source_items = "".join(f'<item name="Source">{source}</item>' for source in sources)
+    return (f'<chunk name="{kind}"><items><item name="Name">{nickname} Name</item>'
+            f'<item name="NickName">{nickname}</item><item name="InstanceGuid">{guid}</item>'
+            f'<item name="SourceCount">{len(sources)}</item>{source_items}</items></chunk>')
+
+
+def _object(guid: str, name: str, instance: str, params: str = "", padding: str = "") -> str:
+    return (f'<chunk name="Object">{_items(GUID=guid, Name=name)}<chunks><chunk name="Container">'
+            f'{_items(InstanceGuid=instance, NickName=name[:3])}<chunks>'
+            f'<chunk name="Attributes">{padding}</chunk>{params}</chunks></chunk></chunks></chunk>')
+
+
+def _document(objects: str) -> str:
+    return ('\ufeff<?xml version="1.0" encoding="utf-8"?><Archive name="Root"><chunks><chunk name="Definition">'
+            f'<chunks><chunk name="DefinitionObjects"><chunks>{objects}</chunks></chunk></chunks></chunk>'
+            '</chunks></Archive>')
+
+
+def _chain(count: int, padding: str = "") -> str:
+    """count 個組件串成一條鏈"""
+    objects = []
+    for i in range(count):
+        params = _param("param_output", f"out-{i}", "R")
+        if i:
+            params = _param("param_input", f"in-{i}", "A", f"out-{i - 1}") + params
+        objects.append(_object("comp-guid", f"Addition {i}", f"inst-{i}", params, padding))
+    return _document("".join(objects))
+
+
+# =============================================================================
+# 測試
+# =============================================================================
+
+def test_samples_plain_and_gzip(tmp_path):
+    parser = GHXParser()
+    files = sorted(SAMPLES.rglob("*.ghx"))
+    docs = [parser.parse_ghx(str(path)) for path in files]
+    assert files and parser.error_count == 0 and parser.parsed_count == len(files)
+    assert all(doc.components for doc in docs)
+    assert sum(len(doc.connections) for doc in docs) > 0
+
+    compressed = tmp_path / files[0].name
+    with gzip.open(compressed, "wb") as f:
+        f.write(files[0].read_bytes())
+    plain, zipped = asdict(docs[0]), asdict(parser.parse_ghx(str(compressed)))
+    plain.pop("file_path"), zipped.pop("file_path")
+    assert plain == zipped
+
+
+def test_chunk_components_and_connections(tmp_path):
+    group = f'<chunk name="Object">{_items(GUID="group-guid", Name="Group")}</chunk>'
+    # 第一個組件的輸入來源在文件後面才出現
+    objects = (
+        _object("merge-guid", "Merge", "m", _param("param_input", "m-in", "D1", "s-out", "missing")
+                + _param("param_output", "m-out", "R"))
+        + group
+        + _object("series-guid", "Series", "s", _param("param_output", "s-out", "S"))
+    )
+    path = tmp_path / "chunks.ghx"
+    path.write_text(_document(objects), encoding="utf-8")
+
+    doc = GHXParser().parse_ghx(str(path))
+    assert [c.name for c in doc.components] == ["Merge", "Series"]
+    merge = doc.components[0]
+    assert (merge.instance_guid, merge.component_guid, merge.nickname) == ("m", "merge-guid", "Mer")
+    assert [(p.nickname, p.name, p.source_count) for p in merge.inputs] == [("D1", "D1 Name", 2)]
+    assert [asdict(c) for c in doc.connections] == [
+        {"from_component": "s", "from_param": "S", "to_component": "m", "to_param": "D1"}
+    ]
+
+
+def test_legacy_format(tmp_path):
+    path = tmp_path / "legacy.ghx"
+    path.write_text(
+        '<?xml version="1.0"?><Root><Definition Version="0.9" Name="old"><Author>someone</Author>'
+        '<Object Guid="a" ComponentGuid="c" Name="Addition" NickName="A">'
+        '<InputParam Name="A" NickName="A"/><Output Name="Result" NickName="R"/></Object>'
+        '<Object Guid="b" Name="Panel"/>'
+        '<Wire FromObject="a" FromParam="R" ToObject="b" ToParam="In"/>'
+        '<Group Name="g"><Member>a</Member><Member>b</Member></Group></Definition></Root>',
+        encoding="utf-8"
+    )
+    doc = GHXParser().parse_ghx(str(path))
+    assert [(c.instance_guid, c.name) for c in doc.components] == [("a", "Addition"), ("b", "Panel")]
+    assert [p.name for p in doc.components[0].inputs] == ["A"]
+    assert [(c.from_component, c.to_component) for c in doc.connections] == [("a", "b")]
+    assert doc.groups == [{"name": "g", "nickname": "", "colour": "", "members": ["a", "b"]}]
+    assert doc.metadata == {"version": "0.9", "name": "old", "author": "someone"}
+
+
+def test_unreadable_files(tmp_path):
+    parser = GHXParser()
+    binary = tmp_path / "binary.gh"
+    binary.write_bytes(b"\x00\x01\x02 not xml")
+    truncated = tmp_path / "truncated.ghx"
+    truncated.write_text('<Archive name="Root"><chunks><chunk name="Object">', encoding="utf-8")
+    broken_gzip = tmp_path / "broken.ghx"
+    broken_gzip.write_bytes(gzip.compress(_chain(3).encode("utf-8"))[:40])
+
+    for path in (binary, truncated, broken_gzip, tmp_path / "missing.ghx"):
+        assert parser.parse_ghx(str(path)) is None
+    assert parser.error_count == 4 and parser.parsed_count == 0
+    assert "not XML or gzip" in parser.errors[0] and "XML parse error" in parser.errors[1]
+    assert "not XML or gzip" in parser.errors[2] and "File not found" in parser.errors[3]
+
+
+def test_memory_independent_of_file_size(tmp_path):
+    # 每個組件帶大量與解析無關的內容，結果大小相同
+    padding = _items(**{f"Bounds{i}": "0;0;100;20" * 20 for i in range(100)})
+    small, large = tmp_path / "small.ghx", tmp_path / "large.ghx"
+    small.write_text(_chain(200), encoding="utf-8")
+    large.write_text(_chain(200, padding), encoding="utf-8")
+    assert large.stat().st_size > 30 * small.stat().st_size
+
+    peaks = []
+    for path in (small, large):
+        tracemalloc.start()
+        doc = GHXParser().parse_ghx(str(path))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        assert len(doc.components) == 200 and len(doc.connections) == 199
+    assert peaks[1] < peaks[0] * 2
+    assert peaks[1] < large.stat().st_size / 10
+
+
+def _corpus(folder: Path) -> Path:
+    """三個範例、一個生成的文件與一個壞文件"""
+    folder.mkdir()
+    for path in sorted(SAMPLES.rglob("*.ghx"))[:3]:
+        shutil.copy(path, folder / path.name)
+    (folder / "nested").mkdir()
+    (folder / "nested" / "chain.ghx").write_text(_chain(20), encoding="utf-8")
+    (folder / "broken.ghx").write_text("<Archive><chunk>", encoding="utf-8")
+    (folder / "notes.txt").write_text("ignored", encoding="utf-8")
+    return folder
+
+
+def test_batch_parse_parallel(tmp_path):
+    folder = _corpus(tmp_path / "corpus")
+    sequential, parallel = GHXParser(), GHXParser()
+    events = []
+    docs = sequential.batch_parse(str(folder), workers=1)
+    parallel_docs = parallel.batch_parse(str(folder), workers=2, progress=lambda *event: events.append(event))
+
+    assert [asdict(doc) for doc in parallel_docs] == [asdict(doc) for doc in docs]
+    assert len(docs) == 4 and parallel.parsed_count == 4 and parallel.error_count == 1
+    report = parallel.last_report
+    assert (report.total, report.parsed, report.cached) == (5, 4, 0)
+    assert [Path(path).name for path, _ in report.failures] == ["broken.ghx"]
+    assert "broken.ghx" in report.summary()
+    assert sorted(done for done, *_ in events) == [1, 2, 3, 4, 5]
+    assert sum(status == "failed" for *_, status in events) == 1
+
+    restored = GHXDocument.from_dict(docs[0].to_dict())
+    assert asdict(restored) == asdict(docs[0])
+
+
+def test_batch_parse_cache(tmp_path):
+    folder = _corpus(tmp_path / "corpus")
+    cache_dir = str(tmp_path / "cache")
+    first = GHXParser().batch_parse(str(folder), workers=1, cache_dir=cache_dir)
+
+    statuses = {}
+    parser = GHXParser()
+    again = parser.batch_parse(str(folder), workers=1, cache_dir=cache_dir,
+                               progress=lambda done, total, path, status: statuses.update({Path(path).name: status}))
+    assert [asdict(doc) for doc in again] == [asdict(doc) for doc in first]
+    assert parser.last_report.cached == 4 and parser.last_report.parsed == 0
+    assert statuses["broken.ghx"] == "failed" and len(parser.last_report.failures) == 1
+
+    # 只被觸碰的文件命中；改動的文件重新解析
+    chain = folder / "nested" / "chain.ghx"
+    touched = next(folder.glob("*.ghx"))
+    stat = touched.stat()
+    os.utime(touched, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    chain.write_text(_chain(25), encoding="utf-8")
+
+    statuses.clear()
+    parser = GHXParser()
+    docs = parser.batch_parse(str(folder), workers=1, cache_dir=cache_dir,
+                              progress=lambda done, total, path, status: statuses.update({Path(path).name: status}))
+    assert statuses[touched.name] == "cached" and statuses["chain.ghx"] == "parsed"
+    assert parser.last_report.parsed == 1
+    assert [len(doc.components) for doc in docs if doc.file_path.endswith("chain.ghx")] == [25]
+
+    # 舊格式的條目失效
+    cache = GHXCache(cache_dir)
+    assert cache.get(str(chain)) is not None
+    for entry in Path(cache_dir).glob("*.json"):
+        entry.write_text(entry.read_text(encoding="utf-8").replace(
+            f'"format": {CACHE_FORMAT}', f'"format": {CACHE_FORMAT + 1}'), encoding="utf-8")
+    assert cache.get(str(chain)) is None
@@ -0,0 +1,137 @@
+"""
+Test: Level 1 統計嵌入 (gh_learning/src/graph_learner.py)
+
+測試項目：
+1. SparseCooccurrence：合併重複邊後與逐邊累加的稠密矩陣相同，按非零元素數分段的乘法與稠密乘法相同
+2. 隨機化截斷分解的奇異值與子空間接近完整 SVD
+3. 大量類型時走隨機化分解，ComponentGraph 與 .npz 語料兩條路徑得到相同的嵌入
+4. 空類型、未知端點與 InstanceGuid 為空的連線不計入共現
+5. benchmarks/embedding_training.py 小規模執行，稀疏與稠密實作的全部 dim 個奇異值一致
+"""
+
+import contextlib
+import io
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "gh_learning" / "src"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import graph_learner
+from ghx_corpus import GHXCorpus
+from ghx_parser import Component, Connection, GHXDocument, GHXParser
+from graph_learner import AdaptiveLearner, SparseCooccurrence, randomized_eigh
+import embedding_training
+
+
+def _quiet(function, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args)
+
+
+def _random_edges(size: int, count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # 低索引的類型更常見，奇異值有明顯衰減
+    source = (rng.pareto(1.5, count) * 10).astype(np.int64) % size
+    target = rng.integers(0, size, count)
+    return source, target
+
+
+def test_sparse_matches_dense(monkeypatch):
+    source, target = _random_edges(300, 5000)
+    matrix = SparseCooccurrence.from_edges(source, target, 300)
+
+    dense = np.zeros((300, 300))
+    for i, j in zip(source, target):
+        dense[i, j] += 1
+        dense[j, i] += 1
+    assert np.array_equal(matrix.to_dense(), dense)
+    assert matrix.nnz == np.count_nonzero(dense)
+
+    other = np.random.default_rng(1).standard_normal((300, 7))
+    assert np.allclose(matrix.matmul(other), dense @ other)
+    # 分段邊界落在行內時仍按整行切分（單行超過上限時獨佔一段）
+    monkeypatch.setattr(graph_learner, "MATMUL_BLOCK_ELEMENTS", 7 * 20)
+    assert np.allclose(matrix.matmul(other), dense @ other)
+    assert not SparseCooccurrence.from_edges([], [], 5).matmul(other[:5]).any()
+
+
+def test_randomized_eigh_close_to_svd():
+    source, target = _random_edges(600, 20000)
+    matrix = SparseCooccurrence.from_edges(source, target, 600)
+    U, S, _ = np.linalg.svd(matrix.to_dense())
+
+    vectors, values = randomized_eigh(matrix, 8)
+    assert np.allclose(values[:2], S[:2], rtol=1e-6)
+    # 尾部奇異值間距小，誤差較大但仍在 0.5% 內
+    assert np.allclose(values, S[:8], rtol=5e-3)
+    # 過採樣隨 rank 增加：64 維時連最後一個奇異值也準確
+    _, values = randomized_eigh(matrix, 64)
+    assert np.allclose(values, S[:64], rtol=1e-3)
+    # 間距明顯的前兩個向量與對應的奇異向量同向（差一個符號）
+    assert np.all(np.abs(np.sum(vectors[:, :2] * U[:, :2], axis=0)) > 0.999)
+
+
+def _documents():
+    docs = []
+    for d in range(12):
+        components = [Component(f"{d}-{i}", f"guid-{i % 40}", f"Type {(i * 7 + d) % 40}", "T") for i in range(30)]
+        connections = [Connection(f"{d}-{i}", "R", f"{d}-{(i * 3 + 1) % 30}", "A") for i in range(30)]
+        docs.append(GHXDocument(file_path=f"doc{d}.ghx", components=components, connections=connections))
+    return docs
+
+
+def test_randomized_path_graphs_and_corpus_agree(tmp_path, monkeypatch):
+    monkeypatch.setattr(graph_learner, "EXACT_SVD_MAX_TYPES", 0)
+    docs = _documents()
+    json_path, npz = tmp_path / "parsed.json", tmp_path / "corpus.npz"
+    _quiet(GHXParser().to_json, docs, str(json_path))
+    GHXCorpus.from_documents(docs).save(npz)
+
+    from_json, from_npz = AdaptiveLearner(embedding_dim=6), AdaptiveLearner(embedding_dim=6)
+    _quiet(from_json.load_parsed_data, str(json_path))
+    _quiet(from_npz.load_parsed_data, str(npz))
+    assert _quiet(from_json.train, "STATISTICAL") and _quiet(from_npz.train, "STATISTICAL")
+    assert len(from_npz.embeddings) == 40
+    for name, vector in from_json.embeddings.items():
+        assert vector.shape == (6,)
+        assert np.allclose(from_npz.embeddings[name], vector)
+
+
+def test_skipped_edges():
+    doc = GHXDocument(
+        file_path="edges.ghx",
+        components=[Component("a", "g1", "Alpha", "A"), Component("b", "g2", "Beta", "B"),
+                    Component("", "g3", "Gamma", "G"), Component("c", "g4", "", "?")],
+        connections=[Connection("a", "R", "b", "A"), Connection("a", "R", "missing", "A"),
+                     Connection("", "R", "b", "A"), Connection("c", "R", "a", "A")],
+    )
+    for load in ("graphs", "corpus"):
+        learner = AdaptiveLearner(embedding_dim=4)
+        if load == "graphs":
+            learner.component_types.update(["Alpha", "Beta", "Gamma", ""])
+            learner.graphs.append(learner._document_graph(doc))
+        else:
+            _quiet(learner.load_corpus, GHXCorpus.from_documents([doc]))
+        types = sorted(learner.component_types)
+        matrix = learner._cooccurrence({t: i for i, t in enumerate(types)})
+        # 只有 Alpha <-> Beta 一條
+        pairs = {(types[i], types[j]) for i, j in zip(matrix.rows, matrix.cols)}
+        assert pairs == {("Alpha", "Beta"), ("Beta", "Alpha")}, load
+
+
+def test_benchmark_small(tmp_path, monkeypatch):
+    # 稀疏實作走隨機化分解，與稠密實作的完整 SVD 比較
+    monkeypatch.setattr(graph_learner, "EXACT_SVD_MAX_TYPES", 0)
+    output = tmp_path / "result.json"
+    args = ["--types", "300", "--documents", "100", "--components", "40", "--dim", "32", "--json", str(output)]
+    assert _quiet(embedding_training.main, args) == 0
+    result = json.loads(output.read_text(encoding="utf-8"))
+    assert result["types"] == 300 and result["connections"] > 0
+    assert result["sparse"]["seconds"] >= 0 and "dense" in result
+    assert result["max_relative_error"] < 5e-3 and result["median_relative_error"] <= result["max_relative_error"]
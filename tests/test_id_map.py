@@ -0,0 +1,128 @@
+"""
+Test: 組件 ID 映射 ComponentIdMap
+
+測試項目：
+1. 寫入追加到日誌，重新加載時快照 + 日誌重放得到相同映射；末尾半行被忽略
+2. compact() 原子地寫回普通 JSON 快照並清空日誌；超過閾值時自動壓縮
+3. 多執行緒同時讀寫不拋錯且不遺失寫入
+4. ComponentManager.load_id_map / save_id_map 使用增量日誌，現有的 GH_WIP 映射文件可直接加載
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_tools.id_map import ComponentIdMap
+
+GH_WIP = Path(__file__).parent.parent / "GH_WIP"
+
+
+def test_log_replay(tmp_path):
+    path = str(tmp_path / "component_id_map.json")
+    id_map = ComponentIdMap()
+    id_map.load(path)
+    id_map["SLIDER_A"] = "id-a"
+    id_map["SLIDER_B"] = "id-b"
+    id_map["SLIDER_A"] = "id-a2"
+    assert id_map.remove_id("id-b") == ["SLIDER_B"]
+    id_map.close()
+
+    # 尚未壓縮：快照不存在，修改都在日誌中
+    assert not (tmp_path / "component_id_map.json").exists()
+    log = tmp_path / "component_id_map.json.log"
+    assert len(log.read_text(encoding="utf-8").splitlines()) == 4
+
+    # 寫入中斷留下的半行
+    with open(log, "a", encoding="utf-8") as f:
+        f.write('{"k": "SLIDER_C", "v"')
+
+    reloaded = ComponentIdMap()
+    reloaded.load(path)
+    assert reloaded.snapshot() == {"SLIDER_A": "id-a2"}
+    assert reloaded.stats()["log_lines"] == 4
+
+
+def test_compact_and_threshold(tmp_path):
+    path = tmp_path / "ids.json"
+    id_map = ComponentIdMap(compact_threshold=3)
+    id_map.load(str(path))
+    id_map.update_many({"A": "1", "B": "2"})
+    # 相同的值不寫日誌
+    id_map["A"] = "1"
+    assert id_map.stats()["log_lines"] == 2
+
+    id_map["C"] = "3"
+    stats = id_map.stats()
+    assert stats["compactions"] == 1
+    assert stats["log_lines"] == 0
+    assert json.loads(path.read_text(encoding="utf-8")) == {"A": "1", "B": "2", "C": "3"}
+    assert not Path(ComponentIdMap.log_path(str(path))).exists()
+
+    # 壓縮到新路徑後，寫入追加到新路徑的日誌
+    other = tmp_path / "other.json"
+    id_map.compact(str(other))
+    id_map["D"] = "4"
+    id_map.close()
+    assert json.loads(other.read_text(encoding="utf-8")) == {"A": "1", "B": "2", "C": "3"}
+    assert ComponentIdMap().load(str(other)) == 4
+    assert ComponentIdMap().load(str(path)) == 3
+
+
+def test_concurrent_readers_and_writers(tmp_path):
+    id_map = ComponentIdMap(str(tmp_path / "ids.json"), compact_threshold=200)
+    errors = []
+
+    def write(worker):
+        for i in range(250):
+            id_map[f"W{worker}_{i}"] = f"id-{worker}-{i}"
+
+    def read():
+        try:
+            for _ in range(200):
+                for key in id_map:
+                    id_map.get(key)
+                len(id_map)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+    threads += [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    id_map.close()
+
+    assert errors == []
+    assert len(id_map) == 1000
+    assert ComponentIdMap().load(id_map.path) == 1000
+
+
+def test_component_manager_incremental_persistence(tmp_path):
+    from grasshopper_tools.component_manager import ComponentManager
+    from grasshopper_tools.client import GrasshopperClient
+
+    path = tmp_path / "component_id_map.json"
+    source = GH_WIP / "component_id_map_v2.json"
+    expected = json.loads(source.read_text(encoding="utf-8"))
+    path.write_text(source.read_text(encoding="utf-8"), encoding="utf-8")
+
+    manager = ComponentManager(GrasshopperClient())
+    manager.load_id_map(str(path))
+    assert dict(manager.component_id_map) == expected
+
+    manager.register_component_id("NEW_SLIDER", "new-id")
+    manager.component_id_map.close()
+    # 快照未改寫，新映射已在日誌中
+    assert json.loads(path.read_text(encoding="utf-8")) == expected
+    restarted = ComponentManager(GrasshopperClient())
+    restarted.load_id_map(str(path))
+    assert restarted.get_component_id("NEW_SLIDER") == "new-id"
+
+    restarted.save_id_map(str(path))
+    saved = json.loads(path.read_text(encoding="utf-8"))
+    assert saved == dict(expected, NEW_SLIDER="new-id")
@@ -0,0 +1,148 @@
+"""
+Test: 增量知識萃取 (gh_learning/src/knowledge_extractor.py)
+
+測試項目：
+1. 逐一加入、替換、移除文件後的導出結果與完整重新萃取相同
+2. update()：未改動的文件跳過，改動的文件重算，不在集合中的文件被移除
+3. save_state / load_state 往返後可繼續增量更新
+4. 只有受影響組件的視圖被重新計算；Top 100 連線模式在移除後正確補位
+5. batch_parse 的文件以快取鍵的 SHA-256 作為指紋，命中快取時不重新序列化文件
+"""
+
+import shutil
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "gh_learning" / "src"))
+
+from ghx_cache import file_sha256
+from ghx_parser import Component, Connection, GHXDocument, GHXParser, Parameter
+from knowledge_extractor import STATE_FORMAT, TOP_PATTERNS, KnowledgeExtractor
+
+SAMPLES = Path(__file__).parent.parent / "gh_learning" / "ghx_samples"
+
+
+@pytest.fixture(scope="module")
+def documents():
+    parser = GHXParser()
+    return [parser.parse_ghx(str(path)) for path in sorted(SAMPLES.rglob("*.ghx"))[:8]]
+
+
+def _rebuild(documents):
+    return KnowledgeExtractor().extract(documents)
+
+
+def _pair(path: str, count: int) -> GHXDocument:
+    """count 條互不相同的連線模式"""
+    components, connections = [], []
+    for i in range(count):
+        components += [Component(f"s{i}", "guid-src", "Source", "S", outputs=[Parameter(f"o{i}", f"Out {i}")]),
+                       Component(f"t{i}", "guid-dst", "Target", "T", inputs=[Parameter("A", "Input")])]
+        connections.append(Connection(f"s{i}", f"o{i}", f"t{i}", "A"))
+    return GHXDocument(file_path=path, components=components, connections=connections)
+
+
+def test_add_replace_remove_matches_rebuild(documents):
+    extractor = KnowledgeExtractor()
+    for doc in documents:
+        extractor.add_document(doc)
+    assert extractor.export() == _rebuild(documents)
+
+    # 替換：第一個文件改為只剩一半組件
+    first = documents[0]
+    trimmed = replace(first, components=first.components[: len(first.components) // 2])
+    extractor.add_document(trimmed)
+    assert extractor.export() == _rebuild([trimmed] + documents[1:])
+
+    for doc in documents[1:5]:
+        assert extractor.remove_document(doc.file_path)
+    assert not extractor.remove_document("missing.ghx")
+    assert extractor.export() == _rebuild([trimmed] + documents[5:])
+
+    for doc in [trimmed] + documents[5:]:
+        extractor.remove_document(doc.file_path)
+    assert extractor.export()["components"] == {} and not extractor.registry
+    assert extractor.component_name_to_guid == {} and not extractor.connection_patterns
+
+
+def test_update_skips_unchanged(documents):
+    extractor = KnowledgeExtractor()
+    assert extractor.update(documents[:5]) == {"added": 5, "updated": 0, "removed": 0, "unchanged": 0}
+
+    changed = replace(documents[1], components=documents[1].components[1:])
+    summary = extractor.update([documents[0], changed] + documents[2:4] + documents[5:])
+    assert summary == {"added": 3, "updated": 1, "removed": 1, "unchanged": 3}
+    assert extractor.export() == _rebuild([documents[0], changed] + documents[2:4] + documents[5:])
+
+
+def test_state_roundtrip(tmp_path, documents):
+    path = tmp_path / "state" / "knowledge_state.json"
+    extractor = KnowledgeExtractor()
+    extractor.update(documents[:6])
+    extractor.save_state(str(path))
+
+    restored = KnowledgeExtractor.load_state(str(path))
+    assert restored.export() == extractor.export()
+    assert restored.update(documents[2:])["unchanged"] == 4
+    assert restored.export() == _rebuild(documents[2:])
+
+    # 不存在或格式不符的狀態文件得到空的萃取器
+    assert not KnowledgeExtractor.load_state(str(tmp_path / "missing.json")).registry
+    path.write_text(path.read_text(encoding="utf-8").replace(
+        f'"format": {STATE_FORMAT}', f'"format": {STATE_FORMAT + 1}'), encoding="utf-8")
+    assert not KnowledgeExtractor.load_state(str(path)).registry
+
+
+def test_views_recomputed_only_for_touched(documents):
+    extractor = KnowledgeExtractor()
+    extractor.update(documents)
+    before = extractor.export()["components"]
+
+    extra = _pair("extra.ghx", 3)
+    extractor.add_document(extra)
+    after = extractor.export()["components"]
+    touched = {"guid-src", "guid-dst"}
+    assert all(after[guid] is before[guid] for guid in before if guid not in touched)
+    assert after["guid-src"]["commonly_connected_to"] == {"guid-dst": 3}
+
+
+def test_top_patterns_refill_after_removal():
+    big, small = _pair("big.ghx", TOP_PATTERNS), _pair("small.ghx", 5)
+    # small 中的模式與 big 不同
+    small = replace(small, connections=[replace(c, to_param="B") for c in small.connections])
+    extractor = KnowledgeExtractor()
+    extractor.add_document(big)
+    extractor.add_document(big, key="big-copy.ghx")
+    extractor.add_document(small)
+    top = extractor.export()["connection_patterns"]
+    assert len(top) == TOP_PATTERNS and set(top.values()) == {2}
+
+    extractor.remove_document("big-copy.ghx")
+    extractor.remove_document("big.ghx")
+    assert extractor.export() == _rebuild([small])
+    assert extractor.export()["statistics"]["total_patterns"] == 5
+
+
+def test_batch_parse_fingerprint_from_cache(tmp_path, monkeypatch):
+    folder = tmp_path / "samples"
+    folder.mkdir()
+    for path in sorted(SAMPLES.rglob("*.ghx"))[:4]:
+        shutil.copy(path, folder / path.name)
+    cache_dir = str(tmp_path / "cache")
+
+    extractor = KnowledgeExtractor()
+    docs = GHXParser().batch_parse(str(folder), workers=1, cache_dir=cache_dir)
+    assert extractor.update(docs)["added"] == 4
+    for doc in docs:
+        assert extractor.documents[doc.file_path]["fingerprint"] == doc.sha256 == file_sha256(doc.file_path)
+
+    # 第二次全部命中快取：sha256 來自快取鍵，update() 不再序列化任何文件
+    monkeypatch.setattr(GHXDocument, "to_dict", None)
+    again = GHXParser().batch_parse(str(folder), workers=1, cache_dir=cache_dir)
+    assert [doc.sha256 for doc in again] == [doc.sha256 for doc in docs]
+    assert extractor.update(again)["unchanged"] == 4
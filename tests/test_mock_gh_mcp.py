@@ -0,0 +1,182 @@
+"""
+Test: 離線 GH_MCP 模擬伺服器
+
+測試項目：
+1. PlacementExecutor 在模擬伺服器上完整執行，CanvasReconciler 讀回的文檔與期望一致
+2. Slider 屬性、組件資訊與「未收集到資料」警告
+3. 延遲注入（UI 執行緒串行化）、錯誤回應與斷線注入，以 seed 重現
+4. Vision 伺服器的 capture_canvas：base64 與二進位附件
+5. 舊版模式（每條連接一個命令、不支援 batch）下批次執行自動降級
+"""
+
+import base64
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mock_gh_mcp import FaultConfig, MockGHMCP
+from grasshopper_mcp.transport import Transport, TransportError
+
+SLIDER_GUID = "24ee95f9-fb9a-4d81-b8ad-3bd14d7d5e69"
+POINT_GUID = "63d278e5-dc8c-4256-ae10-b4c37e542f76"
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def placement(count: int):
+    """count 組 (X slider, Y slider, Construct Point)"""
+    commands = []
+    for i in range(count):
+        for axis, y in (("X", 0), ("Y", 60)):
+            commands.append({"type": "add_component", "componentId": f"S{axis}{i}", "componentType": "Number Slider",
+                             "x": 0.0, "y": float(i * 200 + y), "value": None, "parameters": {"guid": SLIDER_GUID}})
+        commands.append({"type": "add_component", "componentId": f"PT{i}", "componentType": "Construct Point",
+                         "x": 300.0, "y": float(i * 200), "value": None, "parameters": {"guid": POINT_GUID}})
+        for axis in ("X", "Y"):
+            commands.append({"type": "connect_components", "parameters": {
+                "sourceId": f"S{axis}{i}", "sourceParam": "output", "targetId": f"PT{i}", "targetParam": axis}})
+    return {"description": "mock", "commands": commands}
+
+
+def test_placement_and_reconcile(tmp_path):
+    from grasshopper_tools.client import GrasshopperClient
+    from grasshopper_tools.placement_executor import PlacementExecutor
+    from grasshopper_tools.reconcile import CanvasReconciler, DesiredGraph
+
+    data = placement(5)
+    json_path = tmp_path / "placement_info.json"
+    json_path.write_text(json.dumps(data), encoding="utf-8")
+
+    with MockGHMCP(vision_port=None) as mock:
+        transport = Transport("127.0.0.1", mock.port)
+        client = GrasshopperClient(transport=transport)
+        executor = PlacementExecutor(client=client)
+        result = executor.execute_placement_info(
+            str(json_path), max_workers=4, id_map_path=str(tmp_path / "component_id_map.json")
+        )
+        assert result["success"]
+        assert len(mock.document.components) == 15
+        assert len(mock.document.wires) == 10
+        assert mock.counts()["add_component"] == 15
+
+        # 文檔已與期望一致：編輯腳本為空
+        reconciler = CanvasReconciler(client, executor.component_manager)
+        reconciled = reconciler.reconcile(DesiredGraph.from_placement_info(data), dry_run=True)
+        assert reconciled["success"]
+        assert reconciled["plan"]["ops"] == []
+        transport.close()
+
+
+def test_sliders_info_and_errors():
+    with MockGHMCP(vision_port=None) as mock:
+        transport = Transport("127.0.0.1", mock.port)
+        slider = transport.send_command("add_component", {"guid": SLIDER_GUID, "x": 0, "y": 0})["data"]["id"]
+        point = transport.send_command("add_component", {"guid": POINT_GUID, "x": 200, "y": 0})
+        assert point["data"]["type"] == "Component_ConstructPoint"
+        point = point["data"]["id"]
+
+        response = transport.send_command("set_slider_properties",
+                                          {"id": slider, "min": 0, "max": 200, "rounding": 1, "value": "150"})
+        assert response["success"]
+        info = transport.send_command("get_component_info", {"componentId": slider})["data"]
+        assert (info["value"], info["minimum"], info["maximum"]) == (150.0, 0.0, 200.0)
+
+        errors = transport.send_command("get_document_errors")["data"]
+        assert errors["errorCount"] == 1
+        assert errors["errors"][0]["componentId"] == point
+        assert errors["errors"][0]["messageType"] == "Warning"
+
+        transport.send_command("connect_components", {"sourceId": slider, "targetId": point, "targetParam": "X"})
+        assert transport.send_command("get_document_errors")["data"]["errorCount"] == 0
+        assert transport.send_command("get_connections")["data"] == [
+            {"sourceId": slider, "sourceParam": None, "targetId": point, "targetParam": "X"}
+        ]
+
+        missing = transport.send_command("connect_components", {"sourceId": "nope", "targetId": point})
+        assert not missing["success"] and "not found" in missing["error"]
+        unknown = transport.send_command("get_everything")
+        assert unknown["error"] == "No handler registered for command type 'get_everything'"
+        transport.close()
+
+
+def test_latency_and_fault_injection():
+    faults = FaultConfig(latency={"add_component": 0.02}, failures={"connect_components": 1.0})
+    with MockGHMCP(vision_port=None, faults=faults) as mock:
+        transport = Transport("127.0.0.1", mock.port, pool_size=8)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            list(pool.map(lambda i: transport.send_command("add_component", {"guid": "g", "x": i, "y": 0}), range(5)))
+        # 命令在 UI 執行緒鎖內串行執行：並發也不會比逐一執行快
+        assert time.perf_counter() - start >= 0.1
+
+        ids = list(mock.document.components)
+        failed = transport.send_command("connect_components", {"sourceId": ids[0], "targetId": ids[1]})
+        assert failed == {"success": False, "data": None, "error": "Injected failure in 'connect_components'"}
+        assert not mock.document.wires
+        transport.close()
+
+    def outcomes(seed):
+        faults = FaultConfig(failures={"*": 0.5}, drops={"get_document_info": 1.0}, seed=seed)
+        with MockGHMCP(vision_port=None, faults=faults) as mock:
+            transport = Transport("127.0.0.1", mock.port, retries=0)
+            results = [transport.send_command("add_component", {"guid": "g"})["success"] for _ in range(20)]
+            with pytest.raises(TransportError):
+                transport.send_command("get_document_info")
+            transport.close()
+            return results
+
+    first = outcomes(3)
+    assert first == outcomes(3)
+    assert 0 < sum(first) < 20
+
+
+def test_vision_capture():
+    with MockGHMCP() as mock:
+        main = Transport("127.0.0.1", mock.port)
+        for i in range(3):
+            main.send_command("add_component", {"guid": POINT_GUID, "x": i * 200, "y": 0})
+        vision = Transport("127.0.0.1", mock.vision_port)
+
+        response = vision.send_command("capture_canvas")
+        assert response["success"]
+        png = base64.b64decode(response["data"]["image"])
+        assert png.startswith(PNG_SIGNATURE)
+        assert response["data"]["width"] > 0
+
+        header = bytearray()
+        attachment = vision.request_attachment(
+            {"type": "capture_canvas", "parameters": {"transfer": "binary"}},
+            header.extend,
+            lambda: json.loads(header)["data"]["attachment"]["length"],
+        )
+        assert json.loads(header)["data"]["image"] is None
+        assert bytes(attachment) == png
+        # 附件之後連接仍可重用
+        assert vision.send_command("get_canvas_info")["data"]["componentCount"] == 3
+        main.close()
+        vision.close()
+
+
+def test_legacy_server_batch_fallback():
+    from grasshopper_mcp.batch import MODE_NATIVE, BatchExecutor, CommandBatch, ref
+
+    for legacy in (False, True):
+        with MockGHMCP(vision_port=None, keep_alive=not legacy, native_batch=not legacy) as mock:
+            transport = Transport("127.0.0.1", mock.port)
+            batch = CommandBatch()
+            for i in range(4):
+                batch.add("add_component", {"guid": POINT_GUID, "x": i * 100, "y": 0}, ref=f"C{i}")
+            for i in range(3):
+                batch.add("connect_components", {"sourceId": ref(f"C{i}"), "targetId": ref(f"C{i + 1}"),
+                                                 "targetParam": "X"})
+            result = BatchExecutor(transport).execute(batch)
+            assert result.success
+            assert (result.mode == MODE_NATIVE) is not legacy
+            assert len(mock.document.wires) == 3
+            transport.close()
@@ -0,0 +1,101 @@
+"""
+Test: ParameterSetter 批量 Slider 設置
+
+測試項目：
+1. 每個 Slider 先設範圍再設值，超出舊範圍的值不被 clamp
+2. 原生 batch：所有 Slider 在一次往返內完成
+3. 無 batch 支援：分組並行管線化，逐個 Slider 返回結果
+4. 找不到 ID 或伺服器報錯的 Slider 各自失敗，不影響其他 Slider
+5. 並行組數跟隨 client.flow_control 的並發窗口，不超過 max_workers
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_mcp.transport import Transport
+from grasshopper_tools.client import GrasshopperClient
+from grasshopper_tools.component_manager import ComponentManager
+from grasshopper_tools.parameter_setter import ParameterSetter
+from mock_gh_mcp import FaultConfig, MockComponent
+
+
+def slider_server(gh_mcp, count: int, delay: float = 0.0, native: bool = False):
+    """count 個範圍 0-1 的 Slider 加一個 Panel；每個 set_slider_properties 耗時 delay 秒，命令並行處理"""
+    mock = gh_mcp(native_batch=native, serialize=False,
+                  faults=FaultConfig(latency={"set_slider_properties": delay}))
+    components = mock.document.components
+    for i in range(count):
+        components[f"slider-{i}"] = MockComponent(f"slider-{i}", "", "Number Slider", "GH_NumberSlider", 0.0, 0.0,
+                                                  value=0.5, minimum=0.0, maximum=1.0, rounding=0.1)
+    components["panel"] = MockComponent("panel", "", "Panel", "GH_Panel", 0.0, 0.0)
+    return mock
+
+
+def make_setter(server, count):
+    client = GrasshopperClient(transport=Transport("127.0.0.1", server.port, pool_size=16))
+    manager = ComponentManager(client)
+    for i in range(count):
+        manager.register_component_id(f"WIDTH_{i}", f"slider-{i}")
+    manager.register_component_id("PANEL", "panel")
+    return ParameterSetter(client, manager)
+
+
+@pytest.mark.parametrize("native", [True, False])
+def test_configure_sliders(gh_mcp, native):
+    server = slider_server(gh_mcp, 40, native=native)
+    setter = make_setter(server, 40)
+    configs = [(f"WIDTH_{i}", str(100 + i), None, None, 0.1) for i in range(40)]
+    configs.append(("MISSING", "1", 0, 10, 1))
+    configs.append(("PANEL", "1", 0, 10, 1))
+    results = setter.configure_sliders(configs)
+    setter.client.transport.close()
+
+    assert [r.key for r in results] == [c[0] for c in configs]
+    assert all(r.success for r in results[:40])
+    # 自動範圍 0-214，值沒有被 clamp 到預設的 0-1
+    slider = server.document.components["slider-7"]
+    assert (slider.minimum, slider.maximum, slider.value) == (0.0, 214.0, 107.0)
+    assert results[40].error == "找不到組件 ID 'MISSING'"
+    assert results[41].error == "Component is not a slider: panel"
+    assert server.counts()["set_slider_properties"] == 82
+    if native:
+        assert setter.client.transport.stats()["requests"] <= 3
+
+
+def test_sliders_run_concurrently_without_batch(gh_mcp):
+    server = slider_server(gh_mcp, 40, delay=0.005)
+    setter = make_setter(server, 40)
+    configs = [(f"WIDTH_{i}", "5", 0, 10, 1) for i in range(40)]
+    start = time.perf_counter()
+    success, fail = setter.set_sliders_batch(configs, max_workers=8)
+    elapsed = time.perf_counter() - start
+    setter.client.transport.close()
+
+    assert (success, fail) == (40, 0)
+    assert all(c.value == 5 for c in server.document.components.values() if c.is_slider)
+    assert server.server.peak_clients > 1
+    # 80 個命令逐一執行至少 0.4 秒
+    assert elapsed < 0.4
+
+
+def test_group_count_follows_flow_control(gh_mcp):
+    server = slider_server(gh_mcp, 40, delay=0.002)
+    setter = make_setter(server, 40)
+    controller = setter.client.flow_control
+    # 固定窗口為 2：max_workers=8 也只開 2 組
+    controller.limit = controller.max_limit = 2
+    configs = [(f"WIDTH_{i}", "5", 0, 10, 1) for i in range(40)]
+    success, fail = setter.set_sliders_batch(configs, max_workers=8)
+    stats = controller.stats()
+    setter.client.transport.close()
+
+    assert (success, fail) == (40, 0)
+    assert server.server.peak_clients <= 2
+    # 每組一波管線化命令各佔一個名額
+    assert stats["latency"]["pipeline"]["baseline"] > 0
@@ -0,0 +1,259 @@
+"""
+Test: Placement 執行日誌與可恢復執行
+
+測試項目：
+1. 日誌記錄、重放、忽略寫入中斷的半行；命令內容改變時不視為已完成
+2. 以文檔中實際存在的組件與連線驗證記錄：已刪除的組件、連線與端點失效的連接失效；
+   無法列出連線時所有連接記錄失效
+3. 中途失敗後以 resume=True 重跑：只發送未完成的命令，不重複創建組件或連接
+4. 在畫布上刪除的組件重跑時重建，並重連其連接；在畫布上刪除的連線重跑時重連；
+   預設（resume=False）清空日誌從頭執行
+5. 伺服器無法列出連線時重做所有連接；無法讀取文檔時拒絕恢復
+6. execute_placement_info_async 同樣寫入執行日誌並可從中恢復
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_tools.placement_journal import PlacementJournal
+from mock_gh_mcp import CommandError
+
+MUTATIONS = ("add_component", "connect_components")
+
+
+def add(key, guid="g"):
+    return {"type": "add_component", "componentId": key, "x": 0, "y": 0, "parameters": {"guid": guid}}
+
+
+def connect(source, target, target_param=None):
+    cmd = {"type": "connect_components", "parameters": {"sourceId": source, "targetId": target}}
+    if target_param:
+        cmd["parameters"]["targetParam"] = target_param
+    return cmd
+
+
+def crash_after(server, limit):
+    """前 limit 個 add / connect 正常執行，之後全部失敗（模擬 GH 當機）；返回恢復正常的函數"""
+    handlers = server.document.handlers
+    originals = {name: handlers[name] for name in MUTATIONS}
+    sent = [0]
+
+    def failing(handler):
+        def run(params):
+            # 處理器在伺服器的狀態鎖內執行
+            sent[0] += 1
+            if sent[0] > limit:
+                raise CommandError("Timeout")
+            return handler(params)
+        return run
+
+    for name in MUTATIONS:
+        handlers[name] = failing(handlers[name])
+    return lambda: handlers.update(originals)
+
+
+def mutations(server):
+    counts = server.counts()
+    return {name: counts.get(name, 0) for name in MUTATIONS}
+
+
+def test_journal_replay_and_fingerprint(tmp_path):
+    path = str(tmp_path / "placement_info.journal.jsonl")
+    journal = PlacementJournal(path)
+    journal.record_add(add("A"), "id-a")
+    journal.record_add(add("B"), "id-b")
+    journal.record_add({"type": "add_component", "x": 0, "y": 0}, "id-anon")
+    journal.record_connect(connect("A", "B", "X"), "id-a", "id-b")
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"op": "add", "key": "C", "id": ')
+
+    replayed = PlacementJournal(path)
+    assert replayed.load() == 3
+    assert replayed.completed_add(add("A")) == "id-a"
+    assert replayed.completed_add(dict(add("A"), comment="renamed")) == "id-a"
+    assert replayed.completed_add(add("A", guid="other")) is None
+    assert replayed.completed_add(add("C")) is None
+    assert replayed.completed_connect(connect("A", "B", "X"), "id-a", "id-b")
+    assert not replayed.completed_connect(connect("A", "B", "Y"), "id-a", "id-b")
+    assert not replayed.completed_connect(connect("A", "B", "X"), "id-a", "id-b2")
+
+    wire = {"sourceId": "id-a", "sourceParam": None, "targetId": "id-b", "targetParam": "x"}
+    assert replayed.verify(["id-a", "id-b"], [wire]) == {"adds": 2, "connects": 1, "stale_adds": 0, "stale_connects": 0}
+    assert replayed.completed_connect(connect("A", "B", "X"), "id-a", "id-b")
+    # 連線已從畫布上移除
+    assert replayed.verify(["id-a", "id-b"], [dict(wire, targetParam="Y")])["stale_connects"] == 1
+    assert not replayed.completed_connect(connect("A", "B", "X"), "id-a", "id-b")
+
+    replayed.record_connect(connect("A", "B", "X"), "id-a", "id-b")
+    # 伺服器無法列出連線：不信任連接記錄
+    assert replayed.verify(["id-a", "id-b"]) == {"adds": 2, "connects": 0, "stale_adds": 0, "stale_connects": 1}
+
+    replayed.record_connect(connect("A", "B", "X"), "id-a", "id-b")
+    assert replayed.verify(["id-a"], [wire]) == {"adds": 1, "connects": 0, "stale_adds": 1, "stale_connects": 1}
+    assert replayed.completed_add(add("B")) is None
+
+    replayed.reset()
+    assert not Path(path).exists()
+    assert PlacementJournal(path).load() == 0
+
+
+@pytest.fixture
+def placement(tmp_path):
+    commands = [add(f"C{i}") for i in range(30)]
+    commands += [connect(f"C{i}", f"C{i + 1}") for i in range(29)]
+    json_path = tmp_path / "placement_info.json"
+    json_path.write_text(json.dumps({"description": "resume", "commands": commands}), encoding="utf-8")
+    return json_path
+
+
+def run(server, json_path, **kwargs):
+    from grasshopper_mcp.transport import Transport
+    from grasshopper_tools.client import GrasshopperClient
+    from grasshopper_tools.placement_executor import PlacementExecutor
+
+    transport = Transport("127.0.0.1", server.port)
+    try:
+        executor = PlacementExecutor(client=GrasshopperClient(transport=transport))
+        return executor.execute_placement_info(
+            str(json_path), max_workers=4,
+            id_map_path=str(json_path.parent / "component_id_map.json"), **kwargs
+        )
+    finally:
+        transport.close()
+
+
+def id_map(json_path):
+    return json.loads((json_path.parent / "component_id_map.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("mode", [{}, {"use_dag": False}, {"use_batch": True}])
+def test_resume_after_failure(gh_mcp, placement, mode):
+    server = gh_mcp()
+    recover = crash_after(server, 40)
+    first = run(server, placement, **mode)
+    assert not first["success"]
+    assert first["journal_path"] == str(placement.parent / "placement_info.journal.jsonl")
+    created = len(server.document.components)
+    wired = len(server.document.wires)
+    assert 0 < created and created + wired == 40
+
+    recover()
+    server.received.clear()
+    second = run(server, placement, resume=True, **mode)
+
+    assert second["success"]
+    assert second["resumed_add"] == created
+    assert second["resumed_connect"] == wired
+    assert second["add_success"] == 30 and second["connect_success"] == 29
+    # 沒有重複的組件或連接，第二次只發送剩下的命令
+    assert len(server.document.components) == 30
+    assert len(server.document.wires) == 29
+    assert mutations(server) == {"add_component": 30 - created, "connect_components": 29 - wired}
+
+
+def test_rerun_rebuilds_deleted_components(gh_mcp, placement):
+    server = gh_mcp()
+    assert run(server, placement)["success"]
+    # 使用者在畫布上刪除了 C5（連帶 C4->C5 與 C5->C6）
+    server.document.delete_component({"componentId": id_map(placement)["C5"]})
+    server.received.clear()
+
+    result = run(server, placement, resume=True)
+    assert result["success"]
+    assert result["resumed_add"] == 29 and result["resumed_connect"] == 27
+    assert mutations(server) == {"add_component": 1, "connect_components": 2}
+    assert len(server.document.components) == 30 and len(server.document.wires) == 29
+
+    # 完成後重跑只讀取一次文檔與一次連線，不發送任何修改命令
+    server.received.clear()
+    assert run(server, placement, resume=True)["resumed_add"] == 30
+    assert sorted(server.received) == ["get_connections", "get_document_info"]
+
+    # 預設清空日誌從頭執行
+    server.received.clear()
+    assert run(server, placement)["resumed_add"] == 0
+    assert mutations(server)["add_component"] == 30
+    assert "get_document_info" not in server.received
+
+
+def test_rerun_reconnects_deleted_wires(gh_mcp, placement):
+    server = gh_mcp()
+    assert run(server, placement)["success"]
+    ids = id_map(placement)
+    # 使用者在畫布上刪除了 C3->C4 的連線，兩端組件仍在
+    server.document.disconnect_components({"sourceId": ids["C3"], "targetId": ids["C4"]})
+    server.received.clear()
+
+    result = run(server, placement, resume=True)
+    assert result["success"]
+    assert result["resumed_add"] == 30 and result["resumed_connect"] == 28
+    assert mutations(server) == {"add_component": 0, "connect_components": 1}
+    assert len(server.document.wires) == 29
+
+
+def test_resends_connects_without_connection_listing(gh_mcp, placement):
+    server = gh_mcp()
+    assert run(server, placement)["success"]
+    del server.document.handlers["get_connections"]
+    server.received.clear()
+
+    result = run(server, placement, resume=True)
+    assert result["success"]
+    assert result["resumed_add"] == 30 and result["resumed_connect"] == 0
+    assert mutations(server) == {"add_component": 0, "connect_components": 29}
+    assert len(server.document.wires) == 29
+
+
+def test_refuses_to_resume_without_document(gh_mcp, placement):
+    server = gh_mcp()
+    assert run(server, placement)["success"]
+
+    def no_document(params):
+        raise CommandError("No active Grasshopper document")
+
+    server.document.handlers["get_document_info"] = no_document
+    server.received.clear()
+    result = run(server, placement, resume=True)
+
+    assert result == {
+        "success": False,
+        "error": "無法讀取文檔以驗證執行日誌",
+        "journal_path": str(placement.parent / "placement_info.journal.jsonl")
+    }
+    assert mutations(server) == {"add_component": 0, "connect_components": 0}
+
+
+def test_async_resume_after_failure(gh_mcp, placement):
+    from grasshopper_tools.client import GrasshopperClient
+    from grasshopper_tools.placement_executor import PlacementExecutor
+
+    server = gh_mcp()
+
+    async def run_async(**kwargs):
+        executor = PlacementExecutor(client=GrasshopperClient("127.0.0.1", server.port))
+        return await executor.execute_placement_info_async(
+            str(placement), id_map_path=str(placement.parent / "component_id_map.json"), **kwargs
+        )
+
+    recover = crash_after(server, 20)
+    first = asyncio.run(run_async())
+    assert not first["success"]
+    created = len(server.document.components)
+    assert created == 20 and not server.document.wires
+
+    recover()
+    server.received.clear()
+    second = asyncio.run(run_async(resume=True))
+
+    assert second["success"]
+    assert second["resumed_add"] == 20 and second["resumed_connect"] == 0
+    assert mutations(server) == {"add_component": 10, "connect_components": 29}
+    assert len(server.document.components) == 30 and len(server.document.wires) == 29
@@ -0,0 +1,186 @@
+"""
+Test: 畫布差異比對與同步 CanvasReconciler
+
+測試項目：
+1. 空文檔：全部 add / connect / set_value；執行後再比對沒有任何修改
+2. 修改一個 Slider 值、刪除一個組件、加入一個組件、換一條連接：只執行這些差異
+3. dry_run 只打印編輯腳本，不發送任何修改命令
+4. 不在 ID 映射中的組件預設保留，prune=True 時刪除
+5. 伺服器無法列出連接時假設既有連接存在；Joseki 作為期望圖
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_tools.reconcile import (
+    OP_ADD, OP_CONNECT, OP_DELETE, OP_DISCONNECT, OP_MOVE, OP_SET_VALUE,
+    CanvasReconciler, DesiredGraph,
+)
+from mock_gh_mcp import MockComponent
+
+MUTATING = {"add_component", "connect_components", "disconnect_components", "delete_component",
+            "move_component", "set_slider_properties", "set_component_value"}
+KNOWLEDGE = {"slider-guid": {"name": "Number Slider", "guid": "slider-guid", "typeName": "GH_NumberSlider"}}
+
+
+def mutations(server):
+    return [t for t in server.received if t in MUTATING]
+
+
+def wires(server):
+    return [wire.to_dict() for wire in server.document.wires.values()]
+
+
+def slider(key, value, x=0.0):
+    return {"type": "add_component", "componentId": key, "componentType": "Number Slider",
+            "x": x, "y": 0.0, "value": value, "parameters": {"guid": "slider-guid"}}
+
+
+def component(key, guid="add-guid", x=300.0):
+    return {"type": "add_component", "componentId": key, "componentType": "Addition",
+            "x": x, "y": 0.0, "value": None, "parameters": {"guid": guid}}
+
+
+def wire(source, target, target_param):
+    return {"type": "connect_components", "parameters": {
+        "sourceId": source, "targetId": target, "sourceParam": "output", "targetParam": target_param}}
+
+
+def table(**overrides):
+    commands = [slider("WIDTH", 120.0), slider("LENGTH", 80.0, x=0.0), component("ADD"), component("OUT", x=600.0)]
+    commands += [wire("WIDTH", "ADD", "A"), wire("LENGTH", "ADD", "B"), wire("ADD", "OUT", "A")]
+    return DesiredGraph.from_placement_info({"commands": commands})
+
+
+@pytest.fixture
+def canvas(gh_mcp):
+    from grasshopper_mcp.transport import Transport
+    from grasshopper_tools.client import GrasshopperClient
+
+    transports = []
+
+    def make(list_connections: bool = True):
+        server = gh_mcp(knowledge=KNOWLEDGE)
+        if not list_connections:
+            del server.document.handlers["get_connections"]
+        transport = Transport("127.0.0.1", server.port)
+        transports.append(transport)
+        return server, CanvasReconciler(client=GrasshopperClient(transport=transport))
+
+    yield make
+    for transport in transports:
+        transport.close()
+
+
+def test_build_from_empty_document(canvas):
+    server, reconciler = canvas()
+    result = reconciler.reconcile(table())
+    assert result["success"]
+    assert result["plan"]["counts"][OP_ADD] == 4
+    assert result["plan"]["counts"][OP_CONNECT] == 3
+    assert result["plan"]["counts"][OP_SET_VALUE] == 2
+    assert len(server.document.components) == 4 and len(server.document.wires) == 3
+    width_id = reconciler.component_manager.get_component_id("WIDTH")
+    assert server.document.components[width_id].value == 120.0
+
+    server.received.clear()
+    again = reconciler.reconcile(table())
+    assert again["plan"]["ops"] == [] and again["plan"]["unchanged"] == 4
+    assert mutations(server) == []
+
+
+def test_applies_only_the_delta(canvas):
+    server, reconciler = canvas()
+    reconciler.reconcile(table())
+    ids = dict(reconciler.component_manager.component_id_map)
+
+    # WIDTH 改值，OUT 不再需要，新增 MUL，LENGTH 改接到 ADD.A（原本 B）
+    commands = [slider("WIDTH", 150.0), slider("LENGTH", 80.0), component("ADD"), component("MUL", guid="mul-guid", x=900.0)]
+    commands += [wire("WIDTH", "ADD", "A"), wire("LENGTH", "ADD", "A"), wire("ADD", "MUL", "A")]
+    desired = DesiredGraph.from_placement_info({"commands": commands})
+
+    server.received.clear()
+    preview = reconciler.reconcile(desired, dry_run=True)
+    assert mutations(server) == []
+    counts = preview["plan"]["counts"]
+    assert counts == {OP_DISCONNECT: 1, OP_DELETE: 1, OP_MOVE: 0, OP_ADD: 1, OP_CONNECT: 2, OP_SET_VALUE: 1}
+    assert preview["plan"]["unchanged"] == 2
+    disconnect = next(op for op in preview["plan"]["ops"] if op["op"] == OP_DISCONNECT)
+    assert disconnect["key"] == "LENGTH.output -> ADD.B"
+
+    result = reconciler.reconcile(desired)
+    assert result["success"]
+    assert sorted(mutations(server)) == sorted([
+        "disconnect_components", "delete_component", "add_component",
+        "connect_components", "connect_components", "set_slider_properties", "set_slider_properties",
+    ])
+    components = server.document.components
+    assert ids["OUT"] not in components
+    assert components[ids["WIDTH"]].value == 150.0
+    assert ids["ADD"] in components
+    assert {(w["sourceId"], w["targetParam"]) for w in wires(server) if w["targetId"] == ids["ADD"]} == {
+        (ids["WIDTH"], "A"), (ids["LENGTH"], "A")
+    }
+    assert reconciler.reconcile(desired, dry_run=True)["plan"]["ops"] == []
+
+
+def test_moves_and_type_changes(canvas):
+    server, reconciler = canvas()
+    reconciler.reconcile(table())
+    ids = dict(reconciler.component_manager.component_id_map)
+
+    commands = [slider("WIDTH", 120.0, x=50.0), slider("LENGTH", 80.0), component("ADD", guid="sub-guid"),
+                component("OUT", x=600.0)]
+    commands += [wire("WIDTH", "ADD", "A"), wire("LENGTH", "ADD", "B"), wire("ADD", "OUT", "A")]
+    plan = reconciler.reconcile(DesiredGraph.from_placement_info({"commands": commands}))["plan"]
+
+    assert plan["counts"][OP_MOVE] == 1 and plan["counts"][OP_DELETE] == 1 and plan["counts"][OP_ADD] == 1
+    # 重建的 ADD 需要重新接上三條連接
+    assert plan["counts"][OP_CONNECT] == 3
+    assert server.document.components[ids["WIDTH"]].x == 50.0
+    assert ids["ADD"] not in server.document.components
+    assert len(server.document.wires) == 3
+
+
+def test_unmanaged_components_and_prune(canvas):
+    server, reconciler = canvas()
+    reconciler.reconcile(table())
+    server.document.components["user-sketch"] = MockComponent("user-sketch", "panel-guid", "Panel", "GH_Panel", 0.0, 500.0)
+
+    assert reconciler.reconcile(table(), dry_run=True)["plan"]["ops"] == []
+    plan = reconciler.reconcile(table(), prune=True)["plan"]
+    assert [(op["op"], op["key"]) for op in plan["ops"]] == [(OP_DELETE, "user-sketch")]
+    assert "user-sketch" not in server.document.components
+
+
+def test_without_connection_listing_and_joseki(canvas, tmp_path):
+    server, reconciler = canvas(list_connections=False)
+    joseki = {
+        "id": "j", "name": "Box", "nodes": [
+            {"id": "n1", "name": "Center Box", "component_guid": "box-guid", "input_values": {"X": 10},
+             "position": {"x": 0, "y": 0}},
+            {"id": "n2", "name": "Rectangular Array", "component_guid": "array-guid", "input_values": {},
+             "position": {"x": 200, "y": 0}},
+        ],
+        "connections": [{"from_node_id": "n1", "from_port": "B", "to_node_id": "n2", "to_port": "G"}],
+    }
+    path = tmp_path / "box.json"
+    path.write_text(json.dumps(joseki), encoding="utf-8")
+    desired = DesiredGraph.load(str(path))
+
+    first = reconciler.reconcile(desired)
+    assert first["success"]
+    assert first["plan"]["counts"][OP_ADD] == 2 and first["plan"]["counts"][OP_CONNECT] == 1
+    assert "set_component_value" in server.received
+
+    server.received.clear()
+    second = reconciler.reconcile(desired)
+    assert second["plan"]["ops"] == []
+    assert any("get_connections" in warning for warning in second["plan"]["warnings"])
+    assert mutations(server) == []
@@ -0,0 +1,99 @@
+"""
+Test: 文檔快照快取 DocumentSnapshotCache
+
+測試項目：
+1. 唯讀命令在 TTL 內命中，過期後重新發送；參數不同各自快取
+2. 修改命令使快取失效，未知命令視為修改
+3. 命中返回新的字典；失敗回應不快取
+4. 與修改命令並發的讀取結果不寫回快取
+"""
+
+import sys
+from pathlib import Path
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_mcp.snapshot_cache import DocumentSnapshotCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting_sender(responses=None):
+    calls = []
+
+    def send(command_type, params=None):
+        calls.append(command_type)
+        return (responses or {}).get(command_type, {"success": True, "result": {"n": len(calls)}})
+
+    return calls, send
+
+
+def test_ttl_and_keys():
+    clock = FakeClock()
+    cache = DocumentSnapshotCache(ttl=2.0, clock=clock)
+    calls, send = counting_sender()
+
+    first = cache.fetch("get_connections", {}, lambda: send("get_connections"))
+    assert cache.fetch("get_connections", {}, lambda: send("get_connections")) == first
+    cache.fetch("get_component_info", {"componentId": "a"}, lambda: send("get_component_info"))
+    cache.fetch("get_component_info", {"componentId": "b"}, lambda: send("get_component_info"))
+    assert calls == ["get_connections", "get_component_info", "get_component_info"]
+
+    clock.now = 2.5
+    cache.fetch("get_connections", {}, lambda: send("get_connections"))
+    assert calls[-1] == "get_connections" and len(calls) == 4
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 4
+
+
+def test_mutations_invalidate():
+    cache = DocumentSnapshotCache(ttl=60)
+    calls, send = counting_sender()
+
+    for command_type in ("add_component", "connect_components", "clear_document", "load_document", "delete_component"):
+        cache.fetch("get_all_components", {}, lambda: send("get_all_components"))
+        cache.fetch(command_type, {}, lambda: send(command_type))
+    assert calls.count("get_all_components") == 5
+
+    # 不修改文檔的命令保留快取
+    cache.fetch("get_all_components", {}, lambda: send("get_all_components"))
+    cache.fetch("search_components", {"query": "x"}, lambda: send("search_components"))
+    cache.fetch("get_all_components", {}, lambda: send("get_all_components"))
+    assert calls.count("get_all_components") == 6
+
+
+def test_hits_are_copies_and_failures_not_cached():
+    cache = DocumentSnapshotCache(ttl=60)
+    calls, send = counting_sender({"get_document_errors": {"success": False, "error": "busy"}})
+
+    response = cache.fetch("get_document_info", {}, lambda: send("get_document_info"))
+    response["result"]["n"] = 99
+    assert cache.fetch("get_document_info", {}, lambda: send("get_document_info"))["result"]["n"] == 1
+
+    cache.fetch("get_document_errors", {}, lambda: send("get_document_errors"))
+    cache.fetch("get_document_errors", {}, lambda: send("get_document_errors"))
+    assert calls.count("get_document_errors") == 2
+
+
+def test_concurrent_mutation_discards_stale_read():
+    cache = DocumentSnapshotCache(ttl=60)
+    calls, send = counting_sender()
+
+    def read_during_mutation():
+        # 讀取請求在途時，文檔被修改
+        cache.fetch("connect_components", {}, lambda: send("connect_components"))
+        return send("get_connections")
+
+    cache.fetch("get_connections", {}, read_during_mutation)
+    cache.fetch("get_connections", {}, lambda: send("get_connections"))
+    assert calls.count("get_connections") == 2
+    assert cache.stats()["entries"] == 1
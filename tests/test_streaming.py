@@ -0,0 +1,245 @@
+"""
+Test: 大型回應串流解碼
+
+測試項目：
+1. Base64FieldDecoder 在任意切塊位置下結果一致
+2. JSON 轉義的 "\\/" 與跨塊的欄位名
+3. 直接寫入檔案 (sink)
+4. Transport.request_stream 讀取 4 MB 的 capture_canvas 回應
+5. Transport.request_attachment：JSON 標頭 + 原始位元組附件，記憶體或直接寫檔
+6. VisionCapture.capture_canvas 返回 PNG 位元組 / 直接存檔；舊伺服器退回 base64（需要 langgraph）
+7. vision_capture_node 只保留最近 SNAPSHOT_KEEP 組快照 PNG，較舊的從快照目錄刪除（需要 langgraph）
+"""
+
+import base64
+import json
+import os
+import socket
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_mcp.streaming import Base64FieldDecoder
+from grasshopper_mcp.transport import Transport
+
+PNG = b"\x89PNG\r\n\x1a\n" + os.urandom(3 * 1024 * 1024)
+
+
+def capture_response(image: bytes = PNG) -> bytes:
+    response = {
+        "success": True,
+        "data": {"width": 1920, "height": 1080, "image": base64.b64encode(image).decode("ascii"), "format": "png"}
+    }
+    return json.dumps(response).encode("utf-8")
+
+
+def decode_in_chunks(raw: bytes, size: int, **kwargs) -> Base64FieldDecoder:
+    decoder = Base64FieldDecoder("image", **kwargs)
+    for offset in range(0, len(raw), size):
+        decoder.feed(raw[offset:offset + size])
+    return decoder
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 4096, 1 << 20])
+def test_decoder_chunk_boundaries(size):
+    image = os.urandom(1000)
+    decoder = decode_in_chunks(capture_response(image), size)
+    response = decoder.finish()
+
+    assert decoder.found
+    assert bytes(decoder.data) == image
+    assert response["data"]["image"] is None
+    assert response["data"]["width"] == 1920
+    assert response["data"]["format"] == "png"
+
+
+def test_decoder_escaped_slashes_and_whitespace():
+    image = bytes(range(256)) * 4
+    encoded = base64.b64encode(image).decode("ascii").replace("/", "\\/")
+    raw = ('{"success": true, "data": {"image"  :  "' + encoded + '", "note": "\\"image\\": x"}}').encode()
+    decoder = decode_in_chunks(raw, 5)
+    response = decoder.finish()
+
+    assert bytes(decoder.data) == image
+    assert response["data"]["note"] == '"image": x'
+
+
+def test_decoder_missing_field():
+    decoder = decode_in_chunks(b'{"success": false, "error": "No document"}', 4)
+    response = decoder.finish()
+    assert not decoder.found
+    assert decoder.data is None
+    assert response["error"] == "No document"
+
+
+def test_decoder_truncated():
+    raw = capture_response(b"abc" * 100)
+    decoder = decode_in_chunks(raw[:len(raw) // 2], 16)
+    with pytest.raises(ValueError):
+        decoder.finish()
+
+
+def test_decoder_sink(tmp_path):
+    path = tmp_path / "canvas.png"
+    with open(path, "wb") as sink:
+        decoder = decode_in_chunks(capture_response(), 65536, sink=sink)
+        decoder.finish()
+    assert decoder.data is None
+    assert decoder.size == len(PNG)
+    assert path.read_bytes() == PNG
+
+
+def serve_captures(binary: bool):
+    """
+    capture 伺服器（換行分隔、持久連接）
+
+    binary=False 時不認得 transfer 參數，總是返回約 4 MB 的 base64 回應；
+    binary=True 時對 transfer=binary 返回 JSON 標頭 + 原始 PNG 附件。
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(4)
+    payload = capture_response() + b"\n"
+    header = json.dumps({
+        "success": True,
+        "data": {"width": 1920, "height": 1080, "image": None,
+                 "attachment": {"length": len(PNG), "encoding": "png"}}
+    }).encode("utf-8") + b"\n"
+
+    def handle(client):
+        with client, client.makefile("rb") as reader:
+            for line in reader:
+                transfer = (json.loads(line).get("parameters") or {}).get("transfer")
+                if binary and transfer == "binary":
+                    client.sendall(header)
+                    client.sendall(PNG)
+                else:
+                    client.sendall(payload)
+
+    def serve():
+        while True:
+            try:
+                client, _ = sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=handle, args=(client,), daemon=True).start()
+
+    threading.Thread(target=serve, daemon=True).start()
+    return sock
+
+
+@pytest.fixture
+def capture_server():
+    sock = serve_captures(binary=False)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+@pytest.fixture
+def binary_capture_server():
+    sock = serve_captures(binary=True)
+    yield sock.getsockname()[1]
+    sock.close()
+
+
+def test_request_stream(capture_server):
+    transport = Transport("127.0.0.1", capture_server)
+    for _ in range(2):
+        decoder = Base64FieldDecoder("image")
+        size = transport.request_stream({"type": "capture_canvas"}, decoder.feed)
+        response = decoder.finish()
+        assert response["success"]
+        assert bytes(decoder.data) == PNG
+        assert size == len(capture_response())
+    # 串流讀取後連接仍可重用
+    assert transport.stats()["opened"] == 1
+    transport.close()
+
+
+def request_capture(transport, transfer, sink=None):
+    decoder = Base64FieldDecoder("image")
+    header = {}
+
+    def attachment_size():
+        header.update(decoder.finish())
+        return int((header["data"].get("attachment") or {}).get("length") or 0)
+
+    command = {"type": "capture_canvas", "parameters": {"transfer": transfer}}
+    attachment = transport.request_attachment(command, decoder.feed, attachment_size, sink=sink)
+    return header, decoder, attachment
+
+
+def test_request_attachment(binary_capture_server, tmp_path):
+    """二進位附件：標頭中沒有 base64，附件原樣讀回；之後連接仍可重用"""
+    transport = Transport("127.0.0.1", binary_capture_server)
+    header, decoder, attachment = request_capture(transport, "binary")
+    assert header["data"]["width"] == 1920
+    assert not decoder.found
+    assert attachment == PNG
+    # 附件沒有 base64 的 1/3 額外開銷
+    assert transport.stats()["bytes_received"] < len(PNG) + 1024
+
+    path = tmp_path / "viewport.png"
+    with open(path, "wb") as sink:
+        _, _, attachment = request_capture(transport, "binary", sink=sink)
+    assert attachment is None
+    assert path.read_bytes() == PNG
+
+    # 不要求附件時回到 base64
+    _, decoder, attachment = request_capture(transport, "base64")
+    assert attachment is None
+    assert bytes(decoder.data) == PNG
+
+    assert transport.stats()["opened"] == 1
+    transport.close()
+
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_vision_capture(binary, tmp_path):
+    pytest.importorskip("langgraph")
+    from grasshopper_mcp.langgraph.nodes.vision_capture import VisionCapture
+
+    sock = serve_captures(binary=binary)
+    capture = VisionCapture("127.0.0.1", sock.getsockname()[1], transfer="binary")
+    result = capture.capture_canvas()
+    assert result.success
+    assert bytes(result.image_bytes) == PNG
+    assert result.width == 1920
+
+    path = tmp_path / "canvas.png"
+    result = capture.capture_rhino_view(save_to=str(path))
+    assert result.success
+    assert result.image_bytes is None
+    assert path.read_bytes() == PNG
+    assert capture.save_image(base64.b64encode(PNG).decode(), str(tmp_path / "copy.png"))
+    sock.close()
+
+
+def test_vision_capture_node_prunes_snapshots(tmp_path, monkeypatch):
+    pytest.importorskip("langgraph")
+    from grasshopper_mcp.langgraph.nodes import vision_capture
+
+    sock = serve_captures(binary=True)
+    port = sock.getsockname()[1]
+    capture_class = vision_capture.VisionCapture
+    monkeypatch.setattr(vision_capture, "VisionCapture", lambda: capture_class("127.0.0.1", port))
+    monkeypatch.setattr(vision_capture, "SNAPSHOT_KEEP", 2)
+    monkeypatch.setenv("GH_VISION_SNAPSHOT_DIR", str(tmp_path))
+
+    state = {"vision_snapshots": []}
+    for _ in range(4):
+        state.update(vision_capture.vision_capture_node(state))
+    sock.close()
+
+    snapshots = state["vision_snapshots"]
+    assert len(snapshots) == 4
+    assert all(s["canvas_image_path"] is None and s["viewport_image_path"] is None for s in snapshots[:2])
+    kept = [s[key] for s in snapshots[2:] for key in ("canvas_image_path", "viewport_image_path")]
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in kept)
+    assert state["current_snapshot"] is snapshots[-1]
@@ -0,0 +1,106 @@
+"""
+Test: 合成大型定義 (benchmarks/synthetic.py)
+
+測試項目：
+1. 組件數精確、相同 seed 結果相同；最長路徑等於層數 - 1，扇入 / 扇出不超過上限
+2. 組件類型、GUID 與參數名都來自 component_knowledge.json
+3. placement_info / MMD / Joseki 三種輸出可被現有的解析器讀回
+4. run_benchmarks 可直接使用合成工作負載
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+import synthetic
+import run_benchmarks
+from workloads import Workload
+from grasshopper_mcp.joseki import GrasshopperJoseki
+from grasshopper_tools.dag_scheduler import PlacementGraph
+from grasshopper_tools.parser_utils import MMDParser
+from grasshopper_tools.reconcile import DesiredGraph
+
+
+@pytest.fixture(scope="module")
+def knowledge():
+    return synthetic.load_component_types()
+
+
+@pytest.mark.parametrize("shape", list(synthetic.SHAPES))
+def test_shape_is_controlled(shape, knowledge):
+    options = synthetic.SHAPES[shape]
+    workload = synthetic.generate(3000, **options, seed=7, knowledge=knowledge)
+    stats = synthetic.graph_stats(workload)
+
+    assert stats.components == 3000
+    assert stats.layers == options["depth"]
+    assert stats.longest_path == options["depth"] - 1
+    assert stats.max_fan_in <= options["fan_in"]
+    assert stats.max_fan_out <= options["fan_out"]
+    assert stats.overflow == 0
+    assert len({component.key for component in workload.components}) == 3000
+
+    again = synthetic.generate(3000, **options, seed=7, knowledge=knowledge)
+    assert again.components == workload.components and again.connections == workload.connections
+    assert synthetic.generate(3000, **options, seed=8, knowledge=knowledge).connections != workload.connections
+
+
+def test_uses_real_components(knowledge):
+    workload = synthetic.generate(500, knowledge=knowledge)
+    types = {component.key: component.type for component in workload.components}
+    for component in workload.components:
+        assert component.guid == knowledge[component.type]["guid"]
+    assert workload.sliders and all(s.min_val <= s.value <= s.max_val for s in workload.sliders)
+
+    for connection in workload.connections:
+        inputs = [p["name"] for p in knowledge[types[connection.target]]["inputs"]]
+        outputs = [p["name"] for p in knowledge[types[connection.source]].get("outputs", [])]
+        assert connection.target_param in inputs
+        assert connection.source_param in (outputs or [synthetic.SLIDER_OUTPUT])
+
+    with pytest.raises(ValueError):
+        synthetic.generate(0)
+
+
+def test_formats_roundtrip(tmp_path, knowledge):
+    workload = synthetic.generate(400, depth=6, knowledge=knowledge)
+
+    placement = tmp_path / "placement.json"
+    synthetic.write(workload, placement, "placement")
+    restored = Workload.load(placement)
+    assert restored.components == workload.components
+    data = workload.to_placement_info()
+    assert len(DesiredGraph.from_placement_info(data).components) == 400
+    adds = [cmd for cmd in data["commands"] if cmd["type"] == "add_component"]
+    connects = [cmd for cmd in data["commands"] if cmd["type"] == "connect_components"]
+    graph = PlacementGraph.from_commands(adds, connects)
+    assert all(task.deps for task in graph.tasks[len(adds):])
+
+    mmd = tmp_path / "component_info.mmd"
+    synthetic.write(workload, mmd, "mmd")
+    components, connections = MMDParser().parse_component_info_mmd(str(mmd))
+    assert {c["componentId"] for c in components} == {c.key for c in workload.components}
+    assert len(connections) == len(workload.connections)
+    by_key = {c["componentId"]: c for c in components}
+    first = workload.components[-1]
+    assert by_key[first.key]["guid"] == first.guid and by_key[first.key]["x"] == int(first.x)
+
+    joseki_path = tmp_path / "joseki.json"
+    synthetic.write(workload, joseki_path, "joseki")
+    joseki = GrasshopperJoseki.from_file(joseki_path)
+    assert len(joseki.nodes) == 400 and len(joseki.connections) == len(workload.connections)
+    assert len(joseki.constraints) == len(workload.sliders)
+    assert len(DesiredGraph.from_joseki(joseki).components) == 400
+
+
+def test_run_case_on_synthetic():
+    case = run_benchmarks.run_case("synthetic", 200, "placement-dag", isolate=False)
+    assert case["components"] == 200
+    assert case["ok"] == {"add": 200, "connect": case["connections"]}
+    with pytest.raises(KeyError):
+        run_benchmarks.load_workload("no-such-workload", None)
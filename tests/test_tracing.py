@@ -0,0 +1,148 @@
+"""
+Test: 延遲直方圖與巢狀追蹤
+
+測試項目：
+1. LatencyHistogram 的百分位估計誤差在分桶寬度內，可合併、可序列化還原
+2. 傳輸統計按命令類型記錄 p50 / p95 / p99、收發位元組與重試次數
+3. tracer 開啟時 span 巢狀為 placement.execute → manager → command，跨越工作執行緒
+4. export_metrics 匯出 JSON；tracer 關閉時不記錄任何 span
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_mcp.tracing import LatencyHistogram, export_metrics, get_tracer
+
+
+@pytest.fixture
+def tracer():
+    tracer = get_tracer()
+    tracer.reset()
+    tracer.enable()
+    yield tracer
+    tracer.disable()
+    tracer.reset()
+
+
+def test_histogram_percentiles():
+    rng = random.Random(7)
+    samples = [rng.uniform(0.001, 0.1) for _ in range(5000)]
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.record(sample)
+
+    ordered = sorted(samples)
+    for q in (50, 95, 99):
+        exact = ordered[int(len(ordered) * q / 100) - 1]
+        assert abs(histogram.percentile(q) - exact) / exact < 0.1
+    assert histogram.percentile(100) <= histogram.max
+
+    other = LatencyHistogram()
+    other.record(2.0)
+    histogram.merge(other)
+    assert histogram.count == 5001
+    assert histogram.max == 2.0
+
+    restored = LatencyHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+    assert restored.count == histogram.count
+    assert restored.buckets == histogram.buckets
+    assert restored.percentile(95) == pytest.approx(histogram.percentile(95), rel=1e-3)
+
+
+def test_transport_metrics_per_command(gh_mcp):
+    from grasshopper_mcp.transport import Transport
+
+    server = gh_mcp()
+    transport = Transport("127.0.0.1", server.port)
+    ids = [
+        transport.send_command("add_component", {"guid": "g", "x": 0, "y": 0})["data"]["id"]
+        for _ in range(20)
+    ]
+    assert transport.send_command("connect_components", {"sourceId": ids[0], "targetId": ids[1]})["success"]
+
+    stats = transport.stats()["commands"]
+    add = stats["add_component"]
+    assert add["count"] == 20
+    assert 0 < add["p50"] <= add["p95"] <= add["p99"] <= add["max_time"]
+    assert add["bytes_sent"] > 0 and add["bytes_received"] > 0
+    assert add["retries"] == 0
+    assert sum(add["latency_buckets"].values()) == 20
+    assert stats["connect_components"]["count"] == 1
+    transport.close()
+
+
+def test_nested_spans_across_threads(gh_mcp, tmp_path, tracer):
+    from grasshopper_mcp.transport import Transport
+    from grasshopper_tools.client import GrasshopperClient
+    from grasshopper_tools.placement_executor import PlacementExecutor
+
+    commands = [
+        {"type": "add_component", "componentId": f"C{i}", "x": 0, "y": 0, "parameters": {"guid": "g"}}
+        for i in range(4)
+    ]
+    commands.append({
+        "type": "connect_components",
+        "parameters": {"sourceId": "C0", "sourceParam": "R", "targetId": "C1", "targetParam": "A"}
+    })
+    json_path = tmp_path / "placement_info.json"
+    json_path.write_text(json.dumps({"description": "trace", "commands": commands}), encoding="utf-8")
+
+    server = gh_mcp()
+    transport = Transport("127.0.0.1", server.port)
+    for use_dag in (True, False):
+        tracer.reset()
+        executor = PlacementExecutor(client=GrasshopperClient(transport=transport))
+        result = executor.execute_placement_info(
+            str(json_path), max_workers=4, use_dag=use_dag, resume=False,
+            id_map_path=str(tmp_path / "component_id_map.json")
+        )
+        assert result["success"]
+
+        spans = tracer.spans()
+        by_id = {span["span_id"]: span for span in spans}
+        root = next(span for span in spans if span["name"] == "placement.execute")
+        assert root["parent_id"] is None
+        assert root["attributes"]["mode"] == ("dag" if use_dag else "phased")
+
+        adds = [span for span in spans if span["name"] == "command add_component"]
+        assert len(adds) == 4
+        for span in adds:
+            parent = by_id[span["parent_id"]]
+            assert parent["name"] == "component_manager.add"
+            assert span["trace_id"] == root["trace_id"]
+            assert span["attributes"]["ok"] is True
+            assert span["attributes"]["bytes_sent"] > 0
+
+        connect = next(span for span in spans if span["name"] == "command connect_components")
+        assert by_id[connect["parent_id"]]["name"] == "connection_manager.connect"
+        assert connect["trace_id"] == root["trace_id"]
+    transport.close()
+
+    report = export_metrics(
+        str(tmp_path / "metrics.json"),
+        transports={"graph": transport.stats()},
+        label="test"
+    )
+    saved = json.loads((tmp_path / "metrics.json").read_text(encoding="utf-8"))
+    assert saved["label"] == "test"
+    assert saved["transports"]["graph"]["commands"]["add_component"]["count"] == 8
+    assert saved["span_summary"]["command add_component"]["count"] == 4
+    assert len(saved["spans"]) == len(report["spans"])
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = get_tracer()
+    tracer.reset()
+    assert not tracer.enabled
+    with tracer.span("outer") as span:
+        span.set(ignored=True)
+        fn = tracer.bind(len)
+    assert fn is len
+    assert tracer.spans() == []
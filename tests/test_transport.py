@@ -0,0 +1,231 @@
+"""
+Test: GH_MCP 共用傳輸層
+
+測試項目：
+1. 持久連接伺服器：連接被重用
+2. 舊式伺服器（每個命令後關閉連接）：自動改開新連接
+3. 大型回應（超過單次 recv）完整讀取
+4. SHUT_WR 半關閉框架
+5. 每種命令的統計
+6. 伺服器無法連接時拋出 TransportConnectError
+7. 重用的連接在收到部分回應後被重置：命令已執行，不重送
+"""
+
+import json
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加專案路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from grasshopper_mcp.transport import Transport, TransportConnectError, TransportError
+
+
+class LineServer:
+    """最小的換行分隔 JSON 伺服器，回應 {"success": true, "data": {"echo": type}}"""
+
+    def __init__(self, keep_alive: bool = True, half_close: bool = False, padding: int = 0):
+        self.keep_alive = keep_alive
+        self.half_close = half_close
+        self.padding = padding
+        self.accepted = 0
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(("127.0.0.1", 0))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                return
+            self.accepted += 1
+            threading.Thread(target=self._handle, args=(client,), daemon=True).start()
+
+    def _respond(self, client: socket.socket, raw: bytes, newline: bool = True):
+        command = json.loads(raw)
+        response = {"success": True, "data": {"echo": command["type"], "padding": "x" * self.padding}}
+        client.sendall((json.dumps(response) + ("\n" if newline else "")).encode("utf-8"))
+
+    def _handle(self, client: socket.socket):
+        with client, client.makefile("rb") as reader:
+            if self.half_close:
+                # 讀到 EOF（客戶端 SHUT_WR）後回應並關閉
+                self._respond(client, reader.read(), newline=False)
+                return
+            for line in reader:
+                self._respond(client, line)
+                if not self.keep_alive:
+                    return
+
+    def close(self):
+        self._sock.close()
+
+
+@pytest.fixture
+def keep_alive_server():
+    server = LineServer(keep_alive=True)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def legacy_server():
+    server = LineServer(keep_alive=False)
+    yield server
+    server.close()
+
+
+def test_pool_reuses_connections(keep_alive_server):
+    """持久連接伺服器上，連續請求只開一條 socket"""
+    transport = Transport("127.0.0.1", keep_alive_server.port, pool_size=2)
+    for i in range(20):
+        response = transport.send_command(f"cmd_{i}")
+        assert response["data"]["echo"] == f"cmd_{i}"
+
+    stats = transport.stats()
+    assert stats["requests"] == 20
+    assert stats["opened"] == 1
+    assert stats["reused"] == 19
+    assert keep_alive_server.accepted == 1
+    transport.close()
+
+
+def test_pool_reconnects_on_legacy_server(legacy_server):
+    """舊式伺服器每次關閉連接，連接池應自動改開新連接且請求全部成功"""
+    transport = Transport("127.0.0.1", legacy_server.port, pool_size=2)
+    for i in range(10):
+        response = transport.send_command(f"cmd_{i}")
+        assert response["success"] is True
+
+    stats = transport.stats()
+    assert stats["requests"] == 10
+    assert stats["opened"] == legacy_server.accepted
+    transport.close()
+
+
+def test_pool_threads_share_connections(keep_alive_server):
+    """多執行緒並行請求，開啟的 socket 數不超過並行數"""
+    transport = Transport("127.0.0.1", keep_alive_server.port, pool_size=4)
+    errors = []
+
+    def worker(n: int):
+        for i in range(25):
+            response = transport.request({"type": f"w{n}_{i}"})
+            if response["data"]["echo"] != f"w{n}_{i}":
+                errors.append(response)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not errors
+    stats = transport.stats()
+    assert stats["opened"] <= 4
+    assert stats["opened"] + stats["reused"] == 100
+    transport.close()
+
+
+def test_large_response_not_truncated():
+    """超過 64 KB 的回應必須完整讀取（舊版單次 recv 會截斷）"""
+    server = LineServer(padding=300_000)
+    try:
+        transport = Transport("127.0.0.1", server.port)
+        response = transport.send_command("capture_canvas")
+        assert len(response["data"]["padding"]) == 300_000
+        assert transport.stats()["bytes_received"] > 300_000
+        transport.close()
+    finally:
+        server.close()
+
+
+def test_shutdown_framing():
+    """SHUT_WR 半關閉框架：每個請求一條連接，讀到 EOF"""
+    server = LineServer(half_close=True)
+    try:
+        transport = Transport("127.0.0.1", server.port, framing="shutdown")
+        for i in range(3):
+            assert transport.send_command(f"cmd_{i}")["data"]["echo"] == f"cmd_{i}"
+        stats = transport.stats()
+        assert stats["framing"] == "shutdown"
+        assert stats["opened"] == 3
+        assert stats["reused"] == 0
+    finally:
+        server.close()
+
+
+def test_metrics_per_command(keep_alive_server):
+    """每種命令的次數與耗時"""
+    transport = Transport("127.0.0.1", keep_alive_server.port)
+    for _ in range(3):
+        transport.send_command("add_component", {"guid": "g"})
+    transport.send_command("get_connections")
+
+    stats = transport.stats()
+    assert stats["requests"] == 4
+    assert stats["commands"]["add_component"]["count"] == 3
+    assert stats["commands"]["get_connections"]["count"] == 1
+    assert stats["bytes_sent"] > 0
+    transport.close()
+
+
+def test_pool_connection_refused():
+    """無法連接時（含重試後）拋出 TransportConnectError"""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    transport = Transport("127.0.0.1", port, connect_timeout=1.0, retries=2, retry_backoff=0.01)
+    with pytest.raises(TransportConnectError):
+        transport.send_command("get_document_info")
+    stats = transport.stats()
+    assert stats["retries"] == 2
+    assert stats["errors"] == 1
+
+
+class PartialResetServer(LineServer):
+    """第二個命令只回應一半就重置連接（命令已執行）"""
+
+    def __init__(self):
+        self.received = []
+        super().__init__()
+
+    def _handle(self, client: socket.socket):
+        with client, client.makefile("rb") as reader:
+            for line in reader:
+                self.received.append(json.loads(line)["type"])
+                if len(self.received) == 1:
+                    self._respond(client, line)
+                    continue
+                client.sendall(b'{"success": tr')
+                time.sleep(0.1)
+                client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, b"\x01\x00\x00\x00\x00\x00\x00\x00")
+                return
+
+
+def test_no_retry_after_partial_response():
+    """重用連接在收到部分回應後被重置時拋出錯誤，不重送非冪等命令"""
+    server = PartialResetServer()
+    try:
+        transport = Transport("127.0.0.1", server.port, retries=0)
+        assert transport.send_command("get_document_info")["success"] is True
+        with pytest.raises(TransportError):
+            transport.send_command("add_component", {"guid": "g"})
+        time.sleep(0.1)
+        assert server.received == ["get_document_info", "add_component"]
+        assert server.accepted == 1
+        transport.close()
+    finally:
+        server.close()